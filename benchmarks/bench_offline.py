@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Benchmark the offline pipeline stages on generated corpora.
+
+Stdlib-only. For each corpus size (work items, see generate_corpus.py) times
+parse_epics_file(), scan_story_files(), load_sync_state(), classify_items()
+(epics, stories and tasks; cold, and again through a warm HashMemo
+including loading and saving its sidecar file),
+roll-up hashing with find_unchanged_subtrees() and write_sync_state(), and
+reports throughput (items per second, best of --repeat runs) and peak
+traced memory per stage.
+Peak memory comes from a separate tracemalloc run so it does not skew the
+timings.
+
+Results are compared with a stored baseline (benchmarks/baseline-offline.json
+by default): the ratio columns show current / baseline throughput and peak
+memory, and a stage whose throughput fell by more than --max-regression is
+marked. Baselines are machine-specific; record one with --save-baseline
+before comparing changes on the same machine.
+
+Usage:
+    python benchmarks/bench_offline.py
+    python benchmarks/bench_offline.py --sizes 1000,10000 --repeat 5
+    python benchmarks/bench_offline.py --save-baseline
+    python benchmarks/bench_offline.py --fail-on-regression
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from generate_corpus import TIMESTAMP, load_script, parse_corpus, write_corpus
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline-offline.json")
+STAGES = ["parse_epics_file", "scan_story_files", "load_sync_state", "classify_items", "classify_memoized",
+          "prune_subtrees", "write_sync_state"]
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Tuple[float, float]:
+    """Best wall time over `repeat` runs, and peak traced memory (MB) of one more run."""
+    best = None  # type: Optional[float]
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak / 1e6
+
+
+def classify_all(hashes: Any, parsed: Dict[str, Any], state: Dict[str, Dict],
+                 memo: Any = None) -> Dict[str, List[Dict]]:
+    """Classify epics, stories and tasks as compute-hashes.py main() does."""
+    epic_statuses = parsed["epicStatuses"]
+    story_statuses = parsed["storyStatuses"]
+    return {
+        "epics": hashes.classify_items(parsed["epics"], state["epics"], hashes.memoized(
+            memo, "epic", lambda e: hashes.epic_hash_fields(e, epic_statuses),
+            lambda e: hashes.hash_epic(e, epic_statuses))),
+        "stories": hashes.classify_items(parsed["stories"], state["stories"], hashes.memoized(
+            memo, "story", lambda s: hashes.story_hash_fields(s, story_statuses),
+            lambda s: hashes.hash_story(s, story_statuses))),
+        "tasks": hashes.classify_items(parsed["tasks"], state["tasks"], hashes.memoized(
+            memo, "task", hashes.task_hash_fields, hashes.hash_task)),
+        "iterations": [],
+    }
+
+
+def classify_memoized(hashes: Any, parsed: Dict[str, Any], state: Dict[str, Dict],
+                      memo_path: str) -> Dict[str, List[Dict]]:
+    """classify_all() through the memo file at memo_path, loaded and saved as compute-hashes.py main() does."""
+    memo = hashes.HashMemo(memo_path)
+    diff = classify_all(hashes, parsed, state, memo)
+    memo.save()
+    return diff
+
+
+def bench_corpus(root: str, items: int, seed: int, repeat: int) -> Dict[str, Any]:
+    info = write_corpus(root, items, seed)
+    paths = info["paths"]
+    parser = load_script("parse-artifacts.py")
+    hashes = load_script("compute-hashes.py")
+    writer = load_script("write-sync-state.py")
+
+    parsed = parse_corpus(paths, parser)
+    story_ids = [s["id"] for s in parsed["stories"]]
+    state = hashes.load_sync_state(paths["syncState"])
+    diff = classify_all(hashes, parsed, state)
+    memo_path = os.path.join(root, "output", "_bench-hash-memo.json")
+    warm_up = hashes.HashMemo(memo_path)
+    classify_all(hashes, parsed, state, warm_up)
+    warm_up.save()
+    config = writer.load_config(paths["config"])
+    out_path = os.path.join(root, "output", "_bench-sync.yaml")
+
+    counts = info["counts"]
+    stages = {
+        "parse_epics_file": (lambda: parser.parse_epics_file(paths["epics"]),
+                             counts["epics"] + counts["stories"]),
+        "scan_story_files": (lambda: parser.scan_story_files(paths["storiesDir"], story_ids),
+                             counts["tasks"]),
+        "load_sync_state": (lambda: hashes.load_sync_state(paths["syncState"]),
+                            sum(len(section) for section in state.values())),
+        "classify_items": (lambda: classify_all(hashes, parsed, state), counts["items"]),
+        "classify_memoized": (lambda: classify_memoized(hashes, parsed, state, memo_path), counts["items"]),
+        "prune_subtrees": (lambda: prune_subtrees(hashes, parsed, state, diff), counts["items"]),
+        "write_sync_state": (lambda: writer.write_sync_state(diff, {}, config, TIMESTAMP, out_path),
+                             counts["items"]),
+    }
+    results = {}
+    for name in STAGES:
+        fn, stage_items = stages[name]
+        seconds, peak_mb = measure(fn, repeat)
+        results[name] = {
+            "items": stage_items,
+            "seconds": round(seconds, 4),
+            "itemsPerSec": round(stage_items / seconds) if seconds else 0,
+            "peakMb": round(peak_mb, 2),
+        }
+    return {"counts": counts, "stages": results}
+
+
+def prune_subtrees(hashes: Any, parsed: Dict[str, Any], state: Dict[str, Dict],
+                   diff: Dict[str, List[Dict]]) -> Dict[str, Any]:
+    """Roll up the diff's content hashes and find the unchanged subtrees, as compute-hashes.py main() does."""
+    content = {kind: {item["id"]: item["contentHash"] for item in diff[kind] if item["classification"] != "ORPHANED"}
+               for kind in ("epics", "stories", "tasks")}
+    trees = hashes.compute_tree_hashes(parsed, content)
+    return hashes.find_unchanged_subtrees(parsed, state, trees, set())
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    if not path or not os.path.isfile(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the offline pipeline stages on generated corpora")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="Comma-separated corpus sizes in work items (default: 1000,10000,100000)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed (default: 0)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage; best is reported (default: 3)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run's results as the baseline")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Mark stages whose throughput fell by more than this fraction (default: 0.25)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 when any stage is marked")
+    parser.add_argument("--keep", default="", help="Directory to keep the generated corpora in")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    baseline = {} if args.save_baseline else load_baseline(args.baseline)
+    base_results = baseline.get("results", {})
+    if base_results:
+        print(f"Baseline: {args.baseline} ({baseline.get('python', '?')}, {baseline.get('machine', '?')})")
+    print(f"{'items':>7} {'stage':<17} {'seconds':>8} {'items/s':>10} {'peak MB':>8} {'vs base':>8} {'mem vs':>7}")
+
+    results = {}
+    regressions = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = os.path.join(args.keep, str(size)) if args.keep else tmp
+            run = bench_corpus(root, size, args.seed, args.repeat)
+        results[str(size)] = run
+        base_stages = base_results.get(str(size), {}).get("stages", {})
+        for name in STAGES:
+            stage = run["stages"][name]
+            row = f"{size:>7} {name:<17} {stage['seconds']:>8.3f} {stage['itemsPerSec']:>10} {stage['peakMb']:>8.1f}"
+            base = base_stages.get(name)
+            if base and base.get("itemsPerSec") and base.get("peakMb"):
+                speed = stage["itemsPerSec"] / base["itemsPerSec"]
+                row += f" {speed:>7.2f}x {stage['peakMb'] / base['peakMb']:>6.2f}x"
+                if speed < 1 - args.max_regression:
+                    row += "  REGRESSION"
+                    regressions.append(f"{name} at {size} items")
+            print(row, flush=True)
+
+    if args.save_baseline:
+        data = {
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}",
+            "seed": args.seed,
+            "results": results,
+        }
+        with open(args.baseline, "w", encoding="utf-8", newline="\n") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+
+    if regressions:
+        print(f"Throughput regressions over {args.max_regression:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Benchmark full syncs of a generated corpus against a local fake Azure DevOps.
+
+Stdlib-only. Generates a corpus (see generate_corpus.py) with an empty sync
+state, runs parse-artifacts.py and compute-hashes.py on it, then runs
+sync-devops.py once per mode against a fresh fake_ado.py server:
+
+    az          one az process per call (the fake_az.py shim on PATH)
+    rest        REST backend, one call at a time
+    rest-jobs   REST backend with --jobs (default 8)
+    batch       REST backend with --batch
+
+Each run reports wall time, work items per second, server requests per work
+item, failed items, 429/503 responses and the server-side p50/p95/p99
+request latency. Latency, throttling and error injection are passed to the
+server, so retry and rate-limit handling can be measured as well.
+
+Usage:
+    python benchmarks/bench_online.py
+    python benchmarks/bench_online.py --items 5000 --modes rest-jobs,batch --latency-ms 30 --jitter-ms 20
+    python benchmarks/bench_online.py --rate-limit 200 --error-rate 0.01
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from fake_ado import FakeAzureDevOps
+from fake_az import write_az_shim
+from generate_corpus import SCRIPTS_DIR, write_corpus
+
+MODES = {
+    "az": ["--backend", "az"],
+    "rest": ["--backend", "rest"],
+    "rest-jobs": ["--backend", "rest", "--jobs", "{jobs}"],
+    "batch": ["--backend", "rest", "--batch"],
+}
+
+
+def run_script(name: str, args: List[str], env: Dict[str, str] = None) -> None:
+    """Run one of the scripts/ files, raising with its stderr on failure."""
+    proc = subprocess.run([sys.executable, os.path.join(SCRIPTS_DIR, name)] + args,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{name} exited with {proc.returncode}:\n{proc.stderr.decode('utf-8', 'replace')}")
+
+
+def prepare_diff(root: str, items: int, seed: int, attach: bool) -> Dict[str, Any]:
+    """Generate a never-synced corpus and compute its diff (every item NEW)."""
+    info = write_corpus(root, items, seed, synced=0, changed=0, orphaned=0)
+    paths = info["paths"]
+    if attach:
+        with open(paths["config"], "r", encoding="utf-8") as f:
+            config = f.read().replace('attachStoryFiles: "false"', 'attachStoryFiles: "true"')
+        with open(paths["config"], "w", encoding="utf-8", newline="\n") as f:
+            f.write(config)
+    parsed = os.path.join(root, "output", "_parsed.json")
+    diff = os.path.join(root, "output", "_diff.json")
+    run_script("parse-artifacts.py", ["--epics", paths["epics"], "--stories-dir", paths["storiesDir"],
+                                      "--sprint-yaml", paths["sprintYaml"], "--output", parsed, "--no-cache"])
+    run_script("compute-hashes.py", ["--parsed", parsed, "--sync-state", paths["syncState"], "--output", diff])
+    return {"paths": paths, "counts": info["counts"], "diff": diff}
+
+
+def bench_mode(mode: str, corpus: Dict[str, Any], server_options: Dict[str, Any], jobs: int,
+               bin_dir: str) -> Dict[str, Any]:
+    """Run one sync against a fresh fake server and collect client and server stats."""
+    output = os.path.join(corpus["paths"]["root"], "output", f"_sync-{mode}.json")
+    args = ["--diff", corpus["diff"], "--config", corpus["paths"]["config"], "--output", output]
+    args += [a.format(jobs=jobs) for a in MODES[mode]]
+    with FakeAzureDevOps(**server_options) as server:
+        env = dict(os.environ)
+        env.update({
+            "PATH": bin_dir + os.pathsep + env.get("PATH", ""),
+            "AZURE_DEVOPS_EXT_PAT": "benchmark",
+            "FAKE_ADO_ORG_URL": server.url,
+            "FAKE_ADO_PROJECT": server.project,
+        })
+        start = time.perf_counter()
+        run_script("sync-devops.py", args + ["--org", server.url, "--journal", output + ".journal.jsonl"], env)
+        seconds = time.perf_counter() - start
+        stats = server.stats()
+    with open(output, "r", encoding="utf-8") as f:
+        result = json.load(f)
+    items = corpus["counts"]["items"]
+    failed = sum(len(result[kind].get("failed", [])) for kind in ("epics", "stories", "tasks"))
+    return {
+        "seconds": round(seconds, 2),
+        "itemsPerSec": round(items / seconds, 1) if seconds else 0,
+        "requests": stats["requests"],
+        "callsPerItem": round(stats["requests"] / items, 2) if items else 0,
+        "failed": failed,
+        "throttled": stats["byStatus"].get("429", 0),
+        "errors": stats["byStatus"].get("503", 0),
+        "latencyMs": stats["latencyMs"],
+        "status": result.get("status"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full syncs against a local fake Azure DevOps")
+    parser.add_argument("--items", type=int, default=1000, help="Work items in the corpus (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus and server seed (default: 0)")
+    parser.add_argument("--modes", default="az,rest,rest-jobs,batch",
+                        help=f"Comma-separated modes from {', '.join(MODES)} (default: all)")
+    parser.add_argument("--jobs", type=int, default=8, help="--jobs for the rest-jobs mode (default: 8)")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Server delay per request (default: 10)")
+    parser.add_argument("--jitter-ms", type=float, default=5.0,
+                        help="Mean extra exponential server delay (default: 5)")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Server requests per second before 429s")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--attach", action="store_true", help="Enable story file attachments")
+    parser.add_argument("--keep", default="", help="Directory to keep the corpus and sync results in")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error(f"Unknown mode(s): {', '.join(unknown)}")
+    server_options = {
+        "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "rate_limit": args.rate_limit,
+        "throttle_rate": args.throttle_rate, "error_rate": args.error_rate, "seed": args.seed,
+    }
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.keep or tmp
+        corpus = prepare_diff(root, args.items, args.seed, args.attach)
+        bin_dir = os.path.join(tmp, "bin")
+        write_az_shim(bin_dir)
+        counts = corpus["counts"]
+        if not args.json:
+            print(f"Corpus: {counts['items']} work items ({counts['epics']} epics, {counts['stories']} stories, "
+                  f"{counts['tasks']} tasks); server latency {args.latency_ms:g} ms + {args.jitter_ms:g} ms jitter")
+            print(f"{'mode':<10} {'seconds':>8} {'items/s':>8} {'calls':>7} {'calls/item':>10} {'failed':>6} "
+                  f"{'429':>5} {'503':>5} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}")
+        for mode in modes:
+            run = bench_mode(mode, corpus, server_options, args.jobs, bin_dir)
+            results[mode] = run
+            if not args.json:
+                lat = run["latencyMs"]
+                print(f"{mode:<10} {run['seconds']:>8.2f} {run['itemsPerSec']:>8.1f} {run['requests']:>7} "
+                      f"{run['callsPerItem']:>10.2f} {run['failed']:>6} {run['throttled']:>5} {run['errors']:>5} "
+                      f"{lat['p50'] or 0:>7.1f} {lat['p95'] or 0:>7.1f} {lat['p99'] or 0:>7.1f}", flush=True)
+
+    if args.json:
+        print(json.dumps({"counts": counts, "server": server_options, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark parse_epics_file() scaling on generated epics.md documents.
+
+Stdlib-only. Generates planning documents from 250 epics / 2,500 stories up
+to 2,000 epics / 20,000 stories (10 stories per epic, summary section plus
+detailed section, phases, dependencies, requirement references and
+acceptance criteria) and reports parse time per size. Linear scaling shows
+as a flat time-per-story column.
+
+Usage:
+    python benchmarks/bench_parse_epics.py
+    python benchmarks/bench_parse_epics.py --epics 2000 --stories-per-epic 10
+    python benchmarks/bench_parse_epics.py --compare old-parse-artifacts.py
+
+--compare times another parse-artifacts.py (e.g. from `git show
+<rev>:scripts/parse-artifacts.py`) on the same documents and checks that
+both produce identical JSON.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Optional, Tuple
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts")
+
+
+def load_parser(path: str) -> Any:
+    """Import a parse-artifacts.py file as a module."""
+    spec = importlib.util.spec_from_file_location(f"parse_artifacts_{abs(hash(path))}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def generate_epics_md(epic_count: int, stories_per_epic: int) -> str:
+    """Build an epics.md with a summary section and a detailed section."""
+    lines = ["# Project Epics", "", "## Epic Summary", ""]
+    for e in range(1, epic_count + 1):
+        lines += [f"### Epic {e}: Capability area {e}", f"Summary of capability area {e}.", ""]
+    lines += ["## Detailed Epics", ""]
+    for e in range(1, epic_count + 1):
+        lines += [
+            f"## Epic {e}: Capability area {e}",
+            f"Deliver capability area {e} end to end. Covers FR-{e}.1 and NFR-{e % 7}.",
+            f"**Phase:** Phase {e % 4 + 1}",
+            f"**Dependencies:** Epic {max(1, e - 1)}; Epic {max(1, e - 2)}",
+            "",
+        ]
+        for s in range(1, stories_per_epic + 1):
+            lines += [
+                f"### Story {e}.{s}: Feature {s} of area {e}",
+                f"As a user, I want feature {s} of area {e}, so that work flows (FR-{e}.{s}).",
+                "",
+                "**Acceptance Criteria:**",
+                f"- Given area {e} is enabled, when feature {s} runs, then it succeeds",
+                f"- Given invalid input, when feature {s} runs, then an error is shown (ARCH-{s})",
+                "",
+                "**Technical Notes:** keep it simple",
+                "",
+            ]
+    return "\n".join(lines) + "\n"
+
+
+def time_parse(module: Any, path: str, repeat: int) -> Tuple[float, Any]:
+    best = None  # type: Optional[float]
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = module.parse_epics_file(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parse_epics_file() scaling")
+    parser.add_argument("--epics", type=int, default=2000, help="Epic count at the largest size (default: 2000)")
+    parser.add_argument("--stories-per-epic", type=int, default=10, help="Stories per epic (default: 10)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; best time is reported (default: 3)")
+    parser.add_argument("--compare", default="", help="Another parse-artifacts.py to time on the same documents")
+    args = parser.parse_args()
+
+    current = load_parser(os.path.join(SCRIPTS_DIR, "parse-artifacts.py"))
+    baseline = load_parser(args.compare) if args.compare else None
+
+    sizes = sorted({max(1, args.epics // 8), max(1, args.epics // 4), max(1, args.epics // 2), args.epics})
+    header = f"{'epics':>7} {'stories':>8} {'MB':>6} {'parse s':>9} {'us/story':>9}"
+    if baseline:
+        header += f" {'compare s':>10} {'speedup':>8}"
+    print(header)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for epic_count in sizes:
+            path = os.path.join(tmp, "epics.md")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(generate_epics_md(epic_count, args.stories_per_epic))
+            story_count = epic_count * args.stories_per_epic
+            size_mb = os.path.getsize(path) / 1e6
+
+            elapsed, result = time_parse(current, path, args.repeat)
+            row = f"{epic_count:>7} {story_count:>8} {size_mb:>6.1f} {elapsed:>9.3f} {elapsed / story_count * 1e6:>9.1f}"
+            if baseline:
+                base_elapsed, base_result = time_parse(baseline, path, 1)
+                if json.dumps(base_result) != json.dumps(result):
+                    print(f"ERROR: output differs from {args.compare} at {epic_count} epics", file=sys.stderr)
+                    sys.exit(1)
+                row += f" {base_elapsed:>10.3f} {base_elapsed / elapsed:>7.1f}x"
+            print(row, flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Benchmark parse_story_file() / scan_story_files() on generated story files.
+
+Stdlib-only. Writes flat {N-M-slug}.md story files (status line, a Tasks /
+Subtasks section with subtasks and AC references, dev notes and two rounds
+of review follow-ups with priority/file/AI-Review tags) and times a full
+scan_story_files() over them.
+
+Usage:
+    python benchmarks/bench_parse_stories.py
+    python benchmarks/bench_parse_stories.py --stories 5000
+    python benchmarks/bench_parse_stories.py --jobs 4
+    python benchmarks/bench_parse_stories.py --compare old-parse-artifacts.py
+
+--compare times another parse-artifacts.py on the same files and checks
+that both produce the same JSON (ignoring dict key order).
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, List, Tuple
+
+from bench_parse_epics import SCRIPTS_DIR, load_parser
+
+
+def generate_story_md(epic: int, story: int) -> str:
+    """One realistic story file."""
+    lines = [
+        f"# Story {epic}.{story}: Feature {story} of area {epic}",
+        "",
+        f"Status: {('done', 'in-progress', 'review', 'draft')[story % 4]}",
+        "",
+        "## Story",
+        "",
+        f"As a user, I want feature {story}, so that area {epic} works.",
+        "",
+        "## Acceptance Criteria",
+        "",
+        "1. Given input, when processed, then output is produced",
+        "2. Given bad input, when processed, then an error is shown",
+        "",
+        "## Tasks / Subtasks",
+        "",
+    ]
+    for t in range(1, 7):
+        lines.append(f"- [{'x' if t % 2 else ' '}] Implement part {t} of feature {story} (AC: {t % 2 + 1}, 2)")
+        for st in range(1, 4):
+            lines.append(f"  - [{'x' if st == 1 else ' '}] Step {st} for part {t}")
+    lines += ["", "## Dev Notes", ""]
+    lines += [f"Note line {n} about the implementation of feature {story}." for n in range(1, 21)]
+    lines += ["", "### Review Follow-ups (AI)", ""]
+    lines += [f"- [ ] [AI-Review][HIGH] Fix issue {n} in handler [src/area{epic}/feature{story}.py:{n * 10}]"
+              for n in range(1, 4)]
+    lines += ["", "### Review Follow-ups Round 2 (AI)", ""]
+    lines += [f"- [x] [LOW] Tidy naming {n}" for n in range(1, 3)]
+    lines += ["", "## Dev Agent Record", "", "Completed."]
+    return "\n".join(lines) + "\n"
+
+
+def write_story_files(root: str, count: int, per_epic: int = 10) -> List[str]:
+    story_ids = []
+    for n in range(count):
+        epic, story = n // per_epic + 1, n % per_epic + 1
+        with open(os.path.join(root, f"{epic}-{story}-feature-{story}.md"), "w", encoding="utf-8") as f:
+            f.write(generate_story_md(epic, story))
+        story_ids.append(f"{epic}.{story}")
+    return story_ids
+
+
+def time_scan(module: Any, root: str, story_ids: List[str], repeat: int, jobs: int = 1) -> Tuple[float, Any]:
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if jobs > 1:
+            result = module.scan_story_files(root, story_ids, jobs=jobs)
+        else:
+            result = module.scan_story_files(root, story_ids)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scan_story_files() on generated story files")
+    parser.add_argument("--stories", type=int, default=2000, help="Story files at the largest size (default: 2000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; best time is reported (default: 3)")
+    parser.add_argument("--compare", default="", help="Another parse-artifacts.py to time on the same files")
+    parser.add_argument("--jobs", type=int, default=1, help="Parse threads for the current parser (default: 1)")
+    args = parser.parse_args()
+
+    current = load_parser(os.path.join(SCRIPTS_DIR, "parse-artifacts.py"))
+    baseline = load_parser(args.compare) if args.compare else None
+
+    sizes = sorted({max(1, args.stories // 4), max(1, args.stories // 2), args.stories})
+    header = f"{'stories':>8} {'scan s':>8} {'us/file':>8}"
+    if baseline:
+        header += f" {'compare s':>10} {'speedup':>8}"
+    print(header)
+
+    for count in sizes:
+        with tempfile.TemporaryDirectory() as root:
+            story_ids = write_story_files(root, count)
+            elapsed, result = time_scan(current, root, story_ids, args.repeat, args.jobs)
+            row = f"{count:>8} {elapsed:>8.3f} {elapsed / count * 1e6:>8.0f}"
+            if baseline:
+                base_elapsed, base_result = time_scan(baseline, root, story_ids, args.repeat)
+                if json.dumps(base_result, sort_keys=True) != json.dumps(result, sort_keys=True):
+                    print(f"ERROR: output differs from {args.compare} at {count} stories", file=sys.stderr)
+                    sys.exit(1)
+                row += f" {base_elapsed:>10.3f} {base_elapsed / elapsed:>7.1f}x"
+            print(row, flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Azure DevOps work item REST API.
+
+Stdlib-only, in-memory, for benchmarks and manual testing of sync-devops.py
+without a real organization. Implements the endpoints the sync scripts use:
+
+    POST  {project}/_apis/wit/workitems/${type}          create (JSON Patch)
+    PATCH [{project}/]_apis/wit/workitems/{id}            update: fields, relations, test /rev
+    GET   [{project}/]_apis/wit/workitems/{id}            read ($expand=relations)
+    POST  _apis/wit/$batch                                work item batch, temporary negative IDs
+    POST  {project}/_apis/wit/wiql                        [System.Id] IN (...) / WorkItemType filters
+    POST  {project}/_apis/wit/attachments                 upload, or start a chunked upload
+    PUT   {project}/_apis/wit/attachments/{id}            upload chunk (Content-Range)
+    POST  {project}/_apis/wit/classificationnodes/Iterations/{path}
+    GET   {project}/_apis/wit/workitemtypes               Agile process types
+
+Every request can be delayed (--latency-ms plus exponential --jitter-ms),
+throttled (a --rate-limit token bucket answering 429 with Retry-After and
+X-RateLimit-Remaining, plus a random --throttle-rate) and failed with a
+503 (--error-rate; the server does not act on a failed request, so retrying
+it is safe). Request counts, status codes and handling times are kept for
+reporting.
+
+Usage:
+    python benchmarks/fake_ado.py --port 8080 --latency-ms 20
+    # organization URL: http://127.0.0.1:8080/benchmark
+"""
+
+import argparse
+import http.server
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+import urllib.parse
+from typing import Any, Dict, List, Optional, Tuple
+
+WORK_ITEM_TYPES = ["Epic", "Feature", "User Story", "Task", "Bug", "Issue"]
+
+
+class FakeError(Exception):
+    """An error response: HTTP status plus an Azure DevOps style message."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class FakeAzureDevOps:
+    """In-memory Azure DevOps organization served over HTTP on 127.0.0.1.
+
+    Use as a context manager (or start()/stop()); url is the organization
+    URL to put in devops-sync-config.yaml.
+    """
+
+    def __init__(self, org: str = "benchmark", project: str = "Benchmark", port: int = 0,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, rate_limit: float = 0.0,
+                 burst: int = 50, throttle_rate: float = 0.0, error_rate: float = 0.0,
+                 require_auth: bool = True, seed: int = 0):
+        self.org = org
+        self.project = project
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit = rate_limit
+        self.burst = max(1, burst)
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.require_auth = require_auth
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._refilled = time.monotonic()
+        self._ids = itertools.count(1)
+        self.work_items = {}  # type: Dict[int, Dict[str, Any]]
+        self.iterations = {}  # type: Dict[str, Dict[str, Any]]
+        self.attachments = {}  # type: Dict[str, Dict[str, Any]]
+        self.requests = {}  # type: Dict[str, int]
+        self.statuses = {}  # type: Dict[int, int]
+        self.durations = []  # type: List[float]
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None  # type: Optional[threading.Thread]
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/{self.org}"
+
+    def start(self) -> "FakeAzureDevOps":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeAzureDevOps":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    # --- reporting ---
+
+    def stats(self) -> Dict[str, Any]:
+        """Request counts by route and status, and handling time percentiles (ms)."""
+        with self._lock:
+            durations = sorted(self.durations)
+            requests = dict(self.requests)
+            statuses = dict(self.statuses)
+
+        def pct(p: float) -> Optional[float]:
+            if not durations:
+                return None
+            return round(durations[min(len(durations) - 1, int(math.ceil(p / 100 * len(durations))) - 1)] * 1000, 1)
+
+        return {
+            "requests": sum(statuses.values()),
+            "byRoute": requests,
+            "byStatus": {str(k): v for k, v in sorted(statuses.items())},
+            "workItems": len(self.work_items),
+            "latencyMs": {"p50": pct(50), "p95": pct(95), "p99": pct(99), "max": pct(100)},
+        }
+
+    def _count(self, route: str, status: int, seconds: float) -> None:
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.durations.append(seconds)
+
+    # --- request admission: latency, rate limit, injected failures ---
+
+    def _delay(self) -> float:
+        with self._lock:
+            jitter = self._rng.expovariate(1.0 / self.jitter_ms) if self.jitter_ms > 0 else 0.0
+        return (self.latency_ms + jitter) / 1000.0
+
+    def _admit(self) -> Optional[Tuple[int, Dict[str, str], str]]:
+        """None to serve the request, else (status, headers, message) to reject it with."""
+        with self._lock:
+            headers = {}
+            if self.rate_limit > 0:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate_limit)
+                self._refilled = now
+                if self._tokens < 1:
+                    retry_after = max(1, math.ceil((1 - self._tokens) / self.rate_limit))
+                    return 429, {"Retry-After": str(retry_after), "X-RateLimit-Remaining": "0"}, \
+                        "TF400733: Request was blocked due to exceeding usage of resource"
+                self._tokens -= 1
+                headers["X-RateLimit-Remaining"] = str(int(self._tokens))
+            if self.throttle_rate and self._rng.random() < self.throttle_rate:
+                return 429, {"Retry-After": "1", "X-RateLimit-Remaining": "0"}, \
+                    "TF400733: Request was blocked due to exceeding usage of resource"
+            if self.error_rate and self._rng.random() < self.error_rate:
+                return 503, {}, "Service Unavailable"
+        return None
+
+    # --- work items ---
+
+    def _item_url(self, devops_id: int) -> str:
+        return f"{self.url}/_apis/wit/workItems/{devops_id}"
+
+    def _apply_patch(self, item: Dict[str, Any], ops: List[Dict[str, Any]], temp_ids: Dict[int, int]) -> None:
+        for op in ops:
+            path = op.get("path", "")
+            kind = op.get("op", "add")
+            if path == "/rev" and kind == "test":
+                if int(op.get("value", -1)) != item["rev"]:
+                    raise FakeError(412, f"TF26071: This work item has been changed (rev {item['rev']})")
+            elif path == "/id":
+                continue
+            elif path.startswith("/fields/"):
+                field = path[len("/fields/"):]
+                if kind == "remove":
+                    item["fields"].pop(field, None)
+                else:
+                    item["fields"][field] = op.get("value")
+            elif path == "/relations/-" and kind == "add":
+                relation = dict(op.get("value") or {})
+                m = re.search(r"/workItems/(-?\d+)$", relation.get("url", ""), re.IGNORECASE)
+                if m:
+                    target = int(m.group(1))
+                    target = temp_ids.get(target, target)
+                    if target not in self.work_items:
+                        raise FakeError(400, f"TF201036: Work item {target} does not exist")
+                    relation["url"] = self._item_url(target)
+                item["relations"].append(relation)
+            elif path.startswith("/relations/") and kind == "remove":
+                index = int(path.rsplit("/", 1)[1])
+                if index >= len(item["relations"]):
+                    raise FakeError(400, f"Relation index {index} out of range")
+                del item["relations"][index]
+            else:
+                raise FakeError(400, f"Unsupported patch operation: {kind} {path}")
+
+    def create_work_item(self, wit: str, ops: List[Dict[str, Any]],
+                         temp_ids: Optional[Dict[int, int]] = None) -> Dict[str, Any]:
+        if wit not in WORK_ITEM_TYPES:
+            raise FakeError(404, f"VS402323: Work item type {wit} does not exist")
+        temp_ids = temp_ids if temp_ids is not None else {}
+        with self._lock:
+            devops_id = next(self._ids)
+        item = {"id": devops_id, "rev": 1, "fields": {"System.WorkItemType": wit, "System.State": "New",
+                                                      "System.TeamProject": self.project},
+                "relations": [], "url": self._item_url(devops_id)}
+        self._apply_patch(item, ops, temp_ids)
+        if not item["fields"].get("System.Title"):
+            raise FakeError(400, "TF401320: Rule Error for field Title. Error code: Required")
+        for op in ops:
+            if op.get("path") == "/id":
+                temp_ids[int(op["value"])] = devops_id
+        with self._lock:
+            self.work_items[devops_id] = item
+        return item
+
+    def update_work_item(self, devops_id: int, ops: List[Dict[str, Any]],
+                         temp_ids: Optional[Dict[int, int]] = None) -> Dict[str, Any]:
+        devops_id = (temp_ids or {}).get(devops_id, devops_id)
+        item = self.work_items.get(devops_id)
+        if item is None:
+            raise FakeError(404, f"TF401232: Work item {devops_id} does not exist")
+        with self._lock:
+            self._apply_patch(item, ops, temp_ids or {})
+            item["rev"] += 1
+        return item
+
+    def _work_item_request(self, method: str, rest: List[str], body: Any, query: Dict[str, str],
+                           temp_ids: Optional[Dict[int, int]] = None) -> Tuple[str, Dict[str, Any]]:
+        target = rest[2] if len(rest) > 2 else ""
+        if target.startswith("$") and method in ("POST", "PATCH"):
+            return "create", self.create_work_item(target[1:], body or [], temp_ids)
+        if re.fullmatch(r"-?\d+", target):
+            if method == "PATCH":
+                route = "relations" if all(op.get("path", "").startswith(("/relations", "/rev"))
+                                           for op in body or []) else "update"
+                return route, self.update_work_item(int(target), body or [], temp_ids)
+            if method == "GET":
+                item = self.work_items.get(int(target))
+                if item is None:
+                    raise FakeError(404, f"TF401232: Work item {target} does not exist")
+                if query.get("$expand", "").lower() not in ("relations", "all"):
+                    item = {k: v for k, v in item.items() if k != "relations"}
+                return "get", item
+        raise FakeError(405, f"Unsupported work item request: {method} {'/'.join(rest)}")
+
+    def batch(self, requests: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if len(requests) > 200:
+            raise FakeError(400, "VS403474: The batch request can contain at most 200 requests")
+        temp_ids = {}  # type: Dict[int, int]
+        values = []
+        for sub in requests:
+            parts = urllib.parse.urlsplit(sub.get("uri", ""))
+            segments = [urllib.parse.unquote(s) for s in parts.path.split("/") if s]
+            rest = segments[segments.index("_apis") + 1:] if "_apis" in segments else []
+            try:
+                _, item = self._work_item_request(sub.get("method", "PATCH"), rest, sub.get("body"),
+                                                  dict(urllib.parse.parse_qsl(parts.query)), temp_ids)
+                values.append({"code": 200, "headers": {"Content-Type": "application/json"},
+                               "body": json.dumps(item)})
+            except FakeError as e:
+                values.append({"code": e.status, "headers": {"Content-Type": "application/json"},
+                               "body": json.dumps({"message": e.message})})
+        return {"count": len(values), "value": values}
+
+    def wiql(self, query: str) -> Dict[str, Any]:
+        ids = sorted(self.work_items)
+        m = re.search(r"\[System\.Id\]\s+IN\s*\(([^)]*)\)", query, re.IGNORECASE)
+        if m:
+            wanted = {int(x) for x in re.findall(r"\d+", m.group(1))}
+            ids = [i for i in ids if i in wanted]
+        m = re.search(r"\[System\.WorkItemType\]\s*=\s*'([^']+)'", query, re.IGNORECASE)
+        if m:
+            ids = [i for i in ids if self.work_items[i]["fields"].get("System.WorkItemType") == m.group(1)]
+        return {"queryType": "flat", "workItems": [{"id": i, "url": self._item_url(i)} for i in ids]}
+
+    # --- iterations and attachments ---
+
+    def create_iteration(self, parent: List[str], name: str) -> Dict[str, Any]:
+        path = "\\".join([self.project, "Iteration"] + parent + [name])
+        with self._lock:
+            if path in self.iterations:
+                raise FakeError(409, f"VS402371: Classification node name {name} is already in use")
+            node_id = next(self._ids)
+            node = {"id": node_id, "identifier": f"00000000-0000-0000-0000-{node_id:012d}", "name": name,
+                    "structureType": "iteration", "path": "\\" + path}
+            self.iterations[path] = node
+        return node
+
+    def _attachment(self, attachment_id: str, filename: str) -> Dict[str, Any]:
+        quoted = urllib.parse.quote(filename)
+        return {"id": attachment_id,
+                "url": f"{self.url}/{self.project}/_apis/wit/attachments/{attachment_id}?fileName={quoted}"}
+
+    # --- HTTP plumbing ---
+
+    def _handler_class(self) -> type:
+        fake = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without this Nagle's
+            # algorithm and delayed ACKs add ~40 ms to every keep-alive response
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                self._handle("GET")
+
+            def do_POST(self) -> None:
+                self._handle("POST")
+
+            def do_PATCH(self) -> None:
+                self._handle("PATCH")
+
+            def do_PUT(self) -> None:
+                self._handle("PUT")
+
+            def _handle(self, method: str) -> None:
+                start = time.perf_counter()
+                route = "unknown"
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                try:
+                    time.sleep(fake._delay())
+                    if fake.require_auth and not self.headers.get("Authorization"):
+                        raise FakeError(401, "TF400813: The user is not authorized to access this resource")
+                    rejected = fake._admit()
+                    if rejected:
+                        status, headers, message = rejected
+                        route = "rejected"
+                        self._send(status, {"message": message}, headers)
+                    else:
+                        route, status, data = self._route(method, raw)
+                        self._send(status, data)
+                except FakeError as e:
+                    status = e.status
+                    self._send(e.status, {"message": e.message})
+                fake._count(route, status, time.perf_counter() - start)
+
+            def _route(self, method: str, raw: bytes) -> Tuple[str, int, Dict[str, Any]]:
+                parts = urllib.parse.urlsplit(self.path)
+                query = dict(urllib.parse.parse_qsl(parts.query))
+                segments = [urllib.parse.unquote(s) for s in parts.path.split("/") if s]
+                if "_apis" not in segments:
+                    raise FakeError(404, f"Not found: {parts.path}")
+                rest = segments[segments.index("_apis") + 1:]
+                if rest[:1] != ["wit"]:
+                    raise FakeError(404, f"Not found: {parts.path}")
+                rest[1:2] = [rest[1].lower()] if len(rest) > 1 else []
+                content_type = self.headers.get("Content-Type", "")
+                body = json.loads(raw.decode("utf-8")) if raw and "json" in content_type else None
+
+                if rest[1:2] == ["workitems"]:
+                    route, item = fake._work_item_request(method, rest, body, query)
+                    return route, 200, item
+                if rest[1:] == ["$batch"] and method == "POST":
+                    return "batch", 200, fake.batch(body or [])
+                if rest[1:] == ["wiql"] and method == "POST":
+                    return "wiql", 200, fake.wiql((body or {}).get("query", ""))
+                if rest[1:] == ["workitemtypes"] and method == "GET":
+                    types = [{"name": t, "referenceName": f"Microsoft.VSTS.WorkItemTypes.{t.replace(' ', '')}"}
+                             for t in WORK_ITEM_TYPES]
+                    return "workitemtypes", 200, {"count": len(types), "value": types}
+                if rest[1:2] == ["classificationnodes"] and len(rest) > 2 \
+                        and rest[2].lower() == "iterations" and method == "POST":
+                    return "iteration", 201, fake.create_iteration(rest[3:], (body or {}).get("name", ""))
+                if rest[1:2] == ["attachments"]:
+                    filename = query.get("fileName", "attachment")
+                    if len(rest) == 2 and method == "POST":
+                        attachment_id = f"att-{next(fake._ids)}"
+                        fake.attachments[attachment_id] = {"fileName": filename, "size": len(raw)}
+                        return "attachment", 201, fake._attachment(attachment_id, filename)
+                    if len(rest) == 3 and method == "PUT" and rest[2] in fake.attachments:
+                        fake.attachments[rest[2]]["size"] += len(raw)
+                        return "attachmentChunk", 201, fake._attachment(rest[2], filename)
+                raise FakeError(404, f"Not found: {method} {parts.path}")
+
+            def _send(self, status: int, data: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+                payload = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Azure DevOps work item REST API")
+    parser.add_argument("--port", type=int, default=8080, help="Port on 127.0.0.1 (default: 8080)")
+    parser.add_argument("--org", default="benchmark", help="Organization name in the URL (default: benchmark)")
+    parser.add_argument("--project", default="Benchmark", help="Project name (default: Benchmark)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed delay per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Mean of an extra exponential delay")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests per second before 429s (0: off)")
+    parser.add_argument("--burst", type=int, default=50, help="Token bucket size for --rate-limit")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for jitter and injected failures")
+    args = parser.parse_args()
+
+    server = FakeAzureDevOps(args.org, args.project, args.port, args.latency_ms, args.jitter_ms,
+                             args.rate_limit, args.burst, args.throttle_rate, args.error_rate, seed=args.seed)
+    print(f"Fake Azure DevOps at {server.url} (project {args.project}); Ctrl+C to stop", flush=True)
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+        print(json.dumps(server.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
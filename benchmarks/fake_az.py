@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Stand-in for the az CLI that talks to a fake_ado.py server.
+
+Handles the az commands sync-devops.py runs — boards work-item create/update,
+work-item relation add, iteration project create, boards query --wiql and
+account get-access-token — by translating them with sync-devops.py's own
+az_args_to_rest() and sending them to FAKE_ADO_ORG_URL (project
+FAKE_ADO_PROJECT). Like az, it prints the JSON response on success and an
+"ERROR: ..." line on stderr with exit code 1 on failure; throttling errors
+carry the 429 status and Retry-After value the way az reports them.
+
+Every call is a new Python process, so the az backend benchmark includes
+process startup cost (real az startup is slower still).
+
+Usage:
+    write_az_shim(bin_dir)        # creates bin_dir/az (and az.cmd)
+    PATH=bin_dir:$PATH FAKE_ADO_ORG_URL=http://127.0.0.1:8080/benchmark \\
+        FAKE_ADO_PROJECT=Benchmark az boards work-item create --type Task --title T
+"""
+
+import base64
+import json
+import os
+import stat
+import sys
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+from generate_corpus import load_script
+
+
+def write_az_shim(bin_dir: str) -> str:
+    """Create an `az` executable (and `az.cmd` for Windows) running this script."""
+    os.makedirs(bin_dir, exist_ok=True)
+    script = os.path.abspath(__file__)
+    path = os.path.join(bin_dir, "az")
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n')
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    with open(os.path.join(bin_dir, "az.cmd"), "w", encoding="utf-8", newline="\r\n") as f:
+        f.write(f'@"{sys.executable}" "{script}" %*\n')
+    return path
+
+
+def send(org_url: str, method: str, path: str, body: Any, content_type: str) -> Dict[str, Any]:
+    pat = os.environ.get("AZURE_DEVOPS_EXT_PAT", "fake")
+    auth = base64.b64encode(f":{pat}".encode("utf-8")).decode("ascii")
+    req = urllib.request.Request(org_url.rstrip("/") + path, method=method,
+                                 data=json.dumps(body).encode("utf-8") if body is not None else None,
+                                 headers={"Content-Type": content_type, "Accept": "application/json",
+                                          "Authorization": f"Basic {auth}"})
+    with urllib.request.urlopen(req, timeout=60) as resp:
+        return json.loads(resp.read().decode("utf-8") or "{}")
+
+
+def run(args: List[str]) -> Optional[Dict[str, Any]]:
+    sync = load_script("sync-devops.py")
+    org_url = os.environ.get("FAKE_ADO_ORG_URL", "")
+    project = os.environ.get("FAKE_ADO_PROJECT", "")
+    args = [a for a in args if a not in ("--only-show-errors",)]
+    if "--output" in args:
+        i = args.index("--output")
+        del args[i:i + 2]
+    command, options = sync.parse_az_args(args)
+
+    if command[:2] == ["account", "get-access-token"]:
+        return {"accessToken": "fake-token", "expiresOn": "2099-01-01 00:00:00.000000",
+                "expires_on": 4070908800, "tokenType": "Bearer"}
+    if command[:2] == ["boards", "query"]:
+        quoted = urllib.parse.quote(project, safe="")
+        data = send(org_url, "POST", f"/{quoted}/_apis/wit/wiql?api-version={sync.API_VERSION}",
+                    {"query": sync.az_option(options, "--wiql")}, "application/json")
+        return data.get("workItems", [])
+    req = sync.az_args_to_rest(args, project, org_url)
+    return send(org_url, req["method"], req["path"], req["body"], req["contentType"])
+
+
+def main():
+    try:
+        data = run(sys.argv[1:])
+    except urllib.error.HTTPError as e:
+        text = e.read().decode("utf-8", errors="replace")
+        try:
+            message = json.loads(text).get("message", "")
+        except (ValueError, AttributeError):
+            message = ""
+        retry_after = e.headers.get("Retry-After")
+        hint = f" Retry-After: {retry_after}" if e.code == 429 and retry_after else ""
+        print(f"ERROR: HTTP {e.code}: {message or e.reason}{hint}", file=sys.stderr)
+        sys.exit(1)
+    except (urllib.error.URLError, OSError) as e:
+        print(f"ERROR: Connection error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(2)
+    print(json.dumps(data, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""Generate a deterministic synthetic BMAD project for benchmarks.
+
+Stdlib-only. Given a target number of work items (epics + stories + tasks,
+review follow-ups included) and a seed, writes the same tree every time:
+
+    planning-artifacts/epics.md              summary + detailed sections
+    implementation-artifacts/                story files, flat {N-M-slug}.md and
+                                             nested {N.M}/story.md, with tasks,
+                                             subtasks and review follow-ups
+    implementation-artifacts/sprint-status.yaml
+    output/devops-sync-config.yaml
+    output/devops-sync.yaml                  state of an earlier sync
+
+The sync state is produced by the real parse / hash / write-sync-state code
+and then drifted: a share of items is left out (NEW on the next diff), a
+share gets a stale hash (CHANGED), and orphaned entries are added.
+
+Usage:
+    python benchmarks/generate_corpus.py --items 10000 --output /tmp/corpus
+    python benchmarks/generate_corpus.py --items 100000 --seed 7 --output /tmp/big
+"""
+
+import argparse
+import json
+import os
+import random
+from typing import Any, Dict, List
+
+from bench_parse_epics import SCRIPTS_DIR, load_parser
+
+TIMESTAMP = "2026-01-01T00:00:00Z"
+
+WORDS = [
+    "account", "audit", "billing", "cache", "catalog", "checkout", "config", "dashboard", "export",
+    "feed", "gateway", "import", "inventory", "invoice", "ledger", "login", "metrics", "notification",
+    "onboarding", "order", "payment", "profile", "queue", "report", "search", "session", "settings",
+    "shipping", "storage", "subscription", "sync", "tenant", "upload", "webhook", "workflow",
+]
+VERBS = ["Add", "Build", "Wire", "Validate", "Refactor", "Document", "Test", "Harden", "Migrate", "Expose"]
+STORY_STATUSES = ["done", "done", "done", "review", "in-progress", "ready-for-dev", "draft"]
+EPIC_STATUSES = ["done", "done", "in-progress", "backlog"]
+
+
+def load_script(filename: str) -> Any:
+    """Import one of the scripts/ files as a module."""
+    return load_parser(os.path.join(SCRIPTS_DIR, filename))
+
+
+def _phrase(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def build_model(items: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Epics with stories, tasks and review follow-ups until `items` work items exist."""
+    rng = random.Random(seed)
+    epics = []
+    total = 0
+    while total < items:
+        eid = len(epics) + 1
+        epic = {
+            "id": eid,
+            "title": f"{_phrase(rng, 2).title()} platform",
+            "status": rng.choice(EPIC_STATUSES),
+            "phase": rng.randint(1, 4),
+            "stories": [],
+        }
+        epics.append(epic)
+        total += 1
+        for sid in range(1, rng.randint(4, 12) + 1):
+            if total >= items:
+                break
+            story = {
+                "id": f"{eid}.{sid}",
+                "title": f"{rng.choice(VERBS)} {_phrase(rng, 2)}",
+                "status": rng.choice(STORY_STATUSES),
+                "ac": [_phrase(rng, rng.randint(3, 12)) for _ in range(rng.randint(2, 5))],
+                "layout": rng.choice(["flat", "flat", "flat", "nested", "none"]),
+                "tasks": [],
+                "reviews": [],
+            }
+            epic["stories"].append(story)
+            total += 1
+            if story["layout"] == "none":
+                continue
+            for _ in range(rng.randint(2, 7)):
+                if total >= items:
+                    break
+                story["tasks"].append({
+                    "title": f"{rng.choice(VERBS)} {_phrase(rng, rng.randint(2, 6))}",
+                    "done": rng.random() < 0.6,
+                    "ac": sorted(rng.sample(range(1, len(story["ac"]) + 1), rng.randint(0, 2))),
+                    "subtasks": [(_phrase(rng, rng.randint(2, 5)), rng.random() < 0.5)
+                                 for _ in range(rng.randint(0, 4))],
+                })
+                total += 1
+            if rng.random() < 0.35:
+                for round_num in range(1, rng.randint(1, 2) + 1):
+                    for _ in range(rng.randint(1, 4)):
+                        if total >= items:
+                            break
+                        story["reviews"].append({
+                            "round": round_num,
+                            "priority": rng.choice(["HIGH", "MEDIUM", "LOW"]),
+                            "title": f"Fix {_phrase(rng, rng.randint(2, 5))}",
+                            "file": f"src/{rng.choice(WORDS)}/{rng.choice(WORDS)}.py:{rng.randint(1, 400)}",
+                            "done": rng.random() < 0.3,
+                        })
+                        total += 1
+    return epics
+
+
+def render_epics_md(epics: List[Dict[str, Any]]) -> str:
+    lines = ["# Project Epics", "", "## Requirements Inventory", ""]
+    lines += [f"- FR-{e['id']}: {e['title']}" for e in epics]
+    lines += ["", "## Epic List", ""]
+    for e in epics:
+        lines += [f"### Epic {e['id']}: {e['title']}", f"Summary of {e['title'].lower()}.", ""]
+    lines += ["## Epic Details", ""]
+    for e in epics:
+        lines += [
+            f"## Epic {e['id']}: {e['title']}",
+            "",
+            f"Deliver {e['title'].lower()} end to end. Covers FR-{e['id']} and NFR-{e['id'] % 9 + 1}.",
+            "",
+            f"**Phase:** Phase {e['phase']}",
+            f"**Dependencies:** Epic {max(1, e['id'] - 1)}",
+            "",
+        ]
+        for s in e["stories"]:
+            lines += [
+                f"### Story {s['id']}: {s['title']}",
+                "",
+                f"As an operator, I want to {s['title'].lower()}, so that the {e['title'].lower()} works (FR-{e['id']}).",
+                "",
+                "**Acceptance Criteria:**",
+                "",
+            ]
+            lines += [f"{n}. **Given** {ac} **Then** it succeeds" for n, ac in enumerate(s["ac"], 1)]
+            lines += [""]
+    return "\n".join(lines) + "\n"
+
+
+def render_story_md(story: Dict[str, Any]) -> str:
+    lines = [f"# Story {story['id']}: {story['title']}", "", f"Status: {story['status']}", "",
+             "## Story", "", f"As an operator, I want to {story['title'].lower()}.", "",
+             "## Acceptance Criteria", ""]
+    lines += [f"{n}. {ac}" for n, ac in enumerate(story["ac"], 1)]
+    lines += ["", "## Tasks / Subtasks", ""]
+    for task in story["tasks"]:
+        refs = f" (AC: {', '.join(str(a) for a in task['ac'])})" if task["ac"] else ""
+        lines.append(f"- [{'x' if task['done'] else ' '}] {task['title']}{refs}")
+        lines += [f"  - [{'x' if done else ' '}] {text}" for text, done in task["subtasks"]]
+    lines += ["", "## Dev Notes", "", "Follow the existing module layout.", ""]
+    for round_num in sorted({r["round"] for r in story["reviews"]}):
+        heading = "Review Follow-ups (AI)" if round_num == 1 else f"Review Follow-ups Round {round_num} (AI)"
+        lines += [f"### {heading}", ""]
+        lines += [f"- [{'x' if r['done'] else ' '}] [AI-Review][{r['priority']}] {r['title']} [{r['file']}]"
+                  for r in story["reviews"] if r["round"] == round_num]
+        lines += [""]
+    lines += ["## Dev Agent Record", "", "### File List", "", "- src/app.py"]
+    return "\n".join(lines) + "\n"
+
+
+def story_file_path(stories_dir: str, story: Dict[str, Any]) -> str:
+    if story["layout"] == "nested":
+        return os.path.join(stories_dir, story["id"], "story.md")
+    slug = "-".join(story["title"].lower().split())
+    return os.path.join(stories_dir, f"{story['id'].replace('.', '-')}-{slug}.md")
+
+
+def render_sprint_status(epics: List[Dict[str, Any]]) -> str:
+    lines = ["# generated: " + TIMESTAMP, "project: benchmark", "", "development_status:"]
+    for e in epics:
+        lines.append(f"  epic-{e['id']}: {e['status']}")
+        for s in e["stories"]:
+            lines.append(f"  {s['id'].replace('.', '-')}-story: {s['status']}")
+    return "\n".join(lines) + "\n"
+
+
+def corpus_paths(root: str) -> Dict[str, str]:
+    return {
+        "root": root,
+        "epics": os.path.join(root, "planning-artifacts", "epics.md"),
+        "storiesDir": os.path.join(root, "implementation-artifacts"),
+        "sprintYaml": os.path.join(root, "implementation-artifacts", "sprint-status.yaml"),
+        "config": os.path.join(root, "output", "devops-sync-config.yaml"),
+        "syncState": os.path.join(root, "output", "devops-sync.yaml"),
+    }
+
+
+def parse_corpus(paths: Dict[str, str], parser: Any = None) -> Dict[str, Any]:
+    """Parse a corpus the way parse-artifacts.py main() does (without the parse cache)."""
+    parser = parser or load_script("parse-artifacts.py")
+    epics, stories = parser.parse_epics_file(paths["epics"])
+    tasks_by_story, story_statuses, reviews_by_story, _ = parser.scan_story_files(
+        paths["storiesDir"], [s["id"] for s in stories])
+    tasks = [{**t, "storyId": sid} for sid, ts in sorted(tasks_by_story.items()) for t in ts]
+    tasks += [{**t, "storyId": sid} for sid, ts in sorted(reviews_by_story.items()) for t in ts]
+    return {
+        "epics": epics,
+        "stories": stories,
+        "tasks": tasks,
+        "epicStatuses": parser.parse_epic_statuses(paths["sprintYaml"]),
+        "storyStatuses": story_statuses,
+    }
+
+
+def write_sync_state_file(paths: Dict[str, str], parsed: Dict[str, Any], seed: int, synced: float,
+                          changed: float, orphaned: float) -> Dict[str, int]:
+    """Write devops-sync.yaml for an earlier sync of the corpus, drifted as described above."""
+    hashes = load_script("compute-hashes.py")
+    writer = load_script("write-sync-state.py")
+    rng = random.Random(seed + 1)
+    next_id = [1000]
+    drift = {"new": 0, "changed": 0, "orphaned": 0}
+
+    def stored(item: Dict[str, Any], content_hash: str, values: Dict[str, str], **extra: Any) -> Any:
+        if rng.random() >= synced:
+            drift["new"] += 1
+            return None
+        fields = hashes.field_hashes(values)
+        if rng.random() < changed:
+            content_hash = hashes.compute_hash("stale|" + item["id"])
+            fields["title"] = content_hash[:hashes.FIELD_HASH_LENGTH]
+            drift["changed"] += 1
+        next_id[0] += 1
+        return {"id": item["id"], "contentHash": content_hash, "fieldHashes": fields, "devopsId": next_id[0],
+                "classification": "UNCHANGED", **extra}
+
+    epic_statuses = parsed["epicStatuses"]
+    story_statuses = parsed["storyStatuses"]
+    diff = {"epics": [], "stories": [], "tasks": [], "iterations": []}
+    for epic in parsed["epics"]:
+        entry = stored(epic, hashes.hash_epic(epic, epic_statuses), hashes.epic_field_values(epic, epic_statuses))
+        if entry:
+            diff["epics"].append(entry)
+            if epic_statuses.get(epic["id"]) in ("in-progress", "done"):
+                next_id[0] += 1
+                diff["iterations"].append({"slug": hashes.generate_iteration_slug(epic["id"], epic["title"]),
+                                           "epicId": epic["id"], "devopsId": next_id[0]})
+    for story in parsed["stories"]:
+        entry = stored(story, hashes.hash_story(story, story_statuses), hashes.story_field_values(story, story_statuses),
+                       epicId=story["epicId"])
+        if entry:
+            diff["stories"].append(entry)
+    for task in parsed["tasks"]:
+        entry = stored(task, hashes.hash_task(task), hashes.task_field_values(task), storyId=task["storyId"])
+        if entry:
+            diff["tasks"].append(entry)
+    # Roll-ups over what was synced back then, so new and changed items break them
+    synced_hashes = {kind: {e["id"]: hashes.tree_leaf_hash(e["contentHash"], e["fieldHashes"]) for e in diff[kind]}
+                     for kind in ("epics", "stories", "tasks")}
+    trees = hashes.compute_tree_hashes(diff, synced_hashes)
+    for kind in ("epics", "stories"):
+        for entry in diff[kind]:
+            entry["treeHash"] = trees[kind][entry["id"]]
+
+    orphans = int(len(parsed["stories"]) * orphaned)
+    for n in range(1, orphans + 1):
+        next_id[0] += 2
+        diff["stories"].append({"id": f"999.{n}", "contentHash": hashes.compute_hash(f"gone|{n}"),
+                                "devopsId": next_id[0] - 1, "epicId": "999", "classification": "UNCHANGED"})
+        diff["tasks"].append({"id": f"999.{n}-T1", "contentHash": hashes.compute_hash(f"gone|{n}|T1"),
+                              "devopsId": next_id[0], "storyId": f"999.{n}", "classification": "UNCHANGED"})
+    drift["orphaned"] = orphans * 2
+
+    config = {"organizationUrl": "https://dev.azure.com/benchmark", "projectName": "Benchmark",
+              "areaPath": "Benchmark", "iterationRootPath": "Benchmark", "processTemplate": "Agile",
+              "attachStoryFiles": "false"}
+    with open(paths["config"], "w", encoding="utf-8", newline="\n") as f:
+        f.write("".join(f'{key}: "{value}"\n' for key, value in config.items()))
+    writer.write_sync_state(diff, {}, config, TIMESTAMP, paths["syncState"])
+    return drift
+
+
+def write_corpus(root: str, items: int, seed: int = 0, synced: float = 0.9, changed: float = 0.05,
+                 orphaned: float = 0.01) -> Dict[str, Any]:
+    """Write the corpus under root; returns its paths and item counts."""
+    paths = corpus_paths(root)
+    for key in ("epics", "sprintYaml", "config"):
+        os.makedirs(os.path.dirname(paths[key]), exist_ok=True)
+
+    model = build_model(items, seed)
+    with open(paths["epics"], "w", encoding="utf-8", newline="\n") as f:
+        f.write(render_epics_md(model))
+    story_files = 0
+    for epic in model:
+        for story in epic["stories"]:
+            if story["layout"] == "none":
+                continue
+            path = story_file_path(paths["storiesDir"], story)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8", newline="\n") as f:
+                f.write(render_story_md(story))
+            story_files += 1
+    with open(paths["sprintYaml"], "w", encoding="utf-8", newline="\n") as f:
+        f.write(render_sprint_status(model))
+
+    parsed = parse_corpus(paths)
+    drift = write_sync_state_file(paths, parsed, seed, synced, changed, orphaned)
+    counts = {
+        "epics": len(parsed["epics"]),
+        "stories": len(parsed["stories"]),
+        "tasks": len(parsed["tasks"]),
+        "storyFiles": story_files,
+    }
+    counts["items"] = counts["epics"] + counts["stories"] + counts["tasks"]
+    return {"paths": paths, "counts": counts, "drift": drift}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic BMAD corpus")
+    parser.add_argument("--items", type=int, default=10000, help="Work items to generate (default: 10000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--synced", type=float, default=0.9, help="Share of items in the existing sync state")
+    parser.add_argument("--changed", type=float, default=0.05, help="Share of synced items with a stale hash")
+    parser.add_argument("--orphaned", type=float, default=0.01, help="Orphaned stories (with one task each) per story")
+    parser.add_argument("--output", required=True, help="Directory to write the corpus into")
+    args = parser.parse_args()
+
+    info = write_corpus(args.output, args.items, args.seed, args.synced, args.changed, args.orphaned)
+    print(json.dumps(info, indent=2))
+
+
+if __name__ == "__main__":
+    main()
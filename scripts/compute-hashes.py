@@ -3,15 +3,34 @@
 
 Cross-platform, stdlib-only. Computes content hashes using hashlib,
 compares against stored sync state, classifies items as NEW/CHANGED/UNCHANGED/ORPHANED.
+Content hashes are memoized across runs in a sidecar file (see HashMemo).
+Each item also gets a short hash per field (title, description, acceptance
+criteria, status, subtasks, ...) so CHANGED items list the fields that
+changed and the sync can send only those.
 """
 
 import argparse
+import collections
+import difflib
 import hashlib
 import json
 import os
 import re
 import sys
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set
+
+# Bump whenever normalize(), normalize_list(), compute_hash() or the fields
+# fed to hash_epic()/hash_story()/hash_task() change: memo entries written
+# under another schema version are discarded on load.
+HASH_SCHEMA_VERSION = 1
+HASH_MEMO_MAX_ENTRIES = 500000
+# Minimum normalized title similarity (difflib ratio) to pair an ORPHANED
+# item with a NEW one under the same parent when their content differs
+MOVE_TITLE_SIMILARITY = 0.85
+# Hex digits kept per field hash
+FIELD_HASH_LENGTH = 8
+# Fields tracked by field hashes that the (older) content hash leaves out
+FIELDS_OUTSIDE_CONTENT_HASH = ("subtasks",)
 
 
 def normalize(text: Optional[str]) -> str:
@@ -37,6 +56,130 @@ def compute_hash(content_string: str) -> str:
     return h[:12]
 
 
+def item_fingerprint(kind: str, fields: List[Any]) -> str:
+    """Cheap digest of an item's raw (un-normalized) hash inputs, used as the memo key."""
+    parts = [kind]
+    for value in fields:
+        if isinstance(value, list):
+            parts.append("\x1e".join(str(v) for v in value))
+        else:
+            parts.append(str(value) if value else "")
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=12).hexdigest()
+
+
+class HashMemo:
+    """Persistent LRU memo of content hashes keyed by item_fingerprint().
+
+    Most items are unchanged between runs, so their hash is looked up instead
+    of normalizing every field again. Holds at most max_entries entries,
+    evicting the least recently used; the file keeps them in recency order.
+    The whole memo is discarded when HASH_SCHEMA_VERSION changes. A run
+    without misses or evictions leaves the file as it is (only the recency
+    order of its hits would change).
+    """
+
+    def __init__(self, path: str, version: int = HASH_SCHEMA_VERSION,
+                 max_entries: int = HASH_MEMO_MAX_ENTRIES):
+        self.path = path
+        self.version = version
+        self.max_entries = max(1, max_entries)
+        self.entries = collections.OrderedDict()  # type: collections.OrderedDict
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != self.version:
+            return
+        entries = data.get("entries")
+        if isinstance(entries, dict):
+            self.entries.update(entries)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self._dirty = True
+
+    def hash(self, kind: str, fields: List[Any], compute: Callable[[], Any]) -> Any:
+        """Return the memoized value (a hash or field hash map) for these raw fields, calling compute() on a miss."""
+        key = item_fingerprint(kind, fields)
+        value = self.entries.get(key)
+        if value is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return value
+        self.misses += 1
+        self._dirty = True
+        value = compute()
+        self.entries[key] = value
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evicted += 1
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the diff summary."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self.entries),
+            "evicted": self.evicted,
+        }
+
+    def save(self) -> None:
+        """Write the memo back to its sidecar file (atomically), least recently used first.
+
+        Skipped when nothing was added or evicted since it was loaded.
+        """
+        if not self.path or not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        text = json.dumps({"version": self.version, "entries": self.entries})
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+def epic_hash_fields(epic: Dict[str, Any], epic_statuses: Optional[Dict[str, str]] = None) -> List[Any]:
+    """Raw inputs of hash_epic(), for the memo fingerprint."""
+    status = epic_statuses.get(epic.get("id", ""), "") if epic_statuses else ""
+    return [epic.get("title", ""), epic.get("description", ""), epic.get("phase", ""),
+            epic.get("requirements", []), status]
+
+
+def story_hash_fields(story: Dict[str, Any], story_statuses: Optional[Dict[str, str]] = None) -> List[Any]:
+    """Raw inputs of hash_story(), for the memo fingerprint."""
+    status = story_statuses.get(story.get("id", ""), "") if story_statuses else ""
+    return [story.get("title", ""), story.get("userStoryText", ""), story.get("acceptanceCriteria", ""), status]
+
+
+def task_hash_fields(task: Dict[str, Any]) -> List[Any]:
+    """Raw inputs of hash_task(), for the memo fingerprint."""
+    return [task.get("description", ""), "complete" if task.get("complete", False) else "incomplete"]
+
+
+def memoized(memo: Optional[HashMemo], kind: str, fields_fn: Callable[[Dict[str, Any]], List[Any]],
+             hash_fn: Callable[[Dict[str, Any]], Any]) -> Callable[[Dict[str, Any]], Any]:
+    """Wrap hash_fn(item) so it goes through memo (returned unchanged without one).
+
+    hash_fn returns a content hash or a field hash map; kind keeps the two apart.
+    """
+    if memo is None:
+        return hash_fn
+    return lambda item: memo.hash(kind, fields_fn(item), lambda: hash_fn(item))
+
+
 def hash_epic(epic: Dict[str, Any], epic_statuses: Optional[Dict[str, str]] = None) -> str:
     """Compute content hash for an epic.
 
@@ -82,6 +225,70 @@ def hash_task(task: Dict[str, Any]) -> str:
     return compute_hash("|".join(parts))
 
 
+def epic_field_values(epic: Dict[str, Any], epic_statuses: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Normalized inputs of hash_epic(), one per field."""
+    status = epic_statuses.get(epic.get("id", ""), "") if epic_statuses else ""
+    return {
+        "title": normalize(epic.get("title", "")),
+        "description": normalize(epic.get("description", "")),
+        "phase": normalize(epic.get("phase", "")),
+        "requirements": normalize_list(epic.get("requirements", [])),
+        "status": normalize(status),
+    }
+
+
+def story_field_values(story: Dict[str, Any], story_statuses: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Normalized inputs of hash_story(), one per field."""
+    status = story_statuses.get(story.get("id", ""), "") if story_statuses else ""
+    return {
+        "title": normalize(story.get("title", "")),
+        "description": normalize(story.get("userStoryText", "")),
+        "acceptanceCriteria": normalize(story.get("acceptanceCriteria", "")),
+        "status": normalize(status),
+    }
+
+
+def task_field_values(task: Dict[str, Any]) -> Dict[str, str]:
+    """Normalized inputs of hash_task() plus the subtask checklist, one per field."""
+    subtasks = [("x " if st.get("complete", False) else "- ") + normalize(st.get("description", ""))
+                for st in task.get("subtasks", [])]
+    return {
+        "title": normalize(task.get("description", "")),
+        "status": "complete" if task.get("complete", False) else "incomplete",
+        "subtasks": "|".join(subtasks),
+    }
+
+
+def task_field_inputs(task: Dict[str, Any]) -> List[Any]:
+    """Raw inputs of task_field_values(), for the memo fingerprint."""
+    subtasks = [f"{st.get('description', '')}\x1d{bool(st.get('complete', False))}" for st in task.get("subtasks", [])]
+    return task_hash_fields(task) + [subtasks]
+
+
+def field_hashes(values: Dict[str, str]) -> Dict[str, str]:
+    """Short hash of each normalized field value."""
+    return {name: compute_hash(value)[:FIELD_HASH_LENGTH] for name, value in values.items()}
+
+
+def parse_field_hashes(text: Any) -> Dict[str, str]:
+    """Field hashes as stored in devops-sync.yaml ('title=1a2b3c4d;status=...'), or a dict as is."""
+    if isinstance(text, dict):
+        return dict(text)
+    result = {}
+    for part in (text or "").split(";"):
+        name, sep, value = part.partition("=")
+        if sep and name.strip():
+            result[name.strip()] = value.strip()
+    return result
+
+
+def changed_fields(current: Dict[str, str], stored: Dict[str, str]) -> List[str]:
+    """Fields whose hash differs from the stored one; all fields when none can be told apart."""
+    if not stored:
+        return list(current)
+    return [name for name, value in current.items() if stored.get(name) != value] or list(current)
+
+
 def generate_iteration_slug(epic_id: str, title: str) -> str:
     """Generate a kebab-case iteration slug from epic ID and title."""
     slug = re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')
@@ -159,8 +366,18 @@ def load_sync_state(path: Optional[str]) -> Dict[str, Dict]:
     return result
 
 
-def classify_items(parsed_items: List[Dict], stored_items: Dict, hash_fn: Callable, id_field: str = "id") -> List[Dict]:
-    """Classify items as NEW/CHANGED/UNCHANGED/ORPHANED."""
+def classify_items(parsed_items: List[Dict], stored_items: Dict, hash_fn: Callable, id_field: str = "id",
+                   fields_fn: Optional[Callable] = None) -> List[Dict]:
+    """Classify items as NEW/CHANGED/UNCHANGED/ORPHANED.
+
+    With fields_fn (item -> field hashes), items carry fieldHashes, an item
+    whose stored field hashes differ is CHANGED even when its content hash
+    matches (fields outside the content hash, such as subtasks), and CHANGED
+    items list changedFields. An entry left "pending" by an unfinished sync is
+    NEW until its work item exists, then CHANGED until an update goes through.
+    CHANGED items carry the stored previousHash (and previousFieldHashes), which
+    write-sync-state.py keeps when their update fails.
+    """
     results = []
 
     parsed_ids = set()
@@ -173,10 +390,19 @@ def classify_items(parsed_items: List[Dict], stored_items: Dict, hash_fn: Callab
         old_hash = stored.get("contentHash", "")
         devops_id = stored.get("devopsId", None)
         attached = stored.get("attached", "")
+        attachment_hash = stored.get("attachmentHash", "")
+        attachment_url = stored.get("attachmentUrl", "")
+
+        fields = fields_fn(item) if fields_fn is not None else None
+        stored_fields = parse_field_hashes(stored.get("fieldHashes", "")) if fields is not None else {}
 
-        if not old_hash:
+        pending = stored.get("status") == "pending"
+        if not old_hash or (pending and not has_devops_id(stored)):
             classification = "NEW"
-        elif old_hash == new_hash:
+        elif pending:
+            classification = "CHANGED"
+        elif old_hash == new_hash and not (
+                fields and any(stored_fields.get(name, value) != value for name, value in fields.items())):
             classification = "UNCHANGED"
         else:
             classification = "CHANGED"
@@ -187,8 +413,21 @@ def classify_items(parsed_items: List[Dict], stored_items: Dict, hash_fn: Callab
             "classification": classification,
             "devopsId": devops_id
         }
+        if classification == "CHANGED":
+            result_item["previousHash"] = old_hash
+        if fields is not None:
+            result_item["fieldHashes"] = fields
+            if classification == "CHANGED":
+                result_item["changedFields"] = changed_fields(fields, stored_fields)
+                if stored.get("fieldHashes"):
+                    result_item["previousFieldHashes"] = stored["fieldHashes"]
         if attached:
             result_item["attached"] = attached
+        # Attachment content hash and URL let the sync skip unchanged story files
+        if attachment_hash:
+            result_item["attachmentHash"] = attachment_hash
+        if attachment_url:
+            result_item["attachmentUrl"] = attachment_url
         results.append(result_item)
 
     # Find orphaned items (in stored but not in parsed)
@@ -204,6 +443,295 @@ def classify_items(parsed_items: List[Dict], stored_items: Dict, hash_fn: Callab
     return results
 
 
+def reassign_moved_items(results: List[Dict], stored_items: Dict[str, Dict], parent_field: Optional[str],
+                         stored_parent_field: Optional[str], parent_devops_ids: Dict[str, Any],
+                         threshold: float = MOVE_TITLE_SIMILARITY, title_field: str = "title",
+                         position_field: Optional[str] = None) -> Dict[str, str]:
+    """Hand stored work items to renumbered items instead of orphaning and recreating them.
+
+    classify_items() matches by ID, so inserting story 3.4 turns 3.4-3.40
+    into CHANGED and 3.41 into NEW. Here every NEW or CHANGED item, and every
+    item whose stored entry sits under a different parent work item, may
+    claim a stored entry that is no longer held: ORPHANED ones, those of
+    CHANGED items, and those of items whose parent changed. Claims stay
+    under the same parent work item (epics: among all epics) and go first to
+    identical content hashes, then to normalized title similarity of at least
+    threshold, best match first (the item's title_field against the stored
+    title; tasks use their description). With position_field (tasks: legacyId),
+    an item still unmatched then takes an entry stored at the same position
+    under the same parent, so a task reworded beyond the threshold keeps its
+    work item as it did with positional IDs. A claiming item becomes MOVED with the
+    entry's devopsId, movedFrom (the stored ID) and previousHash. A CHANGED
+    item whose own entry was claimed, and found none, becomes NEW; entries
+    left unclaimed are reported ORPHANED. parent_devops_ids maps parent IDs to
+    DevOps IDs for the parsed items. results is rebuilt in place; returns
+    item ID -> stored ID for every MOVED item.
+    """
+    def group_key(value: Any) -> Optional[str]:
+        return None if value in (None, "", "None") else str(value)
+
+    def item_group(item: Dict[str, Any]) -> Optional[str]:
+        return group_key(parent_devops_ids.get(item.get(parent_field, ""))) if parent_field else ""
+
+    def stored_group(stored_id: str) -> Optional[str]:
+        return group_key(stored_items[stored_id].get(stored_parent_field)) if stored_parent_field else ""
+
+    live = [item for item in results if item["classification"] != "ORPHANED"]
+    # Orphans without a work item have nothing to hand over
+    idle = [item for item in results
+            if item["classification"] == "ORPHANED" and not has_devops_id(stored_items.get(item["id"], {}))]
+    free = [item["id"] for item in results
+            if item["classification"] == "ORPHANED" and has_devops_id(stored_items.get(item["id"], {}))]
+    seekers = []
+    for item in live:
+        cls = item["classification"]
+        if cls not in ("UNCHANGED", "CHANGED", "NEW"):
+            continue
+        own = stored_items.get(item["id"], {})
+        group, own_group = item_group(item), stored_group(item["id"]) if own else None
+        if cls != "NEW" and group is not None and own_group is not None and group != own_group:
+            # Same ID under another parent: not the same work item
+            item["classification"] = cls = "NEW"
+            _drop_stored_fields(item)
+            if has_devops_id(own):
+                free.append(item["id"])
+        if cls == "CHANGED" and has_devops_id(own):
+            free.append(item["id"])
+        if cls in ("NEW", "CHANGED") and group is not None:
+            seekers.append(item)
+    by_hash = {}
+    for stored_id in free:
+        key = (stored_group(stored_id), stored_items[stored_id].get("contentHash", ""))
+        by_hash.setdefault(key, []).append(stored_id)
+    claims = {}  # item ID -> stored ID
+    claimed = set()
+    for item in seekers:
+        candidates = by_hash.get((item_group(item), item["contentHash"]), [])
+        # A CHANGED item whose content hash still matches (e.g. only subtasks changed) keeps its own entry
+        stored_id = next((c for c in candidates if c not in claimed and c != item["id"]), None)
+        if stored_id is not None:
+            candidates.remove(stored_id)
+            claims[item["id"]] = stored_id
+            claimed.add(stored_id)
+
+    # CHANGED items keep their own entry unless someone else claimed it
+    kept = {item["id"] for item in live if item["classification"] == "CHANGED"
+            and item["id"] not in claims and item["id"] not in claimed}
+
+    unmatched = [item for item in seekers if item["id"] not in claims and item["id"] not in kept]
+    remaining = [stored_id for stored_id in free if stored_id not in claimed and stored_id not in kept]
+    # Titles only compete within a parent group: bucket and normalize stored titles once
+    titles_by_group = {}
+    for stored_id in remaining:
+        old_title = normalize(stored_items[stored_id].get("title", ""))
+        if old_title:
+            titles_by_group.setdefault(stored_group(stored_id), []).append((stored_id, old_title))
+    scored = []
+    for item in unmatched:
+        candidates = titles_by_group.get(item_group(item))
+        if not candidates:
+            continue
+        title = normalize(item.get(title_field, ""))
+        if not title:
+            continue
+        for stored_id, old_title in candidates:
+            ratio = difflib.SequenceMatcher(None, title, old_title).ratio()
+            if ratio >= threshold:
+                scored.append((-ratio, item["id"], stored_id))
+    scored.sort()
+    for _, item_id, stored_id in scored:
+        if item_id in claims or stored_id in claimed:
+            continue
+        claims[item_id] = stored_id
+        claimed.add(stored_id)
+
+    if position_field:
+        # Entries stored before positions were recorded still have their positional key
+        by_position = {(stored_group(stored_id), stored_items[stored_id].get(position_field, stored_id)): stored_id
+                       for stored_id in remaining if stored_id not in claimed}
+        for item in unmatched:
+            stored_id = by_position.get((item_group(item), item.get(position_field)))
+            if item["id"] not in claims and stored_id is not None and stored_id not in claimed:
+                claims[item["id"]] = stored_id
+                claimed.add(stored_id)
+
+    for item in live:
+        stored_id = claims.get(item["id"])
+        if stored_id is not None:
+            stored = stored_items[stored_id]
+            _drop_stored_fields(item)
+            item.update(classification="MOVED", devopsId=stored["devopsId"], movedFrom=stored_id,
+                        previousHash=stored.get("contentHash", ""))
+            if stored.get("fieldHashes"):
+                item["previousFieldHashes"] = stored["fieldHashes"]
+            if "fieldHashes" in item:
+                stored_fields = parse_field_hashes(stored.get("fieldHashes", ""))
+                if stored_fields:
+                    item["changedFields"] = [name for name, value in item["fieldHashes"].items()
+                                             if stored_fields.get(name, value) != value]
+                else:
+                    item["changedFields"] = (list(item["fieldHashes"])
+                                             if item["contentHash"] != item["previousHash"] else [])
+            item.update({key: stored[key] for key in STORED_CARRIED_FIELDS if stored.get(key)})
+        elif item["id"] in free and item["id"] not in kept:
+            # Its stored work item went to another item (or another parent)
+            item["classification"] = "NEW"
+            _drop_stored_fields(item)
+    orphans = [_orphan_record(stored_id, stored_items[stored_id]) for stored_id in free
+               if stored_id not in claimed and stored_id not in kept]
+    results[:] = live + orphans + idle
+    return {item_id: stored_id for item_id, stored_id in claims.items()}
+
+
+STORED_CARRIED_FIELDS = ("attached", "attachmentHash", "attachmentUrl")
+
+
+def _drop_stored_fields(item: Dict[str, Any]) -> None:
+    item["devopsId"] = None
+    for key in ("changedFields", "previousHash", "previousFieldHashes"):
+        item.pop(key, None)
+    for key in STORED_CARRIED_FIELDS:
+        item.pop(key, None)
+
+
+def _orphan_record(stored_id: str, stored: Dict[str, Any]) -> Dict[str, Any]:
+    return {"id": stored_id, "classification": "ORPHANED", "devopsId": stored.get("devopsId"),
+            "contentHash": stored.get("contentHash", "")}
+
+
+def migrate_legacy_task_ids(sync_state: Dict[str, Dict], tasks: List[Dict]) -> int:
+    """Re-key stored tasks from positional IDs ('1.1-T3') to content-anchored ones.
+
+    parse-artifacts.py reports each task's old positional ID as legacyId.
+    A stored entry under a task's legacyId moves to the task's current ID
+    unless that ID is already stored. Entries whose position since held
+    another task are sorted out by reassign_moved_items(). Returns the
+    number of entries re-keyed.
+    """
+    stored = sync_state.get("tasks", {})
+    migrated = 0
+    for task in tasks:
+        legacy_id = task.get("legacyId")
+        if legacy_id and legacy_id != task["id"] and legacy_id in stored and task["id"] not in stored:
+            stored[task["id"]] = stored.pop(legacy_id)
+            migrated += 1
+    return migrated
+
+
+def tree_leaf_hash(content_hash: str, fields: Optional[Dict[str, str]] = None) -> str:
+    """An item's own hash in the roll-ups: its content hash, plus any non-empty field it leaves out.
+
+    Items without subtasks keep the roll-ups recorded before field hashes existed.
+    """
+    empty = compute_hash("")[:FIELD_HASH_LENGTH]
+    extra = [fields[name] for name in FIELDS_OUTSIDE_CONTENT_HASH
+             if fields and fields.get(name, empty) != empty]
+    return compute_hash("|".join([content_hash] + extra)) if extra else content_hash
+
+
+def tree_hash(content_hash: str, children: Dict[str, str]) -> str:
+    """Roll-up hash of an item's own hash and its children's (child ID -> hash), in ID order."""
+    joined = ",".join(f"{child_id}:{children[child_id]}" for child_id in sorted(children))
+    return compute_hash(f"{content_hash}|{joined}")
+
+
+def compute_tree_hashes(parsed: Dict[str, Any], content_hashes: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    """Roll-up hashes: story = own hash + its tasks' hashes, epic = own hash + its stories' roll-ups.
+
+    main() passes tree_leaf_hash() values, so subtask edits break the roll-ups too.
+    """
+    task_hashes_by_story = {}
+    for task in parsed.get("tasks", []):
+        task_hashes_by_story.setdefault(task.get("storyId", ""), {})[task["id"]] = content_hashes["tasks"][task["id"]]
+
+    story_trees = {}
+    story_trees_by_epic = {}
+    for story in parsed.get("stories", []):
+        sid = story["id"]
+        story_trees[sid] = tree_hash(content_hashes["stories"][sid], task_hashes_by_story.get(sid, {}))
+        story_trees_by_epic.setdefault(story.get("epicId", ""), {})[sid] = story_trees[sid]
+
+    epic_trees = {}
+    for epic in parsed.get("epics", []):
+        eid = epic["id"]
+        epic_trees[eid] = tree_hash(content_hashes["epics"][eid], story_trees_by_epic.get(eid, {}))
+    return {"epics": epic_trees, "stories": story_trees}
+
+
+def has_devops_id(stored: Dict[str, Any]) -> bool:
+    """Whether a stored sync state entry has a DevOps work item ID."""
+    return stored.get("devopsId") not in (None, "", "None")
+
+
+def find_unchanged_subtrees(parsed: Dict[str, Any], sync_state: Dict[str, Dict],
+                            trees: Dict[str, Dict[str, str]], keep_epics: Set[str]) -> Dict[str, Set[str]]:
+    """IDs of items in subtrees whose stored treeHash matches the current roll-up.
+
+    A story is pruned with its tasks when its roll-up matches and it and every
+    task have a DevOps ID; an epic is pruned when its roll-up matches and all
+    its stories are pruned. Nothing under an epic in keep_epics is pruned.
+    """
+    pruned = {"epics": set(), "stories": set(), "tasks": set()}
+    task_ids_by_story = {}
+    for task in parsed.get("tasks", []):
+        task_ids_by_story.setdefault(task.get("storyId", ""), []).append(task["id"])
+
+    stored_stories = sync_state.get("stories", {})
+    stored_tasks = sync_state.get("tasks", {})
+    story_ids_by_epic = {}
+    for story in parsed.get("stories", []):
+        sid = story["id"]
+        eid = story.get("epicId", "")
+        story_ids_by_epic.setdefault(eid, []).append(sid)
+        stored = stored_stories.get(sid, {})
+        if eid in keep_epics or stored.get("treeHash") != trees["stories"][sid] or not has_devops_id(stored):
+            continue
+        task_ids = task_ids_by_story.get(sid, [])
+        if all(has_devops_id(stored_tasks.get(tid, {})) for tid in task_ids):
+            pruned["stories"].add(sid)
+            pruned["tasks"].update(task_ids)
+
+    stored_epics = sync_state.get("epics", {})
+    for epic in parsed.get("epics", []):
+        eid = epic["id"]
+        stored = stored_epics.get(eid, {})
+        if eid in keep_epics or stored.get("treeHash") != trees["epics"][eid] or not has_devops_id(stored):
+            continue
+        if all(sid in pruned["stories"] for sid in story_ids_by_epic.get(eid, [])):
+            pruned["epics"].add(eid)
+    return pruned
+
+
+def pruned_records(parsed: Dict[str, Any], sync_state: Dict[str, Dict], pruned_ids: Dict[str, Set[str]],
+                   trees: Dict[str, Dict[str, str]]) -> Dict[str, List[Dict]]:
+    """Compact UNCHANGED entries for pruned items, built from their stored sync state."""
+    links = {"epics": None, "stories": "epicId", "tasks": "storyId"}
+    carried = ("attached", "attachmentHash", "attachmentUrl")
+    records = {}
+    for kind, link in links.items():
+        stored_items = sync_state.get(kind, {})
+        records[kind] = []
+        for item in parsed.get(kind, []):
+            item_id = item["id"]
+            if item_id not in pruned_ids[kind]:
+                continue
+            stored = stored_items[item_id]
+            record = {"id": item_id, "classification": "UNCHANGED", "devopsId": stored["devopsId"],
+                      "contentHash": stored.get("contentHash", "")}
+            if link:
+                record[link] = item.get(link, "")
+            record["title"] = item.get("title", "") if kind in trees else item.get("description", "")
+            if kind in trees:
+                record["treeHash"] = trees[kind][item_id]
+            record.update({key: stored[key] for key in carried if stored.get(key)})
+            if stored.get("fieldHashes"):
+                record["fieldHashes"] = parse_field_hashes(stored["fieldHashes"])
+            if item.get("legacyId"):
+                record["legacyId"] = item["legacyId"]
+            records[kind].append(record)
+    return records
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Compute content hashes and classify items for sync diff"
@@ -211,37 +739,59 @@ def main():
     parser.add_argument("--parsed", required=True, help="Path to parsed artifacts JSON (from parse-artifacts.py)")
     parser.add_argument("--sync-state", default="", help="Path to existing devops-sync.yaml")
     parser.add_argument("--output", required=True, help="Path to write diff results JSON")
+    parser.add_argument("--memo", default=None,
+                        help="Path to the hash memo (default: _hash-memo.json next to --output)")
+    parser.add_argument("--no-memo", action="store_true", help="Hash every item, ignoring the hash memo")
+    parser.add_argument("--no-prune", action="store_true",
+                        help="List every item in the diff, including unchanged subtrees")
+    parser.add_argument("--no-moves", action="store_true",
+                        help="Match items by ID only, without detecting renumbered (MOVED) work items")
+    parser.add_argument("--memo-size", type=int, default=HASH_MEMO_MAX_ENTRIES,
+                        help=f"Maximum hash memo entries, least recently used evicted first "
+                             f"(default: {HASH_MEMO_MAX_ENTRIES})")
     args = parser.parse_args()
 
+    memo = None
+    if not args.no_memo:
+        memo_path = args.memo or os.path.join(os.path.dirname(args.output) or ".", "_hash-memo.json")
+        memo = HashMemo(memo_path, max_entries=args.memo_size)
+
     # Load parsed data
     with open(args.parsed, "r", encoding="utf-8") as f:
         parsed = json.load(f)
 
-    # Load existing sync state
+    # Load existing sync state, re-keying tasks stored under positional IDs
     sync_state = load_sync_state(args.sync_state)
+    migrated = migrate_legacy_task_ids(sync_state, parsed.get("tasks", []))
+    if migrated:
+        print(f"Migrated {migrated} task IDs in the sync state to content-anchored IDs", file=sys.stderr)
 
     # Extract statuses from parsed data
     story_statuses = parsed.get("storyStatuses", {})
     epic_statuses = parsed.get("epicStatuses", {})
 
-    # Classify each type
-    epic_results = classify_items(
-        parsed.get("epics", []),
-        sync_state.get("epics", {}),
-        lambda e: hash_epic(e, epic_statuses)
-    )
-
-    story_results = classify_items(
-        parsed.get("stories", []),
-        sync_state.get("stories", {}),
-        lambda s: hash_story(s, story_statuses)
-    )
-
-    task_results = classify_items(
-        parsed.get("tasks", []),
-        sync_state.get("tasks", {}),
-        hash_task
-    )
+    # Content hashes of every parsed item (memoized across runs)
+    hash_fns = {
+        "epics": memoized(memo, "epic", lambda e: epic_hash_fields(e, epic_statuses),
+                          lambda e: hash_epic(e, epic_statuses)),
+        "stories": memoized(memo, "story", lambda s: story_hash_fields(s, story_statuses),
+                            lambda s: hash_story(s, story_statuses)),
+        "tasks": memoized(memo, "task", task_hash_fields, hash_task),
+    }
+    content_hashes = {kind: {item["id"]: hash_fn(item) for item in parsed.get(kind, [])}
+                      for kind, hash_fn in hash_fns.items()}
+    fields_fns = {
+        "epics": memoized(memo, "epic-fields", lambda e: epic_hash_fields(e, epic_statuses),
+                          lambda e: field_hashes(epic_field_values(e, epic_statuses))),
+        "stories": memoized(memo, "story-fields", lambda s: story_hash_fields(s, story_statuses),
+                            lambda s: field_hashes(story_field_values(s, story_statuses))),
+        "tasks": memoized(memo, "task-fields", task_field_inputs, lambda t: field_hashes(task_field_values(t))),
+    }
+    item_fields = {kind: {item["id"]: fields_fn(item) for item in parsed.get(kind, [])}
+                   for kind, fields_fn in fields_fns.items()}
+    leaf_hashes = {kind: {item_id: tree_leaf_hash(h, item_fields[kind][item_id]) for item_id, h in hashes.items()}
+                   for kind, hashes in content_hashes.items()}
+    trees = compute_tree_hashes(parsed, leaf_hashes)
 
     # Derive epic-based iterations for epics with status in-progress or done
     iteration_results = []
@@ -283,8 +833,7 @@ def main():
             epic_task_ids.extend(task_ids_by_story.get(sid, []))
 
         stored = stored_iterations.get(slug, {})
-        has_devops_id = stored.get("devopsId") not in (None, "", "None")
-        if slug in stored_iterations and has_devops_id:
+        if slug in stored_iterations and has_devops_id(stored):
             # EXISTS iteration: only include NEW items that need assignment.
             # UNCHANGED and CHANGED items are already in this iteration.
             new_story_ids = [sid for sid in epic_story_ids
@@ -309,64 +858,72 @@ def main():
                 "devopsId": None
             })
 
+    # Whole subtrees whose stored roll-up hash still matches need no attention;
+    # epics getting a new iteration are kept, their items all have to move
+    new_iteration_epics = {it["epicId"] for it in iteration_results if it["classification"] == "NEW"}
+    if args.no_prune:
+        pruned_ids = {"epics": set(), "stories": set(), "tasks": set()}
+    else:
+        pruned_ids = find_unchanged_subtrees(parsed, sync_state, trees, new_iteration_epics)
+    pruned = pruned_records(parsed, sync_state, pruned_ids, trees)
+
+    # Classify the remaining items one by one
+    stored_by_kind = {kind: {k: v for k, v in sync_state.get(kind, {}).items() if k not in pruned_ids[kind]}
+                      for kind in ("epics", "stories", "tasks")}
+
+    def classify(kind):
+        items = [item for item in parsed.get(kind, []) if item["id"] not in pruned_ids[kind]]
+        results = classify_items(items, stored_by_kind[kind], lambda item: content_hashes[kind][item["id"]],
+                                 fields_fn=lambda item: item_fields[kind][item["id"]])
+        for item in results:
+            if kind in trees and item["classification"] != "ORPHANED":
+                item["treeHash"] = trees[kind][item["id"]]
+        return results
+
+    epic_results = classify("epics")
+    story_results = classify("stories")
+    task_results = classify("tasks")
+
+    # Renumbered items keep their work items; parents first so children are
+    # matched under the parent work item they will end up in
+    if not args.no_moves:
+        reassign_moved_items(epic_results, stored_by_kind["epics"], None, None, {})
+        epic_devops_ids = {e["id"]: e.get("devopsId") for e in epic_results + pruned["epics"]}
+        reassign_moved_items(story_results, stored_by_kind["stories"], "epicId", "epicDevopsId", epic_devops_ids)
+        story_devops_ids = {s["id"]: s.get("devopsId") for s in story_results + pruned["stories"]}
+        reassign_moved_items(task_results, stored_by_kind["tasks"], "storyId", "storyDevopsId", story_devops_ids,
+                             title_field="description", position_field="legacyId")
+        # Existing iterations only need the items that get a new work item
+        new_ids = {item["id"] for item in story_results + task_results if item["classification"] == "NEW"}
+        for it in iteration_results:
+            if it["classification"] == "EXISTS":
+                epic_story_ids = story_ids_by_epic.get(it["epicId"], [])
+                it["storyIds"] = [sid for sid in epic_story_ids if sid in new_ids]
+                it["taskIds"] = [tid for sid in epic_story_ids for tid in task_ids_by_story.get(sid, [])
+                                 if tid in new_ids]
+
     # Compute summary counts
     def count_by_class(items):
-        counts = {"NEW": 0, "CHANGED": 0, "UNCHANGED": 0, "ORPHANED": 0, "EXISTS": 0}
+        counts = {"NEW": 0, "CHANGED": 0, "MOVED": 0, "UNCHANGED": 0, "ORPHANED": 0, "EXISTS": 0}
         for item in items:
             cls = item["classification"]
             counts[cls] = counts.get(cls, 0) + 1
         return counts
 
-    epic_counts = count_by_class(epic_results)
-    story_counts = count_by_class(story_results)
-    task_counts = count_by_class(task_results)
+    epic_counts = count_by_class(epic_results + pruned["epics"])
+    story_counts = count_by_class(story_results + pruned["stories"])
+    task_counts = count_by_class(task_results + pruned["tasks"])
     iter_counts = count_by_class(iteration_results)
 
-    # Estimate CLI calls
-    # Count NEW stories that have a non-default status needing a state update
-    new_story_state_updates = 0
-    for s in story_results:
-        if s["classification"] == "NEW" and story_statuses.get(s.get("id", "")):
-            status = story_statuses[s["id"]]
-            if status not in ("draft", ""):
-                new_story_state_updates += 1
-
-    # Count story attachment calls (upload + relation add = 2 per story with file)
+    # Call counts are planned by sync-devops.py --plan-only from this diff
     story_file_paths = parsed.get("storyFilePaths", {})
-    attachment_calls = 0
-    for s in story_results:
-        has_file = story_file_paths.get(s.get("id", ""))
-        if s["classification"] in ("NEW", "CHANGED") and has_file:
-            attachment_calls += 2  # REST upload + az relation add
-        elif s["classification"] == "UNCHANGED" and s.get("attached") != "true" and has_file:
-            attachment_calls += 2  # backfill attachment for previously-synced story
-
-    cli_calls = (
-        epic_counts["NEW"] + epic_counts["CHANGED"]  # epic create/update
-        + story_counts["NEW"] * 2  # story create + parent link
-        + new_story_state_updates  # state update for NEW stories with non-default status
-        + story_counts["CHANGED"]  # story update (includes state in same call)
-        + task_counts["NEW"] * 2  # task create + parent link
-        + task_counts["CHANGED"]  # task update
-        + attachment_calls  # story file attachments (REST + CLI)
-    )
-    # Add iteration calls: creation + item movement (epic + stories + tasks)
-    for it in iteration_results:
-        if it["classification"] == "NEW":
-            cli_calls += 1  # iteration create
-            cli_calls += 1  # move epic
-            cli_calls += len(it.get("storyIds", []))  # move stories
-            cli_calls += len(it.get("taskIds", []))  # move tasks
-        elif it["classification"] == "EXISTS":
-            # Only move NEW items (not already assigned to this iteration)
-            cli_calls += len(it.get("storyIds", []))  # move new stories
-            cli_calls += len(it.get("taskIds", []))  # move new tasks
 
     result = {
         "epics": epic_results,
         "stories": story_results,
         "tasks": task_results,
         "iterations": iteration_results,
+        "pruned": pruned,
         "epicStatuses": epic_statuses,
         "storyStatuses": story_statuses,
         "storyFilePaths": story_file_paths,
@@ -375,10 +932,21 @@ def main():
             "stories": story_counts,
             "tasks": task_counts,
             "iterations": iter_counts,
-            "estimatedCliCalls": cli_calls
+            "pruned": {kind: len(items) for kind, items in pruned.items()},
+            "migratedTaskIds": migrated,
+            "hashMemo": memo.stats() if memo is not None else None
         }
     }
 
+    if memo is not None:
+        try:
+            memo.save()
+        except OSError as e:
+            print(json.dumps({"warning": f"Could not write hash memo {memo.path}: {e}"}), file=sys.stderr)
+        stats = memo.stats()
+        print(f"Hash memo: {stats['hits']} cached, {stats['misses']} hashed ({stats['hitRate']:.1%} hit rate)",
+              file=sys.stderr)
+
     # Write output
     os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
     with open(args.output, "w", encoding="utf-8") as f:
@@ -5,11 +5,27 @@ Cross-platform, stdlib-only. Auto-detects heading levels.
 """
 
 import argparse
+import concurrent.futures
+import glob
+import hashlib
 import json
 import os
+import pickle
 import re
 import sys
-from typing import Any, Dict, List, Optional, Tuple
+import tempfile
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+_PRIORITY_TAG_RE = re.compile(r'\[(HIGH|MEDIUM|LOW)\]', re.IGNORECASE)
+_FILE_PATH_TAG_RE = re.compile(r'\[([^\]]+\.\w+(?::\d+)?)\]\s*$')
+_AI_REVIEW_TAG_RE = re.compile(r'\[AI-Review\]', re.IGNORECASE)
+_STRIP_TAGS_RE = re.compile(r'\[(?:HIGH|MEDIUM|LOW|AI-Review)\]\s*', re.IGNORECASE)
+_AC_REFERENCE_RE = re.compile(r'\(AC:\s*([\d,\s]+)\)')
+_PRIORITY_MAP = {"high": 1, "medium": 2, "low": 3}
 
 
 def extract_review_metadata(description: str) -> Dict[str, Any]:
@@ -24,28 +40,32 @@ def extract_review_metadata(description: str) -> Dict[str, Any]:
     Returns dict with keys: priority, filePath, cleanTitle, tags.
     Missing fields are None or empty list.
     """
-    priority_map = {"high": 1, "medium": 2, "low": 3}
+    if "[" not in description:
+        # No bracket tags: nothing to extract or strip
+        clean = description.strip()
+        return {"priority": None, "filePath": None, "cleanTitle": clean, "tags": []}
+
     priority = None
     file_path = None
     tags = []
 
     # Extract priority
-    pm = re.search(r'\[(HIGH|MEDIUM|LOW)\]', description, re.IGNORECASE)
+    pm = _PRIORITY_TAG_RE.search(description)
     if pm:
-        priority = priority_map[pm.group(1).lower()]
+        priority = _PRIORITY_MAP[pm.group(1).lower()]
 
     # Extract file path (anchored to end of string)
-    fm = re.search(r'\[([^\]]+\.\w+(?::\d+)?)\]\s*$', description)
+    fm = _FILE_PATH_TAG_RE.search(description)
     if fm:
         file_path = fm.group(1)
 
     # Extract AI-Review tag
-    if re.search(r'\[AI-Review\]', description, re.IGNORECASE):
+    if _AI_REVIEW_TAG_RE.search(description):
         tags.append("AI-Review")
 
     # Build clean title: strip all [...] tags and trailing file path
-    clean = re.sub(r'\[(?:HIGH|MEDIUM|LOW|AI-Review)\]\s*', '', description, flags=re.IGNORECASE)
-    clean = re.sub(r'\[[^\]]+\.\w+(?::\d+)?\]\s*$', '', clean)
+    clean = _STRIP_TAGS_RE.sub('', description)
+    clean = _FILE_PATH_TAG_RE.sub('', clean)
     clean = clean.strip()
 
     return {
@@ -62,7 +82,9 @@ def extract_ac_references(description: str) -> List[int]:
     Matches patterns like (AC: 1), (AC: 1, 2, 3), (AC: 1, 3).
     Returns sorted unique list of ints.
     """
-    m = re.search(r'\(AC:\s*([\d,\s]+)\)', description)
+    if "(AC:" not in description:
+        return []
+    m = _AC_REFERENCE_RE.search(description)
     if not m:
         return []
     nums = set()
@@ -92,6 +114,44 @@ def build_subtask_html(subtasks: List[Dict[str, Any]]) -> str:
     return "<div><ul>" + "".join(items) + "</ul></div>"
 
 
+# Precompiled patterns for the epics.md parser. Heading patterns are
+# matched right after the run of '#' characters (see heading_level()).
+_HEADING_RE = re.compile(r'(#+)\s')
+_EPIC_HEADING_RE = re.compile(r'\s+Epic\s+(\d+):\s*(.+)$')
+_STORY_HEADING_RE = re.compile(r'\s+Story\s+(\d+\.\d+):\s*(.+)$')
+_EPIC_PROBE_RE = re.compile(r'\s+Epic\s+\d+:')
+_STORY_PROBE_RE = re.compile(r'\s+Story\s+\d+\.\d+:')
+_PHASE_RE = re.compile(r'\*\*(?:Target\s+)?Phase:\*\*\s*(.+)', re.IGNORECASE)
+_DEPENDENCIES_RE = re.compile(r'\*\*Depend(?:s on|encies):\*\*\s*(.+)', re.IGNORECASE)
+_DEPENDENCY_SPLIT_RE = re.compile(r'[,;]')
+_REQUIREMENT_RE = re.compile(r'(?:FR|NFR|ARCH)-[\w.]+')
+_AC_HEADING_RE = re.compile(r'\s+Acceptance Criteria')
+_BOLD_LABEL_RE = re.compile(r'\*\*[^*]+:\*\*')
+
+
+def heading_level(line: str) -> int:
+    """Number of leading '#' characters when followed by whitespace, else 0."""
+    if not line.startswith("#"):
+        return 0
+    m = _HEADING_RE.match(line)
+    return len(m.group(1)) if m else 0
+
+
+def probe_heading_levels(line: str) -> Optional[Tuple[str, int]]:
+    """Classify a 'Story N.M:' or 'Epic N:' heading (levels 1-6) for level detection.
+
+    Returns ("story", level), ("epic", level) or None.
+    """
+    level = heading_level(line)
+    if not 1 <= level <= 6:
+        return None
+    if _STORY_PROBE_RE.match(line, level):
+        return "story", level
+    if _EPIC_PROBE_RE.match(line, level):
+        return "epic", level
+    return None
+
+
 def detect_heading_levels(content: str) -> Tuple[int, int]:
     """Scan for 'Story N.M:' and 'Epic N:' patterns to detect heading levels.
 
@@ -99,315 +159,695 @@ def detect_heading_levels(content: str) -> Tuple[int, int]:
     This handles epics.md files that have both a summary section (### Epic) and a detailed
     section (## Epic / ### Story) — the story heading level disambiguates.
     """
-    # First, try to detect story level directly — unambiguous when present
-    for line in content.splitlines():
-        m = re.match(r'^(#{1,6})\s+Story\s+\d+\.\d+:', line)
-        if m:
-            story_level = len(m.group(1))
-            return story_level - 1, story_level
+    return detect_heading_levels_from_lines(content.splitlines())
+
+
+def detect_heading_levels_from_lines(lines: Iterable[str]) -> Tuple[int, int]:
+    """detect_heading_levels() over an iterable of lines; stops at the first story heading."""
+    first_epic_level = None
+    for line in lines:
+        probe = probe_heading_levels(line)
+        if probe is None:
+            continue
+        kind, level = probe
+        # Story level is unambiguous when present
+        if kind == "story":
+            return level - 1, level
+        if first_epic_level is None:
+            first_epic_level = level
 
     # No stories found; detect from first epic heading
-    for line in content.splitlines():
-        m = re.match(r'^(#{1,6})\s+Epic\s+\d+:', line)
-        if m:
-            epic_level = len(m.group(1))
-            return epic_level, epic_level + 1
+    if first_epic_level is not None:
+        return first_epic_level, first_epic_level + 1
 
     # Defaults: ## Epic, ### Story
     return 2, 3
 
 
-def parse_epics_file(path: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-    """Parse epics.md, auto-detecting heading levels."""
-    if not os.path.isfile(path):
-        print(json.dumps({"error": f"File not found: {path}"}), file=sys.stderr)
-        return [], []
+def iter_file_lines(f: IO[str]) -> Iterator[str]:
+    """Lines of an open text file, split exactly as str.splitlines() splits the whole content."""
+    for line in f:
+        # splitlines() also breaks on \v, \f, \x1c-\x1e, \x85, \u2028 and \u2029
+        yield from line.splitlines()
 
-    with open(path, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    epic_level, story_level = detect_heading_levels(content)
 
-    epic_prefix = "#" * epic_level
-    story_prefix = "#" * story_level
+class EpicsParser:
+    """Single-pass state machine over epics.md lines.
 
-    epic_pattern = re.compile(
-        rf'^{re.escape(epic_prefix)}\s+Epic\s+(\d+):\s*(.+)$', re.MULTILINE
-    )
-    story_pattern = re.compile(
-        rf'^{re.escape(story_prefix)}\s+Story\s+(\d+\.\d+):\s*(.+)$', re.MULTILINE
-    )
+    feed() each line in order, then close() to get (epics, stories). Every
+    line is classified once with precompiled patterns; an epic's content
+    runs to the next epic heading but stops at the first heading at story
+    level or deeper, and a story's content runs to the next story or epic
+    heading. Heading levels come from the first 'Story N.M:' heading (or
+    the first 'Epic N:' heading when there are no stories), so lines are
+    buffered only until that heading is seen, or not at all when epic_level
+    is passed in. Duplicate epic IDs keep the first occurrence.
 
-    # Also match any heading at epic level or above as section boundary
-    any_heading_at_epic = re.compile(
-        rf'^#{{{1},{epic_level}}}\s+', re.MULTILINE
-    )
+    With emit, each finished epic or story is passed to emit("epic" | "story",
+    item) instead of being collected, and close() returns empty lists.
+    """
 
-    lines = content.splitlines()
-    epics = []
-    stories = []
-
-    # Find all epic and story positions
-    epic_positions = []
-    story_positions = []
-
-    for i, line in enumerate(lines):
-        em = re.match(rf'^{re.escape(epic_prefix)}\s+Epic\s+(\d+):\s*(.+)$', line)
-        if em:
-            epic_positions.append((i, em.group(1), em.group(2)))
-        sm = re.match(rf'^{re.escape(story_prefix)}\s+Story\s+(\d+\.\d+):\s*(.+)$', line)
-        if sm:
-            story_positions.append((i, sm.group(1), sm.group(2)))
-
-    # Parse epics with their content
-    for idx, (line_num, epic_id, epic_title) in enumerate(epic_positions):
-        # Content runs until next epic heading or end of file
-        if idx + 1 < len(epic_positions):
-            end_line = epic_positions[idx + 1][0]
+    def __init__(self, epic_level: Optional[int] = None,
+                 emit: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        self.epics = []
+        self.stories = []
+        self.epic_level = None
+        self.story_level = None
+        self._emit = emit
+        self._pending = []
+        self._first_epic_level = None
+        self._seen_epic_ids = set()
+        self._epic = None
+        self._story = None
+        if epic_level is not None:
+            self._set_levels(epic_level)
+
+    def feed(self, line: str) -> None:
+        if self.epic_level is not None:
+            self._process(line)
+            return
+        # Levels unknown: buffer until the first story heading settles them
+        self._pending.append(line)
+        probe = probe_heading_levels(line)
+        if probe is None:
+            return
+        kind, level = probe
+        if kind == "story":
+            self._set_levels(level - 1)
+        elif self._first_epic_level is None:
+            self._first_epic_level = level
+
+    def close(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        if self.epic_level is None:
+            self._set_levels(self._first_epic_level if self._first_epic_level is not None else 2)
+        self._end_epic()
+        self._end_story()
+        return self.epics, self.stories
+
+    def _set_levels(self, epic_level: int) -> None:
+        self.epic_level = epic_level
+        self.story_level = epic_level + 1
+        pending, self._pending = self._pending, []
+        for line in pending:
+            self._process(line)
+
+    def _process(self, line: str) -> None:
+        level = heading_level(line)
+        if level == self.epic_level and (level or line[:1].isspace()):
+            m = _EPIC_HEADING_RE.match(line, level)
+            if m:
+                self._end_epic()
+                self._end_story()
+                self._epic = {"id": m.group(1), "title": m.group(2).strip(), "description": [],
+                              "phase": "", "requirements": [], "dependencies": []}
+                return
+        elif level == self.story_level:
+            m = _STORY_HEADING_RE.match(line, level)
+            if m:
+                self._end_epic()
+                self._end_story()
+                story_id = m.group(1)
+                self._story = {"id": story_id, "epicId": story_id.split(".")[0], "title": m.group(2).strip(),
+                               "userStoryText": [], "acceptanceCriteria": [], "requirements": [], "inAc": False}
+                return
+        if self._epic is not None:
+            # Story headings and deeper end the epic's own content
+            if level >= self.story_level:
+                self._end_epic()
+            else:
+                self._epic_line(self._epic, line, level)
+        elif self._story is not None:
+            self._story_line(self._story, line, level)
+
+    @staticmethod
+    def _epic_line(epic: Dict[str, Any], line: str, level: int) -> None:
+        if line.startswith("**"):
+            pm = _PHASE_RE.match(line)
+            if pm:
+                epic["phase"] = pm.group(1).strip()
+                return
+            dm = _DEPENDENCIES_RE.match(line)
+            if dm:
+                deps_text = dm.group(1).strip()
+                epic["dependencies"] = [d.strip() for d in _DEPENDENCY_SPLIT_RE.split(deps_text) if d.strip()]
+                return
+        if "FR-" in line or "ARCH-" in line:
+            epic["requirements"].extend(_REQUIREMENT_RE.findall(line))
+        # Description lines (non-empty, non-metadata, not headings)
+        stripped = line.strip()
+        if stripped and not stripped.startswith("**") and not level:
+            epic["description"].append(stripped)
+
+    @staticmethod
+    def _story_line(story: Dict[str, Any], line: str, level: int) -> None:
+        is_heading = 1 <= level <= 6
+        if line.startswith("**Acceptance Criteria:**") or (is_heading and _AC_HEADING_RE.match(line, level)):
+            story["inAc"] = True
+            return
+        if story["inAc"]:
+            # A new heading or bold section label ends the AC block
+            if is_heading or (line.startswith("**") and _BOLD_LABEL_RE.match(line)):
+                story["inAc"] = False
+            else:
+                story["acceptanceCriteria"].append(line)
+                return
+        if "FR-" in line or "ARCH-" in line:
+            story["requirements"].extend(_REQUIREMENT_RE.findall(line))
+        stripped = line.strip()
+        if stripped and not is_heading:
+            story["userStoryText"].append(stripped)
+
+    def _end_epic(self) -> None:
+        epic, self._epic = self._epic, None
+        if epic is None or epic["id"] in self._seen_epic_ids:
+            # Summary + detailed sections repeat Epic headings; keep the first
+            return
+        self._seen_epic_ids.add(epic["id"])
+        epic["description"] = "\n".join(epic["description"]).strip()
+        epic["requirements"] = sorted(set(epic["requirements"]))
+        if self._emit is not None:
+            self._emit("epic", epic)
         else:
-            end_line = len(lines)
+            self.epics.append(epic)
+
+    def _end_story(self) -> None:
+        story, self._story = self._story, None
+        if story is None:
+            return
+        del story["inAc"]
+        story["userStoryText"] = "\n".join(story["userStoryText"]).strip()
+        story["acceptanceCriteria"] = "\n".join(story["acceptanceCriteria"]).strip()
+        story["requirements"] = sorted(set(story["requirements"]))
+        if self._emit is not None:
+            self._emit("story", story)
+        else:
+            self.stories.append(story)
 
-        content_lines = lines[line_num + 1:end_line]
-        description_parts = []
-        phase = ""
-        requirements = []
-        dependencies = []
 
-        for cl in content_lines:
-            # Skip story headings and deeper - they belong to stories
-            if re.match(rf'^#{{{story_level},}}\s+', cl):
-                break
+# Bump whenever a change to the parsers alters their output for the same input.
+# Entries are also invalidated when this script's own bytes change.
+PARSE_CACHE_VERSION = 2
 
-            # Extract phase
-            pm = re.match(r'^\*\*(?:Target\s+)?Phase:\*\*\s*(.+)', cl, re.IGNORECASE)
-            if pm:
-                phase = pm.group(1).strip()
-                continue
+# Files modified this close to the previous cache write are re-hashed even when
+# size and mtime match (a same-size edit within the mtime granularity is invisible).
+PARSE_CACHE_RACY_WINDOW_NS = 2 * 1000 ** 3
 
-            # Extract dependencies
-            dm = re.match(r'^\*\*Depend(?:s on|encies):\*\*\s*(.+)', cl, re.IGNORECASE)
-            if dm:
-                deps_text = dm.group(1).strip()
-                dependencies = [d.strip() for d in re.split(r'[,;]', deps_text) if d.strip()]
-                continue
-
-            # Extract requirement references
-            refs = re.findall(r'(?:FR|NFR|ARCH)-[\w.]+', cl)
-            if refs:
-                requirements.extend(refs)
-
-            # Description lines (non-empty, non-metadata)
-            stripped = cl.strip()
-            if stripped and not stripped.startswith("**") and not re.match(rf'^#{{{1},}}\s+', cl):
-                description_parts.append(stripped)
-
-        # Deduplicate requirements
-        requirements = sorted(set(requirements))
-
-        epics.append({
-            "id": epic_id,
-            "title": epic_title.strip(),
-            "description": "\n".join(description_parts).strip(),
-            "phase": phase,
-            "requirements": requirements,
-            "dependencies": dependencies
-        })
 
-    # Deduplicate epics by ID — some epics.md files have both a summary section
-    # and a detailed section with the same Epic headings. Keep first occurrence.
-    seen_epic_ids = set()
-    unique_epics = []
-    for epic in epics:
-        if epic["id"] not in seen_epic_ids:
-            seen_epic_ids.add(epic["id"])
-            unique_epics.append(epic)
-    epics = unique_epics
-
-    # Parse stories with their content
-    for idx, (line_num, story_id, story_title) in enumerate(story_positions):
-        # Determine parent epic
-        epic_id = story_id.split(".")[0]
-
-        # Content runs until next story heading or next epic heading or end
-        end_line = len(lines)
-        for next_pos in story_positions[idx + 1:]:
-            end_line = next_pos[0]
-            break
-        # Also check next epic
-        for ep_pos in epic_positions:
-            if ep_pos[0] > line_num and ep_pos[0] < end_line:
-                end_line = ep_pos[0]
-                break
+def parser_fingerprint() -> str:
+    """Cache version string: PARSE_CACHE_VERSION plus a digest of this script."""
+    try:
+        with open(os.path.abspath(__file__), "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:16]
+    except OSError:
+        digest = "unknown"
+    return f"{PARSE_CACHE_VERSION}:{digest}"
 
-        content_lines = lines[line_num + 1:end_line]
-
-        user_story_text = ""
-        acceptance_criteria = ""
-        requirements = []
-        in_ac = False
-        ac_lines = []
-        desc_lines = []
-
-        for cl in content_lines:
-            # Check for AC header
-            if re.match(r'^\*\*Acceptance Criteria:\*\*|^#{1,6}\s+Acceptance Criteria', cl):
-                in_ac = True
-                continue
-
-            # Check for end of AC block (new bold section or higher heading)
-            if in_ac:
-                if re.match(r'^#{1,6}\s+', cl) and not re.match(r'^#{1,6}\s+Acceptance Criteria', cl):
-                    in_ac = False
-                elif re.match(r'^\*\*[^*]+:\*\*', cl) and not re.match(r'^\*\*Acceptance Criteria:\*\*', cl):
-                    in_ac = False
-                else:
-                    ac_lines.append(cl)
-                    continue
-
-            # Extract requirement references
-            refs = re.findall(r'(?:FR|NFR|ARCH)-[\w.]+', cl)
-            if refs:
-                requirements.extend(refs)
-
-            # Description lines
-            stripped = cl.strip()
-            if stripped and not re.match(r'^#{1,6}\s+', cl):
-                desc_lines.append(stripped)
-
-        # First paragraph is typically the user story text
-        user_story_text = "\n".join(desc_lines).strip()
-        acceptance_criteria = "\n".join(ac_lines).strip()
-        requirements = sorted(set(requirements))
-
-        stories.append({
-            "id": story_id,
-            "epicId": epic_id,
-            "title": story_title.strip(),
-            "userStoryText": user_story_text,
-            "acceptanceCriteria": acceptance_criteria,
-            "requirements": requirements
-        })
 
-    return epics, stories
+class ParseCache:
+    """Sidecar cache of parsed files keyed by path, size, mtime and content hash.
 
+    A file whose size and mtime match its entry is served without being read.
+    If either differs the file is read and hashed; a matching hash still serves
+    the cached result (e.g. after a checkout that only touched the mtime),
+    otherwise the file is parsed again. The whole cache is discarded when the
+    parser fingerprint changes, and entries for files not looked up in this run
+    are dropped on save.
+    """
 
-def parse_story_file(story_id: str, story_path: str) -> Tuple[List[Dict[str, Any]], Optional[str], List[Dict[str, Any]]]:
-    """Parse a single story file for task/subtask breakdowns, status, and review follow-ups.
+    def __init__(self, path: str, version: Optional[str] = None):
+        self.path = path
+        self.version = version if version is not None else parser_fingerprint()
+        self.entries = {}  # type: Dict[str, Dict[str, Any]]
+        self.seen = {}  # type: Dict[str, Dict[str, Any]]
+        self.written_ns = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != self.version:
+            return
+        files = data.get("files")
+        if isinstance(files, dict):
+            self.entries = files
+            self.written_ns = int(data.get("written") or 0)
+
+    def lookup(self, path: str, kind: str, key: str, parse_text: Optional[Callable[[str], Any]]) -> Any:
+        """Return the parsed result for path, calling parse_text(content) on a miss.
+
+        kind and key identify what the result was parsed as (e.g. a story file
+        parsed for story ID "1.2"); an entry recorded under another kind or key
+        is treated as a miss. With parse_text None a miss returns None, and the
+        caller records its own result with store().
+        """
+        apath = os.path.abspath(path)
+        st = os.stat(apath)
+        entry = self.entries.get(apath)
+        usable = entry is not None and entry.get("kind") == kind and entry.get("key") == key
+        if (usable and entry.get("size") == st.st_size and entry.get("mtimeNs") == st.st_mtime_ns
+                and st.st_mtime_ns < self.written_ns - PARSE_CACHE_RACY_WINDOW_NS):
+            with self._lock:
+                self.hits += 1
+                self.seen[apath] = entry
+            return entry["result"]
+
+        with open(apath, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if usable and entry.get("sha256") == digest:
+            self._record(apath, kind, key, entry["result"], st.st_size, st.st_mtime_ns, digest, hit=True)
+            return entry["result"]
+        if parse_text is None:
+            return None
+        result = parse_text(data.decode("utf-8"))
+        self._record(apath, kind, key, result, st.st_size, st.st_mtime_ns, digest, hit=False)
+        return result
+
+    def store(self, path: str, kind: str, key: str, result: Any, size: int, mtime_ns: int, digest: str) -> None:
+        """Record a result parsed outside lookup(), with the fingerprint of the bytes it was parsed from."""
+        self._record(os.path.abspath(path), kind, key, result, size, mtime_ns, digest, hit=False)
+
+    def _record(self, apath: str, kind: str, key: str, result: Any, size: int, mtime_ns: int,
+                digest: str, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.seen[apath] = {
+                "kind": kind,
+                "key": key,
+                "size": size,
+                "mtimeNs": mtime_ns,
+                "sha256": digest,
+                "result": result,
+            }
+
+    def save(self) -> None:
+        """Write the entries looked up in this run back to the sidecar file (atomically)."""
+        if not self.path:
+            return
+        data = {
+            "version": self.version,
+            "written": int(time.time() * 1000 ** 3),
+            "files": self.seen,
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
 
-    Returns (tasks, status, review_tasks) where:
-    - tasks: list of task dicts with subtasks
-    - status: string or None (e.g., 'done', 'in-progress', 'review', 'draft')
-    - review_tasks: list of review follow-up task dicts
+
+def parse_epics_text(content: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Parse epics.md content, auto-detecting heading levels (single pass, see EpicsParser)."""
+    parser = EpicsParser()
+    for line in content.splitlines():
+        parser.feed(line)
+    return parser.close()
+
+
+def parse_epics_file(path: str, cache: Optional[ParseCache] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Parse epics.md, auto-detecting heading levels (single pass, see EpicsParser).
+
+    With a ParseCache, an unchanged file is served from the cache.
     """
-    tasks = []
-    status = None
-    review_tasks = []
+    if not os.path.isfile(path):
+        print(json.dumps({"error": f"File not found: {path}"}), file=sys.stderr)
+        return [], []
 
-    if not os.path.isfile(story_path):
-        return tasks, status, review_tasks
+    if cache is not None:
+        def parse_text(content: str) -> Dict[str, Any]:
+            epics, stories = parse_epics_text(content)
+            return {"epics": epics, "stories": stories}
+        result = cache.lookup(path, "epics", "", parse_text)
+        return result["epics"], result["stories"]
 
-    with open(story_path, "r", encoding="utf-8") as f:
+    with open(path, "r", encoding="utf-8") as f:
         content = f.read()
+    return parse_epics_text(content)
 
-    lines = content.splitlines()
 
-    # --- Extract Status field ---
-    for line in lines:
-        sm = re.match(r'^\*?\*?Status:\*?\*?\s*(.+)$', line, re.IGNORECASE)
-        if sm:
-            status = sm.group(1).strip().lower()
-            break
+def iter_epics_file(path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Stream epics.md as ("epic", epic) and ("story", story) items in document order.
 
-    # --- Extract Tasks ---
-    in_tasks = False
-    task_num = 0
-    current_task_num = 0
+    Reads the file line by line: once up to the first story heading to fix the
+    heading levels, then again to parse. Each item is yielded as soon as its
+    section ends, so memory stays proportional to the largest section. The
+    items are the ones parse_epics_file() returns.
+    """
+    if not os.path.isfile(path):
+        print(json.dumps({"error": f"File not found: {path}"}), file=sys.stderr)
+        return
 
-    for line in lines:
-        # Detect Tasks section header
-        if re.match(r'^##\s+Tasks\s*/?\s*Subtasks', line, re.IGNORECASE):
-            in_tasks = True
-            continue
+    ready = []  # type: List[Tuple[str, Dict[str, Any]]]
+    with open(path, "r", encoding="utf-8") as f:
+        epic_level, _ = detect_heading_levels_from_lines(iter_file_lines(f))
+        f.seek(0)
+        parser = EpicsParser(epic_level, emit=lambda kind, item: ready.append((kind, item)))
+        for line in iter_file_lines(f):
+            parser.feed(line)
+            if ready:
+                yield from ready
+                ready.clear()
+    parser.close()
+    yield from ready
 
-        # End of tasks section on next heading (## or deeper)
-        if in_tasks and re.match(r'^#{2,}\s+', line) and not re.match(r'^#{2,}\s+Tasks', line, re.IGNORECASE):
-            break
 
-        if not in_tasks:
-            continue
+def _natural_key(path: str) -> List[Any]:
+    """Sort key that orders epic-2.md before epic-10.md."""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', path)]
 
-        # Top-level task: "- [ ] description" or "- [x] description"
-        tm = re.match(r'^- \[([ xX])\]\s*(.+)$', line)
-        if tm:
-            task_num += 1
-            current_task_num = task_num
-            tasks.append({
-                "id": f"{story_id}-T{task_num}",
-                "description": tm.group(2).strip(),
-                "complete": tm.group(1).lower() == "x",
-                "subtasks": []
-            })
+
+def resolve_epics_paths(spec: str) -> List[str]:
+    """Expand --epics into the epics files to parse.
+
+    A directory means every *.md file directly inside it, a pattern with
+    glob characters (* ? [, ** for subdirectories) means its matching files,
+    and anything else is a single path. Shards come back in natural sort order.
+    """
+    if os.path.isdir(spec):
+        paths = glob.glob(os.path.join(glob.escape(spec), "*.md"))
+    elif any(c in spec for c in "*?["):
+        paths = glob.glob(spec, recursive=True)
+    else:
+        return [spec]
+    return sorted((p for p in paths if os.path.isfile(p)), key=_natural_key)
+
+
+def _parse_epics_shard(path: str) -> Tuple[Dict[str, Any], int, int, str]:
+    """Parse one epics shard in a worker process; returns (result, size, mtime_ns, sha256) for the cache."""
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    epics, stories = parse_epics_text(data.decode("utf-8"))
+    return {"epics": epics, "stories": stories}, st.st_size, st.st_mtime_ns, hashlib.sha256(data).hexdigest()
+
+
+def _parse_epics_shards(paths: List[str], jobs: int) -> List[Tuple[Dict[str, Any], int, int, str]]:
+    """Parse shards on a process pool (the parser is CPU-bound), serially when that is unavailable."""
+    if jobs > 1 and len(paths) > 1:
+        try:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+                return list(pool.map(_parse_epics_shard, paths))
+        except (OSError, NotImplementedError, pickle.PicklingError, BrokenProcessPool):
+            # No usable worker processes (sandbox, frozen interpreter, module not importable by name)
+            pass
+    return [_parse_epics_shard(path) for path in paths]
+
+
+def merge_epic_shards(shard_items: Iterable[Tuple[str, str, Dict[str, Any]]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Merge (path, kind, item) epics/stories from several shards, dropping cross-shard duplicates.
+
+    An epic or story ID already defined by an earlier shard is reported on
+    stderr and skipped (first shard wins); repeats inside one shard are left
+    to the single-file rules.
+    """
+    first_seen = {}  # type: Dict[Tuple[str, str], str]
+    for path, kind, item in shard_items:
+        origin = first_seen.setdefault((kind, item["id"]), path)
+        if origin != path:
+            print(json.dumps({"error": f"Duplicate {kind} {item['id']} in {path} (already defined in {origin}); skipped"}),
+                  file=sys.stderr)
             continue
+        yield kind, item
 
-        # Subtask: indented "- [ ] description"
-        sm = re.match(r'^\s{2,}- \[([ xX])\]\s*(.+)$', line)
-        if sm and tasks:
-            subtask_num = len(tasks[-1]["subtasks"]) + 1
-            tasks[-1]["subtasks"].append({
-                "id": f"{story_id}-T{current_task_num}.{subtask_num}",
-                "description": sm.group(2).strip(),
-                "complete": sm.group(1).lower() == "x"
-            })
 
-    # --- Extract Review Follow-ups ---
-    review_header_re = re.compile(
-        r'^###\s+Review Follow-ups(?:\s+Round\s+(\d+))?\s*\(AI\)\s*$', re.IGNORECASE
-    )
-    current_round = 0
-    in_review = False
-    item_num = 0
+def parse_epics_sources(spec: str, cache: Optional[ParseCache] = None,
+                        jobs: int = 1) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Parse --epics (a file, a directory of shards or a glob) into merged (epics, stories).
 
-    for line in lines:
-        hm = review_header_re.match(line)
-        if hm:
-            current_round = int(hm.group(1)) if hm.group(1) else 1
-            in_review = True
-            item_num = 0
-            continue
+    Shards are parsed concurrently on up to `jobs` processes, with unchanged
+    shards served from the cache, then merged in shard order by
+    merge_epic_shards().
+    """
+    paths = resolve_epics_paths(spec)
+    if paths == [spec]:
+        return parse_epics_file(spec, cache)
+    if not paths:
+        print(json.dumps({"error": f"No epics files found: {spec}"}), file=sys.stderr)
+        return [], []
 
-        # End of review section on next heading at ## or ### level (that isn't another review header)
-        if in_review and re.match(r'^##\s+', line) and not review_header_re.match(line):
-            in_review = False
-            continue
+    results = {}  # type: Dict[str, Dict[str, Any]]
+    if cache is not None:
+        for path in paths:
+            cached = cache.lookup(path, "epics", "", None)
+            if cached is not None:
+                results[path] = cached
+    misses = [path for path in paths if path not in results]
+    for path, (result, size, mtime_ns, digest) in zip(misses, _parse_epics_shards(misses, jobs)):
+        results[path] = result
+        if cache is not None:
+            cache.store(path, "epics", "", result, size, mtime_ns, digest)
+
+    items = [(path, "epic", epic) for path in paths for epic in results[path]["epics"]]
+    items += [(path, "story", story) for path in paths for story in results[path]["stories"]]
+    epics, stories = [], []
+    for kind, item in merge_epic_shards(items):
+        (epics if kind == "epic" else stories).append(item)
+    return epics, stories
 
-        if not in_review:
-            continue
 
-        # Review item: "- [ ] description" or "- [x] description"
-        rm = re.match(r'^- \[([ xX])\]\s*(.+)$', line)
-        if rm:
-            item_num += 1
-            desc = rm.group(2).strip()
-            meta = extract_review_metadata(desc)
-            review_tasks.append({
-                "id": f"{story_id}-R{current_round}.{item_num}",
-                "description": desc,
-                "complete": rm.group(1).lower() == "x",
-                "isReviewFollowup": True,
-                "reviewRound": current_round,
-                "subtasks": [],
-                "cleanTitle": meta["cleanTitle"],
-                "priority": meta["priority"],
-                "filePath": meta["filePath"],
-                "tags": meta["tags"]
+def iter_epics_sources(spec: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Streaming counterpart of parse_epics_sources(): shards one after another, line by line."""
+    paths = resolve_epics_paths(spec)
+    if not paths:
+        print(json.dumps({"error": f"No epics files found: {spec}"}), file=sys.stderr)
+        return
+    yield from merge_epic_shards((path, kind, item) for path in paths for kind, item in iter_epics_file(path))
+
+
+# Precompiled patterns for story files
+_STATUS_RE = re.compile(r'^\*?\*?Status:\*?\*?\s*(.+)$', re.IGNORECASE)
+_TASKS_HEADER_RE = re.compile(r'^##\s+Tasks\s*/?\s*Subtasks', re.IGNORECASE)
+_TASKS_HEADING_RE = re.compile(r'^#{2,}\s+Tasks', re.IGNORECASE)
+_SUBHEADING_RE = re.compile(r'^#{2,}\s+')
+_LEVEL2_HEADING_RE = re.compile(r'^##\s+')
+_REVIEW_HEADER_RE = re.compile(
+    r'^###\s+Review Follow-ups(?:\s+Round\s+(\d+))?\s*\(AI\)\s*$', re.IGNORECASE
+)
+# Top-level task ("- [ ] ...", no indent) or subtask (indented 2+ whitespace)
+_CHECKBOX_RE = re.compile(r'^(\s*)- \[([ xX])\]\s*(.+)$')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Hex digits of the task text digest used in task IDs
+TASK_ANCHOR_LENGTH = 6
+
+
+def task_anchor(text: str) -> str:
+    """Content anchor of a task: digest of its trimmed, whitespace-collapsed, lowercased text.
+
+    The checkbox state is not part of it, so ticking a task keeps its ID.
+    """
+    normalized = _WHITESPACE_RE.sub(" ", text.strip()).lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:TASK_ANCHOR_LENGTH]
+
+
+class StoryFileParser:
+    """Single-pass state machine over a story file's lines.
+
+    feed() each line in order, then close() to get (tasks, status,
+    review_tasks). Status, the Tasks / Subtasks section and Review
+    Follow-ups sections are tracked together: status is the first
+    'Status:' line; the tasks section starts at '## Tasks / Subtasks' and
+    ends for good at the next ## (or deeper) heading; a review section
+    starts at '### Review Follow-ups [Round N] (AI)' and ends at the next
+    ## heading.
+
+    Task IDs are anchored on the task text, not its position, so inserting
+    or removing a checkbox leaves the other IDs alone: '{story}-T{anchor}'
+    and '{story}-R{round}.{anchor}', with '-2', '-3', ... appended to
+    repeats of the same text. Subtasks are '{task id}.{n}'. The positional
+    IDs of earlier versions ('{story}-T{n}', '{story}-R{round}.{n}') are
+    kept as legacyId so stored sync state can be migrated.
+
+    With emit, the status and each finished task or review task are passed
+    to emit("status" | "task" | "reviewTask", value) instead of being
+    collected; a task is finished when the next task starts or the tasks
+    section ends.
+    """
+
+    def __init__(self, story_id: str, emit: Optional[Callable[[str, Any], None]] = None):
+        self.story_id = story_id
+        self.tasks = []
+        self.status = None
+        self.review_tasks = []
+        self._emit = emit
+        self._status_found = False
+        self._tasks_state = "before"  # before -> in -> done
+        self._task = None
+        self._task_count = 0
+        self._in_review = False
+        self._review_round = 0
+        self._review_item = 0
+        self._anchor_counts = {}  # type: Dict[str, int]
+
+    def feed(self, line: str) -> None:
+        if not self._status_found:
+            sm = _STATUS_RE.match(line)
+            if sm:
+                self.status = sm.group(1).strip().lower()
+                self._status_found = True
+                if self._emit is not None:
+                    self._emit("status", self.status)
+
+        is_heading = line.startswith("##")
+        checkbox = _CHECKBOX_RE.match(line) if "- [" in line else None
+
+        # --- Tasks / Subtasks section ---
+        if self._tasks_state != "done":
+            if is_heading and _TASKS_HEADER_RE.match(line):
+                self._tasks_state = "in"
+            elif self._tasks_state == "in":
+                if is_heading and _SUBHEADING_RE.match(line) and not _TASKS_HEADING_RE.match(line):
+                    self._tasks_state = "done"
+                    self._end_task()
+                elif checkbox:
+                    self._task_line(checkbox)
+
+        # --- Review Follow-ups sections ---
+        hm = _REVIEW_HEADER_RE.match(line) if is_heading else None
+        if hm:
+            self._review_round = int(hm.group(1)) if hm.group(1) else 1
+            self._in_review = True
+            self._review_item = 0
+        elif self._in_review:
+            if is_heading and _LEVEL2_HEADING_RE.match(line):
+                self._in_review = False
+            elif checkbox and not checkbox.group(1):
+                self._review_line(checkbox)
+
+    def _task_line(self, checkbox) -> None:
+        indent, mark, text = checkbox.groups()
+        if not indent:
+            self._end_task()
+            self._task_count += 1
+            task_id = self._anchored_id(f"{self.story_id}-T{task_anchor(text)}")
+            self._task = {
+                "id": task_id,
+                "legacyId": f"{self.story_id}-T{self._task_count}",
+                "description": text.strip(),
+                "complete": mark.lower() == "x",
+                "subtasks": []
+            }
+        elif len(indent) >= 2 and self._task is not None:
+            subtasks = self._task["subtasks"]
+            subtasks.append({
+                "id": f"{self._task['id']}.{len(subtasks) + 1}",
+                "description": text.strip(),
+                "complete": mark.lower() == "x"
             })
 
-    # --- Enrich regular tasks with AC references and subtask HTML ---
-    for task in tasks:
+    def _anchored_id(self, base: str) -> str:
+        """base for the first task with this text, base-2, base-3, ... for repeats."""
+        count = self._anchor_counts.get(base, 0) + 1
+        self._anchor_counts[base] = count
+        return base if count == 1 else f"{base}-{count}"
+
+    def _end_task(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        # Enrich regular tasks with AC references and subtask HTML
         task["acReferences"] = extract_ac_references(task["description"])
         task["subtaskHtml"] = build_subtask_html(task["subtasks"])
+        if self._emit is not None:
+            self._emit("task", task)
+        else:
+            self.tasks.append(task)
+
+    def _review_line(self, checkbox) -> None:
+        _, mark, text = checkbox.groups()
+        self._review_item += 1
+        desc = text.strip()
+        meta = extract_review_metadata(desc)
+        review_task = {
+            "id": self._anchored_id(f"{self.story_id}-R{self._review_round}.{task_anchor(desc)}"),
+            "legacyId": f"{self.story_id}-R{self._review_round}.{self._review_item}",
+            "description": desc,
+            "complete": mark.lower() == "x",
+            "isReviewFollowup": True,
+            "reviewRound": self._review_round,
+            "subtasks": [],
+            "cleanTitle": meta["cleanTitle"],
+            "priority": meta["priority"],
+            "filePath": meta["filePath"],
+            "tags": meta["tags"]
+        }
+        if self._emit is not None:
+            self._emit("reviewTask", review_task)
+        else:
+            self.review_tasks.append(review_task)
 
-    return tasks, status, review_tasks
+    def close(self) -> Tuple[List[Dict[str, Any]], Optional[str], List[Dict[str, Any]]]:
+        self._end_task()
+        return self.tasks, self.status, self.review_tasks
+
+
+def parse_story_text(story_id: str, content: str) -> Tuple[List[Dict[str, Any]], Optional[str], List[Dict[str, Any]]]:
+    """Parse story file content (single pass, see StoryFileParser)."""
+    parser = StoryFileParser(story_id)
+    for line in content.splitlines():
+        parser.feed(line)
+    return parser.close()
+
+
+def iter_story_file(story_id: str, story_path: str) -> Iterator[Tuple[str, Any]]:
+    """Stream a story file as ("status", str), ("task", task) and ("reviewTask", task) items.
+
+    Reads line by line and yields each task as soon as it is complete; the
+    items are the ones parse_story_file() returns.
+    """
+    if not os.path.isfile(story_path):
+        return
+
+    ready = []  # type: List[Tuple[str, Any]]
+    with open(story_path, "r", encoding="utf-8") as f:
+        parser = StoryFileParser(story_id, emit=lambda kind, item: ready.append((kind, item)))
+        for line in iter_file_lines(f):
+            parser.feed(line)
+            if ready:
+                yield from ready
+                ready.clear()
+    parser.close()
+    yield from ready
+
+
+def parse_story_file(story_id: str, story_path: str, cache: Optional[ParseCache] = None) -> Tuple[List[Dict[str, Any]], Optional[str], List[Dict[str, Any]]]:
+    """Parse a single story file for task/subtask breakdowns, status, and review follow-ups.
+
+    Returns (tasks, status, review_tasks) where:
+    - tasks: list of task dicts with subtasks
+    - status: string or None (e.g., 'done', 'in-progress', 'review', 'draft')
+    - review_tasks: list of review follow-up task dicts
+
+    With a ParseCache, an unchanged file is served from the cache.
+    """
+    if not os.path.isfile(story_path):
+        return [], None, []
+    return _read_story_file(story_id, story_path, cache)
+
+
+def _read_story_file(story_id: str, story_path: str, cache: Optional[ParseCache]) -> Tuple[List[Dict[str, Any]], Optional[str], List[Dict[str, Any]]]:
+    """parse_story_file() for a path already known to be a file."""
+    if cache is not None:
+        def parse_text(content: str) -> Dict[str, Any]:
+            tasks, status, review_tasks = parse_story_text(story_id, content)
+            return {"tasks": tasks, "status": status, "reviewTasks": review_tasks}
+        result = cache.lookup(story_path, "story", story_id, parse_text)
+        return result["tasks"], result["status"], result["reviewTasks"]
+
+    with open(story_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    return parse_story_text(story_id, content)
 
 
 def story_id_from_filename(filename: str) -> Optional[str]:
@@ -419,13 +859,73 @@ def story_id_from_filename(filename: str) -> Optional[str]:
     return f"{m.group(1)}.{m.group(2)}" if m else None
 
 
-def scan_story_files(stories_dir: str, story_ids: List[str]) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, str], Dict[str, List[Dict[str, Any]]], Dict[str, str]]:
-    """Scan story directories and flat files for task breakdowns, statuses, and review follow-ups.
+_NESTED_STORY_DIR_RE = re.compile(r'^\d+\.\d+$')
 
-    3-pass scan returning (all_tasks, story_statuses, review_followups_by_story, story_file_paths):
+# Story files are read on a thread pool: overlapping the reads pays off on
+# network-mounted artifact directories, while the parsing itself is cheap.
+DEFAULT_PARSE_JOBS = 4
+
+
+def discover_story_files(stories_dir: str, story_ids: List[str]) -> List[Tuple[str, str]]:
+    """Index story files in a single directory walk and apply the 3-pass precedence.
+
+    Returns (story_id, path) pairs in scan order:
     1. Known story IDs in nested {N.M}/story.md format (backward compat)
     2. Flat {N-M-slug}.md files — skip IDs already found in pass 1
     3. Unknown nested directories matching ^\\d+\\.\\d+$
+    Directory entries are visited in name order, so duplicates resolve the
+    same way on every filesystem.
+    """
+    nested = {}  # type: Dict[str, str]
+    flat = []  # type: List[Tuple[str, str]]
+    try:
+        with os.scandir(stories_dir) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        # Unlistable directory: known nested stories can still be found by path
+        entries = []
+        for story_id in story_ids:
+            story_path = os.path.join(stories_dir, story_id, "story.md")
+            if os.path.isfile(story_path):
+                nested[story_id] = story_path
+
+    for entry in entries:
+        try:
+            if entry.name.endswith(".md"):
+                sid = story_id_from_filename(entry.name)
+                if sid and entry.is_file():
+                    flat.append((sid, entry.path))
+            elif _NESTED_STORY_DIR_RE.match(entry.name) and entry.is_dir():
+                story_path = os.path.join(entry.path, "story.md")
+                if os.path.isfile(story_path):
+                    nested[entry.name] = story_path
+        except OSError:
+            continue
+
+    found = []  # type: List[Tuple[str, str]]
+    found_ids = set()
+    for story_id in story_ids:
+        if story_id in nested and story_id not in found_ids:
+            found.append((story_id, nested[story_id]))
+            found_ids.add(story_id)
+    for sid, story_path in flat:
+        if sid not in found_ids:
+            found.append((sid, story_path))
+            found_ids.add(sid)
+    for sid, story_path in nested.items():
+        if sid not in found_ids:
+            found.append((sid, story_path))
+            found_ids.add(sid)
+    return found
+
+
+def scan_story_files(stories_dir: str, story_ids: List[str], cache: Optional[ParseCache] = None,
+                     jobs: int = 1) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, str], Dict[str, List[Dict[str, Any]]], Dict[str, str]]:
+    """Scan story directories and flat files for task breakdowns, statuses, and review follow-ups.
+
+    Returns (all_tasks, story_statuses, review_followups_by_story, story_file_paths).
+    Files are found by discover_story_files() and parsed on up to `jobs`
+    threads; results are collected in discovery order either way.
     """
     all_tasks = {}
     story_statuses = {}
@@ -435,62 +935,25 @@ def scan_story_files(stories_dir: str, story_ids: List[str]) -> Tuple[Dict[str,
     if not stories_dir or not os.path.isdir(stories_dir):
         return all_tasks, story_statuses, review_followups_by_story, story_file_paths
 
-    found_ids = set()
+    files = discover_story_files(stories_dir, story_ids)
 
-    # Pass 1: Known story IDs in nested {N.M}/story.md format
-    for story_id in story_ids:
-        story_path = os.path.join(stories_dir, story_id, "story.md")
-        if os.path.isfile(story_path):
-            tasks, status, review_tasks = parse_story_file(story_id, story_path)
-            if tasks:
-                all_tasks[story_id] = tasks
-            if status:
-                story_statuses[story_id] = status
-            if review_tasks:
-                review_followups_by_story[story_id] = review_tasks
-            story_file_paths[story_id] = os.path.abspath(story_path)
-            found_ids.add(story_id)
+    def parse(item: Tuple[str, str]) -> Tuple[List[Dict[str, Any]], Optional[str], List[Dict[str, Any]]]:
+        return _read_story_file(item[0], item[1], cache)
 
-    # Pass 2: Flat {N-M-slug}.md files — skip IDs already found
-    try:
-        for entry in os.listdir(stories_dir):
-            if not entry.endswith(".md"):
-                continue
-            sid = story_id_from_filename(entry)
-            if not sid or sid in found_ids:
-                continue
-            story_path = os.path.join(stories_dir, entry)
-            if os.path.isfile(story_path):
-                tasks, status, review_tasks = parse_story_file(sid, story_path)
-                if tasks:
-                    all_tasks[sid] = tasks
-                if status:
-                    story_statuses[sid] = status
-                if review_tasks:
-                    review_followups_by_story[sid] = review_tasks
-                story_file_paths[sid] = os.path.abspath(story_path)
-                found_ids.add(sid)
-    except OSError:
-        pass
+    if jobs > 1 and len(files) > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+            parsed = list(pool.map(parse, files))
+    else:
+        parsed = [parse(item) for item in files]
 
-    # Pass 3: Unknown nested directories matching ^\d+\.\d+$
-    try:
-        for entry in os.listdir(stories_dir):
-            entry_path = os.path.join(stories_dir, entry)
-            if os.path.isdir(entry_path) and re.match(r'^\d+\.\d+$', entry) and entry not in found_ids:
-                story_path = os.path.join(entry_path, "story.md")
-                if os.path.isfile(story_path):
-                    tasks, status, review_tasks = parse_story_file(entry, story_path)
-                    if tasks:
-                        all_tasks[entry] = tasks
-                    if status:
-                        story_statuses[entry] = status
-                    if review_tasks:
-                        review_followups_by_story[entry] = review_tasks
-                    story_file_paths[entry] = os.path.abspath(story_path)
-                    found_ids.add(entry)
-    except OSError:
-        pass
+    for (story_id, story_path), (tasks, status, review_tasks) in zip(files, parsed):
+        if tasks:
+            all_tasks[story_id] = tasks
+        if status:
+            story_statuses[story_id] = status
+        if review_tasks:
+            review_followups_by_story[story_id] = review_tasks
+        story_file_paths[story_id] = os.path.abspath(story_path)
 
     return all_tasks, story_statuses, review_followups_by_story, story_file_paths
 
@@ -523,22 +986,145 @@ def parse_epic_statuses(path: str) -> Dict[str, str]:
     return epic_statuses
 
 
+def _write_json_array(out: IO[str], key: str, items: Iterable[Any]) -> int:
+    """Write '  "key": [...]' formatted as json.dump(..., indent=2) would at depth 1."""
+    out.write(f"  {json.dumps(key)}: [")
+    count = 0
+    for item in items:
+        out.write(",\n" if count else "\n")
+        # json.dumps escapes newlines inside strings, so every newline is a line break
+        out.write("    " + json.dumps(item, indent=2).replace("\n", "\n    "))
+        count += 1
+    out.write("\n  ]" if count else "]")
+    return count
+
+
+def _write_json_value(out: IO[str], key: str, value: Any) -> None:
+    """Write '  "key": value' formatted as json.dump(..., indent=2) would at depth 1."""
+    out.write(f"  {json.dumps(key)}: " + json.dumps(value, indent=2).replace("\n", "\n  "))
+
+
+def _spooled(spool: IO[str]) -> Iterator[Any]:
+    spool.seek(0)
+    for line in spool:
+        yield json.loads(line)
+
+
+def write_streamed_artifacts(epics_path: str, stories_dir: str, sprint_yaml: str, output_path: str) -> Dict[str, int]:
+    """Parse all artifacts in streaming mode and write the same JSON main() writes.
+
+    epics_path may be a single epics.md or a directory / glob of shards,
+    which are streamed one after another.
+
+    Epics, stories and tasks are written to output_path as they are parsed;
+    stories and review follow-ups (which come after epics and tasks in the
+    output) are spooled one per line to temporary files. Only IDs, statuses
+    and file paths are kept in memory, so peak memory follows the largest
+    section rather than the size of the planning documents. Returns the
+    counts.
+    """
+    counts = {}
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as out, \
+            tempfile.TemporaryFile("w+", encoding="utf-8") as story_spool, \
+            tempfile.TemporaryFile("w+", encoding="utf-8") as review_spool:
+        story_ids = []
+
+        def epics() -> Iterator[Dict[str, Any]]:
+            for kind, item in iter_epics_sources(epics_path):
+                if kind == "epic":
+                    yield item
+                else:
+                    story_ids.append(item["id"])
+                    story_spool.write(json.dumps(item) + "\n")
+
+        out.write("{\n")
+        counts["epics"] = _write_json_array(out, "epics", epics())
+        out.write(",\n")
+        counts["stories"] = _write_json_array(out, "stories", _spooled(story_spool))
+        out.write(",\n")
+
+        files = []
+        if stories_dir and os.path.isdir(stories_dir):
+            files = discover_story_files(stories_dir, story_ids)
+        story_statuses = {}
+        files_with_tasks = set()
+        files_with_reviews = set()
+        review_count = [0]
+
+        def tasks() -> Iterator[Dict[str, Any]]:
+            # Same order as main(): tasks by story ID, review follow-ups after all of them
+            for story_id, story_path in sorted(files):
+                for kind, item in iter_story_file(story_id, story_path):
+                    if kind == "status":
+                        story_statuses[story_id] = item
+                    elif kind == "task":
+                        files_with_tasks.add(story_id)
+                        yield {**item, "storyId": story_id}
+                    else:
+                        files_with_reviews.add(story_id)
+                        review_count[0] += 1
+                        review_spool.write(json.dumps({**item, "storyId": story_id}) + "\n")
+            yield from _spooled(review_spool)
+
+        counts["tasks"] = _write_json_array(out, "tasks", tasks())
+        out.write(",\n")
+
+        epic_statuses = parse_epic_statuses(sprint_yaml)
+        _write_json_value(out, "epicStatuses", epic_statuses)
+        out.write(",\n")
+        _write_json_value(out, "storyStatuses",
+                          {sid: story_statuses[sid] for sid, _ in files if sid in story_statuses})
+        out.write(",\n")
+        _write_json_value(out, "storyFilePaths", {sid: os.path.abspath(path) for sid, path in files})
+        out.write(",\n")
+
+        counts.update({
+            "storyFilesWithTasks": len(files_with_tasks),
+            "epicStatusesLoaded": len(epic_statuses),
+            "reviewFollowupTasks": review_count[0],
+            "storyFilesWithReviewFollowups": len(files_with_reviews)
+        })
+        _write_json_value(out, "counts", counts)
+        out.write("\n}")
+    return counts
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Parse BMAD artifacts (epics, stories, tasks, epic statuses) into structured JSON"
     )
-    parser.add_argument("--epics", required=True, help="Path to epics.md")
+    parser.add_argument("--epics", required=True,
+                        help="Path to epics.md, or a directory / glob of epics shards (e.g. epics/*.md)")
     parser.add_argument("--stories-dir", default="", help="Path to implementation artifacts directory")
     parser.add_argument("--sprint-yaml", default="", help="Path to sprint-status.yaml")
     parser.add_argument("--output", required=True, help="Path to write output JSON")
+    parser.add_argument("--cache", default=None,
+                        help="Parse cache sidecar file (default: _parse-cache.json next to --output)")
+    parser.add_argument("--no-cache", action="store_true", help="Parse every file, ignoring the parse cache")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_PARSE_JOBS,
+                        help=f"Story files (threads) and epics shards (processes) to parse concurrently (default: {DEFAULT_PARSE_JOBS})")
+    parser.add_argument("--stream", action="store_true",
+                        help="Bounded-memory mode for very large planning documents: parse line by line, "
+                             "write the output as it goes and print only the counts (no parse cache, no --jobs)")
     args = parser.parse_args()
 
+    if args.stream:
+        counts = write_streamed_artifacts(args.epics, args.stories_dir, args.sprint_yaml, args.output)
+        print(json.dumps({"counts": counts}, indent=2))
+        return
+
+    cache = None
+    if not args.no_cache:
+        cache_path = args.cache or os.path.join(os.path.dirname(args.output), "_parse-cache.json")
+        cache = ParseCache(cache_path)
+
     # Parse epics.md
-    epics, stories = parse_epics_file(args.epics)
+    epics, stories = parse_epics_sources(args.epics, cache, args.jobs)
 
     # Scan story files for tasks, statuses, review follow-ups, and file paths
     story_ids = [s["id"] for s in stories]
-    tasks_by_story, story_statuses, review_followups_by_story, story_file_paths = scan_story_files(args.stories_dir, story_ids)
+    tasks_by_story, story_statuses, review_followups_by_story, story_file_paths = scan_story_files(args.stories_dir, story_ids, cache, args.jobs)
 
     # Flatten tasks
     all_tasks = []
@@ -580,6 +1166,13 @@ def main():
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(result, f, indent=2)
 
+    if cache is not None:
+        try:
+            cache.save()
+        except OSError as e:
+            print(json.dumps({"warning": f"Could not write parse cache {cache.path}: {e}"}), file=sys.stderr)
+        print(f"Parse cache: {cache.hits} cached, {cache.misses} parsed", file=sys.stderr)
+
     # Also print to stdout for visibility
     print(json.dumps(result, indent=2))
 
@@ -2,19 +2,51 @@
 """Batch Azure DevOps sync via az CLI with error resilience.
 
 Cross-platform, stdlib-only. Auto-detects az executable path.
-Creates/updates work items in dependency order (Epics -> Stories -> Tasks -> Iterations).
+Creates/updates work items in dependency order (Iterations -> Epics -> Stories -> Tasks).
+
+Work item operations are expressed as az CLI argument lists and executed by a
+runner: either run_az() (one az process per call) or RestBackend (the same
+argument lists translated to REST calls over pooled keep-alive connections).
 """
 
 import argparse
 import base64
+import collections
+import concurrent.futures
+import hashlib
+import http.client
+import io
 import json
+import math
 import os
+import queue
+import random
+import re
 import shutil
+import signal
 import subprocess
 import sys
+import threading
+import time
 import urllib.error
+import urllib.parse
 import urllib.request
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+API_VERSION = "7.0"
+# The work item $batch endpoint is documented against this api-version
+BATCH_API_VERSION = "4.1"
+# Azure DevOps accepts at most 200 requests per $batch call
+MAX_BATCH_SIZE = 200
+# Files larger than this use the chunked attachment upload protocol
+ATTACHMENT_CHUNK_SIZE = 4 * 1024 * 1024
+# Background story file uploads: worker threads, and uploads queued or in
+# flight at once (bounds open files and memory while work items sync)
+ATTACHMENT_WORKERS = 4
+ATTACHMENT_QUEUE_SIZE = 8
+
+# A runner executes one az CLI argument list: runner(args) -> (data, err)
+Runner = Callable[..., Tuple[Optional[Dict[str, Any]], Optional[str]]]
 
 
 def find_az_executable() -> str:
@@ -30,8 +62,33 @@ def find_az_executable() -> str:
     return "az"
 
 
+def kill_process_tree(proc: subprocess.Popen) -> None:
+    """Kill a timed-out az process together with its children.
+
+    az is a wrapper (az.cmd on Windows, a shell script elsewhere) around a
+    Python child that inherits our pipes; killing only the wrapper leaves
+    communicate() waiting on the orphan forever.
+    """
+    try:
+        if sys.platform == "win32":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                           capture_output=True, timeout=30)
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except (OSError, subprocess.SubprocessError):
+        pass
+    try:
+        proc.kill()
+    except OSError:
+        pass
+
+
 def run_az(az_path: str, args: List[str], timeout: int = 120) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
-    """Run an az CLI command and return parsed JSON or error."""
+    """Run an az CLI command and return parsed JSON or error.
+
+    On timeout the whole az process tree is killed so a hung call cannot
+    block the sync.
+    """
     cmd = [az_path] + args + ["--output", "json"]
 
     try:
@@ -46,40 +103,492 @@ def run_az(az_path: str, args: List[str], timeout: int = 120) -> Tuple[Optional[
                 a_escaped = a.replace('"', '""')
                 quoted.append(f'"{a_escaped}"')
             cmd_str = " ".join(quoted)
-            result = subprocess.run(
+            proc = subprocess.Popen(
                 cmd_str,
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=timeout,
                 shell=True
             )
         else:
-            result = subprocess.run(
+            proc = subprocess.Popen(
                 cmd,
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=timeout
+                start_new_session=True
             )
 
-        if result.returncode != 0:
-            error_msg = result.stderr.strip() or result.stdout.strip() or f"Exit code {result.returncode}"
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            kill_process_tree(proc)
+            try:
+                proc.communicate(timeout=5)
+            except subprocess.TimeoutExpired:
+                pass
+            return None, f"Command timed out after {timeout}s"
+
+        if proc.returncode != 0:
+            error_msg = stderr.strip() or stdout.strip() or f"Exit code {proc.returncode}"
             return None, error_msg
 
-        if result.stdout.strip():
+        if stdout.strip():
             try:
-                return json.loads(result.stdout), None
+                return json.loads(stdout), None
             except json.JSONDecodeError:
-                return None, f"Invalid JSON response: {result.stdout[:200]}"
+                return None, f"Invalid JSON response: {stdout[:200]}"
         return {}, None
 
-    except subprocess.TimeoutExpired:
-        return None, "Command timed out after 120s"
     except FileNotFoundError:
         return None, f"az CLI not found at: {az_path}"
     except Exception as e:
         return None, str(e)
 
 
+def load_az_cli_factory() -> Optional[Callable[[], Any]]:
+    """Return azure-cli-core's get_default_cli if it is importable, else None.
+
+    Only available when this script runs under the interpreter that has the
+    Azure CLI installed (e.g. pip install azure-cli); the az MSI/apt bundles
+    ship their own private Python.
+    """
+    try:
+        from azure.cli.core import get_default_cli
+    except ImportError:
+        return None
+    return get_default_cli
+
+
+class InProcessAz:
+    """Run az commands through azure-cli-core inside this process.
+
+    Skips the interpreter start, extension load and config read that every
+    spawned az pays. Takes the same argument lists as run_az() and returns
+    the same (data, err) tuple. The Azure CLI keeps global state, so calls
+    are serialized; the per-call timeout cannot be enforced in-process.
+    """
+
+    def __init__(self, cli_factory: Callable[[], Any]):
+        self.cli_factory = cli_factory
+        self._lock = threading.Lock()
+
+    def __call__(self, args: List[str], timeout: int = 120) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        with self._lock:
+            cli = self.cli_factory()
+            out = io.StringIO()
+            try:
+                exit_code = cli.invoke(args + ["--output", "json"], out_file=out)
+            except SystemExit as e:
+                # knack exits on argument parsing errors
+                exit_code = e.code if isinstance(e.code, int) else 1
+            result = getattr(cli, "result", None)
+        error = getattr(result, "error", None)
+        if exit_code or error:
+            return None, str(error) if error else (out.getvalue().strip() or f"Exit code {exit_code}")
+        data = getattr(result, "result", None)
+        return (data if data is not None else {}), None
+
+
+class AzRunner:
+    """az runner that prefers in-process invocation and falls back to run_az().
+
+    If the in-process call itself breaks (as opposed to the az command
+    failing), the runner switches to spawning az for the rest of the sync.
+    Counts which path served each call so the results can report it.
+    """
+
+    def __init__(self, az_path: str, in_process: Optional[InProcessAz] = None):
+        self.az_path = az_path
+        self.in_process = in_process
+        self._lock = threading.Lock()
+        self.calls = {"inProcess": 0, "subprocess": 0}
+
+    def _count(self, path: str) -> None:
+        with self._lock:
+            self.calls[path] += 1
+
+    def __call__(self, args: List[str], timeout: int = 120) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        if self.in_process is not None:
+            try:
+                data, err = self.in_process(args, timeout=timeout)
+                self._count("inProcess")
+                return data, err
+            except Exception as e:
+                progress(f"  WARNING: In-process az failed ({e}); falling back to spawning az")
+                self.in_process = None
+        self._count("subprocess")
+        return run_az(self.az_path, args, timeout=timeout)
+
+    @property
+    def mode(self) -> str:
+        """Which path served the calls: 'az-inprocess', 'az' or 'az-mixed'."""
+        if self.calls["inProcess"] and self.calls["subprocess"]:
+            return "az-mixed"
+        return "az-inprocess" if self.calls["inProcess"] else "az"
+
+
+def make_az_runner(az_path: str, in_process: bool = False) -> AzRunner:
+    """Build the az runner: runner(args) -> (data, err).
+
+    With in_process, commands run through azure-cli-core when it can be
+    imported, falling back to spawning az otherwise.
+    """
+    engine = None
+    if in_process:
+        factory = load_az_cli_factory()
+        if factory is None:
+            progress("azure-cli-core not importable — spawning az per call")
+        else:
+            engine = InProcessAz(factory)
+    return AzRunner(az_path, engine)
+
+
+# Pause applied on a 429 that carries no usable Retry-After header
+DEFAULT_THROTTLE_PAUSE = 30.0
+# Retries of a throttled call after the pause, before it counts as failed
+THROTTLE_RETRIES = 3
+# Slow down once fewer than this fraction of the TSTU budget remains
+RATE_LIMIT_REMAINING_FLOOR = 0.1
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After / X-RateLimit-Delay header value in seconds."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class ThrottleController:
+    """Shared AIMD concurrency limit and global pause for Azure DevOps calls.
+
+    Every call acquires a slot before it is sent and releases it with the
+    response status and headers. Healthy responses raise the in-flight limit
+    additively (by 1/limit, i.e. about one slot per round of calls); a 429,
+    a Retry-After, an X-RateLimit-Delay or an X-RateLimit-Remaining below
+    RATE_LIMIT_REMAINING_FLOOR of X-RateLimit-Limit halves it. Retry-After
+    and X-RateLimit-Delay also pause all callers until the delay has passed.
+    """
+
+    def __init__(self, max_concurrency: int = 1, min_concurrency: int = 1):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._cooldown_until = 0.0
+        self._cond = threading.Condition()
+        self.throttled = 0
+        self.decreases = 0
+        self.paused_seconds = 0.0
+
+    def acquire(self) -> None:
+        """Block until the server allows another call and a slot is free."""
+        with self._cond:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                elif self.in_flight >= int(self.limit):
+                    self._cond.wait()
+                else:
+                    self.in_flight += 1
+                    return
+
+    def release(self, status: Optional[int] = None,
+                headers: Optional[Dict[str, str]] = None) -> Optional[float]:
+        """Free a slot and adapt to the response.
+
+        Returns the number of seconds to wait before retrying when the call
+        was throttled (HTTP 429), otherwise None.
+        """
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        retry_after = parse_retry_after(headers.get("retry-after"))
+        delay = parse_retry_after(headers.get("x-ratelimit-delay"))
+        remaining = parse_retry_after(headers.get("x-ratelimit-remaining"))
+        budget = parse_retry_after(headers.get("x-ratelimit-limit"))
+
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            now = time.monotonic()
+            retry_wait = None
+            if status == 429:
+                self.throttled += 1
+                retry_wait = retry_after if retry_after is not None else DEFAULT_THROTTLE_PAUSE
+                self._decrease(now)
+                self._pause(now, retry_wait)
+            elif retry_after or delay or (
+                    remaining is not None and budget and remaining < budget * RATE_LIMIT_REMAINING_FLOOR):
+                self._decrease(now)
+                self._pause(now, max(retry_after or 0.0, delay or 0.0))
+            elif status is not None and status < 400:
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+            return retry_wait
+
+    def _decrease(self, now: float) -> None:
+        # Responses to calls sent before the last decrease reflect the old
+        # limit; halve at most once per second so a burst doesn't collapse it
+        if now < self._cooldown_until:
+            return
+        self.limit = max(float(self.min_concurrency), self.limit / 2)
+        self._cooldown_until = now + 1.0
+        self.decreases += 1
+
+    def _pause(self, now: float, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        until = now + seconds
+        if until > self.paused_until:
+            self.paused_seconds += until - max(now, self.paused_until)
+            self.paused_until = until
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the sync results summary."""
+        return {
+            "throttled": self.throttled,
+            "decreases": self.decreases,
+            "pausedSeconds": round(self.paused_seconds, 1),
+            "concurrency": int(self.limit),
+        }
+
+
+def az_throttle_signal(err: Optional[str]) -> Tuple[Optional[int], Dict[str, str]]:
+    """Recover an HTTP status and Retry-After from an az CLI error message.
+
+    The az CLI hides response headers, but throttling errors mention the
+    429 status (or TooManyRequests) and usually the Retry-After value.
+    """
+    if not err:
+        return None, {}
+    if not re.search(r"\b429\b|too many requests|toomanyrequests", err, re.IGNORECASE):
+        return None, {}
+    headers = {}
+    m = re.search(r"retry[- ]after\D{0,5}(\d+(?:\.\d+)?)", err, re.IGNORECASE)
+    if m:
+        headers["Retry-After"] = m.group(1)
+    return 429, headers
+
+
+def make_throttled_runner(runner: Runner, throttle: ThrottleController,
+                          retries: int = THROTTLE_RETRIES) -> Runner:
+    """Wrap an az runner so every call goes through the throttle controller.
+
+    A throttled call waits out the pause and is retried up to `retries` times.
+    """
+    def throttled(args: List[str], **kwargs: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        attempt = 0
+        while True:
+            throttle.acquire()
+            data, err = None, "Throttled call did not run"
+            try:
+                data, err = runner(args, **kwargs)
+            finally:
+                status, headers = az_throttle_signal(err) if err else (200, {})
+                wait = throttle.release(status, headers)
+            if wait is None or attempt >= retries:
+                return data, err
+            attempt += 1
+            progress(f"  Throttled (HTTP 429), retrying in {wait:.0f}s")
+    return throttled
+
+
+def urlopen_throttled(req: urllib.request.Request, throttle: Optional[ThrottleController],
+                      timeout: int = 60, retries: int = THROTTLE_RETRIES) -> bytes:
+    """urlopen() through the throttle controller; returns the response body.
+
+    Retries a throttled request after the pause; other errors propagate.
+    A file object body is rewound before every attempt.
+    """
+    attempt = 0
+    while True:
+        if hasattr(req.data, "seek"):
+            req.data.seek(0)
+        if throttle is None:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                return resp.read()
+        throttle.acquire()
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                body = resp.read()
+                throttle.release(resp.status, dict(resp.headers))
+                return body
+        except urllib.error.HTTPError as e:
+            wait = throttle.release(e.code, dict(e.headers or {}))
+            if wait is None or attempt >= retries:
+                raise
+            attempt += 1
+            progress(f"  Throttled (HTTP 429), retrying in {wait:.0f}s")
+        except Exception:
+            throttle.release()
+            raise
+
+
+# Commands that must not be re-sent after an ambiguous failure (timeout,
+# reset, 5xx): the first attempt may have succeeded and a retry would
+# create a duplicate work item, link or iteration.
+NON_IDEMPOTENT_COMMANDS = (
+    ("boards", "work-item", "create"),
+    ("boards", "work-item", "relation"),
+    ("boards", "iteration", "project"),
+)
+# Errors where the server did not act on the request — always safe to retry.
+# Throttling (429) is not listed: the throttle controller already retries it
+# after the server's pause, and retrying it again here would defeat the back-off.
+SAFE_RETRY_PATTERNS = (
+    r"HTTP 503\b", r"service unavailable",
+    r"connection refused", r"name or service not known", r"getaddrinfo failed",
+    r"temporary failure in name resolution",
+)
+# Errors where the request may or may not have been applied
+AMBIGUOUS_RETRY_PATTERNS = (
+    r"timed out", r"HTTP 50[024]\b", r"internal server error", r"bad gateway",
+    r"gateway time-?out", r"connection error", r"connection reset",
+    r"connection aborted", r"remote end closed", r"max retries exceeded",
+)
+
+
+def operation_key(args: List[str]) -> str:
+    """Group az argument lists by command (e.g. 'boards work-item create')."""
+    words = []
+    for a in args:
+        if a.startswith("--") or len(words) == 3:
+            break
+        words.append(a)
+    return " ".join(words)
+
+
+def is_retryable_error(err: Optional[str], idempotent: bool = True) -> bool:
+    """Classify an error as transient (worth retrying) or permanent.
+
+    503 and connection failures are always retryable. Timeouts, resets and
+    other 5xx are retryable only for idempotent operations. Everything else
+    (4xx, validation errors) is permanent, including a 429 that is still
+    throttled after the throttle controller's own retries.
+    """
+    if not err:
+        return False
+    if any(re.search(p, err, re.IGNORECASE) for p in SAFE_RETRY_PATTERNS):
+        return True
+    return idempotent and any(re.search(p, err, re.IGNORECASE) for p in AMBIGUOUS_RETRY_PATTERNS)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter: attempt n waits U(0, min(cap, base * 2**n))."""
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class LatencyTracker:
+    """Per-operation latency window used to derive call timeouts.
+
+    Until MIN_SAMPLES successful calls of an operation have been seen the
+    default timeout applies; after that the timeout is the observed p99
+    times MULTIPLIER, clamped to [MIN_TIMEOUT, default]. A call that hangs
+    far beyond what its peers take is cut off instead of holding a worker
+    for the full default.
+    """
+
+    WINDOW = 200
+    MIN_SAMPLES = 20
+    MULTIPLIER = 3.0
+    MIN_TIMEOUT = 15
+
+    def __init__(self, default_timeout: int = 120):
+        self.default_timeout = default_timeout
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, op: str, seconds: float) -> None:
+        with self._lock:
+            window = self._samples.setdefault(op, collections.deque(maxlen=self.WINDOW))
+            window.append(seconds)
+
+    def percentile(self, op: str, pct: float) -> Optional[float]:
+        with self._lock:
+            window = sorted(self._samples.get(op, ()))
+        if not window:
+            return None
+        index = min(len(window) - 1, int(round(pct / 100.0 * (len(window) - 1))))
+        return window[index]
+
+    def operations(self) -> List[str]:
+        with self._lock:
+            return sorted(self._samples)
+
+    def timeout(self, op: str) -> int:
+        with self._lock:
+            count = len(self._samples.get(op, ()))
+        if count < self.MIN_SAMPLES:
+            return self.default_timeout
+        p99 = self.percentile(op, 99)
+        return int(max(self.MIN_TIMEOUT, min(self.default_timeout, math.ceil(p99 * self.MULTIPLIER))))
+
+
+class RetryingRunner:
+    """Runner wrapper adding retries with backoff and adaptive timeouts.
+
+    Each call gets a timeout from the LatencyTracker for its operation.
+    Transient failures (see is_retryable_error()) are retried per the
+    RetryPolicy; permanent failures and exhausted retries return the last
+    error unchanged.
+    """
+
+    def __init__(self, runner: Runner, policy: Optional[RetryPolicy] = None,
+                 latency: Optional[LatencyTracker] = None, sleep: Callable[[float], None] = time.sleep):
+        self.runner = runner
+        self.policy = policy or RetryPolicy()
+        self.latency = latency or LatencyTracker()
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.timeouts = 0
+
+    def __call__(self, args: List[str], timeout: Optional[int] = None,
+                 **kwargs: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        op = operation_key(args)
+        idempotent = tuple(args[:3]) not in NON_IDEMPOTENT_COMMANDS
+        attempt = 0
+        while True:
+            call_timeout = timeout or self.latency.timeout(op)
+            start = time.monotonic()
+            data, err = self.runner(args, timeout=call_timeout, **kwargs)
+            if not err:
+                self.latency.record(op, time.monotonic() - start)
+                return data, err
+            if "timed out" in err:
+                with self._lock:
+                    self.timeouts += 1
+            attempt += 1
+            if attempt >= self.policy.max_attempts or not is_retryable_error(err, idempotent):
+                return data, err
+            delay = self.policy.delay(attempt - 1)
+            with self._lock:
+                self.retries += 1
+            progress(f"  Retry {attempt}/{self.policy.max_attempts - 1} in {delay:.1f}s: {err[:120]}")
+            self._sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and observed latency for the sync results summary."""
+        latency = {}
+        for op in self.latency.operations():
+            latency[op] = {
+                "p50": round(self.latency.percentile(op, 50), 3),
+                "p99": round(self.latency.percentile(op, 99), 3),
+                "timeout": self.latency.timeout(op),
+            }
+        return {"retries": self.retries, "timeouts": self.timeouts, "latency": latency}
+
+
 def get_story_type(template: str) -> str:
     """Map process template to story work item type."""
     mapping = {
@@ -234,8 +743,19 @@ def build_task_create_args(task: Dict[str, Any], area: str, iteration: str) -> L
     return args
 
 
-def build_task_update_args(task: Dict[str, Any], devops_id: int, complete_state: str) -> List[str]:
-    """Build az CLI args for updating a task work item with enriched fields."""
+def field_changed(fields: Optional[List[str]], *names: str) -> bool:
+    """Whether an update must send a field: any of names changed, or changes unknown (fields None)."""
+    return fields is None or any(name in fields for name in names)
+
+
+def build_task_update_args(task: Dict[str, Any], devops_id: int, complete_state: str,
+                           fields: Optional[List[str]] = None) -> List[str]:
+    """Build az CLI args for updating a task work item with enriched fields.
+
+    fields (the diff's changedFields) limits the update to what changed:
+    title carries the title, priority, tags and description, status the
+    state, subtasks the description. None sends everything.
+    """
     state = complete_state if task.get("complete", False) else "New"
 
     # Use cleanTitle for review tasks, description for regular tasks
@@ -244,120 +764,947 @@ def build_task_update_args(task: Dict[str, Any], devops_id: int, complete_state:
     else:
         title = task.get("description", "")
 
-    args = [
-        "boards", "work-item", "update",
-        "--id", str(devops_id),
-        "--title", truncate_title(title),
-        "--state", state,
-    ]
+    args = ["boards", "work-item", "update", "--id", str(devops_id)]
+    if field_changed(fields, "title"):
+        args += ["--title", truncate_title(title)]
+    if field_changed(fields, "status"):
+        args += ["--state", state]
 
     # Description
     desc_html = build_task_description(task)
-    if desc_html:
+    if desc_html and field_changed(fields, "title", "subtasks"):
         args += ["--description", desc_html]
+    if not field_changed(fields, "title"):
+        return args
 
     # Fields (priority, tags)
-    fields = []
+    field_specs = []
     priority = task.get("priority")
     if priority is not None:
-        fields.append(f"Microsoft.VSTS.Common.Priority={priority}")
+        field_specs.append(f"Microsoft.VSTS.Common.Priority={priority}")
     tags = task.get("tags", [])
     if tags:
-        fields.append(f"System.Tags={';'.join(tags)}")
-    for field in fields:
-        args += ["--fields", field]
+        field_specs.append(f"System.Tags={';'.join(tags)}")
+    for spec in field_specs:
+        args += ["--fields", spec]
 
     return args
 
 
-def upload_attachment(org_url: str, project: str, pat: str, file_path: str, filename: str) -> Optional[str]:
+def build_epic_create_args(epic: Dict[str, Any], area: str, iteration: str) -> List[str]:
+    """Build az CLI args for creating an epic work item."""
+    args = [
+        "boards", "work-item", "create",
+        "--type", "Epic",
+        "--title", truncate_title(epic.get("title", "")),
+        "--description", wrap_html(epic.get("description", ""), max_len=3000),
+    ]
+    if area:
+        args += ["--area", area]
+    if iteration:
+        args += ["--iteration", iteration]
+    return args
+
+
+def build_epic_update_args(epic: Dict[str, Any], devops_id: int, state: Optional[str],
+                           fields: Optional[List[str]] = None) -> List[str]:
+    """Build az CLI args for updating an epic work item, including state if mapped.
+
+    fields (the diff's changedFields) limits the update to the changed title
+    and description; None sends both.
+    """
+    args = ["boards", "work-item", "update", "--id", str(devops_id)]
+    if field_changed(fields, "title"):
+        args += ["--title", truncate_title(epic.get("title", ""))]
+    if field_changed(fields, "description"):
+        args += ["--description", wrap_html(epic.get("description", ""), max_len=3000)]
+    if state:
+        args += ["--state", state]
+    return args
+
+
+def build_story_create_args(story: Dict[str, Any], story_type: str, ac_field: Optional[str],
+                            area: str, iteration: str) -> List[str]:
+    """Build az CLI args for creating a story work item with acceptance criteria."""
+    args = [
+        "boards", "work-item", "create",
+        "--type", story_type,
+        "--title", truncate_title(story.get("title", "")),
+        "--description", wrap_html(story.get("userStoryText", ""), max_len=3000),
+    ]
+    if area:
+        args += ["--area", area]
+    if iteration:
+        args += ["--iteration", iteration]
+
+    ac_text = story.get("acceptanceCriteria", "")
+    if ac_text and ac_field:
+        args += ["--fields", f"{ac_field}={wrap_html(ac_text, max_len=3000)}"]
+    return args
+
+
+def build_story_update_args(story: Dict[str, Any], devops_id: int, ac_field: Optional[str],
+                            state: Optional[str], fields: Optional[List[str]] = None) -> List[str]:
+    """Build az CLI args for updating a story work item, including state if mapped.
+
+    fields (the diff's changedFields) limits the update to the changed title,
+    description and acceptance criteria; None sends all three.
+    """
+    args = ["boards", "work-item", "update", "--id", str(devops_id)]
+    if field_changed(fields, "title"):
+        args += ["--title", truncate_title(story.get("title", ""))]
+    if field_changed(fields, "description"):
+        args += ["--description", wrap_html(story.get("userStoryText", ""), max_len=3000)]
+
+    ac_text = story.get("acceptanceCriteria", "")
+    if ac_text and ac_field and field_changed(fields, "acceptanceCriteria"):
+        args += ["--fields", f"{ac_field}={wrap_html(ac_text, max_len=3000)}"]
+
+    if state:
+        args += ["--state", state]
+    return args
+
+
+def build_auth_header(pat: Union[str, "TokenManager"]) -> str:
+    """Build the Authorization header value for a PAT or az CLI access token.
+
+    Bearer tokens (from az CLI) start with 'eyJ'; PATs use Basic auth.
+    A TokenManager is asked for its current (auto-refreshed) credential.
+    """
+    if isinstance(pat, TokenManager):
+        pat = pat.token()
+    if pat.startswith("eyJ"):
+        return f"Bearer {pat}"
+    token = base64.b64encode(f":{pat}".encode("utf-8")).decode("utf-8")
+    return f"Basic {token}"
+
+
+def upload_attachment(org_url: str, project: str, pat: Union[str, "TokenManager"],
+                      file_path: str, filename: str,
+                      throttle: Optional[ThrottleController] = None,
+                      chunk_size: int = ATTACHMENT_CHUNK_SIZE) -> Optional[str]:
     """Upload a file attachment to Azure DevOps via REST API.
 
     Uses urllib.request (stdlib) with PAT or Bearer token authentication.
-    Bearer tokens (from az CLI) start with 'eyJ'; PATs use Basic auth.
+    The file is streamed from disk; files larger than chunk_size use the
+    chunked upload protocol, so at most one chunk is held in memory.
     Returns the attachment URL on success, None on failure.
     """
     org_url = org_url.rstrip("/")
     encoded_project = urllib.request.quote(project, safe="")
     encoded_filename = urllib.request.quote(filename, safe="")
-    url = f"{org_url}/{encoded_project}/_apis/wit/attachments?fileName={encoded_filename}&api-version=7.0"
+    base_url = f"{org_url}/{encoded_project}/_apis/wit/attachments"
 
     try:
+        size = os.path.getsize(file_path)
+        if size > chunk_size:
+            return upload_attachment_chunked(base_url, encoded_filename, pat, file_path, size,
+                                             throttle, chunk_size)
         with open(file_path, "rb") as f:
-            body = f.read()
-    except OSError as e:
-        progress(f"  WARNING: Could not read file for attachment: {e}")
-        return None
-
-    req = urllib.request.Request(url, data=body, method="POST")
-    if pat.startswith("eyJ"):
-        req.add_header("Authorization", f"Bearer {pat}")
-    else:
-        token = base64.b64encode(f":{pat}".encode("utf-8")).decode("utf-8")
-        req.add_header("Authorization", f"Basic {token}")
-    req.add_header("Content-Type", "application/octet-stream")
-
-    try:
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-            return data.get("url")
+            req = urllib.request.Request(
+                f"{base_url}?fileName={encoded_filename}&api-version={API_VERSION}", data=f, method="POST")
+            req.add_header("Authorization", build_auth_header(pat))
+            req.add_header("Content-Type", "application/octet-stream")
+            req.add_header("Content-Length", str(size))
+            data = json.loads(urlopen_throttled(req, throttle, timeout=60).decode("utf-8"))
+        return data.get("url")
     except (urllib.error.HTTPError, urllib.error.URLError) as e:
         progress(f"  WARNING: Attachment upload failed: {e}")
         return None
+    except OSError as e:
+        progress(f"  WARNING: Could not read file for attachment: {e}")
+        return None
     except Exception as e:
         progress(f"  WARNING: Attachment upload error: {e}")
         return None
 
 
-def attach_file_to_work_item(org_url: str, project: str, pat: str,
-                             devops_id: int, attachment_url: str) -> Optional[str]:
+def upload_attachment_chunked(base_url: str, encoded_filename: str, pat: Union[str, "TokenManager"],
+                              file_path: str, size: int,
+                              throttle: Optional[ThrottleController] = None,
+                              chunk_size: int = ATTACHMENT_CHUNK_SIZE) -> Optional[str]:
+    """Upload a large file with the Azure DevOps chunked attachment protocol.
+
+    An empty POST with uploadType=Chunked reserves the attachment; each
+    chunk is then PUT to it with a Content-Range header. Returns the
+    attachment URL; HTTP and file errors propagate to upload_attachment().
+    """
+    req = urllib.request.Request(
+        f"{base_url}?fileName={encoded_filename}&uploadType=Chunked&api-version={API_VERSION}",
+        data=b"", method="POST")
+    req.add_header("Authorization", build_auth_header(pat))
+    req.add_header("Content-Type", "application/octet-stream")
+    reference = json.loads(urlopen_throttled(req, throttle, timeout=60).decode("utf-8"))
+    chunk_url = f"{base_url}/{reference['id']}?fileName={encoded_filename}&api-version={API_VERSION}"
+
+    progress(f"  Chunked upload: {size} bytes in {math.ceil(size / chunk_size)} chunks")
+    with open(file_path, "rb") as f:
+        offset = 0
+        while offset < size:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise OSError(f"{file_path} shrank during upload")
+            req = urllib.request.Request(chunk_url, data=chunk, method="PUT")
+            req.add_header("Authorization", build_auth_header(pat))
+            req.add_header("Content-Type", "application/octet-stream")
+            req.add_header("Content-Range", f"bytes {offset}-{offset + len(chunk) - 1}/{size}")
+            urlopen_throttled(req, throttle, timeout=60)
+            offset += len(chunk)
+    return reference.get("url")
+
+
+STORY_FILE_COMMENT = "Story specification file"
+
+
+def stale_attachment_indices(relations: List[Dict[str, Any]], old_url: str, filename: str) -> List[int]:
+    """Indices of AttachedFile relations a new story file upload supersedes, highest first.
+
+    Matches the previously recorded attachment URL, and any earlier copy of
+    the same story file (same name and comment) left by older versions that
+    appended a new relation on every change. Highest first so JSON Patch
+    removes do not shift the remaining indices.
+    """
+    stale = []
+    for index, rel in enumerate(relations or []):
+        if rel.get("rel") != "AttachedFile":
+            continue
+        attrs = rel.get("attributes") or {}
+        if (old_url and rel.get("url") == old_url) or \
+                (filename and attrs.get("name") == filename and attrs.get("comment") == STORY_FILE_COMMENT):
+            stale.append(index)
+    return sorted(stale, reverse=True)
+
+
+def attach_file_to_work_item(org_url: str, project: str, pat: Union[str, "TokenManager"],
+                             devops_id: int, attachment_url: str,
+                             throttle: Optional[ThrottleController] = None,
+                             replace_url: Optional[str] = None, filename: str = "") -> Optional[str]:
     """Add an AttachedFile relation to a work item via REST API.
 
     Uses JSON Patch to add the relation. The az CLI does not support
     AttachedFile relations, so this must go through the REST API.
+    With replace_url (the previous attachment URL, "" if unknown), the work
+    item's relations are read first and the stale copies of the file are
+    removed in the same patch, guarded by a revision test.
     Returns error string on failure, None on success.
     """
     org_url = org_url.rstrip("/")
-    url = f"{org_url}/{urllib.request.quote(project, safe='')}/_apis/wit/workitems/{devops_id}?api-version=7.0"
-
-    body = json.dumps([{
+    item_url = f"{org_url}/{urllib.request.quote(project, safe='')}/_apis/wit/workitems/{devops_id}"
+
+    patch = []
+    if replace_url is not None:
+        req = urllib.request.Request(f"{item_url}?$expand=relations&api-version={API_VERSION}", method="GET")
+        req.add_header("Authorization", build_auth_header(pat))
+        try:
+            item = json.loads(urlopen_throttled(req, throttle, timeout=60).decode("utf-8"))
+        except Exception as e:
+            return f"Could not read relations: {e}"
+        patch.append({"op": "test", "path": "/rev", "value": item.get("rev")})
+        for index in stale_attachment_indices(item.get("relations"), replace_url, filename):
+            patch.append({"op": "remove", "path": f"/relations/{index}"})
+    patch.append({
         "op": "add",
         "path": "/relations/-",
         "value": {
             "rel": "AttachedFile",
             "url": attachment_url,
-            "attributes": {"comment": "Story specification file"}
+            "attributes": {"comment": STORY_FILE_COMMENT}
         }
-    }]).encode("utf-8")
+    })
+    body = json.dumps(patch).encode("utf-8")
 
-    req = urllib.request.Request(url, data=body, method="PATCH")
-    if pat.startswith("eyJ"):
-        req.add_header("Authorization", f"Bearer {pat}")
-    else:
-        token = base64.b64encode(f":{pat}".encode("utf-8")).decode("utf-8")
-        req.add_header("Authorization", f"Basic {token}")
+    req = urllib.request.Request(f"{item_url}?api-version={API_VERSION}", data=body, method="PATCH")
+    req.add_header("Authorization", build_auth_header(pat))
     req.add_header("Content-Type", "application/json-patch+json")
 
     try:
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            return None
+        urlopen_throttled(req, throttle, timeout=60)
+        return None
     except (urllib.error.HTTPError, urllib.error.URLError) as e:
         return str(e)
     except Exception as e:
         return str(e)
 
 
+class AttachmentPipeline:
+    """Uploads story files in the background while work items are synced.
+
+    Uploads go through a bounded queue (at most max_pending queued or in
+    flight) served by their own worker threads, so a slow upload never
+    stalls work item calls. The AttachedFile relation is added as soon as
+    both the attachment URL and the story's DevOps ID exist, whichever
+    comes last: IDs of existing stories are known up front, new stories
+    report theirs through work_item_ready() when their create succeeds.
+
+    Jobs are dicts with storyId, filePath, fileHash, replaceUrl (None to
+    add a relation, the previous URL to replace it) and devopsId (None
+    until known).
+    """
+
+    def __init__(self, org_url: str, project: str, pat: Union[str, "TokenManager"],
+                 throttle: Optional[ThrottleController] = None,
+                 workers: int = ATTACHMENT_WORKERS, max_pending: int = ATTACHMENT_QUEUE_SIZE):
+        self.org_url = org_url
+        self.project = project
+        self.pat = pat
+        self.throttle = throttle
+        self.workers = max(1, workers)
+        self._slots = threading.Semaphore(max(1, max_pending))
+        # Relation adds (priority 0) go ahead of uploads (priority 1)
+        self._queue = queue.PriorityQueue()
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._threads = []
+        self._feeder = None
+        self._closing = False
+        self._cancelled = threading.Event()
+        self.results = {}
+        self.counts = {"uploaded": 0, "linked": 0, "failed": 0, "unlinked": 0, "cancelled": 0}
+
+    def _put(self, priority: int, kind: Optional[str], job: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+        self._queue.put((priority, seq, kind, job))
+
+    def start(self, jobs: List[Dict[str, Any]]) -> None:
+        """Start the workers and feed the upload jobs into the bounded queue."""
+        for job in jobs:
+            self._jobs[job["storyId"]] = dict(job, url=None, linkQueued=False)
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._feeder = threading.Thread(target=self._feed, args=(list(self._jobs.values()),), daemon=True)
+        self._feeder.start()
+
+    def _feed(self, jobs: List[Dict[str, Any]]) -> None:
+        for index, job in enumerate(jobs):
+            self._slots.acquire()
+            if self._cancelled.is_set():
+                self._slots.release()
+                with self._lock:
+                    self.counts["cancelled"] += len(jobs) - index
+                return
+            self._put(1, "upload", job)
+
+    def _work(self) -> None:
+        while True:
+            _, _, kind, job = self._queue.get()
+            try:
+                if kind is None:
+                    return
+                if self._cancelled.is_set():
+                    with self._lock:
+                        self.counts["cancelled"] += 1
+                elif kind == "upload":
+                    self._upload(job)
+                else:
+                    self._link(job)
+            finally:
+                if kind == "upload":
+                    self._slots.release()
+                self._queue.task_done()
+
+    def _upload(self, job: Dict[str, Any]) -> None:
+        filename = os.path.basename(job["filePath"])
+        progress(f"  Uploading attachment: {filename}")
+        url = upload_attachment(self.org_url, self.project, self.pat, job["filePath"], filename, self.throttle)
+        with self._lock:
+            if not url:
+                self.counts["failed"] += 1
+                return
+            self.counts["uploaded"] += 1
+            job["url"] = url
+            self._link_when_ready(job)
+
+    def _link_when_ready(self, job: Dict[str, Any]) -> None:
+        # Caller holds self._lock
+        if job["url"] and job["devopsId"] and not job["linkQueued"]:
+            job["linkQueued"] = True
+            self._seq += 1
+            self._queue.put((0, self._seq, "link", job))
+        elif job["url"] and not job["devopsId"] and self._closing:
+            self.counts["unlinked"] += 1
+
+    def _link(self, job: Dict[str, Any]) -> None:
+        filename = os.path.basename(job["filePath"])
+        err = attach_file_to_work_item(self.org_url, self.project, self.pat, job["devopsId"], job["url"],
+                                       self.throttle, replace_url=job["replaceUrl"], filename=filename)
+        with self._lock:
+            if err:
+                progress(f"  WARNING: Attach relation failed: {err}")
+                self.counts["failed"] += 1
+                return
+            self.counts["linked"] += 1
+            self.results[job["storyId"]] = {"hash": job["fileHash"], "url": job["url"]}
+        verb = "Replaced" if job["replaceUrl"] is not None else "Attached"
+        progress(f"  {verb} {filename} on Story #{job['devopsId']}")
+
+    def work_item_ready(self, story_id: str, devops_id: int) -> None:
+        """Report a story's DevOps ID; queues its relation add once the upload is done."""
+        with self._lock:
+            job = self._jobs.get(story_id)
+            if job is not None and not job["devopsId"]:
+                job["devopsId"] = devops_id
+                self._link_when_ready(job)
+
+    def finish(self, cancel: bool = False) -> Dict[str, Dict[str, str]]:
+        """Wait for queued uploads and relation adds; returns story ID -> {hash, url}.
+
+        With cancel, jobs not yet started are dropped (in-flight calls finish).
+        Uploads whose story never got a DevOps ID are counted as unlinked.
+        """
+        if cancel:
+            self._cancelled.set()
+        if self._feeder is not None:
+            self._feeder.join()
+        with self._lock:
+            self._closing = True
+            for job in self._jobs.values():
+                if job["url"] and not job["devopsId"]:
+                    self.counts["unlinked"] += 1
+        self._queue.join()
+        for _ in self._threads:
+            self._put(2, None, None)
+        for thread in self._threads:
+            thread.join()
+        return self.results
+
+
+AZURE_DEVOPS_RESOURCE_ID = "499b84ac-1321-427f-aa17-267ca6975798"
+# Refresh cached AAD tokens this many seconds before they expire
+TOKEN_REFRESH_MARGIN = 300
+
+
+def parse_token_expiry(data: Dict[str, Any]) -> Optional[float]:
+    """Epoch expiry of an az get-access-token response.
+
+    Newer az versions return 'expires_on' (epoch seconds); older ones only
+    'expiresOn' as a local-time 'YYYY-MM-DD HH:MM:SS.ffffff' string.
+    """
+    if data.get("expires_on"):
+        try:
+            return float(data["expires_on"])
+        except (TypeError, ValueError):
+            pass
+    expires_on = data.get("expiresOn", "")
+    if expires_on:
+        try:
+            return time.mktime(time.strptime(expires_on.split(".")[0], "%Y-%m-%d %H:%M:%S"))
+        except ValueError:
+            pass
+    return None
+
+
+def fetch_az_access_token(az_path: str) -> Optional[Dict[str, Any]]:
+    """Fetch an Azure DevOps access token and its expiry via az CLI.
+
+    Returns {"accessToken", "expiresAt"} or None on any failure.
+    """
+    args = ["account", "get-access-token", "--resource", AZURE_DEVOPS_RESOURCE_ID]
+    data, err = run_az(az_path, args)
+    if err or not data or not data.get("accessToken"):
+        return None
+    # Unknown expiry: assume the usual one-hour AAD lifetime
+    expires_at = parse_token_expiry(data) or time.time() + 3600
+    return {"accessToken": data["accessToken"], "expiresAt": expires_at}
+
+
 def get_az_access_token(az_path: str) -> str:
     """Fetch an Azure DevOps access token via az CLI.
 
     Falls back to empty string on any failure so callers can skip attachment.
     Uses the Azure DevOps resource ID (499b84ac-1321-427f-aa17-267ca6975798).
     """
-    args = ["account", "get-access-token", "--resource", "499b84ac-1321-427f-aa17-267ca6975798"]
-    data, err = run_az(az_path, args)
-    if err or not data:
-        return ""
-    return data.get("accessToken", "")
+    token = fetch_az_access_token(az_path)
+    return token["accessToken"] if token else ""
+
+
+def default_token_cache_path() -> str:
+    """User-private token cache location (per-user cache dir, outside the repo)."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "bmad-sync-azure-devops", "token.json")
+
+
+def az_profile_mtime() -> float:
+    """Modification time of the az login profile (0 if absent).
+
+    az login/logout and account switches rewrite azureProfile.json; a
+    cached token older than the profile may belong to another account.
+    """
+    config_dir = os.environ.get("AZURE_CONFIG_DIR") or os.path.join(os.path.expanduser("~"), ".azure")
+    try:
+        return os.path.getmtime(os.path.join(config_dir, "azureProfile.json"))
+    except OSError:
+        return 0.0
+
+
+class TokenManager:
+    """Supplies the Azure DevOps credential for every REST call.
+
+    A PAT (AZURE_DEVOPS_EXT_PAT) is returned as-is. Otherwise an AAD token
+    from `az account get-access-token` is cached with its expiry in a
+    user-private file (mode 0600) so later runs skip the az spawn, and is
+    refreshed TOKEN_REFRESH_MARGIN seconds before it expires so long syncs
+    never send an expired token. Thread-safe; pass the same instance to
+    RestBackend and the attachment helpers (build_auth_header() accepts it
+    in place of a PAT string). cache_path="" disables the cache file.
+    """
+
+    def __init__(self, az_path: str = "az", pat: str = "", cache_path: Optional[str] = None,
+                 fetcher: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None,
+                 refresh_margin: float = TOKEN_REFRESH_MARGIN):
+        self.az_path = az_path
+        self.pat = pat
+        self.cache_path = default_token_cache_path() if cache_path is None else cache_path
+        self.fetcher = fetcher or fetch_az_access_token
+        self.refresh_margin = refresh_margin
+        self._token = None
+        self._lock = threading.Lock()
+        self.refreshes = 0
+
+    def _load_cache(self) -> Optional[Dict[str, Any]]:
+        if not self.cache_path:
+            return None
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get("resource") != AZURE_DEVOPS_RESOURCE_ID:
+            return None
+        if cached.get("profileMtime", 0) < az_profile_mtime():
+            return None
+        return cached
+
+    def _save_cache(self, token: Dict[str, Any]) -> None:
+        if not self.cache_path:
+            return
+        record = dict(token, resource=AZURE_DEVOPS_RESOURCE_ID, profileMtime=az_profile_mtime())
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), mode=0o700, exist_ok=True)
+            fd = os.open(self.cache_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(record, f)
+        except OSError as e:
+            progress(f"  WARNING: Could not write token cache: {e}")
+
+    def _fresh(self, token: Optional[Dict[str, Any]]) -> bool:
+        return bool(token) and token.get("expiresAt", 0) - time.time() > self.refresh_margin
+
+    def token(self) -> str:
+        """Return a valid credential, refreshing the AAD token ahead of expiry ('' if none)."""
+        if self.pat:
+            return self.pat
+        with self._lock:
+            if not self._fresh(self._token):
+                cached = self._load_cache()
+                if self._fresh(cached):
+                    self._token = cached
+                else:
+                    fetched = self.fetcher(self.az_path)
+                    if fetched:
+                        self.refreshes += 1
+                        self._token = fetched
+                        self._save_cache(fetched)
+                    elif not self._token:
+                        return ""
+            return self._token["accessToken"]
+
+    def invalidate(self) -> None:
+        """Drop the current AAD token (e.g. after a 401) so the next call refreshes it."""
+        with self._lock:
+            if self._token:
+                self._token = dict(self._token, expiresAt=0)
+            if self.cache_path and os.path.exists(self.cache_path):
+                try:
+                    os.remove(self.cache_path)
+                except OSError:
+                    pass
+
+    @property
+    def refreshable(self) -> bool:
+        return not self.pat
+
+
+# az option -> work item field reference for create/update commands
+AZ_FIELD_OPTIONS = {
+    "--title": "System.Title",
+    "--description": "System.Description",
+    "--area": "System.AreaPath",
+    "--iteration": "System.IterationPath",
+    "--state": "System.State",
+    "--assigned-to": "System.AssignedTo",
+}
+
+# az --relation-type -> REST link type reference name
+AZ_RELATION_TYPES = {
+    "parent": "System.LinkTypes.Hierarchy-Reverse",
+    "child": "System.LinkTypes.Hierarchy-Forward",
+    "related": "System.LinkTypes.Related",
+}
+
+JSON_PATCH_CONTENT_TYPE = "application/json-patch+json"
+
+
+def parse_az_args(args: List[str]) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """Split an az argument list into command words and (option, value) pairs.
+
+    Pairs keep their original order; repeatable options like --fields appear
+    once per occurrence.
+    """
+    command = []
+    options = []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg.startswith("--"):
+            value = args[i + 1] if i + 1 < len(args) else ""
+            options.append((arg, value))
+            i += 2
+        else:
+            command.append(arg)
+            i += 1
+    return command, options
+
+
+def az_option(options: List[Tuple[str, str]], name: str, default: str = "") -> str:
+    """Return the first value of an az option, or default if absent."""
+    for opt, value in options:
+        if opt == name:
+            return value
+    return default
+
+
+def build_field_patch(options: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """Convert az work item field options into JSON Patch 'add' operations."""
+    ops = []
+    for opt, value in options:
+        if opt in AZ_FIELD_OPTIONS:
+            ops.append({"op": "add", "path": f"/fields/{AZ_FIELD_OPTIONS[opt]}", "value": value})
+        elif opt == "--fields":
+            name, sep, field_value = value.partition("=")
+            if sep and name.strip():
+                ops.append({"op": "add", "path": f"/fields/{name.strip()}", "value": field_value})
+    return ops
+
+
+def work_item_url(org_url: str, devops_id: Any) -> str:
+    """Build the REST URL used to reference a work item in a relation."""
+    return f"{org_url.rstrip('/')}/_apis/wit/workItems/{devops_id}"
+
+
+def iteration_node_path(path: str, project: str) -> str:
+    """Convert an az iteration --path into a classification node URL suffix.
+
+    '\\Proj\\Iteration\\Root' -> '/Root'. The project and literal 'Iteration'
+    segments required by the az CLI are implied by the REST endpoint.
+    """
+    segments = [s for s in path.split("\\") if s]
+    if segments and project and segments[0].lower() == project.lower():
+        segments = segments[1:]
+    if segments and segments[0].lower() in ("iteration", "iterations"):
+        segments = segments[1:]
+    return "".join("/" + urllib.parse.quote(s, safe="") for s in segments)
+
+
+def az_args_to_rest(args: List[str], project: str, org_url: str = "",
+                    api_version: str = API_VERSION) -> Dict[str, Any]:
+    """Translate an az boards argument list into an equivalent REST request.
+
+    Returns dict with method, path (relative to the organization URL), body
+    and contentType. Raises ValueError for commands the REST backend does
+    not implement.
+    """
+    command, options = parse_az_args(args)
+    quoted_project = urllib.parse.quote(project, safe="")
+
+    if command[:3] == ["boards", "work-item", "create"]:
+        wit = urllib.parse.quote(az_option(options, "--type"), safe="")
+        return {
+            "method": "POST",
+            "path": f"/{quoted_project}/_apis/wit/workitems/${wit}?api-version={api_version}",
+            "body": build_field_patch(options),
+            "contentType": JSON_PATCH_CONTENT_TYPE,
+        }
+
+    if command[:3] == ["boards", "work-item", "update"]:
+        devops_id = az_option(options, "--id")
+        return {
+            "method": "PATCH",
+            "path": f"/_apis/wit/workitems/{devops_id}?api-version={api_version}",
+            "body": build_field_patch(options),
+            "contentType": JSON_PATCH_CONTENT_TYPE,
+        }
+
+    if command[:4] == ["boards", "work-item", "relation", "add"]:
+        relation_type = az_option(options, "--relation-type").lower()
+        rel = AZ_RELATION_TYPES.get(relation_type)
+        if not rel:
+            raise ValueError(f"Unsupported relation type for REST backend: {relation_type}")
+        devops_id = az_option(options, "--id")
+        targets = [t.strip() for t in az_option(options, "--target-id").split(",") if t.strip()]
+        body = [{
+            "op": "add",
+            "path": "/relations/-",
+            "value": {"rel": rel, "url": work_item_url(org_url, t)}
+        } for t in targets]
+        return {
+            "method": "PATCH",
+            "path": f"/_apis/wit/workitems/{devops_id}?api-version={api_version}",
+            "body": body,
+            "contentType": JSON_PATCH_CONTENT_TYPE,
+        }
+
+    if command[:4] == ["boards", "iteration", "project", "create"]:
+        node_path = iteration_node_path(az_option(options, "--path"), project)
+        return {
+            "method": "POST",
+            "path": f"/{quoted_project}/_apis/wit/classificationnodes/Iterations{node_path}?api-version={api_version}",
+            "body": {"name": az_option(options, "--name")},
+            "contentType": "application/json",
+        }
+
+    raise ValueError(f"Unsupported command for REST backend: {' '.join(command)}")
+
+
+def build_batch_request(args: List[str], project: str, org_url: str,
+                        temp_id: Optional[int] = None,
+                        parent_ref: Optional[int] = None) -> Dict[str, Any]:
+    """Build one $batch sub-request from an az work item argument list.
+
+    temp_id assigns a temporary negative ID to a created work item so later
+    requests in the same batch can reference it. parent_ref (a real or
+    temporary ID) adds a parent link to the same JSON Patch document.
+    """
+    req = az_args_to_rest(args, project, org_url, api_version=BATCH_API_VERSION)
+    body = list(req["body"])
+    if temp_id is not None:
+        body.insert(0, {"op": "add", "path": "/id", "value": str(temp_id)})
+    if parent_ref is not None:
+        body.append({
+            "op": "add",
+            "path": "/relations/-",
+            "value": {"rel": AZ_RELATION_TYPES["parent"], "url": work_item_url(org_url, parent_ref)}
+        })
+    return {
+        # $batch expresses work item creation as PATCH on /workitems/$Type
+        "method": "PATCH",
+        "uri": req["path"],
+        "headers": {"Content-Type": req["contentType"]},
+        "body": body,
+    }
+
+
+def parse_batch_response(item: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Convert one $batch response entry into the (data, err) runner contract."""
+    code = item.get("code", 0)
+    body = item.get("body")
+    if isinstance(body, str):
+        try:
+            body = json.loads(body) if body.strip() else {}
+        except ValueError:
+            body = {"message": body[:200]}
+    body = body or {}
+    if code >= 400:
+        message = body.get("message") or (body.get("value") or {}).get("Message", "")
+        return None, f"HTTP {code}: {message}" if message else f"HTTP {code}"
+    return body, None
+
+
+def rest_error_message(status: int, reason: str, text: str) -> str:
+    """Format an HTTP error, preferring the 'message' field of a JSON error body."""
+    message = ""
+    try:
+        message = json.loads(text).get("message", "")
+    except (ValueError, AttributeError):
+        pass
+    return f"HTTP {status}: {message or reason or text[:200]}"
+
+
+class RestBackend:
+    """Azure DevOps REST runner with pooled keep-alive HTTPS connections.
+
+    Accepts the same az CLI argument lists as run_az() and returns the same
+    (data, err) tuple, so the sync functions can use either backend. Each
+    thread keeps one persistent connection to the organization host; a stale
+    keep-alive connection closed by the server is reopened transparently.
+    An optional ThrottleController paces requests by the rate-limit headers.
+    pat may be a TokenManager: the token is re-read for every request and
+    refreshed once on HTTP 401.
+    """
+
+    def __init__(self, org_url: str, project: str, pat: Union[str, TokenManager], timeout: int = 60,
+                 throttle: Optional[ThrottleController] = None):
+        self.org_url = org_url.rstrip("/")
+        self.project = project
+        self.pat = pat
+        self.timeout = timeout
+        self.throttle = throttle
+        parts = urllib.parse.urlsplit(self.org_url)
+        self._scheme = parts.scheme or "https"
+        self._host = parts.netloc
+        self._base_path = parts.path.rstrip("/")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self.connections_opened = 0
+        self.requests_sent = 0
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self._scheme == "https":
+                conn = http.client.HTTPSConnection(self._host, timeout=self.timeout)
+            else:
+                conn = http.client.HTTPConnection(self._host, timeout=self.timeout)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+                self.connections_opened += 1
+        return conn
+
+    def _drop_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _send(self, method: str, path: str, payload: Optional[bytes], headers: Dict[str, str],
+              timeout: int) -> Tuple[Optional[int], Dict[str, str], str, Optional[str]]:
+        """Send one request; returns (status, headers, body text, connection error)."""
+        while True:
+            conn = self._connection()
+            reused = conn.sock is not None
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            try:
+                conn.request(method, self._base_path + path, body=payload, headers=headers)
+                resp = conn.getresponse()
+                raw = resp.read()
+                break
+            except (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                    ConnectionResetError, BrokenPipeError) as e:
+                # The server may close an idle keep-alive connection; retry once
+                # on a fresh connection, but never re-send on a fresh one.
+                self._drop_connection()
+                if not reused:
+                    return None, {}, "", f"Connection error: {e}"
+            except OSError as e:
+                self._drop_connection()
+                if "timed out" in str(e):
+                    return None, {}, "", f"Request timed out after {timeout}s"
+                return None, {}, "", f"Connection error: {e}"
+            except http.client.HTTPException as e:
+                self._drop_connection()
+                return None, {}, "", f"Connection error: {e}"
+
+        with self._lock:
+            self.requests_sent += 1
+        if resp.will_close:
+            self._drop_connection()
+        return resp.status, dict(resp.getheaders()), raw.decode("utf-8", errors="replace"), None
+
+    def request(self, method: str, path: str, body: Any = None,
+                content_type: str = "application/json",
+                timeout: Optional[int] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Send one request over this thread's pooled connection. Returns (data, err).
+
+        With a throttle controller, the request waits for a slot, reports the
+        response headers back, and is re-sent after the pause when throttled.
+        """
+        if body is None or isinstance(body, bytes):
+            payload = body
+        else:
+            payload = json.dumps(body).encode("utf-8")
+        headers = {"Accept": "application/json"}
+        if payload is not None:
+            headers["Content-Type"] = content_type
+        timeout = timeout or self.timeout
+
+        attempt = 0
+        reauthenticated = False
+        while True:
+            # Built per attempt so a TokenManager can hand out a refreshed token
+            headers["Authorization"] = build_auth_header(self.pat)
+            if self.throttle is not None:
+                self.throttle.acquire()
+            status, resp_headers, text, err = self._send(method, path, payload, headers, timeout)
+            wait = self.throttle.release(status, resp_headers) if self.throttle is not None else None
+            if status == 401 and not reauthenticated and isinstance(self.pat, TokenManager) \
+                    and self.pat.refreshable:
+                # Token revoked or expired early: refresh once and re-send
+                reauthenticated = True
+                self.pat.invalidate()
+                progress("  HTTP 401, refreshing access token")
+                continue
+            if wait is None or attempt >= THROTTLE_RETRIES:
+                break
+            attempt += 1
+            progress(f"  Throttled (HTTP 429), retrying in {wait:.0f}s")
+
+        if err:
+            return None, err
+        if status >= 400:
+            return None, rest_error_message(status, http.client.responses.get(status, ""), text)
+        if not text.strip():
+            return {}, None
+        try:
+            return json.loads(text), None
+        except ValueError:
+            return None, f"Invalid JSON response: {text[:200]}"
+
+    def __call__(self, args: List[str], timeout: Optional[int] = None,
+                 parent: Optional[int] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Execute an az CLI argument list as a REST request.
+
+        parent adds a parent link to the same JSON Patch document, which the
+        az CLI can only do with a separate relation add call.
+        """
+        try:
+            req = az_args_to_rest(args, self.project, self.org_url)
+        except ValueError as e:
+            return None, str(e)
+        if parent is not None and req["contentType"] == JSON_PATCH_CONTENT_TYPE:
+            req["body"] = req["body"] + [{
+                "op": "add",
+                "path": "/relations/-",
+                "value": {"rel": AZ_RELATION_TYPES["parent"], "url": work_item_url(self.org_url, parent)}
+            }]
+        return self.request(req["method"], req["path"], req["body"], req["contentType"], timeout=timeout)
+
+    def batch(self, requests: List[Dict[str, Any]],
+              timeout: Optional[int] = None) -> Tuple[List[Tuple[Optional[Dict[str, Any]], Optional[str]]], Optional[str]]:
+        """Send up to MAX_BATCH_SIZE work item requests as one $batch call.
+
+        Returns (results, err): one (data, err) tuple per request, or an empty
+        list and an error if the batch call itself failed. $batch is not
+        transactional — each request succeeds or fails on its own.
+        """
+        data, err = self.request(
+            "POST", f"/_apis/wit/$batch?api-version={BATCH_API_VERSION}",
+            requests, "application/json", timeout=timeout
+        )
+        if err:
+            return [], err
+        items = (data or {}).get("value", [])
+        if len(items) != len(requests):
+            return [], f"Batch returned {len(items)} results for {len(requests)} requests"
+        return [parse_batch_response(item) for item in items], None
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
 
 
 def progress(msg: str) -> None:
@@ -383,476 +1730,910 @@ def get_default_iteration(config: Dict[str, str]) -> str:
     return iteration_root
 
 
-def sync_epics(az_path: str, config: Dict[str, str], epics: List[Dict[str, Any]], epic_statuses: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, Any], Dict[str, int]]:
-    """Create/update epics with state sync. Returns dict mapping epic ID -> devops ID."""
-    results = {"created": [], "updated": [], "failed": [], "skipped": []}
-    id_map = {}
+# Errors that will fail every remaining call the same way: bad or expired
+# credentials, missing permissions, wrong organization/project
+FATAL_ERROR_PATTERNS = (
+    ("HTTP 401", r"HTTP 401\b|\bunauthorized\b|TF400813|authentication failed|az login"),
+    ("HTTP 403", r"HTTP 403\b|\bforbidden\b|TF400409"),
+    ("TF401019", r"TF401019"),
+    ("project-not-found", r"TF200016|VS800075|project .{0,80}(?:does not exist|not found)"),
+)
+DEFAULT_BREAKER_THRESHOLD = 3
 
-    area = config.get("areaPath", "")
-    iteration = get_default_iteration(config)
-    template = config.get("processTemplate", "Agile")
-    epic_statuses = epic_statuses or {}
 
-    for epic in epics:
-        cls = epic.get("classification", "")
-        epic_id = epic.get("id", "")
+def fatal_error_signature(err: Optional[str]) -> Optional[str]:
+    """Return the fatal error category of an error message, or None if it is item-specific."""
+    if not err:
+        return None
+    for signature, pattern in FATAL_ERROR_PATTERNS:
+        if re.search(pattern, err, re.IGNORECASE):
+            return signature
+    return None
 
-        if cls == "UNCHANGED" or cls == "ORPHANED":
-            if epic.get("devopsId"):
-                id_map[epic_id] = epic["devopsId"]
-            results["skipped"].append({"id": epic_id, "classification": cls})
-            continue
 
-        if cls == "NEW":
-            args = [
-                "boards", "work-item", "create",
-                "--type", "Epic",
-                "--title", truncate_title(epic.get("title", "")),
-                "--description", wrap_html(epic.get("description", ""), max_len=3000),
-            ]
-            if area:
-                args += ["--area", area]
-            if iteration:
-                args += ["--iteration", iteration]
-
-            progress(f"Creating Epic {epic_id}: {epic.get('title', '')}")
-            data, err = run_az(az_path, args)
+class CircuitBreaker:
+    """Stops the sync after `threshold` consecutive identical fatal errors.
 
-            if err:
-                progress(f"  FAILED: {err}")
-                results["failed"].append({"id": epic_id, "error": err})
-                continue
+    Auth, permission and project-level failures repeat for every remaining
+    item; once the circuit opens, remaining plan entries are recorded as
+    pending instead of being attempted. Any success or item-specific error
+    resets the streak.
+    """
 
-            devops_id = data.get("id")
-            if devops_id:
-                id_map[epic_id] = devops_id
-
-                # Update state if epic has a non-default BMAD status
-                devops_state = map_bmad_status_to_devops_state(
-                    epic_statuses.get(epic_id), template
-                )
-                if devops_state and devops_state != "New":
-                    state_args = [
-                        "boards", "work-item", "update",
-                        "--id", str(devops_id),
-                        "--state", devops_state,
-                    ]
-                    _, state_err = run_az(az_path, state_args)
-                    if state_err:
-                        progress(f"  WARNING: State update to '{devops_state}' failed: {state_err}")
-                    else:
-                        progress(f"  Set state to '{devops_state}'")
-
-                results["created"].append({
-                    "id": epic_id, "devopsId": devops_id,
-                    "contentHash": epic.get("contentHash", "")
-                })
-                progress(f"  Created Epic #{devops_id}")
+    def __init__(self, threshold: int = DEFAULT_BREAKER_THRESHOLD):
+        self.threshold = max(1, threshold)
+        self.is_open = False
+        self.reason = None
+        self._signature = None
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def record(self, err: Optional[str]) -> None:
+        signature = fatal_error_signature(err)
+        with self._lock:
+            if signature is None:
+                self._signature, self._count = None, 0
+                return
+            if signature == self._signature:
+                self._count += 1
             else:
-                results["failed"].append({"id": epic_id, "error": "No ID in response"})
+                self._signature, self._count = signature, 1
+            if self._count >= self.threshold and not self.is_open:
+                self.is_open = True
+                self.reason = f"{self._count} consecutive {signature} errors: {err[:200]}"
+                progress(f"  CIRCUIT OPEN: {self.reason} — skipping remaining work")
 
-        elif cls == "CHANGED":
-            devops_id = epic.get("devopsId")
-            if not devops_id:
-                results["failed"].append({"id": epic_id, "error": "No existing DevOps ID for update"})
-                continue
 
-            id_map[epic_id] = devops_id
-            args = [
-                "boards", "work-item", "update",
-                "--id", str(devops_id),
-                "--title", truncate_title(epic.get("title", "")),
-                "--description", wrap_html(epic.get("description", ""), max_len=3000),
-            ]
-
-            # Include state in update if epic has a BMAD status
-            devops_state = map_bmad_status_to_devops_state(
-                epic_statuses.get(epic_id), template
-            )
-            if devops_state:
-                args += ["--state", devops_state]
+JOURNAL_VERSION = 1
 
-            progress(f"Updating Epic {epic_id} (#{devops_id}): {epic.get('title', '')}")
-            data, err = run_az(az_path, args)
 
-            if err:
-                progress(f"  FAILED: {err}")
-                results["failed"].append({"id": epic_id, "devopsId": devops_id, "error": err})
-            else:
-                results["updated"].append({
-                    "id": epic_id, "devopsId": devops_id,
-                    "contentHash": epic.get("contentHash", "")
-                })
-                progress(f"  Updated Epic #{devops_id}")
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's bytes (first 16 hex chars).
 
-    return results, id_map
+    Ties a journal to the diff it was written for, and identifies the story
+    file content behind an attachment.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
 
 
-def sync_stories(az_path: str, config: Dict[str, str], stories: List[Dict[str, Any]], epic_id_map: Dict[str, int], story_statuses: Optional[Dict[str, str]] = None, story_file_paths: Optional[Dict[str, str]] = None, org_url: str = "", pat: str = "") -> Tuple[Dict[str, Any], Dict[str, int]]:
-    """Create/update stories with parent links to epics, state sync, and file attachments."""
-    results = {"created": [], "updated": [], "failed": [], "skipped": []}
-    id_map = {}
+class OperationJournal:
+    """Append-only, fsynced log of confirmed creates/updates/moves.
 
-    area = config.get("areaPath", "")
-    iteration = get_default_iteration(config)
-    template = config.get("processTemplate", "Agile")
-    story_type = get_story_type(template)
-    ac_field = get_ac_field(template)
-    story_statuses = story_statuses or {}
-    story_file_paths = story_file_paths or {}
-    project = config.get("projectName", "")
+    One JSON object per line. A "done" line is written as soon as Azure
+    DevOps confirms an entry, before anything else happens, so a killed
+    sync leaves a record of every work item it created. --resume replays
+    the journal into the results and ID maps and runs only what is left.
+    """
 
-    attached_ids = set()
+    def __init__(self, path: str, diff_digest: str = ""):
+        self.path = path
+        self.diff_digest = diff_digest
+        self._lock = threading.Lock()
+        self._file = None
+
+    def open(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        is_new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        torn = False
+        if not is_new:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+        self._file = open(self.path, "a", encoding="utf-8")
+        if torn:
+            # Terminate a line cut off by a crash so the next event parses
+            self._file.write("\n")
+        if is_new:
+            self._append({"event": "start", "version": JOURNAL_VERSION, "diff": self.diff_digest})
+
+    def _append(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            self._file.write(json.dumps(event) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def done(self, entry: Dict[str, Any], devops_id: Any, record: Optional[Dict[str, Any]],
+             movement: Optional[Dict[str, Any]] = None, needs_link: bool = False) -> None:
+        self._append({
+            "event": "done", "kind": entry["kind"], "id": entry["id"], "action": entry["action"],
+            "devopsId": devops_id, "record": record, "movement": movement, "needsLink": needs_link,
+        })
+
+    def linked(self, entry: Dict[str, Any]) -> None:
+        self._append({"event": "linked", "kind": entry["kind"], "id": entry["id"]})
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def remove(self) -> None:
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def load_journal(path: str) -> Tuple[Dict[str, Any], Dict[Tuple[str, str], Dict[str, Any]]]:
+    """Read a journal. Returns (start event, latest "done" event per (kind, id)).
+
+    "linked" events clear needsLink on the matching done event. A torn
+    last line from a crash mid-write is ignored.
+    """
+    header = {}
+    done = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event.get("event") == "start":
+                header = event
+            elif event.get("event") == "done":
+                done[(event["kind"], event["id"])] = event
+            elif event.get("event") == "linked":
+                key = (event["kind"], event["id"])
+                if key in done:
+                    done[key]["needsLink"] = False
+    return header, done
+
+
+def apply_journal(entries: List[Dict[str, Any]], ctx: Dict[str, Any],
+                  done: Dict[Tuple[str, str], Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Replay journaled outcomes into ctx and return the entries still to run.
+
+    Entries already done are dropped; one created without its parent link
+    comes back as a link-only entry.
+    """
+    results = ctx["results"]
+    for (kind, item_id), event in done.items():
+        record = event.get("record")
+        if kind == "iterations":
+            if record:
+                results["iterations"]["created"].append(record)
+            continue
+        if event.get("devopsId"):
+            ctx["idMaps"][kind][item_id] = event["devopsId"]
+        if record:
+            results[kind]["created" if event["action"] == "create" else "updated"].append(record)
+        if event.get("movement"):
+            results["iterations"]["movements"].append(event["movement"])
+
+    remaining = []
+    for entry in entries:
+        event = done.get((entry["kind"], entry["id"]))
+        if event is None:
+            remaining.append(entry)
+        elif event.get("needsLink"):
+            remaining.append({**entry, "linkOnly": True})
+    return remaining
+
+
+PLAN_KINDS = ("epics", "stories", "tasks")
+KIND_LABELS = {"epics": "Epic", "stories": "Story", "tasks": "Task", "iterations": "Iteration"}
+# Movement "type" values recorded in iteration results
+MOVEMENT_TYPES = {"epics": "epic", "stories": "story", "tasks": "task"}
+
+
+def get_iteration_path(config: Dict[str, str], slug: str) -> str:
+    """Build the work item iteration path for an epic iteration slug."""
+    iteration_root = get_default_iteration(config)
+    return f"{iteration_root}\\{slug}" if iteration_root else slug
 
-    def _attach_story_file(story_id, devops_id):
-        """Attach story .md file to a work item if org/PAT/path available.
 
-        Returns True on success, False otherwise.
-        """
-        file_path = story_file_paths.get(story_id)
-        if not file_path or not org_url or not pat:
-            return False
-        filename = os.path.basename(file_path)
-        progress(f"  Uploading attachment: {filename}")
-        att_url = upload_attachment(org_url, project, pat, file_path, filename)
-        if att_url:
-            att_err = attach_file_to_work_item(org_url, project, pat, devops_id, att_url)
-            if att_err:
-                progress(f"  WARNING: Attach relation failed: {att_err}")
-                return False
-            else:
-                progress(f"  Attached {filename} to Story #{devops_id}")
-                return True
-        return False
+def build_iteration_create_args(config: Dict[str, str], slug: str) -> List[str]:
+    """Build az CLI args for creating an epic iteration node.
 
-    for story in stories:
-        cls = story.get("classification", "")
-        story_id = story.get("id", "")
+    Azure DevOps uses two different path formats:
+    - "iteration create --path" needs: \\ProjectName\\Iteration\\ParentPath
+      (the literal word "Iteration" is required between project and parent)
+    - "work-item update --iteration" needs: ProjectName\\ParentPath\\ChildName
+      (see get_iteration_path)
+    """
+    project = config.get("projectName", "")
+    iter_root_raw = config.get("iterationRootPath", "")
+    args = [
+        "boards", "iteration", "project", "create",
+        "--name", slug,
+    ]
+    if project:
+        if iter_root_raw:
+            # Strip project prefix if iterationRootPath already starts with it
+            iter_suffix = iter_root_raw
+            if iter_suffix.startswith(project + "\\"):
+                iter_suffix = iter_suffix[len(project) + 1:]
+            create_path = f"\\{project}\\Iteration\\{iter_suffix}"
+        else:
+            create_path = f"\\{project}\\Iteration"
+        args += ["--path", create_path]
+    return args
 
-        if cls == "UNCHANGED" or cls == "ORPHANED":
-            if story.get("devopsId"):
-                id_map[story_id] = story["devopsId"]
-            # Backfill attachment for previously-synced stories that lack one
-            if cls == "UNCHANGED" and story.get("attached") != "true":
-                devops_id = story.get("devopsId")
-                if devops_id and _attach_story_file(story_id, devops_id):
-                    attached_ids.add(story_id)
-            elif cls == "UNCHANGED" and story.get("attached") == "true":
-                attached_ids.add(story_id)
-            results["skipped"].append({"id": story_id, "classification": cls})
-            continue
 
-        if cls == "NEW":
-            args = [
-                "boards", "work-item", "create",
-                "--type", story_type,
-                "--title", truncate_title(story.get("title", "")),
-                "--description", wrap_html(story.get("userStoryText", ""), max_len=3000),
-            ]
-            if area:
-                args += ["--area", area]
-            if iteration:
-                args += ["--iteration", iteration]
-
-            # Add acceptance criteria
-            ac_text = story.get("acceptanceCriteria", "")
-            if ac_text and ac_field:
-                args += ["--fields", f"{ac_field}={wrap_html(ac_text, max_len=3000)}"]
-
-            progress(f"Creating Story {story_id}: {story.get('title', '')}")
-            data, err = run_az(az_path, args)
+UPDATE_ARGS_PREFIX = ("boards", "work-item", "update", "--id")
 
-            if err:
-                progress(f"  FAILED: {err}")
-                results["failed"].append({"id": story_id, "error": err})
-                continue
 
-            devops_id = data.get("id")
-            if not devops_id:
-                results["failed"].append({"id": story_id, "error": "No ID in response"})
-                continue
+def moved_content_changed(item: Dict[str, Any]) -> bool:
+    """Whether a MOVED item needs an update: changedFields when listed, else its content hash."""
+    if "changedFields" in item:
+        return bool(item["changedFields"])
+    return item.get("contentHash") != item.get("previousHash")
 
-            id_map[story_id] = devops_id
-            progress(f"  Created Story #{devops_id}")
-
-            # Add parent link to epic
-            epic_id = story.get("epicId", "")
-            epic_devops_id = epic_id_map.get(epic_id)
-            if epic_devops_id:
-                link_args = [
-                    "boards", "work-item", "relation", "add",
-                    "--id", str(devops_id),
-                    "--relation-type", "parent",
-                    "--target-id", str(epic_devops_id),
-                ]
-                _, link_err = run_az(az_path, link_args)
-                if link_err:
-                    progress(f"  WARNING: Parent link failed: {link_err}")
-
-            # Update state if story has a non-default BMAD status
-            devops_state = map_bmad_status_to_devops_state(
-                story_statuses.get(story_id), template
-            )
-            if devops_state and devops_state != "New":
-                state_args = [
-                    "boards", "work-item", "update",
-                    "--id", str(devops_id),
-                    "--state", devops_state,
-                ]
-                _, state_err = run_az(az_path, state_args)
-                if state_err:
-                    progress(f"  WARNING: State update to '{devops_state}' failed: {state_err}")
-                else:
-                    progress(f"  Set state to '{devops_state}'")
 
-            # Attach story .md file
-            if _attach_story_file(story_id, devops_id):
-                attached_ids.add(story_id)
+def plan_operations(config: Dict[str, str], diff: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Turn the compute-hashes.py diff into an explicit per-item operation list.
 
-            results["created"].append({
-                "id": story_id, "devopsId": devops_id,
-                "epicDevopsId": epic_devops_id,
-                "contentHash": story.get("contentHash", "")
-            })
+    Emits one operation per call the sync would otherwise make:
+    createIteration, create, update, link (parent), state and iteration
+    (move). Operations are ordered iteration nodes -> epics -> stories ->
+    tasks so parents always precede children. Items that need no work
+    (UNCHANGED, ORPHANED, CHANGED without a DevOps ID, MOVED with unchanged
+    content) produce no operations; a MOVED item whose content changed is
+    updated like a CHANGED one. Updates send only the item's changedFields
+    (all fields when the diff has none), and a state change only when the
+    status changed; an update left with nothing to send is dropped.
+    """
+    area = config.get("areaPath", "")
+    iteration = get_default_iteration(config)
+    template = config.get("processTemplate", "Agile")
+    story_type = get_story_type(template)
+    ac_field = get_ac_field(template)
+    complete_state = get_complete_state(template)
+    epic_statuses = diff.get("epicStatuses", {})
+    story_statuses = diff.get("storyStatuses", {})
 
-        elif cls == "CHANGED":
-            devops_id = story.get("devopsId")
-            if not devops_id:
-                results["failed"].append({"id": story_id, "error": "No existing DevOps ID for update"})
-                continue
+    ops = []
 
-            id_map[story_id] = devops_id
-            args = [
-                "boards", "work-item", "update",
-                "--id", str(devops_id),
-                "--title", truncate_title(story.get("title", "")),
-                "--description", wrap_html(story.get("userStoryText", ""), max_len=3000),
-            ]
-
-            ac_text = story.get("acceptanceCriteria", "")
-            if ac_text and ac_field:
-                args += ["--fields", f"{ac_field}={wrap_html(ac_text, max_len=3000)}"]
-
-            # Include state in update if story has a BMAD status
-            devops_state = map_bmad_status_to_devops_state(
-                story_statuses.get(story_id), template
-            )
-            if devops_state:
-                args += ["--state", devops_state]
+    # Iteration nodes first; remember which items move into which iteration
+    moves = {}
+    for it in diff.get("iterations", []):
+        cls = it.get("classification", "")
+        slug = it.get("slug", "")
+        epic_id = it.get("epicId", "")
+        move = {"slug": slug, "path": get_iteration_path(config, slug)}
+        if cls == "NEW":
+            ops.append({"kind": "iterations", "id": slug, "op": "createIteration",
+                        "epicId": epic_id, "args": build_iteration_create_args(config, slug)})
+            # Epic already sits in an EXISTS iteration; only move it for NEW ones
+            moves[("epics", epic_id)] = move
+        for story_id in it.get("storyIds", []):
+            moves[("stories", story_id)] = move
+        for task_id in it.get("taskIds", []):
+            moves[("tasks", task_id)] = move
 
-            progress(f"Updating Story {story_id} (#{devops_id})")
-            data, err = run_az(az_path, args)
+    def plan_item(kind, item, create_args, update_args, state, parent):
+        item_id = item.get("id", "")
+        cls = item.get("classification", "")
+        devops_id = item.get("devopsId")
+        base = {"kind": kind, "id": item_id, "item": item, "devopsId": devops_id}
+        if cls == "NEW":
+            ops.append({**base, "op": "create", "args": create_args()})
+            if parent:
+                ops.append({**base, "op": "link", "parentKind": parent[0], "parentId": parent[1]})
+            if state:
+                ops.append({**base, "op": "state", "state": state})
+        elif (cls == "CHANGED" or (cls == "MOVED" and moved_content_changed(item))) and devops_id:
+            fields = item.get("changedFields")
+            args = update_args(devops_id, fields)
+            if len(args) > len(UPDATE_ARGS_PREFIX) + 1:
+                ops.append({**base, "op": "update", "args": args})
+            if state and field_changed(fields, "status"):
+                ops.append({**base, "op": "state", "state": state})
+        move = moves.get((kind, item_id))
+        if move:
+            ops.append({**base, "op": "iteration", "slug": move["slug"], "path": move["path"]})
+
+    for epic in diff.get("epics", []):
+        state = map_bmad_status_to_devops_state(epic_statuses.get(epic.get("id", "")), template)
+        if epic.get("classification") == "NEW" and state == "New":
+            state = None
+        plan_item("epics", epic,
+                  lambda: build_epic_create_args(epic, area, iteration),
+                  lambda devops_id, fields: build_epic_update_args(epic, devops_id, None, fields),
+                  state, None)
+
+    for story in diff.get("stories", []):
+        state = map_bmad_status_to_devops_state(story_statuses.get(story.get("id", "")), template)
+        if story.get("classification") == "NEW" and state == "New":
+            state = None
+        plan_item("stories", story,
+                  lambda: build_story_create_args(story, story_type, ac_field, area, iteration),
+                  lambda devops_id, fields: build_story_update_args(story, devops_id, ac_field, None, fields),
+                  state, ("epics", story.get("epicId", "")))
+
+    for task in diff.get("tasks", []):
+        # build_task_update_args() already carries the task state
+        state = None
+        if task.get("classification") == "NEW" and task.get("complete", False):
+            state = complete_state
+        plan_item("tasks", task,
+                  lambda: build_task_create_args(task, area, iteration),
+                  lambda devops_id, fields: build_task_update_args(task, devops_id, complete_state, fields),
+                  state, ("stories", task.get("storyId", "")))
+
+    return ops
+
+
+def optimize_plan(ops: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge all operations on the same work item into a single plan entry.
+
+    Each entry becomes one request: fields, state, iteration path and parent
+    relation travel together (see render_entry_args() and execute_entry()).
+    An item that only needs a move becomes a standalone update. Entry order
+    follows the first operation on each item, so dependency order holds.
+    """
+    entries = []
+    index = {}
+    for op in ops:
+        key = (op["kind"], op["id"])
+        entry = index.get(key)
+        if entry is None:
+            entry = {
+                "kind": op["kind"], "id": op["id"], "item": op.get("item") or {},
+                "devopsId": op.get("devopsId"), "action": None, "args": None,
+                "state": None, "iteration": None, "parent": None,
+                "epicId": op.get("epicId", ""), "operations": [],
+            }
+            index[key] = entry
+            entries.append(entry)
+        entry["operations"].append(op["op"])
+        if op["op"] in ("create", "update", "createIteration"):
+            entry["action"] = op["op"]
+            entry["args"] = op["args"]
+        elif op["op"] == "link":
+            entry["parent"] = (op["parentKind"], op["parentId"])
+        elif op["op"] == "state":
+            entry["state"] = op["state"]
+        elif op["op"] == "iteration":
+            entry["iteration"] = {"slug": op["slug"], "path": op["path"]}
+
+    for entry in entries:
+        if entry["action"] is None:
+            entry["action"] = "update"
+            if entry["devopsId"]:
+                entry["args"] = ["boards", "work-item", "update", "--id", str(entry["devopsId"])]
+    return entries
+
+
+def render_entry_args(entry: Dict[str, Any], apply_iteration: bool = True) -> List[str]:
+    """Render a plan entry as one az argument list with state and iteration merged in.
+
+    Creates carry the state as a System.State field (az create has no
+    --state); the iteration path replaces the default --iteration.
+    """
+    args = list(entry["args"])
+    if entry["state"]:
+        if entry["action"] == "create":
+            args += ["--fields", f"System.State={entry['state']}"]
+        else:
+            args += ["--state", entry["state"]]
+    if apply_iteration and entry["iteration"]:
+        path = entry["iteration"]["path"]
+        if "--iteration" in args:
+            args[args.index("--iteration") + 1] = path
+        else:
+            args += ["--iteration", path]
+    return args
 
-            if err:
-                progress(f"  FAILED: {err}")
-                results["failed"].append({"id": story_id, "devopsId": devops_id, "error": err})
-            else:
-                # Attach updated story .md file
-                if _attach_story_file(story_id, devops_id):
-                    attached_ids.add(story_id)
-                results["updated"].append({
-                    "id": story_id, "devopsId": devops_id,
-                    "contentHash": story.get("contentHash", "")
-                })
-                progress(f"  Updated Story #{devops_id}")
 
-    results["attachedIds"] = sorted(attached_ids)
-    return results, id_map
+def count_planned_calls(entries: List[Dict[str, Any]], backend: str = "az",
+                        batch_size: int = MAX_BATCH_SIZE) -> int:
+    """Count the work item calls a plan makes on the given backend.
 
+    az: one call per entry plus a relation add per linked create (the az CLI
+    cannot set relations on create). rest: one call per entry. batch:
+    iteration nodes one by one, then ceil(work items / batch_size).
+    """
+    nodes = [e for e in entries if e["action"] == "createIteration"]
+    items = [e for e in entries if e["action"] != "createIteration" and e["args"]]
+    if backend == "batch":
+        batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        return len(nodes) + (len(items) + batch_size - 1) // batch_size
+    calls = len(nodes) + len(items)
+    if backend == "az":
+        calls += sum(1 for e in items if e["action"] == "create" and e["parent"])
+    return calls
+
+
+def attachment_action(story: Dict[str, Any], file_path: Optional[str]) -> Tuple[str, str]:
+    """Decide what to do with a story's attached file. Returns (action, file hash).
+
+    action is "keep" when the recorded attachment has the file's current
+    bytes, "replace" when an attached copy exists but its bytes differ (or
+    were never recorded), "upload" when the story has no attachment yet,
+    and "none" without a readable story file.
+    """
+    if not file_path:
+        return "none", ""
+    try:
+        file_hash = file_digest(file_path)
+    except OSError:
+        return "none", ""
+    if story.get("attached") != "true":
+        return "upload", file_hash
+    if story.get("attachmentHash") == file_hash and story.get("attachmentUrl"):
+        return "keep", file_hash
+    return "replace", file_hash
 
-def sync_tasks(az_path: str, config: Dict[str, str], tasks: List[Dict[str, Any]], story_id_map: Dict[str, int]) -> Tuple[Dict[str, Any], Dict[str, int]]:
-    """Create/update tasks with parent links to stories. Returns (results, id_map)."""
-    results = {"created": [], "updated": [], "failed": [], "skipped": []}
-    id_map = {}
 
-    area = config.get("areaPath", "")
-    iteration = get_default_iteration(config)
-    template = config.get("processTemplate", "Agile")
-    complete_state = get_complete_state(template)
+def diff_items(diff: Dict[str, Any], kind: str) -> List[Dict[str, Any]]:
+    """Items of one kind from the diff, including those in pruned unchanged subtrees."""
+    return diff.get(kind, []) + diff.get("pruned", {}).get(kind, [])
 
-    for task in tasks:
-        cls = task.get("classification", "")
-        task_id = task.get("id", "")
 
-        if cls == "UNCHANGED" or cls == "ORPHANED":
-            if task.get("devopsId"):
-                id_map[task_id] = task["devopsId"]
-            results["skipped"].append({"id": task_id, "classification": cls})
-            continue
+def count_attachment_calls(diff: Dict[str, Any]) -> int:
+    """Count story attachment calls: upload + relation add, plus a relations read to replace."""
+    story_file_paths = diff.get("storyFilePaths", {})
+    calls = 0
+    for story in diff_items(diff, "stories"):
+        action, _ = attachment_action(story, story_file_paths.get(story.get("id", "")))
+        if action == "upload":
+            calls += 2
+        elif action == "replace":
+            calls += 3
+    return calls
+
+
+def summarize_plan(ops: List[Dict[str, Any]], entries: List[Dict[str, Any]], backend: str,
+                   batch_size: int = MAX_BATCH_SIZE, attachment_calls: int = 0) -> Dict[str, Any]:
+    """Summarize a plan: operation counts and planned calls per backend."""
+    by_backend = {
+        name: count_planned_calls(entries, name, batch_size) + attachment_calls
+        for name in ("az", "rest", "batch")
+    }
+    return {
+        "operations": len(ops),
+        "entries": len(entries),
+        "attachmentCalls": attachment_calls,
+        "plannedCalls": by_backend[backend],
+        "plannedCallsByBackend": by_backend,
+    }
 
-        if cls == "NEW":
-            args = build_task_create_args(task, area, iteration)
 
-            progress(f"Creating Task {task_id}: {task.get('description', '')[:60]}")
-            data, err = run_az(az_path, args)
+def plan_to_json(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Serializable view of plan entries (without the full diff items)."""
+    view = []
+    for entry in entries:
+        record = {k: v for k, v in entry.items() if k != "item"}
+        if entry["args"] and entry["action"] != "createIteration":
+            record["args"] = render_entry_args(entry)
+        view.append(record)
+    return view
 
-            if err:
-                progress(f"  FAILED: {err}")
-                results["failed"].append({"id": task_id, "error": err})
-                continue
 
-            devops_id = data.get("id")
-            if not devops_id:
-                results["failed"].append({"id": task_id, "error": "No ID in response"})
-                continue
+def new_sync_context(diff: Dict[str, Any], breaker: Optional[CircuitBreaker] = None) -> Dict[str, Any]:
+    """Initialize sync results and ID maps from the diff.
 
-            id_map[task_id] = devops_id
-            progress(f"  Created Task #{devops_id}")
-
-            # Add parent link to story
-            story_id = task.get("storyId", "")
-            story_devops_id = story_id_map.get(story_id)
-            if story_devops_id:
-                link_args = [
-                    "boards", "work-item", "relation", "add",
-                    "--id", str(devops_id),
-                    "--relation-type", "parent",
-                    "--target-id", str(story_devops_id),
-                ]
-                _, link_err = run_az(az_path, link_args)
-                if link_err:
-                    progress(f"  WARNING: Parent link failed: {link_err}")
-
-            # If task is complete, update state
-            if task.get("complete", False):
-                state_args = [
-                    "boards", "work-item", "update",
-                    "--id", str(devops_id),
-                    "--state", complete_state,
-                ]
-                _, state_err = run_az(az_path, state_args)
-                if state_err:
-                    progress(f"  WARNING: State update failed: {state_err}")
-
-            results["created"].append({
-                "id": task_id, "devopsId": devops_id,
-                "storyDevopsId": story_devops_id,
-                "contentHash": task.get("contentHash", "")
+    Items that need no call (UNCHANGED/ORPHANED) are recorded as skipped and
+    their DevOps IDs seeded into the ID maps, as are CHANGED and MOVED items'
+    IDs; MOVED (renumbered) items are also listed under moved.
+    Items in pruned unchanged subtrees are only counted: nothing in the plan
+    references them.
+    """
+    pruned = diff.get("pruned", {})
+    results = {kind: {"created": [], "updated": [], "failed": [], "skipped": [], "pending": [], "moved": [],
+                      "pruned": len(pruned.get(kind, []))}
+               for kind in PLAN_KINDS}
+    results["iterations"] = {"created": [], "failed": [], "skipped": [], "pending": [], "movements": []}
+    id_maps = {kind: {} for kind in PLAN_KINDS}
+
+    for kind in PLAN_KINDS:
+        # A renumbered item can reuse an orphan's ID; the live item owns it
+        live_ids = {item.get("id", "") for item in diff.get(kind, []) if item.get("classification") != "ORPHANED"}
+        for item in diff.get(kind, []):
+            item_id = item.get("id", "")
+            cls = item.get("classification", "")
+            if cls == "ORPHANED" and item_id in live_ids:
+                pass
+            elif cls in ("UNCHANGED", "ORPHANED", "CHANGED", "MOVED") and item.get("devopsId"):
+                id_maps[kind][item_id] = item["devopsId"]
+            if cls in ("UNCHANGED", "ORPHANED"):
+                results[kind]["skipped"].append({"id": item_id, "classification": cls})
+            elif cls == "MOVED":
+                results[kind]["moved"].append({"id": item_id, "movedFrom": item.get("movedFrom", ""),
+                                               "devopsId": item.get("devopsId")})
+            elif cls == "CHANGED" and not item.get("devopsId"):
+                results[kind]["failed"].append({"id": item_id, "error": "No existing DevOps ID for update"})
+
+    for it in diff.get("iterations", []):
+        if it.get("classification") == "EXISTS":
+            results["iterations"]["skipped"].append({
+                "slug": it.get("slug", ""), "epicId": it.get("epicId", ""), "classification": "EXISTS"
             })
 
-        elif cls == "CHANGED":
-            devops_id = task.get("devopsId")
-            if not devops_id:
-                results["failed"].append({"id": task_id, "error": "No existing DevOps ID for update"})
-                continue
+    return {"results": results, "idMaps": id_maps, "failedIterations": set(),
+            "lock": threading.Lock(), "breaker": breaker or CircuitBreaker(),
+            "stop": threading.Event(), "journal": None, "attachments": None}
 
-            id_map[task_id] = devops_id
-            args = build_task_update_args(task, devops_id, complete_state)
 
-            progress(f"Updating Task {task_id} (#{devops_id})")
-            data, err = run_az(az_path, args)
+def resolve_parent(entry: Dict[str, Any], ctx: Dict[str, Any]) -> Optional[int]:
+    """Look up the parent's DevOps ID for a plan entry, if it has one."""
+    if not entry["parent"]:
+        return None
+    parent_kind, parent_id = entry["parent"]
+    return ctx["idMaps"][parent_kind].get(parent_id)
 
-            if err:
-                progress(f"  FAILED: {err}")
-                results["failed"].append({"id": task_id, "devopsId": devops_id, "error": err})
-            else:
-                results["updated"].append({
-                    "id": task_id, "devopsId": devops_id,
-                    "contentHash": task.get("contentHash", "")
-                })
-                progress(f"  Updated Task #{devops_id}")
 
-    return results, id_map
+def record_entry_result(entry: Dict[str, Any], ctx: Dict[str, Any], data: Optional[Dict[str, Any]],
+                        err: Optional[str], iteration_applied: bool,
+                        needs_link: bool = False) -> Optional[int]:
+    """Record the outcome of one executed plan entry. Returns the DevOps ID on success.
 
+    Results and ID maps are updated under ctx["lock"]. Successes are then
+    appended to the journal (if any) before returning, so an interrupted run
+    can be resumed without repeating them; the journal fsync happens outside
+    ctx["lock"] so other workers do not wait on the disk.
+    """
+    results = ctx["results"]
+    journal = ctx.get("journal")
+    kind = entry["kind"]
+    item_id = entry["id"]
+
+    if entry["action"] == "createIteration":
+        if err:
+            with ctx["lock"]:
+                results["iterations"]["failed"].append({"slug": item_id, "epicId": entry["epicId"], "error": err})
+                ctx["failedIterations"].add(item_id)
+            progress(f"  FAILED: {err}")
+            return None
+        devops_id = data.get("id", data.get("identifier", ""))
+        record = {"slug": item_id, "epicId": entry["epicId"], "devopsId": devops_id}
+        with ctx["lock"]:
+            results["iterations"]["created"].append(record)
+        if journal:
+            journal.done(entry, devops_id, record)
+        progress(f"  Created Iteration: {item_id}")
+        return devops_id
+
+    label = KIND_LABELS[kind]
+    devops_id = entry["devopsId"]
+    if entry["action"] == "create":
+        devops_id = (data or {}).get("id") if not err else None
+        if not err and not devops_id:
+            err = "No ID in response"
+
+    movement = None
+    if iteration_applied:
+        movement = {"type": MOVEMENT_TYPES[kind], "id": item_id,
+                    "iteration": entry["iteration"]["slug"], "status": "failed" if err else "moved"}
+        if err:
+            movement["error"] = err
+
+    record = None
+    with ctx["lock"]:
+        if movement:
+            results["iterations"]["movements"].append(movement)
+        if err:
+            failure = {"id": item_id, "error": err}
+            if entry["action"] != "create":
+                failure = {"id": item_id, "devopsId": devops_id, "error": err}
+            results[kind]["failed"].append(failure)
+        elif entry["action"] == "create":
+            ctx["idMaps"][kind][item_id] = devops_id
+            record = {"id": item_id, "devopsId": devops_id}
+            if kind == "stories":
+                record["epicDevopsId"] = resolve_parent(entry, ctx)
+            elif kind == "tasks":
+                record["storyDevopsId"] = resolve_parent(entry, ctx)
+            record["contentHash"] = entry["item"].get("contentHash", "")
+            results[kind]["created"].append(record)
+        elif "update" in entry["operations"] or "state" in entry["operations"]:
+            record = {
+                "id": item_id, "devopsId": devops_id,
+                "contentHash": entry["item"].get("contentHash", "")
+            }
+            results[kind]["updated"].append(record)
+    if err:
+        progress(f"  FAILED: {err}")
+        return None
 
-def sync_epic_iterations(az_path: str, config: Dict[str, str], iterations: List[Dict[str, Any]], epic_id_map: Dict[str, int], story_id_map: Dict[str, int], task_id_map: Dict[str, int]) -> Dict[str, Any]:
-    """Create epic-based iterations and move epics, stories, and tasks into them."""
-    results = {"created": [], "failed": [], "skipped": [], "movements": []}
+    if entry["action"] == "create":
+        progress(f"  Created {label} #{devops_id}")
+    elif record is not None:
+        progress(f"  Updated {label} #{devops_id}")
+    if journal:
+        journal.done(entry, devops_id, record, movement, needs_link)
+    if kind == "stories" and ctx.get("attachments") is not None:
+        ctx["attachments"].work_item_ready(item_id, devops_id)
+    if iteration_applied:
+        progress(f"  Moved {MOVEMENT_TYPES[kind]} #{devops_id} to {entry['iteration']['slug']}")
+    return devops_id
+
+
+def iteration_applies(entry: Dict[str, Any], ctx: Dict[str, Any]) -> bool:
+    """Whether an entry's iteration move should run (never into a node that failed to create)."""
+    return bool(entry["iteration"]) and entry["iteration"]["slug"] not in ctx["failedIterations"]
+
+
+def describe_entry(entry: Dict[str, Any]) -> str:
+    """One-line progress description of a plan entry."""
+    if entry["action"] == "createIteration":
+        return f"Creating Iteration: {entry['id']}"
+    label = KIND_LABELS[entry["kind"]]
+    item = entry["item"]
+    title = item.get("title") or item.get("description", "")[:60]
+    if entry["action"] == "create":
+        return f"Creating {label} {entry['id']}: {title}"
+    if entry["operations"] == ["iteration"]:
+        return f"Moving {label} {entry['id']} (#{entry['devopsId']})"
+    return f"Updating {label} {entry['id']} (#{entry['devopsId']})"
+
+
+def record_pending(entry: Dict[str, Any], ctx: Dict[str, Any]) -> None:
+    """Record a plan entry left unattempted because the circuit opened."""
+    if entry["action"] == "createIteration":
+        record = {"slug": entry["id"], "epicId": entry["epicId"]}
+    else:
+        record = {"id": entry["id"], "action": entry["action"], "operations": entry["operations"]}
+        if entry["devopsId"]:
+            record["devopsId"] = entry["devopsId"]
+    with ctx["lock"]:
+        ctx["results"][entry["kind"]]["pending"].append(record)
 
-    # Build iteration paths. Azure DevOps uses two different path formats:
-    # - "iteration create --path" needs: \ProjectName\Iteration\ParentPath
-    #   (the literal word "Iteration" is required between project and parent)
-    # - "work-item update --iteration" needs: ProjectName\ParentPath\ChildName
-    project = config.get("projectName", "")
-    iter_root_raw = config.get("iterationRootPath", "")
-    # For work-item --iteration (no "Iteration" segment, no leading backslash)
-    iteration_root = get_default_iteration(config)
 
-    def move_item(item_type, item_id, devops_id, iter_path, slug):
-        """Move a work item to an iteration path."""
-        assign_args = [
-            "boards", "work-item", "update",
-            "--id", str(devops_id),
-            "--iteration", iter_path,
-        ]
-        _, assign_err = run_az(az_path, assign_args)
-        if assign_err:
-            progress(f"  WARNING: {item_type} {item_id} move failed: {assign_err}")
-            results["movements"].append({
-                "type": item_type, "id": item_id, "iteration": slug,
-                "status": "failed", "error": assign_err
-            })
-        else:
-            results["movements"].append({
-                "type": item_type, "id": item_id, "iteration": slug,
-                "status": "moved"
-            })
-            progress(f"  Moved {item_type} #{devops_id} to {slug}")
+def execute_entry(runner: Runner, entry: Dict[str, Any], ctx: Dict[str, Any],
+                  native_relations: bool = False) -> Optional[int]:
+    """Execute one plan entry and record its outcome. Returns the DevOps ID on success.
 
-    for it in iterations:
-        cls = it.get("classification", "")
-        slug = it.get("slug", "")
-        epic_id = it.get("epicId", "")
+    With native_relations (REST backend) the parent link travels in the same
+    request; with the az CLI it needs a follow-up relation add.
+    """
+    breaker = ctx["breaker"]
+    if breaker.is_open or ctx["stop"].is_set():
+        record_pending(entry, ctx)
+        return None
 
-        iter_path = f"{iteration_root}\\{slug}" if iteration_root else slug
+    if entry.get("linkOnly"):
+        return execute_link(runner, entry, ctx)
 
-        if cls == "NEW":
-            args = [
-                "boards", "iteration", "project", "create",
-                "--name", slug,
-            ]
-            if project:
-                # az boards iteration project create --path requires:
-                # \ProjectName\Iteration\ParentIterationPath
-                # The literal "Iteration" segment is mandatory per Azure DevOps CLI.
-                if iter_root_raw:
-                    # Strip project prefix if iterationRootPath already starts with it
-                    iter_suffix = iter_root_raw
-                    if iter_suffix.startswith(project + "\\"):
-                        iter_suffix = iter_suffix[len(project) + 1:]
-                    create_path = f"\\{project}\\Iteration\\{iter_suffix}"
-                else:
-                    create_path = f"\\{project}\\Iteration"
-                args += ["--path", create_path]
+    if entry["action"] == "createIteration":
+        progress(describe_entry(entry))
+        data, err = runner(entry["args"])
+        breaker.record(err)
+        return record_entry_result(entry, ctx, data, err, False)
 
-            progress(f"Creating Iteration: {slug}")
-            data, err = run_az(az_path, args)
+    if not entry["args"]:
+        label = KIND_LABELS[entry["kind"]]
+        progress(f"  WARNING: {label} {entry['id']} not found in ID map, skipping")
+        return None
 
-            if err:
-                progress(f"  FAILED: {err}")
-                results["failed"].append({"slug": slug, "epicId": epic_id, "error": err})
-                continue
+    apply_iteration = iteration_applies(entry, ctx)
+    if entry["operations"] == ["iteration"] and not apply_iteration:
+        return None
+    args = render_entry_args(entry, apply_iteration)
+    parent_ref = resolve_parent(entry, ctx) if entry["action"] == "create" else None
 
-            devops_id = data.get("id", data.get("identifier", ""))
-            results["created"].append({"slug": slug, "epicId": epic_id, "devopsId": devops_id})
-            progress(f"  Created Iteration: {slug}")
+    progress(describe_entry(entry))
+    if native_relations and parent_ref:
+        data, err = runner(args, parent=parent_ref)
+    else:
+        data, err = runner(args)
+    breaker.record(err)
 
-        elif cls == "EXISTS":
-            results["skipped"].append({"slug": slug, "epicId": epic_id, "classification": cls})
+    needs_link = bool(parent_ref) and not native_relations
+    devops_id = record_entry_result(entry, ctx, data, err, apply_iteration, needs_link)
+    if devops_id and needs_link:
+        add_parent_link(runner, entry, ctx, devops_id, parent_ref)
+    return devops_id
 
-        # Move epic into iteration (only for NEW iterations — epic already assigned for EXISTS)
-        if cls == "NEW":
-            epic_devops_id = epic_id_map.get(epic_id)
-            if epic_devops_id:
-                move_item("epic", epic_id, epic_devops_id, iter_path, slug)
 
-        # Move stories into iteration
-        for story_id in it.get("storyIds", []):
-            story_devops_id = story_id_map.get(story_id)
-            if story_devops_id:
-                move_item("story", story_id, story_devops_id, iter_path, slug)
-            else:
-                progress(f"  WARNING: Story {story_id} not found in ID map, skipping")
+def add_parent_link(runner: Runner, entry: Dict[str, Any], ctx: Dict[str, Any],
+                    devops_id: int, parent_ref: int) -> None:
+    """Link a created work item to its parent with a separate az relation add."""
+    link_args = [
+        "boards", "work-item", "relation", "add",
+        "--id", str(devops_id),
+        "--relation-type", "parent",
+        "--target-id", str(parent_ref),
+    ]
+    _, link_err = runner(link_args)
+    ctx["breaker"].record(link_err)
+    if link_err:
+        progress(f"  WARNING: Parent link failed: {link_err}")
+    elif ctx.get("journal"):
+        ctx["journal"].linked(entry)
+
+
+def execute_link(runner: Runner, entry: Dict[str, Any], ctx: Dict[str, Any]) -> Optional[int]:
+    """Resume: add the parent link of an item created before the interruption."""
+    devops_id = ctx["idMaps"][entry["kind"]].get(entry["id"])
+    parent_ref = resolve_parent(entry, ctx)
+    if devops_id and parent_ref:
+        progress(f"Linking {KIND_LABELS[entry['kind']]} {entry['id']} (#{devops_id}) to parent #{parent_ref}")
+        add_parent_link(runner, entry, ctx, devops_id, parent_ref)
+    return devops_id
+
+
+def plan_dependencies(entries: List[Dict[str, Any]]) -> List[List[int]]:
+    """For each plan entry, list the indexes of the entries it must wait for.
+
+    A create waits for its parent's create (the link needs the parent's
+    DevOps ID) and any entry moving into an epic iteration waits for that
+    iteration node. Everything else — epics, updates, items whose parent
+    already exists — can start immediately.
+    """
+    index = {(entry["kind"], entry["id"]): i for i, entry in enumerate(entries)}
+    deps = []
+    for entry in entries:
+        entry_deps = []
+        if entry["action"] == "create" and entry["parent"] in index:
+            entry_deps.append(index[entry["parent"]])
+        if entry["iteration"] and ("iterations", entry["iteration"]["slug"]) in index:
+            entry_deps.append(index[("iterations", entry["iteration"]["slug"])])
+        deps.append(entry_deps)
+    return deps
+
+
+def execute_plan(runner: Runner, entries: List[Dict[str, Any]], ctx: Dict[str, Any],
+                 native_relations: bool = False, jobs: int = 1) -> None:
+    """Execute plan entries in dependency order with up to `jobs` calls in flight.
+
+    With jobs > 1, each entry is started as soon as the entries it depends
+    on (see plan_dependencies()) have finished, in plan order among those
+    ready. A failed dependency does not block its dependents: they run
+    exactly as they would sequentially (created without the parent link,
+    left in the default iteration).
+    """
+    if jobs <= 1:
+        for entry in entries:
+            execute_entry(runner, entry, ctx, native_relations)
+        return
+
+    deps = plan_dependencies(entries)
+    waiting = [len(d) for d in deps]
+    dependents = [[] for _ in entries]
+    for i, entry_deps in enumerate(deps):
+        for dep in entry_deps:
+            dependents[dep].append(i)
+
+    ready = [i for i, count in enumerate(waiting) if count == 0]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        running = {}
+        while ready or running:
+            ready.sort()
+            while ready and len(running) < jobs:
+                i = ready.pop(0)
+                running[pool.submit(execute_entry, runner, entries[i], ctx, native_relations)] = i
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                i = running.pop(future)
+                future.result()
+                for dependent in dependents[i]:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0:
+                        ready.append(dependent)
+
+
+def execute_plan_batch(backend: RestBackend, entries: List[Dict[str, Any]], ctx: Dict[str, Any],
+                       batch_size: int = MAX_BATCH_SIZE, runner: Optional[Runner] = None) -> None:
+    """Execute plan entries through $batch requests of up to batch_size operations.
+
+    Iteration nodes are created one by one first (work items cannot move
+    into a node that does not exist yet). New work items get temporary
+    negative IDs so a story and its tasks can be created and parent-linked
+    within the same batch; parents resolved by earlier batches are
+    referenced by their real IDs. Single calls (iteration nodes) go
+    through runner when given, e.g. a RetryingRunner around the backend.
+    """
+    batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+    project = backend.project
+    items = []
+    for entry in entries:
+        if entry["action"] == "createIteration" or entry.get("linkOnly"):
+            execute_entry(runner or backend, entry, ctx, native_relations=True)
+        elif not entry["args"]:
+            progress(f"  WARNING: {KIND_LABELS[entry['kind']]} {entry['id']} not found in ID map, skipping")
+        elif entry["operations"] != ["iteration"] or iteration_applies(entry, ctx):
+            items.append(entry)
+
+    total_batches = (len(items) + batch_size - 1) // batch_size
+    next_temp_id = -1
+    breaker = ctx["breaker"]
+    for batch_num, start in enumerate(range(0, len(items), batch_size), 1):
+        chunk = items[start:start + batch_size]
+        if breaker.is_open or ctx["stop"].is_set():
+            for entry in chunk:
+                record_pending(entry, ctx)
+            continue
+        temp_ids = {}
+        requests = []
+        applied = []
+        for entry in chunk:
+            parent_ref = None
+            if entry["action"] == "create" and entry["parent"]:
+                parent_ref = resolve_parent(entry, ctx) or temp_ids.get(entry["parent"])
+                if parent_ref is None and entry["parent"][1]:
+                    progress(f"  WARNING: {KIND_LABELS[entry['kind']]} {entry['id']}: parent {entry['parent'][1]} has no DevOps ID, creating without parent link")
+            temp_id = None
+            if entry["action"] == "create":
+                temp_id = next_temp_id
+                next_temp_id -= 1
+                temp_ids[(entry["kind"], entry["id"])] = temp_id
+            apply_iteration = iteration_applies(entry, ctx)
+            applied.append(apply_iteration)
+            requests.append(build_batch_request(
+                render_entry_args(entry, apply_iteration), project, backend.org_url, temp_id, parent_ref
+            ))
+
+        progress(f"Batch {batch_num}/{total_batches}: {len(requests)} operations")
+        responses, batch_err = backend.batch(requests)
+        if batch_err:
+            progress(f"  FAILED: {batch_err}")
+            responses = [(None, batch_err)] * len(chunk)
+
+        for entry, apply_iteration, (data, err) in zip(chunk, applied, responses):
+            progress(f"  {describe_entry(entry)}")
+            record_entry_result(entry, ctx, data, err, apply_iteration)
+            breaker.record(err)
+
+
+def start_story_attachments(diff: Dict[str, Any], ctx: Dict[str, Any], org_url: str,
+                            project: str, pat: Union[str, TokenManager],
+                            throttle: Optional[ThrottleController] = None,
+                            workers: int = ATTACHMENT_WORKERS) -> Optional[AttachmentPipeline]:
+    """Start background uploads of story .md files whose bytes changed.
+
+    Stories whose recorded attachment hash matches the file are left alone,
+    whatever their classification; a changed file replaces the previous
+    relation instead of adding another copy. Stories without an attachment
+    (new, or synced before attachments were enabled) get one. Recorded
+    attachments are kept in the results until a new copy replaces them.
+    The pipeline is stored in ctx["attachments"] so story creates can hand
+    it their DevOps IDs; returns None when there is nothing to upload.
+    """
+    story_file_paths = diff.get("storyFilePaths", {})
+    story_results = ctx["results"]["stories"]
+    attachments = {}
+    jobs = []
+    for story in diff_items(diff, "stories"):
+        story_id = story.get("id", "")
+        if story.get("classification") == "ORPHANED":
+            continue
+        if story.get("attached") == "true":
+            # Previous record stands unless a new copy replaces it
+            attachments[story_id] = {"hash": story.get("attachmentHash", ""),
+                                     "url": story.get("attachmentUrl", "")}
+        if not org_url or not pat:
+            continue
+        action, file_hash = attachment_action(story, story_file_paths.get(story_id))
+        if action in ("none", "keep"):
+            continue
+        jobs.append({
+            "storyId": story_id,
+            "filePath": story_file_paths[story_id],
+            "fileHash": file_hash,
+            "replaceUrl": story.get("attachmentUrl", "") if action == "replace" else None,
+            "devopsId": ctx["idMaps"]["stories"].get(story_id, story.get("devopsId")),
+        })
+    story_results["attachments"] = attachments
+    story_results["attachedIds"] = sorted(attachments)
+    if not jobs:
+        return None
+    progress(f"Uploading {len(jobs)} story file(s) in the background")
+    pipeline = AttachmentPipeline(org_url, project, pat, throttle, workers=workers)
+    ctx["attachments"] = pipeline
+    pipeline.start(jobs)
+    return pipeline
 
-        # Move tasks into iteration
-        for task_id in it.get("taskIds", []):
-            task_devops_id = task_id_map.get(task_id)
-            if task_devops_id:
-                move_item("task", task_id, task_devops_id, iter_path, slug)
-            else:
-                progress(f"  WARNING: Task {task_id} not found in ID map, skipping")
 
-    return results
+def finish_story_attachments(ctx: Dict[str, Any]) -> None:
+    """Wait for background story file uploads and record them in the results.
+
+    After an abort or interrupt, uploads not yet started are dropped.
+    """
+    pipeline = ctx.get("attachments")
+    if pipeline is None:
+        return
+    cancel = ctx["breaker"].is_open or ctx["stop"].is_set()
+    story_results = ctx["results"]["stories"]
+    story_results["attachments"].update(pipeline.finish(cancel=cancel))
+    story_results["attachedIds"] = sorted(story_results["attachments"])
+    counts = pipeline.counts
+    progress(f"Attachments: {counts['linked']} attached, {counts['failed']} failed, "
+             f"{counts['unlinked']} without work item, {counts['cancelled']} cancelled")
 
 
 def main():
@@ -862,12 +2643,31 @@ def main():
     parser.add_argument("--diff", required=True, help="Path to diff results JSON (from compute-hashes.py)")
     parser.add_argument("--config", required=True, help="Path to devops-sync-config.yaml")
     parser.add_argument("--output", required=True, help="Path to write sync results JSON")
-    parser.add_argument("--org", default="", help="Azure DevOps org URL (for story file attachments via REST API)")
+    parser.add_argument("--org", default="", help="Azure DevOps org URL (for story file attachments and the REST backend)")
+    parser.add_argument("--backend", choices=["az", "rest"], default="az",
+                        help="Execution backend: 'az' spawns the az CLI per call, 'rest' calls the REST API over pooled keep-alive connections")
+    parser.add_argument("--az-in-process", action="store_true",
+                        help="With --backend az, run az commands in-process via azure-cli-core when importable (falls back to spawning az)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Send creates, updates and iteration moves as $batch requests (requires --backend rest)")
+    parser.add_argument("--batch-size", type=int, default=MAX_BATCH_SIZE,
+                        help=f"Operations per $batch request (max {MAX_BATCH_SIZE})")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Work item calls to run concurrently; each item starts once its parent and iteration exist (ignored with --batch)")
+    parser.add_argument("--breaker-threshold", type=int, default=DEFAULT_BREAKER_THRESHOLD,
+                        help="Stop after this many consecutive identical auth/permission/project errors; remaining items are written as pending")
+    parser.add_argument("--journal", default="",
+                        help="Write-ahead journal path (default: <output>.journal.jsonl)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume an interrupted sync from its journal: skip confirmed operations, run the rest")
+    parser.add_argument("--plan-only", action="store_true",
+                        help="Write the optimized operation plan and planned call counts without contacting Azure DevOps")
     args = parser.parse_args()
 
-    # Find az CLI
-    az_path = find_az_executable()
-    progress(f"Using az CLI: {az_path}")
+    if args.batch and args.backend != "rest":
+        parser.error("--batch requires --backend rest")
+    if args.az_in_process and args.backend != "az":
+        parser.error("--az-in-process requires --backend az")
 
     # Load diff results
     with open(args.diff, "r", encoding="utf-8") as f:
@@ -886,52 +2686,141 @@ def main():
 
     progress(f"Config loaded: template={config.get('processTemplate', '?')}, project={config.get('projectName', '?')}")
 
-    # Sync in dependency order
-    progress("\n=== Syncing Epics ===")
-    epic_statuses = diff.get("epicStatuses", {})
-    epic_results, epic_id_map = sync_epics(az_path, config, diff.get("epics", []), epic_statuses=epic_statuses)
-
-    progress("\n=== Syncing Stories ===")
-    story_statuses = diff.get("storyStatuses", {})
-    story_file_paths = diff.get("storyFilePaths", {})
+    # Plan: explicit per-item operations, merged into one request per work item
     attach_enabled = config.get("attachStoryFiles", "false").lower() == "true"
-    org_url = ""
+    ops = plan_operations(config, diff)
+    entries = optimize_plan(ops)
+    plan_backend = "batch" if args.batch else args.backend
+    plan_summary = summarize_plan(
+        ops, entries, plan_backend, args.batch_size,
+        count_attachment_calls(diff) if attach_enabled else 0
+    )
+    progress(f"Plan: {plan_summary['operations']} operations merged into {plan_summary['entries']} requests, "
+             f"{plan_summary['plannedCalls']} calls planned ({plan_backend})")
+
+    if args.plan_only:
+        result = {"backend": plan_backend, "plan": plan_to_json(entries), "summary": plan_summary}
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(json.dumps(result, indent=2))
+        return
+
+    # Find az CLI
+    az_path = find_az_executable()
+    progress(f"Using az CLI: {az_path}")
+
+    # Resolve REST credentials (needed for story file attachments and the REST backend)
+    org_url = args.org or config.get("organizationUrl", "") or config.get("orgUrl", "")
+    # One TokenManager serves every REST caller and refreshes AAD tokens before they expire
     pat = ""
-    if attach_enabled:
-        org_url = args.org or config.get("organizationUrl", "") or config.get("orgUrl", "")
-        pat = os.environ.get("AZURE_DEVOPS_EXT_PAT", "")
-        if org_url and not pat:
-            progress("No AZURE_DEVOPS_EXT_PAT set — fetching token from az CLI...")
-            pat = get_az_access_token(az_path)
-            if pat:
+    if attach_enabled or args.backend == "rest":
+        tokens = TokenManager(az_path, pat=os.environ.get("AZURE_DEVOPS_EXT_PAT", ""))
+        if org_url and tokens.refreshable:
+            progress("No AZURE_DEVOPS_EXT_PAT set — using token from az CLI session (cached, auto-refreshed)")
+        if org_url and tokens.token():
+            pat = tokens
+            if tokens.refreshable:
                 progress("Token acquired from az CLI session")
-            else:
-                progress("WARNING: Could not acquire token — story file attachments will be skipped")
+        elif org_url and attach_enabled:
+            progress("WARNING: Could not acquire token — story file attachments will be skipped")
+
+    # One controller paces every call: work items, iterations and attachments
+    throttle = ThrottleController(max_concurrency=max(1, args.jobs))
+
+    if args.backend == "rest":
+        if not pat:
+            progress("ERROR: REST backend requires an organization URL and AZURE_DEVOPS_EXT_PAT (or an az login session)")
+            sys.exit(1)
+        backend = RestBackend(org_url, config.get("projectName", ""), pat, throttle=throttle)
+        az_runner = None
+        progress(f"Using REST backend: {org_url}")
+        runner = RetryingRunner(backend, latency=LatencyTracker(backend.timeout))
     else:
+        backend = None
+        az_runner = make_az_runner(az_path, in_process=args.az_in_process)
+        if az_runner.in_process is not None:
+            progress("Running az commands in-process via azure-cli-core")
+        runner = RetryingRunner(make_throttled_runner(az_runner, throttle))
+
+    if not attach_enabled:
         progress("Story file attachments disabled (attachStoryFiles != true)")
-    story_results, story_id_map = sync_stories(
-        az_path, config, diff.get("stories", []), epic_id_map,
-        story_statuses=story_statuses,
-        story_file_paths=story_file_paths,
-        org_url=org_url,
-        pat=pat
-    )
 
-    progress("\n=== Syncing Tasks ===")
-    task_results, task_id_map = sync_tasks(az_path, config, diff.get("tasks", []), story_id_map)
+    # Execute in dependency order: iteration nodes, epics, stories, tasks
+    breaker = CircuitBreaker(args.breaker_threshold)
+    ctx = new_sync_context(diff, breaker)
+
+    # Write-ahead journal: every confirmed operation hits disk before the next
+    journal_path = args.journal or os.path.splitext(args.output)[0] + ".journal.jsonl"
+    diff_digest = file_digest(args.diff)
+    if os.path.exists(journal_path) and os.path.getsize(journal_path) > 0:
+        if not args.resume:
+            progress(f"ERROR: Journal from an interrupted sync found: {journal_path}")
+            progress("Re-run with --resume to continue it (work items it created will not be created again),")
+            progress("or delete the journal to start over.")
+            sys.exit(1)
+        header, done = load_journal(journal_path)
+        if header.get("diff") != diff_digest:
+            progress("WARNING: Diff changed since the journal was written — resuming by item ID")
+        entries = apply_journal(entries, ctx, done)
+        progress(f"Resuming: {len(done)} operations already confirmed, {len(entries)} remaining")
+    elif args.resume:
+        progress(f"No journal at {journal_path} — nothing to resume, running full sync")
+    journal = OperationJournal(journal_path, diff_digest)
+    journal.open()
+    ctx["journal"] = journal
+
+    # First Ctrl+C: stop dispatching, let in-flight calls finish, write
+    # partial results. Second Ctrl+C: abort immediately.
+    def handle_sigint(signum, frame):
+        if ctx["stop"].is_set():
+            raise KeyboardInterrupt
+        ctx["stop"].set()
+        progress("\nInterrupted — finishing in-flight calls and writing partial results (Ctrl+C again to abort)")
+    signal.signal(signal.SIGINT, handle_sigint)
+
+    # Story files upload in the background while work items are synced
+    if attach_enabled:
+        start_story_attachments(diff, ctx, org_url, config.get("projectName", ""), pat, throttle)
+    else:
+        start_story_attachments(diff, ctx, "", "", "")
 
-    progress("\n=== Syncing Epic Iterations ===")
-    iteration_results = sync_epic_iterations(
-        az_path, config, diff.get("iterations", []),
-        epic_id_map, story_id_map, task_id_map
-    )
+    progress("\n=== Syncing Work Items ===")
+    if args.batch:
+        execute_plan_batch(backend, entries, ctx, batch_size=args.batch_size, runner=runner)
+    else:
+        if args.jobs > 1:
+            progress(f"Running up to {args.jobs} calls concurrently")
+        execute_plan(runner, entries, ctx, native_relations=backend is not None, jobs=args.jobs)
+
+    if ctx["attachments"] is not None:
+        progress("\n=== Attaching Story Files ===")
+        finish_story_attachments(ctx)
+
+    if backend is not None:
+        progress(f"REST backend: {backend.requests_sent} requests over {backend.connections_opened} connection(s)")
+        backend.close()
+
+    results, id_maps = ctx["results"], ctx["idMaps"]
+    epic_results, epic_id_map = results["epics"], id_maps["epics"]
+    story_results, story_id_map = results["stories"], id_maps["stories"]
+    task_results, task_id_map = results["tasks"], id_maps["tasks"]
+    iteration_results = results["iterations"]
 
     # Build output
     result = {
+        "backend": az_runner.mode if az_runner else args.backend,
+        "status": "aborted" if breaker.is_open else "interrupted" if ctx["stop"].is_set() else "complete",
+        "abortReason": breaker.reason,
+        "resumed": bool(args.resume),
+        "azCalls": az_runner.calls if az_runner else None,
         "epics": epic_results,
         "stories": story_results,
         "tasks": task_results,
         "iterations": iteration_results,
+        "plan": plan_summary,
+        "throttle": throttle.stats(),
+        "retry": runner.stats(),
         "epicIdMap": {k: v for k, v in epic_id_map.items()},
         "storyIdMap": {k: v for k, v in story_id_map.items()},
         "taskIdMap": {k: v for k, v in task_id_map.items()},
@@ -948,7 +2837,10 @@ def main():
             "tasksFailed": len(task_results["failed"]),
             "iterationsCreated": len(iteration_results["created"]),
             "iterationsFailed": len(iteration_results["failed"]),
-            "iterationMovements": len([m for m in iteration_results["movements"] if m["status"] == "moved"])
+            "iterationMovements": len([m for m in iteration_results["movements"] if m["status"] == "moved"]),
+            "pending": sum(len(results[kind]["pending"]) for kind in PLAN_KINDS + ("iterations",)),
+            "moved": sum(len(results[kind]["moved"]) for kind in PLAN_KINDS),
+            "pruned": sum(results[kind]["pruned"] for kind in PLAN_KINDS)
         }
     }
 
@@ -957,16 +2849,35 @@ def main():
     with open(args.output, "w", encoding="utf-8") as f:
         json.dump(result, f, indent=2)
 
+    # The results file now holds everything the journal protected
+    if result["status"] == "complete":
+        journal.remove()
+    else:
+        journal.close()
+
     # Print to stdout
     print(json.dumps(result, indent=2))
 
     # Print summary to stderr
     s = result["summary"]
-    progress(f"\n=== SYNC COMPLETE ===")
+    progress(f"\n=== SYNC {result['status'].upper()} ===")
     progress(f"Epics:      {s['epicsCreated']} created, {s['epicsUpdated']} updated, {s['epicsFailed']} failed")
     progress(f"Stories:    {s['storiesCreated']} created, {s['storiesUpdated']} updated, {s['storiesFailed']} failed, {s['storiesAttached']} attached")
     progress(f"Tasks:      {s['tasksCreated']} created, {s['tasksUpdated']} updated, {s['tasksFailed']} failed")
     progress(f"Iterations: {s['iterationsCreated']} created, {s['iterationsFailed']} failed, {s['iterationMovements']} items moved")
+    t = result["throttle"]
+    if t["throttled"] or t["decreases"]:
+        progress(f"Throttling: {t['throttled']} throttled responses, paused {t['pausedSeconds']}s, concurrency {t['concurrency']}")
+    r = result["retry"]
+    if r["retries"]:
+        progress(f"Retries:    {r['retries']} retried calls, {r['timeouts']} timeouts")
+    if breaker.is_open:
+        progress(f"\nABORTED: {breaker.reason}")
+        progress(f"{s['pending']} work items/iterations left pending — fix the cause and re-run with --resume")
+        sys.exit(1)
+    if ctx["stop"].is_set():
+        progress(f"\nINTERRUPTED: {s['pending']} work items/iterations left pending — re-run with --resume")
+        sys.exit(130)
 
 
 if __name__ == "__main__":
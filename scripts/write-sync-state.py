@@ -10,6 +10,8 @@ Design constraints:
 - Updates changed/new items with data from sync results
 - Correctly extracts iteration slugs from sync results structure
 - Marks failed items as 'pending' for retry on next sync
+- Writes roll-up treeHash values only for fully synced subtrees, so the next
+  diff never prunes a subtree with failed or pending items
 """
 
 import argparse
@@ -18,7 +20,7 @@ import os
 import re
 import sys
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 def progress(msg: str) -> None:
@@ -37,6 +39,18 @@ def yaml_val(val: Any) -> str:
     return f'"{val}"'
 
 
+def yaml_text(text: Optional[str]) -> str:
+    """Single-line text safe inside the double quotes of the simple YAML format."""
+    return " ".join((text or "").replace('"', "'").replace("\\", "/").split())
+
+
+def format_field_hashes(fields: Any) -> str:
+    """Field hashes as one sync state value: 'title=1a2b3c4d;status=...' (a stored string passes through)."""
+    if isinstance(fields, dict):
+        return ";".join(f"{name}={value}" for name, value in fields.items())
+    return fields or ""
+
+
 def sort_key_numeric(item_id: str) -> tuple:
     """Sort key that handles N.M, N.M-TN, N.M-RN.M patterns numerically."""
     # Split into tokens of text and numbers: "1.1-T10" -> ["1", ".", "1", "-", "T", "10"]
@@ -50,6 +64,28 @@ def sort_key_numeric(item_id: str) -> tuple:
     return tuple(result)
 
 
+def diff_items(diff_results: Dict, kind: str) -> List[Dict]:
+    """Items of one kind from the diff, including those in pruned unchanged subtrees."""
+    return diff_results.get(kind, []) + diff_results.get("pruned", {}).get(kind, [])
+
+
+def unsynced_ids(sync_results: Dict, kind: str) -> set:
+    """IDs the sync reported as failed or left pending."""
+    section = sync_results.get(kind, {})
+    return {entry.get("id", "") for key in ("failed", "pending") for entry in section.get(key, [])}
+
+
+def recorded_hashes(item: Dict, unsynced: set) -> Tuple[str, Any]:
+    """Content and field hashes to record for an item that has a work item.
+
+    When its update failed or never ran, the hashes stored before this sync
+    are kept, so the next diff still sees the change.
+    """
+    if item.get("id", "") in unsynced and "previousHash" in item:
+        return item["previousHash"], item.get("previousFieldHashes", "")
+    return item.get("contentHash", ""), item.get("fieldHashes", "")
+
+
 def build_epic_id_map(sync_results: Dict) -> Dict[str, int]:
     """Build epic ID -> devops ID map from sync results."""
     result = {}
@@ -86,6 +122,25 @@ def build_task_id_map(sync_results: Dict) -> Dict[str, int]:
     return result
 
 
+def build_attachment_map(diff_results: Dict, sync_results: Dict) -> Dict[str, Dict]:
+    """Story ID -> {hash, url} of its attached story file.
+
+    Sync results hold the attachments uploaded (or kept) by this run; the
+    stored values from the diff cover stories the sync did not report.
+    """
+    result = {}
+    for story in diff_items(diff_results, "stories"):
+        if story.get("attachmentHash") or story.get("attachmentUrl"):
+            result[story.get("id", "")] = {
+                "hash": story.get("attachmentHash", ""),
+                "url": story.get("attachmentUrl", ""),
+            }
+    for sid, attachment in sync_results.get("stories", {}).get("attachments", {}).items():
+        if attachment.get("hash") or attachment.get("url"):
+            result[sid] = attachment
+    return result
+
+
 def build_iteration_map(sync_results: Dict) -> Dict[str, Dict]:
     """Extract iteration slug -> {epicId, devopsId} from sync results.
 
@@ -135,6 +190,35 @@ def write_sync_state(
 
     counts = {"epics": 0, "stories": 0, "tasks": 0, "iterations": 0,
               "pending_stories": 0, "pending_tasks": 0}
+    all_epics = diff_items(diff_results, "epics")
+    all_stories = diff_items(diff_results, "stories")
+    all_tasks = diff_items(diff_results, "tasks")
+
+    # Parent DevOps IDs: this sync's ID maps, else the diff (pruned parents are not in the maps)
+    parent_devops_ids = {}
+    for kind, items, id_map in (("epics", all_epics, epic_id_map), ("stories", all_stories, story_id_map)):
+        parent_devops_ids[kind] = {item.get("id", ""): item["devopsId"] for item in items
+                                   if item.get("classification") != "ORPHANED"
+                                   and item.get("devopsId") not in (None, "None", "")}
+        parent_devops_ids[kind].update(id_map)
+
+    # A subtree's roll-up hash is recorded only when every item in it is synced
+    unsynced = {kind: unsynced_ids(sync_results, kind) for kind in ("epics", "stories", "tasks")}
+    synced_ids = {}
+    for kind, items, id_map in (("epics", all_epics, epic_id_map), ("stories", all_stories, story_id_map),
+                                ("tasks", all_tasks, task_id_map)):
+        failed = unsynced[kind]
+        synced_ids[kind] = {item.get("id", "") for item in items
+                            if item.get("classification") != "ORPHANED" and item.get("id", "") not in failed
+                            and id_map.get(item.get("id", ""), item.get("devopsId")) not in (None, "None", "")}
+    clean_stories = set(synced_ids["stories"])
+    for task in all_tasks:
+        if task.get("classification") != "ORPHANED" and task.get("id", "") not in synced_ids["tasks"]:
+            clean_stories.discard(task.get("storyId", ""))
+    clean_epics = set(synced_ids["epics"])
+    for story in all_stories:
+        if story.get("classification") != "ORPHANED" and story.get("id", "") not in clean_stories:
+            clean_epics.discard(story.get("epicId", ""))
     lines = []
     lines.append(f"# Azure DevOps Sync State")
     lines.append(f"# Last full sync: {timestamp}")
@@ -143,7 +227,7 @@ def write_sync_state(
 
     # --- Epics ---
     lines.append("epics:")
-    epics = sorted(diff_results.get("epics", []),
+    epics = sorted(all_epics,
                    key=lambda e: sort_key_numeric(e.get("id", "")))
     for epic in epics:
         eid = epic.get("id", "")
@@ -156,11 +240,18 @@ def write_sync_state(
             devops_id = int(devops_id)
         except (ValueError, TypeError):
             continue
+        content_hash, fields = recorded_hashes(epic, unsynced["epics"])
         lines.append(f'  "{eid}":')
         lines.append(f"    devopsId: {devops_id}")
-        lines.append(f'    contentHash: "{epic.get("contentHash", "")}"')
+        if epic.get("title"):
+            lines.append(f'    title: "{yaml_text(epic["title"])}"')
+        lines.append(f'    contentHash: "{content_hash}"')
+        if fields:
+            lines.append(f'    fieldHashes: "{format_field_hashes(fields)}"')
+        if epic.get("treeHash") and eid in clean_epics:
+            lines.append(f'    treeHash: "{epic["treeHash"]}"')
         lines.append(f'    lastSynced: "{timestamp}"')
-        lines.append(f'    status: "synced"')
+        lines.append(f'    status: "{"pending" if eid in unsynced["epics"] else "synced"}"')
         counts["epics"] += 1
 
     lines.append("")
@@ -168,12 +259,13 @@ def write_sync_state(
     # --- Stories ---
     # Build set of story IDs that have attachments (from sync results + diff state)
     story_attached_ids = set(sync_results.get("stories", {}).get("attachedIds", []))
-    for story in diff_results.get("stories", []):
+    story_attachments = build_attachment_map(diff_results, sync_results)
+    for story in all_stories:
         if story.get("attached") == "true":
             story_attached_ids.add(story.get("id", ""))
 
     lines.append("stories:")
-    stories = sorted(diff_results.get("stories", []),
+    stories = sorted(all_stories,
                      key=lambda s: sort_key_numeric(s.get("id", "")))
     for story in stories:
         sid = story.get("id", "")
@@ -181,12 +273,12 @@ def write_sync_state(
             continue
         devops_id = story_id_map.get(sid, story.get("devopsId"))
         epic_id = story.get("epicId", "")
-        epic_devops_id = epic_id_map.get(epic_id, "")
+        epic_devops_id = parent_devops_ids["epics"].get(epic_id, "")
 
         is_pending = devops_id in (None, "None", "")
         lines.append(f'  "{sid}":')
         if is_pending:
-            lines.append(f'    contentHash: "{story.get("contentHash", "")}"')
+            # No contentHash: the next diff must see it as NEW so the work item gets created
             lines.append(f'    lastSynced: "{timestamp}"')
             lines.append(f'    status: "pending"')
             counts["pending_stories"] += 1
@@ -198,18 +290,30 @@ def write_sync_state(
             lines.append(f"    devopsId: {devops_id}")
             if epic_devops_id:
                 lines.append(f"    epicDevopsId: {epic_devops_id}")
-            lines.append(f'    contentHash: "{story.get("contentHash", "")}"')
+            if story.get("title"):
+                lines.append(f'    title: "{yaml_text(story["title"])}"')
+            content_hash, fields = recorded_hashes(story, unsynced["stories"])
+            lines.append(f'    contentHash: "{content_hash}"')
+            if fields:
+                lines.append(f'    fieldHashes: "{format_field_hashes(fields)}"')
+            if story.get("treeHash") and sid in clean_stories:
+                lines.append(f'    treeHash: "{story["treeHash"]}"')
             lines.append(f'    lastSynced: "{timestamp}"')
-            lines.append(f'    status: "synced"')
+            lines.append(f'    status: "{"pending" if sid in unsynced["stories"] else "synced"}"')
             if sid in story_attached_ids:
                 lines.append(f"    attached: true")
+                attachment = story_attachments.get(sid, {})
+                if attachment.get("hash"):
+                    lines.append(f'    attachmentHash: "{attachment["hash"]}"')
+                if attachment.get("url"):
+                    lines.append(f'    attachmentUrl: "{attachment["url"]}"')
         counts["stories"] += 1
 
     lines.append("")
 
     # --- Tasks ---
     lines.append("tasks:")
-    tasks = sorted(diff_results.get("tasks", []),
+    tasks = sorted(all_tasks,
                    key=lambda t: sort_key_numeric(t.get("id", "")))
     for task in tasks:
         tid = task.get("id", "")
@@ -217,12 +321,12 @@ def write_sync_state(
             continue
         devops_id = task_id_map.get(tid, task.get("devopsId"))
         story_id = task.get("storyId", "")
-        story_devops_id = story_id_map.get(story_id, "")
+        story_devops_id = parent_devops_ids["stories"].get(story_id, "")
 
         is_pending = devops_id in (None, "None", "")
         lines.append(f'  "{tid}":')
         if is_pending:
-            lines.append(f'    contentHash: "{task.get("contentHash", "")}"')
+            # No contentHash: the next diff must see it as NEW so the work item gets created
             lines.append(f'    lastSynced: "{timestamp}"')
             lines.append(f'    status: "pending"')
             counts["pending_tasks"] += 1
@@ -234,9 +338,17 @@ def write_sync_state(
             lines.append(f"    devopsId: {devops_id}")
             if story_devops_id:
                 lines.append(f"    storyDevopsId: {story_devops_id}")
-            lines.append(f'    contentHash: "{task.get("contentHash", "")}"')
+            title = task.get("title") or task.get("description", "")
+            if title:
+                lines.append(f'    title: "{yaml_text(title)}"')
+            if task.get("legacyId"):
+                lines.append(f'    legacyId: "{task["legacyId"]}"')
+            content_hash, fields = recorded_hashes(task, unsynced["tasks"])
+            lines.append(f'    contentHash: "{content_hash}"')
+            if fields:
+                lines.append(f'    fieldHashes: "{format_field_hashes(fields)}"')
             lines.append(f'    lastSynced: "{timestamp}"')
-            lines.append(f'    status: "synced"')
+            lines.append(f'    status: "{"pending" if tid in unsynced["tasks"] else "synced"}"')
         counts["tasks"] += 1
 
     lines.append("")
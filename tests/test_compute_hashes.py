@@ -1,6 +1,9 @@
 """Tests for compute-hashes.py."""
 
 import importlib
+import json
+import os
+import sys
 
 import pytest
 
@@ -333,6 +336,15 @@ class TestClassifyItems:
         assert results[0]["classification"] == "ORPHANED"
         assert results[0]["id"] == "1"
 
+    def test_attachment_state_carried_through(self):
+        parsed = [{"id": "1", "title": "Test"}]
+        stored = {"1": {"contentHash": "hash123", "devopsId": 100, "attached": "true",
+                        "attachmentHash": "f00d", "attachmentUrl": "https://dev.azure.com/o/_apis/wit/attachments/1"}}
+        result = compute_hashes.classify_items(parsed, stored, lambda x: "hash123")[0]
+        assert result["attached"] == "true"
+        assert result["attachmentHash"] == "f00d"
+        assert result["attachmentUrl"] == "https://dev.azure.com/o/_apis/wit/attachments/1"
+
     def test_mixed(self):
         parsed = [
             {"id": "1", "title": "Same"},
@@ -356,6 +368,451 @@ class TestClassifyItems:
         assert by_id["4"] == "ORPHANED"
 
 
+# --- HashMemo ---
+
+class TestHashMemo:
+    EPIC = {"id": "1", "title": "Foundation", "description": "Set  up\nthings", "phase": "1",
+            "requirements": ["FR2", "FR1"]}
+    STORY = {"id": "1.1", "title": "Login", "userStoryText": "As a user", "acceptanceCriteria": "Given x"}
+    TASK = {"id": "1.1-T1", "description": "Write code", "complete": True}
+
+    def _hash_all(self, memo):
+        epic_statuses = {"1": "in-progress"}
+        story_statuses = {"1.1": "review"}
+        return [
+            compute_hashes.memoized(memo, "epic", lambda e: compute_hashes.epic_hash_fields(e, epic_statuses),
+                                    lambda e: compute_hashes.hash_epic(e, epic_statuses))(self.EPIC),
+            compute_hashes.memoized(memo, "story", lambda s: compute_hashes.story_hash_fields(s, story_statuses),
+                                    lambda s: compute_hashes.hash_story(s, story_statuses))(self.STORY),
+            compute_hashes.memoized(memo, "task", compute_hashes.task_hash_fields,
+                                    compute_hashes.hash_task)(self.TASK),
+        ]
+
+    def test_same_hashes_as_without_memo(self, tmp_dir):
+        memo = compute_hashes.HashMemo(os.path.join(tmp_dir, "memo.json"))
+        assert self._hash_all(memo) == self._hash_all(None)
+        assert self._hash_all(memo) == self._hash_all(None)
+        assert (memo.hits, memo.misses) == (3, 3)
+
+    def test_persisted_between_runs(self, tmp_dir):
+        path = os.path.join(tmp_dir, "memo.json")
+        memo = compute_hashes.HashMemo(path)
+        expected = self._hash_all(memo)
+        memo.save()
+        memo = compute_hashes.HashMemo(path)
+        assert self._hash_all(memo) == expected
+        assert memo.stats()["hitRate"] == 1.0
+
+    def test_save_skipped_without_misses(self, tmp_dir):
+        path = os.path.join(tmp_dir, "memo.json")
+        memo = compute_hashes.HashMemo(path)
+        self._hash_all(memo)
+        memo.save()
+        os.utime(path, (0, 0))
+        memo = compute_hashes.HashMemo(path)
+        self._hash_all(memo)
+        memo.save()
+        assert os.path.getmtime(path) == 0
+        memo.hash("task", ["new"], lambda: "h")
+        memo.save()
+        assert os.path.getmtime(path) != 0
+        assert len(compute_hashes.HashMemo(path).entries) == 4
+
+    def test_changed_field_misses(self, tmp_dir):
+        memo = compute_hashes.HashMemo(os.path.join(tmp_dir, "memo.json"))
+        fields = compute_hashes.task_hash_fields
+        memo.hash("task", fields(self.TASK), lambda: compute_hashes.hash_task(self.TASK))
+        done = {**self.TASK, "complete": False}
+        result = memo.hash("task", fields(done), lambda: compute_hashes.hash_task(done))
+        assert result == compute_hashes.hash_task(done)
+        assert memo.misses == 2
+
+    def test_schema_version_change_discards_entries(self, tmp_dir):
+        path = os.path.join(tmp_dir, "memo.json")
+        memo = compute_hashes.HashMemo(path, version=1)
+        self._hash_all(memo)
+        memo.save()
+        assert len(compute_hashes.HashMemo(path, version=1).entries) == 3
+        assert len(compute_hashes.HashMemo(path, version=2).entries) == 0
+
+    def test_lru_eviction(self, tmp_dir):
+        memo = compute_hashes.HashMemo(os.path.join(tmp_dir, "memo.json"), max_entries=2)
+        memo.hash("task", ["a"], lambda: "ha")
+        memo.hash("task", ["b"], lambda: "hb")
+        memo.hash("task", ["a"], lambda: "unused")
+        memo.hash("task", ["c"], lambda: "hc")
+        assert memo.evicted == 1
+        assert memo.hash("task", ["a"], lambda: "recomputed") == "ha"
+        assert memo.hash("task", ["b"], lambda: "recomputed") == "recomputed"
+
+    def test_corrupt_file_ignored(self, tmp_file):
+        memo = compute_hashes.HashMemo(tmp_file("{not json", "memo.json"))
+        assert memo.entries == {}
+
+    def test_main_reports_hit_rate(self, tmp_file, tmp_dir, monkeypatch, capsys):
+        parsed = tmp_file(json.dumps({"epics": [self.EPIC], "stories": [self.STORY], "tasks": [self.TASK]}),
+                          "parsed.json")
+        output = os.path.join(tmp_dir, "diff.json")
+        monkeypatch.setattr(sys, "argv", ["compute-hashes.py", "--parsed", parsed, "--output", output])
+        compute_hashes.main()
+        compute_hashes.main()
+        capsys.readouterr()
+        with open(output, encoding="utf-8") as f:
+            summary = json.load(f)["summary"]
+        # Content hash and field hashes of each of the three items
+        assert summary["hashMemo"]["hits"] == 6
+        assert summary["hashMemo"]["hitRate"] == 1.0
+        assert os.path.isfile(os.path.join(tmp_dir, "_hash-memo.json"))
+
+
+# --- tree hashes and subtree pruning ---
+
+class TestTreeHashes:
+    PARSED = {
+        "epics": [{"id": "1", "title": "E1"}, {"id": "2", "title": "E2"}],
+        "stories": [{"id": "1.1", "epicId": "1", "title": "S11"}, {"id": "1.2", "epicId": "1", "title": "S12"},
+                    {"id": "2.1", "epicId": "2", "title": "S21"}],
+        "tasks": [{"id": "1.1-T1", "storyId": "1.1", "description": "a"},
+                  {"id": "1.2-T1", "storyId": "1.2", "description": "b"},
+                  {"id": "2.1-T1", "storyId": "2.1", "description": "c"}],
+    }
+
+    def _content(self, parsed):
+        return {
+            "epics": {e["id"]: compute_hashes.hash_epic(e) for e in parsed["epics"]},
+            "stories": {s["id"]: compute_hashes.hash_story(s) for s in parsed["stories"]},
+            "tasks": {t["id"]: compute_hashes.hash_task(t) for t in parsed["tasks"]},
+        }
+
+    def _changed_task(self):
+        parsed = json.loads(json.dumps(self.PARSED))
+        parsed["tasks"][0]["complete"] = True
+        return parsed
+
+    def _state(self, parsed):
+        """Fully synced state with roll-ups, as write-sync-state.py records it."""
+        content = self._content(parsed)
+        trees = compute_hashes.compute_tree_hashes(parsed, content)
+        state = {"epics": {}, "stories": {}, "tasks": {}, "iterations": {}}
+        for n, (kind, hashes) in enumerate(sorted(content.items())):
+            for m, (item_id, h) in enumerate(sorted(hashes.items())):
+                state[kind][item_id] = {"devopsId": 100 * (n + 1) + m, "contentHash": h}
+                if kind in trees:
+                    state[kind][item_id]["treeHash"] = trees[kind][item_id]
+        return state
+
+    def test_tree_hash_ignores_child_order(self):
+        assert compute_hashes.tree_hash("h", {"a": "1", "b": "2"}) == compute_hashes.tree_hash("h", {"b": "2", "a": "1"})
+        assert compute_hashes.tree_hash("h", {"a": "1"}) != compute_hashes.tree_hash("h", {"a": "2"})
+
+    def test_task_change_rolls_up_to_story_and_epic(self):
+        before = compute_hashes.compute_tree_hashes(self.PARSED, self._content(self.PARSED))
+        parsed = self._changed_task()
+        after = compute_hashes.compute_tree_hashes(parsed, self._content(parsed))
+        assert after["stories"]["1.1"] != before["stories"]["1.1"]
+        assert after["epics"]["1"] != before["epics"]["1"]
+        assert after["stories"]["1.2"] == before["stories"]["1.2"]
+        assert after["epics"]["2"] == before["epics"]["2"]
+
+    def test_unchanged_subtrees_pruned(self):
+        parsed = self._changed_task()
+        state = self._state(self.PARSED)
+        trees = compute_hashes.compute_tree_hashes(parsed, self._content(parsed))
+        pruned = compute_hashes.find_unchanged_subtrees(parsed, state, trees, set())
+        assert pruned["epics"] == {"2"}
+        assert pruned["stories"] == {"1.2", "2.1"}
+        assert pruned["tasks"] == {"1.2-T1", "2.1-T1"}
+
+    def test_kept_epics_and_unsynced_items_not_pruned(self):
+        state = self._state(self.PARSED)
+        del state["tasks"]["2.1-T1"]["devopsId"]
+        trees = compute_hashes.compute_tree_hashes(self.PARSED, self._content(self.PARSED))
+        pruned = compute_hashes.find_unchanged_subtrees(self.PARSED, state, trees, {"1"})
+        assert pruned == {"epics": set(), "stories": set(), "tasks": set()}
+
+    def test_state_without_tree_hashes_prunes_nothing(self):
+        state = self._state(self.PARSED)
+        for kind in ("epics", "stories"):
+            for entry in state[kind].values():
+                del entry["treeHash"]
+        trees = compute_hashes.compute_tree_hashes(self.PARSED, self._content(self.PARSED))
+        pruned = compute_hashes.find_unchanged_subtrees(self.PARSED, state, trees, set())
+        assert pruned == {"epics": set(), "stories": set(), "tasks": set()}
+
+    def test_main_lists_only_subtrees_needing_attention(self, tmp_file, tmp_dir, monkeypatch, capsys):
+        state = self._state(self.PARSED)
+        lines = []
+        for kind in ("epics", "stories", "tasks"):
+            lines.append(f"{kind}:")
+            for item_id, entry in state[kind].items():
+                lines.append(f'  "{item_id}":')
+                lines.extend(f'    {key}: "{value}"' for key, value in entry.items())
+        sync_state = tmp_file("\n".join(lines) + "\n", "devops-sync.yaml")
+        parsed = tmp_file(json.dumps(self._changed_task()), "parsed.json")
+        output = os.path.join(tmp_dir, "diff.json")
+        monkeypatch.setattr(sys, "argv", ["compute-hashes.py", "--parsed", parsed, "--sync-state", sync_state,
+                                          "--output", output, "--no-memo"])
+        compute_hashes.main()
+        capsys.readouterr()
+        with open(output, encoding="utf-8") as f:
+            diff = json.load(f)
+        assert [e["id"] for e in diff["epics"]] == ["1"]
+        assert [s["id"] for s in diff["stories"]] == ["1.1"]
+        assert [(t["id"], t["classification"]) for t in diff["tasks"]] == [("1.1-T1", "CHANGED")]
+        assert [s["id"] for s in diff["pruned"]["stories"]] == ["1.2", "2.1"]
+        assert diff["pruned"]["epics"][0]["devopsId"] == state["epics"]["2"]["devopsId"]
+        assert diff["summary"]["pruned"] == {"epics": 1, "stories": 2, "tasks": 2}
+        assert diff["summary"]["stories"]["UNCHANGED"] == 3
+        assert diff["summary"]["tasks"]["CHANGED"] == 1
+
+
+# --- renumbered (MOVED) items ---
+
+class TestReassignMovedItems:
+    def _story(self, story_id, title, epic_id="1"):
+        return {"id": story_id, "epicId": epic_id, "title": title}
+
+    def _stored(self, stories, epic_devops_id=10):
+        """Synced state for stories, devopsId 100, 101, ... in order."""
+        return {s["id"]: {"devopsId": 100 + n, "contentHash": compute_hashes.hash_story(s),
+                          "epicDevopsId": epic_devops_id, "title": s["title"]}
+                for n, s in enumerate(stories)}
+
+    def _reassign(self, stories, stored, epic_devops_ids=None):
+        results = compute_hashes.classify_items(stories, stored, compute_hashes.hash_story)
+        moved = compute_hashes.reassign_moved_items(results, stored, "epicId", "epicDevopsId",
+                                                    epic_devops_ids or {"1": 10})
+        return results, moved
+
+    def test_insertion_shifts_work_items_instead_of_rewriting_them(self):
+        before = [self._story("1.1", "Login"), self._story("1.2", "Logout"), self._story("1.3", "Profile page")]
+        after = [self._story("1.1", "Login"), self._story("1.2", "Password reset"),
+                 self._story("1.3", "Logout"), self._story("1.4", "Profile page")]
+        results, moved = self._reassign(after, self._stored(before))
+        by_id = {r["id"]: r for r in results}
+        assert moved == {"1.3": "1.2", "1.4": "1.3"}
+        assert by_id["1.1"]["classification"] == "UNCHANGED"
+        assert (by_id["1.2"]["classification"], by_id["1.2"]["devopsId"]) == ("NEW", None)
+        assert (by_id["1.3"]["classification"], by_id["1.3"]["devopsId"]) == ("MOVED", 101)
+        assert by_id["1.4"]["devopsId"] == 102
+        assert by_id["1.4"]["previousHash"] == by_id["1.4"]["contentHash"]
+        assert not [r for r in results if r["classification"] == "ORPHANED"]
+
+    def test_deletion_orphans_only_the_deleted_item(self):
+        before = [self._story("1.1", "Login"), self._story("1.2", "Logout"), self._story("1.3", "Profile page")]
+        after = [self._story("1.1", "Login"), self._story("1.2", "Profile page")]
+        results, moved = self._reassign(after, self._stored(before))
+        assert moved == {"1.2": "1.3"}
+        assert [(r["id"], r["classification"], r["devopsId"]) for r in results] == [
+            ("1.1", "UNCHANGED", 100), ("1.2", "MOVED", 102), ("1.2", "ORPHANED", 101)]
+
+    def test_similar_title_matches_edited_renumbered_item(self):
+        before = [self._story("1.1", "Export invoices to CSV")]
+        after = [{**self._story("1.2", "Export invoices to CSV file"), "userStory": "edited"}]
+        results, moved = self._reassign(after, self._stored(before))
+        assert moved == {"1.2": "1.1"}
+        assert results[0]["previousHash"] != results[0]["contentHash"]
+
+    def test_dissimilar_title_stays_orphan_and_new(self):
+        before = [self._story("1.1", "Export invoices")]
+        after = [self._story("1.2", "Import customers")]
+        results, moved = self._reassign(after, self._stored(before))
+        assert moved == {}
+        assert sorted(r["classification"] for r in results) == ["NEW", "ORPHANED"]
+
+    def test_no_match_across_parents(self):
+        before = [self._story("1.1", "Login")]
+        after = [self._story("2.1", "Login", epic_id="2")]
+        results, moved = self._reassign(after, self._stored(before), {"1": 10, "2": 20})
+        assert moved == {}
+
+    def test_unrelated_pairs_scale_linearly(self, monkeypatch):
+        count = 3000
+        tasks = [{"id": f"2.{n}-T1", "storyId": f"2.{n}", "description": f"new task {n}"} for n in range(count)]
+        stored = {f"1.{n}-T1": {"devopsId": 1000 + n, "storyDevopsId": 100 + n, "title": f"old task {n}",
+                                "contentHash": "old"} for n in range(count)}
+        results = compute_hashes.classify_items(tasks, stored, compute_hashes.hash_task)
+        calls = []
+        normalize = compute_hashes.normalize
+        monkeypatch.setattr(compute_hashes, "normalize", lambda text: calls.append(text) or normalize(text))
+        parents = {f"2.{n}": 5000 + n for n in range(count)}
+        moved = compute_hashes.reassign_moved_items(results, stored, "storyId", "storyDevopsId", parents,
+                                                    title_field="description")
+        assert moved == {}
+        # Each stored title is normalized once; no item is compared against another parent's entries
+        assert len(calls) <= count
+
+    def test_same_id_under_another_parent_is_not_the_same_work_item(self):
+        tasks = [{"id": "1.2-T1", "storyId": "1.2", "description": "Write tests"}]
+        stored = {"1.2-T1": {"devopsId": 500, "contentHash": compute_hashes.hash_task(tasks[0]),
+                             "storyDevopsId": 200},
+                  "1.1-T1": {"devopsId": 501, "contentHash": compute_hashes.hash_task(tasks[0]),
+                             "storyDevopsId": 201}}
+        # Story 1.2 now holds the work item story 1.1 had
+        results = compute_hashes.classify_items(tasks, stored, compute_hashes.hash_task)
+        moved = compute_hashes.reassign_moved_items(results, stored, "storyId", "storyDevopsId", {"1.2": 201})
+        assert moved == {"1.2-T1": "1.1-T1"}
+        assert [(r["id"], r["classification"], r["devopsId"]) for r in results] == [
+            ("1.2-T1", "MOVED", 501), ("1.2-T1", "ORPHANED", 500)]
+
+    def test_main_moves_children_with_their_story(self, tmp_file, tmp_dir, monkeypatch, capsys):
+        story = {"id": "1.1", "epicId": "1", "title": "Login"}
+        task = {"id": "1.1-T1", "storyId": "1.1", "description": "Form"}
+        state = "\n".join([
+            "epics:", '  "1":', '    devopsId: "10"', f'    contentHash: "{compute_hashes.hash_epic({"id": "1"})}"',
+            "stories:", '  "1.1":', '    devopsId: "100"', '    epicDevopsId: "10"',
+            f'    contentHash: "{compute_hashes.hash_story(story)}"',
+            "tasks:", '  "1.1-T1":', '    devopsId: "1000"', '    storyDevopsId: "100"',
+            f'    contentHash: "{compute_hashes.hash_task(task)}"',
+            "iterations:", '  "epic-1":', '    devopsId: "abc"', '    epicId: "1"',
+        ]) + "\n"
+        parsed = {"epics": [{"id": "1"}], "epicStatuses": {"1": "in-progress"},
+                  "stories": [{"id": "1.1", "epicId": "1", "title": "Signup"}, {**story, "id": "1.2"}],
+                  "tasks": [{"id": "1.1-T1", "storyId": "1.1", "description": "Captcha"},
+                            {**task, "id": "1.2-T1", "storyId": "1.2"}]}
+        output = os.path.join(tmp_dir, "diff.json")
+        monkeypatch.setattr(sys, "argv", ["compute-hashes.py", "--parsed", tmp_file(json.dumps(parsed), "p.json"),
+                                          "--sync-state", tmp_file(state, "devops-sync.yaml"),
+                                          "--output", output, "--no-memo"])
+        compute_hashes.main()
+        capsys.readouterr()
+        with open(output, encoding="utf-8") as f:
+            diff = json.load(f)
+        assert [(s["id"], s["classification"], s["devopsId"]) for s in diff["stories"]] == [
+            ("1.1", "NEW", None), ("1.2", "MOVED", 100)]
+        assert [(t["id"], t["classification"], t["devopsId"]) for t in diff["tasks"]] == [
+            ("1.1-T1", "NEW", None), ("1.2-T1", "MOVED", 1000)]
+        assert diff["iterations"][0]["storyIds"] == ["1.1"]
+        assert diff["iterations"][0]["taskIds"] == ["1.1-T1"]
+        assert diff["summary"]["stories"]["MOVED"] == 1
+
+    def test_main_no_moves_matches_by_id(self, tmp_file, tmp_dir, monkeypatch, capsys):
+        story = {"id": "1.1", "epicId": "1", "title": "Login"}
+        state = "\n".join(["stories:", '  "1.1":', '    devopsId: "100"',
+                           f'    contentHash: "{compute_hashes.hash_story(story)}"']) + "\n"
+        parsed = {"epics": [], "stories": [{**story, "id": "1.2"}], "tasks": []}
+        output = os.path.join(tmp_dir, "diff.json")
+        monkeypatch.setattr(sys, "argv", ["compute-hashes.py", "--parsed", tmp_file(json.dumps(parsed), "p.json"),
+                                          "--sync-state", tmp_file(state, "devops-sync.yaml"),
+                                          "--output", output, "--no-memo", "--no-moves"])
+        compute_hashes.main()
+        capsys.readouterr()
+        with open(output, encoding="utf-8") as f:
+            diff = json.load(f)
+        assert sorted(s["classification"] for s in diff["stories"]) == ["NEW", "ORPHANED"]
+
+
+# --- legacy task ID migration ---
+
+class TestMigrateLegacyTaskIds:
+    def test_positional_keys_rekeyed(self):
+        state = {"tasks": {"1.1-T1": {"devopsId": 5, "contentHash": "a"},
+                           "1.1-T2": {"devopsId": 6, "contentHash": "b"}}}
+        tasks = [{"id": "1.1-Tabc123", "legacyId": "1.1-T1"}, {"id": "1.1-Tdef456", "legacyId": "1.1-T2"}]
+        assert compute_hashes.migrate_legacy_task_ids(state, tasks) == 2
+        assert state["tasks"] == {"1.1-Tabc123": {"devopsId": 5, "contentHash": "a"},
+                                  "1.1-Tdef456": {"devopsId": 6, "contentHash": "b"}}
+
+    def test_already_migrated_state_untouched(self):
+        state = {"tasks": {"1.1-Tabc123": {"devopsId": 5}, "1.1-T1": {"devopsId": 9}}}
+        tasks = [{"id": "1.1-Tabc123", "legacyId": "1.1-T1"}, {"id": "1.1-T9"}]
+        assert compute_hashes.migrate_legacy_task_ids(state, tasks) == 0
+        assert state["tasks"]["1.1-T1"] == {"devopsId": 9}
+
+    def test_edited_task_text_moves_work_item(self):
+        old = {"id": "1.1-Tabc123", "storyId": "1.1", "description": "Build the orders API endpoints"}
+        new = {"id": "1.1-Tfed321", "storyId": "1.1", "description": "Build the order API endpoints"}
+        stored = {old["id"]: {"devopsId": 7, "storyDevopsId": 3, "title": old["description"],
+                              "contentHash": compute_hashes.hash_task(old)}}
+        results = compute_hashes.classify_items([new], stored, compute_hashes.hash_task)
+        moved = compute_hashes.reassign_moved_items(results, stored, "storyId", "storyDevopsId", {"1.1": 3},
+                                                    title_field="description")
+        assert moved == {new["id"]: old["id"]}
+        assert [(r["classification"], r["devopsId"]) for r in results] == [("MOVED", 7)]
+
+    def _reworded(self, stored_position):
+        old = {"id": "1.1-Tabc123", "storyId": "1.1", "description": "Add login form", "legacyId": "1.1-T2"}
+        new = {"id": "1.1-Tfed321", "storyId": "1.1", "description": "Wire SSO redirect", "legacyId": "1.1-T2"}
+        stored = {old["id"]: {"devopsId": 7, "storyDevopsId": 3, "title": old["description"],
+                              "contentHash": compute_hashes.hash_task(old), "legacyId": stored_position}}
+        results = compute_hashes.classify_items([new], stored, compute_hashes.hash_task)
+        moved = compute_hashes.reassign_moved_items(results, stored, "storyId", "storyDevopsId", {"1.1": 3},
+                                                    title_field="description", position_field="legacyId")
+        return results, moved
+
+    def test_rewritten_task_keeps_work_item_at_same_position(self):
+        results, moved = self._reworded("1.1-T2")
+        assert moved == {"1.1-Tfed321": "1.1-Tabc123"}
+        assert [(r["classification"], r["devopsId"]) for r in results] == [("MOVED", 7)]
+
+    def test_rewritten_task_at_another_position_is_new(self):
+        results, moved = self._reworded("1.1-T1")
+        assert moved == {}
+        assert sorted(r["classification"] for r in results) == ["NEW", "ORPHANED"]
+
+
+# --- field hashes ---
+
+class TestFieldHashes:
+    STORY = {"id": "1.1", "title": "Login", "userStoryText": "As a user", "acceptanceCriteria": "Given X"}
+    TASK = {"id": "1.1-Tabc123", "description": "Build", "complete": False,
+            "subtasks": [{"description": "Form", "complete": False}]}
+
+    def _fields(self, item, kind):
+        values = (compute_hashes.story_field_values(item) if kind == "stories"
+                  else compute_hashes.task_field_values(item))
+        return compute_hashes.field_hashes(values)
+
+    def _stored(self, item, kind):
+        hash_fn = compute_hashes.hash_story if kind == "stories" else compute_hashes.hash_task
+        fields = self._fields(item, kind)
+        return {item["id"]: {"devopsId": 5, "contentHash": hash_fn(item),
+                             "fieldHashes": ";".join(f"{k}={v}" for k, v in fields.items())}}
+
+    def _classify(self, item, stored, kind):
+        hash_fn = compute_hashes.hash_story if kind == "stories" else compute_hashes.hash_task
+        return compute_hashes.classify_items([item], stored, hash_fn,
+                                             fields_fn=lambda i: self._fields(i, kind))[0]
+
+    def test_field_names(self):
+        assert list(self._fields(self.STORY, "stories")) == ["title", "description", "acceptanceCriteria", "status"]
+        assert list(self._fields(self.TASK, "tasks")) == ["title", "status", "subtasks"]
+        assert all(len(h) == compute_hashes.FIELD_HASH_LENGTH for h in self._fields(self.TASK, "tasks").values())
+
+    def test_parse_field_hashes(self):
+        assert compute_hashes.parse_field_hashes("title=aa; status=bb;junk") == {"title": "aa", "status": "bb"}
+        assert compute_hashes.parse_field_hashes("") == {}
+        assert compute_hashes.parse_field_hashes({"title": "aa"}) == {"title": "aa"}
+
+    def test_changed_fields_listed(self):
+        stored = self._stored(self.STORY, "stories")
+        result = self._classify({**self.STORY, "acceptanceCriteria": "Given Y"}, stored, "stories")
+        assert result["classification"] == "CHANGED"
+        assert result["changedFields"] == ["acceptanceCriteria"]
+        assert result["fieldHashes"]["title"] == self._fields(self.STORY, "stories")["title"]
+
+    def test_subtask_change_outside_content_hash(self):
+        stored = self._stored(self.TASK, "tasks")
+        ticked = {**self.TASK, "subtasks": [{"description": "Form", "complete": True}]}
+        result = self._classify(ticked, stored, "tasks")
+        assert result["contentHash"] == stored[self.TASK["id"]]["contentHash"]
+        assert (result["classification"], result["changedFields"]) == ("CHANGED", ["subtasks"])
+
+    def test_without_stored_field_hashes(self):
+        stored = self._stored(self.STORY, "stories")
+        del stored["1.1"]["fieldHashes"]
+        assert self._classify(self.STORY, stored, "stories")["classification"] == "UNCHANGED"
+        result = self._classify({**self.STORY, "title": "Logout"}, stored, "stories")
+        assert result["changedFields"] == ["title", "description", "acceptanceCriteria", "status"]
+
+    def test_tree_leaf_hash_counts_subtasks(self):
+        fields = self._fields(self.TASK, "tasks")
+        assert compute_hashes.tree_leaf_hash("abc", fields) != "abc"
+        no_subtasks = self._fields({**self.TASK, "subtasks": []}, "tasks")
+        assert compute_hashes.tree_leaf_hash("abc", no_subtasks) == "abc"
+        assert compute_hashes.tree_leaf_hash("abc") == "abc"
+
+
 # --- EXISTS iteration filtering ---
 
 class TestExistsIterationFiltering:
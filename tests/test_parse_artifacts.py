@@ -1,6 +1,7 @@
 """Tests for parse-artifacts.py."""
 
 import importlib
+import json
 import os
 
 import pytest
@@ -254,6 +255,45 @@ class TestParseEpicsFile:
         assert len(stories) == 1
 
 
+    def test_summary_section_does_not_leak_into_detailed_epics(self, tmp_file):
+        content = (
+            "## Summary\n"
+            "### Epic 1: Summary title\nSummary text\n\n"
+            "## Epic 1: Foundation\nDetailed text FR-1\n"
+            "### Story 1.1: Setup\nStory text\n"
+            "## Epic 2: Next\nNext text\n"
+        )
+        path = tmp_file(content)
+        epics, stories = parse_artifacts.parse_epics_file(path)
+        assert [(e["id"], e["title"], e["description"]) for e in epics] == [
+            ("1", "Foundation", "Detailed text FR-1"), ("2", "Next", "Next text")
+        ]
+        assert epics[0]["requirements"] == ["FR-1"]
+        assert stories[0]["userStoryText"] == "Story text"
+
+    def test_epic_content_stops_at_story_level_heading(self, tmp_file):
+        content = (
+            "## Epic 1: Test\nEpic text\n"
+            "### Notes\nNot epic text FR-9\n"
+            "### Story 1.1: Setup\nStory text\n"
+            "#### Technical Notes\nStill story text\n"
+            "**Acceptance Criteria:**\n- works\n"
+            "**Notes:** after AC\n"
+        )
+        path = tmp_file(content)
+        epics, stories = parse_artifacts.parse_epics_file(path)
+        assert epics[0]["description"] == "Epic text"
+        assert epics[0]["requirements"] == []
+        assert stories[0]["userStoryText"] == "Story text\nStill story text\n**Notes:** after AC"
+        assert stories[0]["acceptanceCriteria"] == "- works"
+
+    def test_top_level_story_headings(self, tmp_file):
+        path = tmp_file("# Story 1.1: Top\nText\n# Story 1.2: Next\n")
+        epics, stories = parse_artifacts.parse_epics_file(path)
+        assert epics == []
+        assert [s["id"] for s in stories] == ["1.1", "1.2"]
+
+
 # --- parse_story_file ---
 
 class TestParseStoryFile:
@@ -269,14 +309,31 @@ class TestParseStoryFile:
         path = tmp_file(content)
         tasks, status, review_tasks = parse_artifacts.parse_story_file("1.1", path)
         assert len(tasks) == 2
-        assert tasks[0]["id"] == "1.1-T1"
+        second = "1.1-T" + parse_artifacts.task_anchor("Second task")
+        assert tasks[0]["id"] == "1.1-T" + parse_artifacts.task_anchor("first   TASK ")
+        assert tasks[0]["legacyId"] == "1.1-T1"
         assert tasks[0]["complete"] is False
-        assert tasks[1]["id"] == "1.1-T2"
+        assert tasks[1]["id"] == second
+        assert tasks[1]["legacyId"] == "1.1-T2"
         assert tasks[1]["complete"] is True
         assert len(tasks[1]["subtasks"]) == 2
-        assert tasks[1]["subtasks"][0]["id"] == "1.1-T2.1"
+        assert tasks[1]["subtasks"][0]["id"] == second + ".1"
         assert tasks[1]["subtasks"][1]["complete"] is True
 
+    def test_task_ids_survive_insertion(self, tmp_file):
+        before = "## Tasks / Subtasks\n- [ ] Build API\n- [ ] Write docs\n"
+        after = "## Tasks / Subtasks\n- [ ] Add config\n- [x] Build API\n- [ ] Write docs\n"
+        old, _, _ = parse_artifacts.parse_story_file("1.1", tmp_file(before))
+        new, _, _ = parse_artifacts.parse_story_file("1.1", tmp_file(after, "after.md"))
+        assert [t["id"] for t in new][1:] == [t["id"] for t in old]
+        assert [t["legacyId"] for t in new][1:] == ["1.1-T2", "1.1-T3"]
+
+    def test_repeated_task_text_gets_suffix(self, tmp_file):
+        path = tmp_file("## Tasks / Subtasks\n- [ ] Write tests\n- [ ] Other\n- [x] Write  tests\n")
+        tasks, _, _ = parse_artifacts.parse_story_file("1.1", path)
+        base = "1.1-T" + parse_artifacts.task_anchor("Write tests")
+        assert [t["id"] for t in tasks if "Write" in t["description"]] == [base, base + "-2"]
+
     def test_status_extraction(self, tmp_file):
         path = tmp_file("**Status:** done\n## Tasks / Subtasks\n- [ ] Task\n")
         _, status, _ = parse_artifacts.parse_story_file("1.1", path)
@@ -299,12 +356,14 @@ class TestParseStoryFile:
         path = tmp_file(content)
         _, _, review_tasks = parse_artifacts.parse_story_file("1.1", path)
         assert len(review_tasks) == 3
-        assert review_tasks[0]["id"] == "1.1-R1.1"
+        assert review_tasks[0]["id"] == "1.1-R1." + parse_artifacts.task_anchor("Fix error handling")
+        assert review_tasks[0]["legacyId"] == "1.1-R1.1"
         assert review_tasks[0]["reviewRound"] == 1
         assert review_tasks[0]["isReviewFollowup"] is True
-        assert review_tasks[1]["id"] == "1.1-R1.2"
+        assert review_tasks[1]["legacyId"] == "1.1-R1.2"
         assert review_tasks[1]["complete"] is True
-        assert review_tasks[2]["id"] == "1.1-R2.1"
+        assert review_tasks[2]["id"] == "1.1-R2." + parse_artifacts.task_anchor("Refactor method")
+        assert review_tasks[2]["legacyId"] == "1.1-R2.1"
         assert review_tasks[2]["reviewRound"] == 2
 
     def test_nonexistent_file(self):
@@ -364,6 +423,30 @@ class TestParseStoryFile:
         assert tasks[1]["subtaskHtml"] == ""
 
 
+    def test_review_section_ends_tasks_section(self, tmp_file):
+        content = (
+            "Status: review\n\n"
+            "## Tasks / Subtasks\n"
+            "- [x] Task one (AC: 2, 1)\n"
+            "  - [ ] Sub one\n"
+            "### Review Follow-ups (AI)\n"
+            "- [ ] [AI-Review][HIGH] Fix it [src/a.py:3]\n"
+            "  - [ ] not a review item\n"
+            "### Review Follow-ups Round 2 (AI)\n"
+            "- [x] [LOW] Tidy\n"
+            "## Dev Notes\n"
+            "- [ ] neither a task nor a review item\n"
+            "Status: ignored\n"
+        )
+        tasks, status, review = parse_artifacts.parse_story_file("1.1", tmp_file(content))
+        assert status == "review"
+        assert [(t["legacyId"], t["acReferences"]) for t in tasks] == [("1.1-T1", [1, 2])]
+        assert [st["id"] for st in tasks[0]["subtasks"]] == [tasks[0]["id"] + ".1"]
+        assert [(r["legacyId"], r["priority"], r["filePath"], r["cleanTitle"]) for r in review] == [
+            ("1.1-R1.1", 1, "src/a.py:3", "Fix it"), ("1.1-R2.1", 3, None, "Tidy")
+        ]
+
+
 # --- story_id_from_filename ---
 
 class TestStoryIdFromFilename:
@@ -417,6 +500,344 @@ class TestScanStoryFiles:
         assert reviews == {}
         assert file_paths == {}
 
+    def _story(self, path, status):
+        path.write_text(f"Status: {status}\n## Tasks / Subtasks\n- [ ] Task\n", encoding="utf-8")
+
+    def test_known_nested_wins_over_flat(self, tmp_path):
+        (tmp_path / "1.1").mkdir()
+        self._story(tmp_path / "1.1" / "story.md", "nested")
+        self._story(tmp_path / "1-1-flat.md", "flat")
+        _, statuses, _, file_paths = parse_artifacts.scan_story_files(str(tmp_path), ["1.1"])
+        assert statuses["1.1"] == "nested"
+        assert file_paths["1.1"].endswith("story.md")
+
+    def test_flat_wins_over_unknown_nested(self, tmp_path):
+        (tmp_path / "3.2").mkdir()
+        self._story(tmp_path / "3.2" / "story.md", "nested")
+        self._story(tmp_path / "3-2-flat.md", "flat")
+        _, statuses, _, _ = parse_artifacts.scan_story_files(str(tmp_path), [])
+        assert statuses["3.2"] == "flat"
+
+    def test_duplicate_flat_files_resolve_by_name(self, tmp_path):
+        self._story(tmp_path / "1-1-b.md", "second")
+        self._story(tmp_path / "1-1-a.md", "first")
+        _, statuses, _, _ = parse_artifacts.scan_story_files(str(tmp_path), [])
+        assert statuses["1.1"] == "first"
+
+    def test_discovery_order(self, tmp_path):
+        for name in ("2-1-x.md", "1-2-y.md"):
+            self._story(tmp_path / name, "draft")
+        for sid in ("4.1", "1.1"):
+            (tmp_path / sid).mkdir()
+            self._story(tmp_path / sid / "story.md", "draft")
+        (tmp_path / "5.5").mkdir()  # no story.md
+        found = parse_artifacts.discover_story_files(str(tmp_path), ["1.1", "9.9"])
+        assert [sid for sid, _ in found] == ["1.1", "1.2", "2.1", "4.1"]
+
+    def test_parallel_matches_serial(self, tmp_path):
+        for n in range(1, 21):
+            self._story(tmp_path / f"{n % 3 + 1}-{n}-story.md", f"s{n}")
+        serial = parse_artifacts.scan_story_files(str(tmp_path), [])
+        parallel = parse_artifacts.scan_story_files(str(tmp_path), [], jobs=4)
+        assert parallel == serial
+        assert list(parallel[1]) == list(serial[1])
+
+
+# --- ParseCache ---
+
+STORY_WITH_TASKS = "Status: in-progress\n\n## Tasks / Subtasks\n\n- [x] Task 1: Setup\n  - [ ] 1.1 Configure\n"
+
+
+def _age(path, seconds=60):
+    """Move a file's mtime into the past so the cache trusts size + mtime alone."""
+    old = os.stat(path).st_mtime - seconds
+    os.utime(path, (old, old))
+
+
+class TestParseCache:
+    def _cache(self, tmp_path, version="test"):
+        return parse_artifacts.ParseCache(str(tmp_path / "cache.json"), version=version)
+
+    def test_unchanged_file_served_from_cache(self, tmp_path):
+        story = tmp_path / "1-1-a.md"
+        story.write_text(STORY_WITH_TASKS, encoding="utf-8")
+        _age(str(story))
+        first = self._cache(tmp_path)
+        expected = parse_artifacts.parse_story_file("1.1", str(story), first)
+        first.save()
+
+        second = self._cache(tmp_path)
+        calls = []
+        result = second.lookup(str(story), "story", "1.1", lambda c: calls.append(c))
+        assert calls == []
+        assert second.hits == 1 and second.misses == 0
+        assert (result["tasks"], result["status"], result["reviewTasks"]) == expected
+
+    def test_changed_content_reparsed(self, tmp_path):
+        story = tmp_path / "1-1-a.md"
+        story.write_text(STORY_WITH_TASKS, encoding="utf-8")
+        cache = self._cache(tmp_path)
+        parse_artifacts.parse_story_file("1.1", str(story), cache)
+        cache.save()
+
+        story.write_text(STORY_WITH_TASKS.replace("in-progress", "done"), encoding="utf-8")
+        cache = self._cache(tmp_path)
+        _, status, _ = parse_artifacts.parse_story_file("1.1", str(story), cache)
+        assert status == "done"
+        assert cache.misses == 1
+
+    def test_same_size_edit_with_same_mtime_detected(self, tmp_path):
+        story = tmp_path / "1-1-a.md"
+        story.write_text(STORY_WITH_TASKS, encoding="utf-8")
+        cache = self._cache(tmp_path)
+        parse_artifacts.parse_story_file("1.1", str(story), cache)
+        cache.save()
+
+        st = os.stat(str(story))
+        story.write_text(STORY_WITH_TASKS.replace("[x]", "[ ]"), encoding="utf-8")
+        os.utime(str(story), ns=(st.st_atime_ns, st.st_mtime_ns))
+        cache = self._cache(tmp_path)
+        tasks, _, _ = parse_artifacts.parse_story_file("1.1", str(story), cache)
+        assert tasks[0]["complete"] is False
+
+    def test_touched_file_served_by_content_hash(self, tmp_path):
+        story = tmp_path / "1-1-a.md"
+        story.write_text(STORY_WITH_TASKS, encoding="utf-8")
+        cache = self._cache(tmp_path)
+        parse_artifacts.parse_story_file("1.1", str(story), cache)
+        cache.save()
+
+        os.utime(str(story), None)
+        cache = self._cache(tmp_path)
+        parse_artifacts.parse_story_file("1.1", str(story), cache)
+        assert cache.hits == 1 and cache.misses == 0
+
+    def test_version_change_invalidates(self, tmp_path):
+        story = tmp_path / "1-1-a.md"
+        story.write_text(STORY_WITH_TASKS, encoding="utf-8")
+        _age(str(story))
+        cache = self._cache(tmp_path, version="1:old")
+        parse_artifacts.parse_story_file("1.1", str(story), cache)
+        cache.save()
+
+        cache = self._cache(tmp_path, version="2:new")
+        assert cache.entries == {}
+        parse_artifacts.parse_story_file("1.1", str(story), cache)
+        assert cache.misses == 1
+
+    def test_different_story_id_reparsed(self, tmp_path):
+        story = tmp_path / "story.md"
+        story.write_text(STORY_WITH_TASKS, encoding="utf-8")
+        _age(str(story))
+        cache = self._cache(tmp_path)
+        parse_artifacts.parse_story_file("1.1", str(story), cache)
+        cache.save()
+
+        cache = self._cache(tmp_path)
+        tasks, _, _ = parse_artifacts.parse_story_file("2.3", str(story), cache)
+        assert cache.misses == 1
+        assert tasks[0]["id"].startswith("2.3")
+
+    def test_save_drops_files_not_seen(self, tmp_path):
+        a = tmp_path / "1-1-a.md"
+        b = tmp_path / "1-2-b.md"
+        a.write_text(STORY_WITH_TASKS, encoding="utf-8")
+        b.write_text(STORY_WITH_TASKS, encoding="utf-8")
+        cache = self._cache(tmp_path)
+        parse_artifacts.scan_story_files(str(tmp_path), [], cache)
+        cache.save()
+        b.unlink()
+
+        cache = self._cache(tmp_path)
+        parse_artifacts.scan_story_files(str(tmp_path), [], cache)
+        cache.save()
+        assert list(self._cache(tmp_path).entries) == [os.path.abspath(str(a))]
+
+    def test_cached_epics_match_uncached(self, tmp_file, tmp_path):
+        content = (
+            "## Epic 1: Foundation\n\nSetup.\n\n"
+            "### Story 1.1: Init\n\nAs a dev, I want init.\n\n"
+            "**Acceptance Criteria:**\n\n**Given** x\n**When** y\n**Then** z\n"
+        )
+        path = tmp_file(content, "epics.md")
+        _age(path)
+        expected = parse_artifacts.parse_epics_file(path)
+        cache = self._cache(tmp_path)
+        assert parse_artifacts.parse_epics_file(path, cache) == expected
+        cache.save()
+        cache = self._cache(tmp_path)
+        assert parse_artifacts.parse_epics_file(path, cache) == expected
+        assert cache.hits == 1
+
+    def test_corrupt_cache_ignored(self, tmp_path):
+        (tmp_path / "cache.json").write_text("{not json", encoding="utf-8")
+        assert self._cache(tmp_path).entries == {}
+
+    def test_fingerprint_includes_version(self):
+        assert parse_artifacts.parser_fingerprint().startswith(f"{parse_artifacts.PARSE_CACHE_VERSION}:")
+
+
+# --- sharded epics input ---
+
+def _shard(epic_id, story_ids):
+    lines = [f"## Epic {epic_id}: Area {epic_id}", "", f"Work for area {epic_id}.", ""]
+    for sid in story_ids:
+        lines += [f"### Story {sid}: Story {sid}", "", f"As a user, I want {sid}.", ""]
+    return "\n".join(lines)
+
+
+class TestEpicsShards:
+    def _write(self, root, shards):
+        root.mkdir(exist_ok=True)
+        for name, content in shards.items():
+            (root / name).write_text(content, encoding="utf-8")
+
+    def test_resolve_directory_natural_order(self, tmp_path):
+        self._write(tmp_path / "epics", {"epic-10.md": "", "epic-2.md": "", "notes.txt": ""})
+        paths = parse_artifacts.resolve_epics_paths(str(tmp_path / "epics"))
+        assert [os.path.basename(p) for p in paths] == ["epic-2.md", "epic-10.md"]
+
+    def test_resolve_glob_and_single_file(self, tmp_path):
+        self._write(tmp_path / "epics", {"epic-1.md": "", "other.md": ""})
+        paths = parse_artifacts.resolve_epics_paths(str(tmp_path / "epics" / "epic-*.md"))
+        assert [os.path.basename(p) for p in paths] == ["epic-1.md"]
+        assert parse_artifacts.resolve_epics_paths("/some/epics.md") == ["/some/epics.md"]
+
+    def test_shards_merged_in_order(self, tmp_path):
+        self._write(tmp_path / "epics", {
+            "epic-2.md": _shard(2, ["2.1"]),
+            "epic-1.md": _shard(1, ["1.1", "1.2"]),
+        })
+        epics, stories = parse_artifacts.parse_epics_sources(str(tmp_path / "epics"))
+        assert [e["id"] for e in epics] == ["1", "2"]
+        assert [s["id"] for s in stories] == ["1.1", "1.2", "2.1"]
+
+    def test_duplicate_ids_across_shards(self, tmp_path, capsys):
+        self._write(tmp_path / "epics", {
+            "a.md": _shard(1, ["1.1"]),
+            "b.md": _shard(1, ["1.1", "1.2"]),
+        })
+        epics, stories = parse_artifacts.parse_epics_sources(str(tmp_path / "epics"))
+        assert [e["description"] for e in epics] == ["Work for area 1."]
+        assert [s["id"] for s in stories] == ["1.1", "1.2"]
+        err = capsys.readouterr().err
+        assert "Duplicate epic 1 in" in err and "Duplicate story 1.1 in" in err
+        assert "a.md" in err and "b.md" in err
+
+    def test_parallel_matches_serial(self, tmp_path):
+        self._write(tmp_path / "epics", {f"epic-{n}.md": _shard(n, [f"{n}.1", f"{n}.2"]) for n in range(1, 6)})
+        serial = parse_artifacts.parse_epics_sources(str(tmp_path / "epics"), jobs=1)
+        assert parse_artifacts.parse_epics_sources(str(tmp_path / "epics"), jobs=3) == serial
+
+    def test_unchanged_shards_from_cache(self, tmp_path):
+        self._write(tmp_path / "epics", {"epic-1.md": _shard(1, ["1.1"]), "epic-2.md": _shard(2, ["2.1"])})
+        cache_path = str(tmp_path / "cache.json")
+        cache = parse_artifacts.ParseCache(cache_path, version="test")
+        expected = parse_artifacts.parse_epics_sources(str(tmp_path / "epics"), cache)
+        cache.save()
+
+        (tmp_path / "epics" / "epic-2.md").write_text(_shard(2, ["2.1", "2.2"]), encoding="utf-8")
+        cache = parse_artifacts.ParseCache(cache_path, version="test")
+        epics, stories = parse_artifacts.parse_epics_sources(str(tmp_path / "epics"), cache)
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert epics == expected[0]
+        assert [s["id"] for s in stories] == ["1.1", "2.1", "2.2"]
+
+    def test_no_matching_shards(self, tmp_path, capsys):
+        assert parse_artifacts.parse_epics_sources(str(tmp_path / "*.md")) == ([], [])
+        assert "No epics files found" in capsys.readouterr().err
+
+    def test_streamed_shards_match(self, tmp_path):
+        self._write(tmp_path / "epics", {
+            "a.md": _shard(1, ["1.1"]),
+            "b.md": _shard(1, ["1.1", "1.2"]) + "\n" + _shard(2, ["2.1"]),
+        })
+        epics, stories = parse_artifacts.parse_epics_sources(str(tmp_path / "epics"))
+        items = list(parse_artifacts.iter_epics_sources(str(tmp_path / "epics")))
+        assert [i for k, i in items if k == "epic"] == epics
+        assert [i for k, i in items if k == "story"] == stories
+
+
+# --- streaming mode ---
+
+STREAM_EPICS = (
+    "# Planning\n\n## Epic 1: Foundation\n\nSetup work.\n**Phase:** 1\n\n"
+    "### Story 1.1: Init\n\nAs a dev, I want init. FR-1\n\n**Acceptance Criteria:**\n\n**Given** x\n\n"
+    "### Story 1.2: Config\n\nAs a dev, I want config.\n\n"
+    "## Epic 2: Features\n\nFeature work.\n\n### Story 2.1: Login\n\nAs a user, I want login.\n"
+)
+STREAM_STORY = (
+    "Status: review\n\n## Tasks / Subtasks\n\n- [x] Task A (AC: 1)\n  - [x] 1.1 Sub\n- [ ] Task B\n\n"
+    "## Dev Notes\n\n### Review Follow-ups (AI)\n\n- [ ] [HIGH] Fix it [src/a.py:3]\n"
+)
+
+
+class TestStreaming:
+    def test_iter_epics_file_matches_parse(self, tmp_file):
+        path = tmp_file(STREAM_EPICS, "epics.md")
+        items = list(parse_artifacts.iter_epics_file(path))
+        assert [(kind, item["id"]) for kind, item in items] == [
+            ("epic", "1"), ("story", "1.1"), ("story", "1.2"), ("epic", "2"), ("story", "2.1")]
+        epics, stories = parse_artifacts.parse_epics_file(path)
+        assert [i for k, i in items if k == "epic"] == epics
+        assert [i for k, i in items if k == "story"] == stories
+
+    def test_iter_epics_file_levels_from_first_story(self, tmp_file):
+        # Summary '### Epic' headings before the detailed '## Epic' / '### Story' section
+        content = "### Epic 1: Summary\n\n## Epic 1: Detail\n\nText.\n\n### Story 1.1: S\n\nBody.\n"
+        path = tmp_file(content, "epics.md")
+        items = list(parse_artifacts.iter_epics_file(path))
+        assert [i for k, i in items if k == "epic"] == parse_artifacts.parse_epics_file(path)[0]
+        assert items[0][1]["description"] == "Text."
+
+    def test_iter_epics_file_missing(self):
+        assert list(parse_artifacts.iter_epics_file("/nonexistent/epics.md")) == []
+
+    def test_iter_story_file_matches_parse(self, tmp_file):
+        path = tmp_file(STREAM_STORY, "1-1-a.md")
+        items = list(parse_artifacts.iter_story_file("1.1", path))
+        assert [kind for kind, _ in items] == ["status", "task", "task", "reviewTask"]
+        tasks, status, review_tasks = parse_artifacts.parse_story_file("1.1", path)
+        assert items[0][1] == status
+        assert [i for k, i in items if k == "task"] == tasks
+        assert [i for k, i in items if k == "reviewTask"] == review_tasks
+
+    def test_task_emitted_when_next_task_starts(self, tmp_file):
+        path = tmp_file(STREAM_STORY, "1-1-a.md")
+        emitted = []
+        parser = parse_artifacts.StoryFileParser("1.1", emit=lambda kind, item: emitted.append(kind))
+        with open(path, encoding="utf-8") as f:
+            for line in parse_artifacts.iter_file_lines(f):
+                parser.feed(line)
+                if line.startswith("- [ ] Task B"):
+                    assert emitted == ["status", "task"]
+        parser.close()
+        assert emitted == ["status", "task", "task", "reviewTask"]
+
+    def test_iter_file_lines_matches_splitlines(self, tmp_path):
+        content = "a\r\nb\rc\x0cd\n\ne\u2028f"
+        path = tmp_path / "x.md"
+        path.write_bytes(content.encode("utf-8"))
+        with open(str(path), "r", encoding="utf-8") as f:
+            assert list(parse_artifacts.iter_file_lines(f)) == content.replace("\r\n", "\n").splitlines()
+
+    def test_streamed_output_identical(self, tmp_path, monkeypatch, capsys):
+        (tmp_path / "epics.md").write_text(STREAM_EPICS, encoding="utf-8")
+        (tmp_path / "1-1-a.md").write_text(STREAM_STORY, encoding="utf-8")
+        (tmp_path / "2.1").mkdir()
+        (tmp_path / "2.1" / "story.md").write_text("Status: done\n", encoding="utf-8")
+        (tmp_path / "sprint-status.yaml").write_text("development_status:\n  epic-1: done\n", encoding="utf-8")
+        args = ["parse-artifacts.py", "--epics", str(tmp_path / "epics.md"), "--stories-dir", str(tmp_path),
+                "--sprint-yaml", str(tmp_path / "sprint-status.yaml"), "--no-cache"]
+        monkeypatch.setattr("sys.argv", args + ["--output", str(tmp_path / "full.json")])
+        parse_artifacts.main()
+        monkeypatch.setattr("sys.argv", args + ["--output", str(tmp_path / "stream.json"), "--stream"])
+        parse_artifacts.main()
+        capsys.readouterr()
+        full = (tmp_path / "full.json").read_text(encoding="utf-8")
+        assert (tmp_path / "stream.json").read_text(encoding="utf-8") == full
+        assert json.loads(full)["counts"]["reviewFollowupTasks"] == 1
+
 
 # --- parse_epic_statuses ---
 
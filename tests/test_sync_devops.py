@@ -1,6 +1,10 @@
 """Tests for sync-devops.py (unit tests for pure functions only — no az CLI calls)."""
 
 import importlib
+import json
+import sys
+import threading
+import time
 
 import pytest
 
@@ -361,3 +365,1380 @@ class TestDetectTemplate:
     def test_priority_agile_over_basic(self):
         # If both User Story and Issue exist, Agile wins
         assert detect_template.detect_template(["User Story", "Issue"]) == "Agile"
+
+
+# --- build_auth_header ---
+
+class TestBuildAuthHeader:
+    def test_pat_uses_basic(self):
+        import base64
+        header = sync_devops.build_auth_header("mypat")
+        assert header.startswith("Basic ")
+        assert base64.b64decode(header[6:]).decode("utf-8") == ":mypat"
+
+    def test_jwt_uses_bearer(self):
+        assert sync_devops.build_auth_header("eyJabc.def") == "Bearer eyJabc.def"
+
+
+# --- parse_az_args ---
+
+class TestParseAzArgs:
+    def test_command_and_options(self):
+        command, options = sync_devops.parse_az_args(
+            ["boards", "work-item", "update", "--id", "5", "--state", "Active"]
+        )
+        assert command == ["boards", "work-item", "update"]
+        assert options == [("--id", "5"), ("--state", "Active")]
+
+    def test_repeated_fields_kept_in_order(self):
+        _, options = sync_devops.parse_az_args(
+            ["--fields", "A=1", "--fields", "B=2"]
+        )
+        assert options == [("--fields", "A=1"), ("--fields", "B=2")]
+
+    def test_az_option_default(self):
+        assert sync_devops.az_option([("--id", "5")], "--title", "none") == "none"
+
+
+# --- az_args_to_rest ---
+
+class TestAzArgsToRest:
+    ORG = "https://dev.azure.com/myorg"
+
+    def test_create_task(self):
+        task = {"description": "Set up auth", "priority": 2, "tags": ["AI-Review"],
+                "acReferences": [], "subtaskHtml": ""}
+        args = sync_devops.build_task_create_args(task, "Proj\\Area", "Proj\\Iter")
+        req = sync_devops.az_args_to_rest(args, "My Proj", self.ORG)
+        assert req["method"] == "POST"
+        assert req["path"] == "/My%20Proj/_apis/wit/workitems/$Task?api-version=7.0"
+        assert req["contentType"] == "application/json-patch+json"
+        body = {op["path"]: op["value"] for op in req["body"]}
+        assert body["/fields/System.Title"] == "Set up auth"
+        assert body["/fields/System.AreaPath"] == "Proj\\Area"
+        assert body["/fields/System.IterationPath"] == "Proj\\Iter"
+        assert body["/fields/Microsoft.VSTS.Common.Priority"] == "2"
+        assert body["/fields/System.Tags"] == "AI-Review"
+
+    def test_create_quotes_type_with_spaces(self):
+        req = sync_devops.az_args_to_rest(
+            ["boards", "work-item", "create", "--type", "User Story", "--title", "T"], "P", self.ORG
+        )
+        assert "/workitems/$User%20Story?" in req["path"]
+
+    def test_update_state(self):
+        req = sync_devops.az_args_to_rest(
+            ["boards", "work-item", "update", "--id", "42", "--state", "Closed"], "P", self.ORG
+        )
+        assert req["method"] == "PATCH"
+        assert req["path"] == "/_apis/wit/workitems/42?api-version=7.0"
+        assert req["body"] == [{"op": "add", "path": "/fields/System.State", "value": "Closed"}]
+
+    def test_field_value_may_contain_equals(self):
+        req = sync_devops.az_args_to_rest(
+            ["boards", "work-item", "update", "--id", "1", "--fields", "X.Y=a=b"], "P", self.ORG
+        )
+        assert req["body"][0]["value"] == "a=b"
+
+    def test_parent_relation(self):
+        req = sync_devops.az_args_to_rest(
+            ["boards", "work-item", "relation", "add", "--id", "7",
+             "--relation-type", "parent", "--target-id", "3"], "P", self.ORG
+        )
+        assert req["path"] == "/_apis/wit/workitems/7?api-version=7.0"
+        assert req["body"] == [{
+            "op": "add", "path": "/relations/-",
+            "value": {"rel": "System.LinkTypes.Hierarchy-Reverse",
+                      "url": "https://dev.azure.com/myorg/_apis/wit/workItems/3"}
+        }]
+
+    def test_iteration_create(self):
+        req = sync_devops.az_args_to_rest(
+            ["boards", "iteration", "project", "create", "--name", "epic-1-x",
+             "--path", "\\P\\Iteration\\Root Sprints"], "P", self.ORG
+        )
+        assert req["method"] == "POST"
+        assert req["path"] == "/P/_apis/wit/classificationnodes/Iterations/Root%20Sprints?api-version=7.0"
+        assert req["body"] == {"name": "epic-1-x"}
+
+    def test_unsupported_command(self):
+        with pytest.raises(ValueError):
+            sync_devops.az_args_to_rest(["boards", "query", "--wiql", "x"], "P", self.ORG)
+
+
+# --- RestBackend ---
+
+class TestRestBackend:
+    @pytest.fixture
+    def server(self):
+        import http.server
+        import threading
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            requests = []
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                patch = json.loads(self.rfile.read(length))
+                Handler.requests.append((self.command, self.path, self.headers.get("Authorization"), patch))
+                if self.headers.get("Authorization") == "Bearer eyJstale":
+                    self._reply(401, {"message": "TF400813: The user is not authorized"})
+                    return
+                self._reply(200, {"id": len(Handler.requests)})
+
+            def do_GET(self):
+                # Throttle the first GET, then serve it
+                Handler.requests.append((self.command, self.path, None, None))
+                if len(Handler.requests) == 1:
+                    body = b'{"message": "TF400733: throttled"}'
+                    self.send_response(429)
+                    self.send_header("Retry-After", "0")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                else:
+                    self._reply(200, {"ok": True})
+
+            def do_PATCH(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self.rfile.read(length)
+                self._reply(404, {"message": "TF401232: Work item 99 does not exist"})
+
+            def log_message(self, *args):
+                pass
+
+        httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{httpd.server_address[1]}/myorg", Handler
+        httpd.shutdown()
+        httpd.server_close()
+
+    def test_reuses_connection_and_returns_data(self, server):
+        url, handler = server
+        backend = sync_devops.RestBackend(url, "P", "pat")
+        for _ in range(3):
+            data, err = backend(["boards", "work-item", "create", "--type", "Epic", "--title", "E"])
+            assert err is None
+        assert data == {"id": 3}
+        assert backend.connections_opened == 1
+        assert backend.requests_sent == 3
+        method, path, auth, patch = handler.requests[0]
+        assert path == "/myorg/P/_apis/wit/workitems/$Epic?api-version=7.0"
+        assert auth.startswith("Basic ")
+        assert patch == [{"op": "add", "path": "/fields/System.Title", "value": "E"}]
+        backend.close()
+
+    def test_parent_link_sent_in_create(self, server):
+        url, handler = server
+        backend = sync_devops.RestBackend(url, "P", "pat")
+        backend(["boards", "work-item", "create", "--type", "Task", "--title", "T"], parent=7)
+        patch = handler.requests[-1][3]
+        assert patch[-1] == {
+            "op": "add", "path": "/relations/-",
+            "value": {"rel": "System.LinkTypes.Hierarchy-Reverse", "url": f"{url}/_apis/wit/workItems/7"}
+        }
+        backend.close()
+
+    def test_throttled_request_is_retried(self, server):
+        url, handler = server
+        throttle = sync_devops.ThrottleController(max_concurrency=4)
+        backend = sync_devops.RestBackend(url, "P", "pat", throttle=throttle)
+        data, err = backend.request("GET", "/_apis/projects")
+        assert err is None
+        assert data == {"ok": True}
+        assert len(handler.requests) == 2
+        assert throttle.throttled == 1
+        assert throttle.limit < 4
+        backend.close()
+
+    def test_401_refreshes_token_once_and_resends(self, server, tmp_path):
+        url, handler = server
+        tokens_issued = iter(["eyJstale", "eyJfresh"])
+        manager = sync_devops.TokenManager(
+            cache_path=str(tmp_path / "token.json"),
+            fetcher=lambda az: {"accessToken": next(tokens_issued), "expiresAt": time.time() + 3600})
+        backend = sync_devops.RestBackend(url, "P", manager)
+        data, err = backend(["boards", "work-item", "create", "--type", "Epic", "--title", "E"])
+        assert err is None
+        assert [r[2] for r in handler.requests] == ["Bearer eyJstale", "Bearer eyJfresh"]
+        assert manager.refreshes == 2
+        backend.close()
+
+    def test_401_with_pat_is_not_retried(self, server):
+        url, handler = server
+        backend = sync_devops.RestBackend(url, "P", sync_devops.TokenManager(pat="eyJstale"))
+        data, err = backend(["boards", "work-item", "create", "--type", "Epic", "--title", "E"])
+        assert data is None
+        assert err.startswith("HTTP 401")
+        assert len(handler.requests) == 1
+        backend.close()
+
+    def test_http_error_returns_message(self, server):
+        url, _ = server
+        backend = sync_devops.RestBackend(url, "P", "pat")
+        data, err = backend(["boards", "work-item", "update", "--id", "99", "--state", "Done"])
+        assert data is None
+        assert err == "HTTP 404: TF401232: Work item 99 does not exist"
+        backend.close()
+
+    def test_unsupported_command_is_error(self, server):
+        url, _ = server
+        backend = sync_devops.RestBackend(url, "P", "pat")
+        data, err = backend(["boards", "query", "--wiql", "x"])
+        assert data is None
+        assert "Unsupported command" in err
+
+
+# --- story file attachments ---
+
+class TestStoryAttachments:
+    def test_stale_attachment_indices(self):
+        relations = [
+            {"rel": "System.LinkTypes.Hierarchy-Reverse", "url": "p"},
+            {"rel": "AttachedFile", "url": "old", "attributes": {"name": "1-1-a.md"}},
+            {"rel": "AttachedFile", "url": "other", "attributes": {"name": "design.png"}},
+            {"rel": "AttachedFile", "url": "older",
+             "attributes": {"name": "1-1-a.md", "comment": "Story specification file"}},
+        ]
+        assert sync_devops.stale_attachment_indices(relations, "old", "1-1-a.md") == [3, 1]
+        assert sync_devops.stale_attachment_indices(relations, "", "2-1-b.md") == []
+
+    def test_replace_removes_stale_relations_in_one_patch(self):
+        import http.server
+
+        patches = []
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps({"rev": 7, "relations": [
+                    {"rel": "AttachedFile", "url": "https://x/att/old", "attributes": {"name": "s.md"}},
+                ]}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_PATCH(self):
+                patches.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def log_message(self, *args):
+                pass
+
+        httpd = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        try:
+            err = sync_devops.attach_file_to_work_item(
+                f"http://127.0.0.1:{httpd.server_address[1]}", "P", "pat", 5, "https://x/att/new",
+                replace_url="https://x/att/old", filename="s.md")
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+        assert err is None
+        assert patches[0][:2] == [{"op": "test", "path": "/rev", "value": 7},
+                                  {"op": "remove", "path": "/relations/0"}]
+        assert patches[0][2]["value"]["url"] == "https://x/att/new"
+
+    @staticmethod
+    def fake_rest(monkeypatch, fail_links=()):
+        calls = []
+        lock = threading.Lock()
+
+        def fake_upload(org_url, project, pat, file_path, filename, throttle=None):
+            with lock:
+                calls.append(("upload", filename))
+            return f"https://x/att/{filename}"
+
+        def fake_link(org_url, project, pat, devops_id, url, throttle=None, replace_url=None, filename=""):
+            with lock:
+                calls.append(("link", devops_id, url, replace_url))
+            return "boom" if devops_id in fail_links else None
+        monkeypatch.setattr(sync_devops, "upload_attachment", fake_upload)
+        monkeypatch.setattr(sync_devops, "attach_file_to_work_item", fake_link)
+        return calls
+
+    @staticmethod
+    def story_files(tmp_path, stories):
+        paths = {}
+        for story in stories:
+            path = tmp_path / f"{story['id']}.md"
+            path.write_text(f"story {story['id']}")
+            paths[story["id"]] = str(path)
+        return {"stories": stories, "storyFilePaths": paths}
+
+    def test_uploads_only_changed_bytes(self, monkeypatch, tmp_path):
+        calls = self.fake_rest(monkeypatch)
+        (tmp_path / "1.1.md").write_text("story 1.1")
+        same = sync_devops.file_digest(str(tmp_path / "1.1.md"))
+        diff = self.story_files(tmp_path, [
+            # Story content changed, file bytes did not: nothing to upload
+            {"id": "1.1", "classification": "CHANGED", "devopsId": 11,
+             "attached": "true", "attachmentHash": same, "attachmentUrl": "https://x/att/a"},
+            # File changed: replaces the recorded relation
+            {"id": "1.2", "classification": "UNCHANGED", "devopsId": 12,
+             "attached": "true", "attachmentHash": "stale", "attachmentUrl": "https://x/att/b"},
+            # Never attached: backfilled
+            {"id": "1.3", "classification": "UNCHANGED", "devopsId": 13},
+        ])
+        ctx = sync_devops.new_sync_context(diff)
+        sync_devops.start_story_attachments(diff, ctx, "https://x", "P", "pat")
+        sync_devops.finish_story_attachments(ctx)
+        links = sorted(c for c in calls if c[0] == "link")
+        assert links == [("link", 12, "https://x/att/1.2.md", "https://x/att/b"),
+                         ("link", 13, "https://x/att/1.3.md", None)]
+        results = ctx["results"]["stories"]
+        assert results["attachedIds"] == ["1.1", "1.2", "1.3"]
+        assert results["attachments"]["1.1"] == {"hash": same, "url": "https://x/att/a"}
+        assert results["attachments"]["1.2"]["url"] == "https://x/att/1.2.md"
+        assert results["attachments"]["1.2"]["hash"] != "stale"
+
+    def test_new_story_linked_once_created(self, monkeypatch, tmp_path):
+        calls = self.fake_rest(monkeypatch)
+        diff = make_diff()
+        diff.update(self.story_files(tmp_path, diff["stories"]))
+        entries = sync_devops.optimize_plan(sync_devops.plan_operations(CONFIG, diff))
+        ctx = sync_devops.new_sync_context(diff)
+        sync_devops.start_story_attachments(diff, ctx, "https://x", "P", "pat")
+        sync_devops.execute_plan(FakeRunner(), entries, ctx, native_relations=True)
+        sync_devops.finish_story_attachments(ctx)
+        new_story_id = ctx["idMaps"]["stories"]["1.1"]
+        assert ("link", new_story_id, "https://x/att/1.1.md", None) in calls
+        assert ("link", 60, "https://x/att/2.1.md", None) in calls
+        assert ctx["results"]["stories"]["attachedIds"] == ["1.1", "2.1"]
+
+    def test_story_that_failed_to_create_stays_unlinked(self, monkeypatch, tmp_path):
+        calls = self.fake_rest(monkeypatch)
+        diff = self.story_files(tmp_path, [{"id": "1.1", "classification": "NEW"}])
+        ctx = sync_devops.new_sync_context(diff)
+        pipeline = sync_devops.start_story_attachments(diff, ctx, "https://x", "P", "pat")
+        sync_devops.finish_story_attachments(ctx)
+        assert [c[0] for c in calls] == ["upload"]
+        assert pipeline.counts["unlinked"] == 1
+        assert ctx["results"]["stories"]["attachedIds"] == []
+
+    def test_failed_replace_keeps_previous_record(self, monkeypatch, tmp_path):
+        self.fake_rest(monkeypatch, fail_links=(11,))
+        diff = self.story_files(tmp_path, [
+            {"id": "1.1", "classification": "CHANGED", "devopsId": 11,
+             "attached": "true", "attachmentHash": "stale", "attachmentUrl": "https://x/att/a"}])
+        ctx = sync_devops.new_sync_context(diff)
+        sync_devops.start_story_attachments(diff, ctx, "https://x", "P", "pat")
+        sync_devops.finish_story_attachments(ctx)
+        assert ctx["results"]["stories"]["attachments"] == {"1.1": {"hash": "stale", "url": "https://x/att/a"}}
+
+    def test_cancel_drops_unstarted_uploads(self, monkeypatch, tmp_path):
+        calls = self.fake_rest(monkeypatch)
+        diff = self.story_files(tmp_path, [{"id": "1.1"}, {"id": "1.2"}])
+        jobs = [{"storyId": sid, "filePath": path, "fileHash": "h", "replaceUrl": None, "devopsId": 1}
+                for sid, path in diff["storyFilePaths"].items()]
+        pipeline = sync_devops.AttachmentPipeline("https://x", "P", "pat", workers=1, max_pending=1)
+        pipeline._cancelled.set()
+        pipeline.start(jobs)
+        assert pipeline.finish(cancel=True) == {}
+        assert calls == []
+        assert pipeline.counts["cancelled"] == 2
+
+    def test_chunked_upload(self, tmp_path):
+        import http.server
+
+        received = []
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def _reply(self, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                received.append(("POST", self.path, self.rfile.read(int(self.headers["Content-Length"]))))
+                self._reply({"id": "abc", "url": "https://x/_apis/wit/attachments/abc"})
+
+            def do_PUT(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                received.append(("PUT", self.headers["Content-Range"], body))
+                self._reply({"id": "abc", "url": "https://x/_apis/wit/attachments/abc"})
+
+            def log_message(self, *args):
+                pass
+
+        httpd = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        org = f"http://127.0.0.1:{httpd.server_address[1]}"
+        path = tmp_path / "big.md"
+        path.write_bytes(b"0123456789")
+        try:
+            chunked = sync_devops.upload_attachment(org, "P", "pat", str(path), "big.md", chunk_size=4)
+            streamed = sync_devops.upload_attachment(org, "P", "pat", str(path), "big.md")
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+        assert chunked == "https://x/_apis/wit/attachments/abc"
+        assert "uploadType=Chunked" in received[0][1]
+        assert received[1:4] == [("PUT", "bytes 0-3/10", b"0123"), ("PUT", "bytes 4-7/10", b"4567"),
+                                 ("PUT", "bytes 8-9/10", b"89")]
+        assert streamed == chunked
+        assert received[4][2] == b"0123456789"
+
+
+# --- TokenManager ---
+
+class TestTokenManager:
+    @staticmethod
+    def fetcher(lifetime=3600):
+        calls = []
+
+        def fetch(az_path):
+            calls.append(az_path)
+            return {"accessToken": f"eyJ{len(calls)}", "expiresAt": time.time() + lifetime}
+        return fetch, calls
+
+    def test_pat_is_returned_without_fetching(self, tmp_path):
+        fetch, calls = self.fetcher()
+        manager = sync_devops.TokenManager(pat="secret", cache_path=str(tmp_path / "t.json"), fetcher=fetch)
+        assert manager.token() == "secret"
+        assert not manager.refreshable
+        assert calls == []
+        assert sync_devops.build_auth_header(manager).startswith("Basic ")
+
+    def test_token_reused_until_refresh_margin(self):
+        fetch, calls = self.fetcher()
+        manager = sync_devops.TokenManager(cache_path="", fetcher=fetch)
+        assert manager.token() == "eyJ1"
+        assert manager.token() == "eyJ1"
+        assert len(calls) == 1
+        manager._token["expiresAt"] = time.time() + 60  # inside the 300s margin
+        assert manager.token() == "eyJ2"
+        assert sync_devops.build_auth_header(manager) == "Bearer eyJ2"
+
+    def test_cache_file_is_private_and_shared_across_instances(self, tmp_path):
+        cache = tmp_path / "sub" / "token.json"
+        fetch, calls = self.fetcher()
+        sync_devops.TokenManager(cache_path=str(cache), fetcher=fetch).token()
+        if sys.platform != "win32":
+            assert cache.stat().st_mode & 0o777 == 0o600
+        assert sync_devops.TokenManager(cache_path=str(cache), fetcher=fetch).token() == "eyJ1"
+        assert len(calls) == 1
+
+    def test_expired_cache_is_refetched(self, tmp_path):
+        cache = tmp_path / "token.json"
+        fetch, calls = self.fetcher(lifetime=10)
+        sync_devops.TokenManager(cache_path=str(cache), fetcher=fetch).token()
+        assert sync_devops.TokenManager(cache_path=str(cache), fetcher=fetch).token() == "eyJ2"
+
+    def test_invalidate_forces_refresh(self, tmp_path):
+        cache = tmp_path / "token.json"
+        fetch, calls = self.fetcher()
+        manager = sync_devops.TokenManager(cache_path=str(cache), fetcher=fetch)
+        manager.token()
+        manager.invalidate()
+        assert not cache.exists()
+        assert manager.token() == "eyJ2"
+
+    def test_failed_fetch_returns_empty(self, tmp_path):
+        manager = sync_devops.TokenManager(cache_path=str(tmp_path / "t.json"), fetcher=lambda az: None)
+        assert manager.token() == ""
+
+    def test_parse_token_expiry(self):
+        assert sync_devops.parse_token_expiry({"expires_on": 1700000000}) == 1700000000.0
+        local = sync_devops.parse_token_expiry({"expiresOn": "2024-05-01 13:45:12.000000"})
+        assert local == time.mktime((2024, 5, 1, 13, 45, 12, 0, 0, -1))
+        assert sync_devops.parse_token_expiry({}) is None
+
+
+# --- ThrottleController ---
+
+class TestThrottleController:
+    def test_additive_increase_up_to_max(self):
+        throttle = sync_devops.ThrottleController(max_concurrency=4)
+        throttle.limit = 2.0
+        for _ in range(20):
+            throttle.acquire()
+            assert throttle.release(200, {}) is None
+        assert throttle.limit == 4.0
+
+    def test_429_halves_limit_and_returns_retry_after(self):
+        throttle = sync_devops.ThrottleController(max_concurrency=8)
+        throttle.acquire()
+        assert throttle.release(429, {"Retry-After": "0"}) == 0.0
+        assert throttle.limit == 4.0
+        assert throttle.throttled == 1
+        assert throttle.in_flight == 0
+
+    def test_decrease_at_most_once_per_cooldown(self):
+        throttle = sync_devops.ThrottleController(max_concurrency=8)
+        throttle.release(429, {"Retry-After": "0"})
+        throttle.release(429, {"Retry-After": "0"})
+        assert throttle.limit == 4.0
+
+    def test_low_remaining_budget_decreases(self):
+        throttle = sync_devops.ThrottleController(max_concurrency=8)
+        throttle.release(200, {"X-RateLimit-Remaining": "5", "X-RateLimit-Limit": "200"})
+        assert throttle.limit == 4.0
+
+    def test_delay_header_pauses_everyone(self):
+        throttle = sync_devops.ThrottleController(max_concurrency=2)
+        throttle.release(200, {"X-RateLimit-Delay": "0.2"})
+        assert throttle.paused_until > sync_devops.time.monotonic()
+        assert throttle.stats()["pausedSeconds"] == 0.2
+
+    def test_never_below_min(self):
+        throttle = sync_devops.ThrottleController(max_concurrency=1)
+        throttle.release(429, {"Retry-After": "0"})
+        assert throttle.limit == 1.0
+
+
+class TestAzThrottleSignal:
+    def test_detects_429_with_retry_after(self):
+        err = "ERROR: TF400733: The request was throttled. Status code 429, Retry-After: 12"
+        assert sync_devops.az_throttle_signal(err) == (429, {"Retry-After": "12"})
+
+    def test_detects_too_many_requests(self):
+        assert sync_devops.az_throttle_signal("Too Many Requests")[0] == 429
+
+    def test_other_errors_are_not_throttling(self):
+        assert sync_devops.az_throttle_signal("TF401232: Work item 99 does not exist") == (None, {})
+
+    def test_throttled_runner_retries(self):
+        calls = []
+
+        def runner(args, **kwargs):
+            calls.append(args)
+            if len(calls) == 1:
+                return None, "HTTP 429 Too Many Requests. Retry-After: 0"
+            return {"id": 1}, None
+
+        throttle = sync_devops.ThrottleController(max_concurrency=2)
+        wrapped = sync_devops.make_throttled_runner(runner, throttle)
+        assert wrapped(["boards"]) == ({"id": 1}, None)
+        assert len(calls) == 2
+        assert throttle.throttled == 1
+
+    def test_persistent_429_retried_by_throttle_only(self):
+        calls = []
+
+        def runner(args, **kwargs):
+            calls.append(args)
+            return None, "HTTP 429 Too Many Requests. Retry-After: 0"
+
+        throttle = sync_devops.ThrottleController(max_concurrency=2)
+        wrapped = sync_devops.RetryingRunner(sync_devops.make_throttled_runner(runner, throttle),
+                                             sleep=lambda s: None)
+        data, err = wrapped(["boards", "work-item", "update", "--id", "1"])
+        assert data is None and "429" in err
+        assert len(calls) == sync_devops.THROTTLE_RETRIES + 1
+        assert wrapped.stats()["retries"] == 0
+
+
+# --- retry / timeouts ---
+
+class TestIsRetryableError:
+    @pytest.mark.parametrize("err", [
+        "HTTP 503: Service Unavailable",
+        "Connection error: [Errno 111] Connection refused",
+    ])
+    def test_safe_errors_always_retryable(self, err):
+        assert sync_devops.is_retryable_error(err, idempotent=False)
+
+    @pytest.mark.parametrize("err", [
+        "Command timed out after 120s",
+        "HTTP 502: Bad Gateway",
+        "Connection error: [Errno 104] Connection reset by peer",
+    ])
+    def test_ambiguous_errors_only_for_idempotent(self, err):
+        assert sync_devops.is_retryable_error(err, idempotent=True)
+        assert not sync_devops.is_retryable_error(err, idempotent=False)
+
+    @pytest.mark.parametrize("err", [
+        "HTTP 429: TF400733: throttled",
+        "HTTP 400: TF401320: Rule Error for field Title",
+        "HTTP 404: TF401232: Work item 99 does not exist",
+        None,
+    ])
+    def test_permanent_errors(self, err):
+        assert not sync_devops.is_retryable_error(err)
+
+
+class TestRetryPolicy:
+    def test_delay_is_jittered_and_capped(self):
+        policy = sync_devops.RetryPolicy(base_delay=1.0, max_delay=5.0)
+        for attempt in range(10):
+            assert 0 <= policy.delay(attempt) <= min(5.0, 2 ** attempt)
+
+
+class TestLatencyTracker:
+    def test_default_until_enough_samples(self):
+        tracker = sync_devops.LatencyTracker(default_timeout=120)
+        for _ in range(tracker.MIN_SAMPLES - 1):
+            tracker.record("boards work-item update", 2.0)
+        assert tracker.timeout("boards work-item update") == 120
+
+    def test_timeout_from_p99(self):
+        tracker = sync_devops.LatencyTracker(default_timeout=120)
+        for n in range(100):
+            tracker.record("boards work-item update", 1.0 + n / 10.0)  # p99 = 10.9
+        assert tracker.timeout("boards work-item update") == 33
+        assert tracker.timeout("boards work-item create") == 120
+
+    def test_timeout_clamped_to_min(self):
+        tracker = sync_devops.LatencyTracker(default_timeout=120)
+        for _ in range(50):
+            tracker.record("op", 0.5)
+        assert tracker.timeout("op") == tracker.MIN_TIMEOUT
+
+
+class TestRetryingRunner:
+    def _runner(self, errors):
+        calls = []
+
+        def runner(args, timeout=None, **kwargs):
+            calls.append(timeout)
+            err = errors.pop(0) if errors else None
+            return (None, err) if err else ({"id": 1}, None)
+        return runner, calls
+
+    def test_retries_transient_errors(self):
+        runner, calls = self._runner(["HTTP 503: Service Unavailable", "Command timed out after 120s"])
+        wrapped = sync_devops.RetryingRunner(runner, sleep=lambda s: None)
+        assert wrapped(["boards", "work-item", "update", "--id", "1"]) == ({"id": 1}, None)
+        assert len(calls) == 3
+        assert wrapped.stats()["retries"] == 2
+        assert wrapped.stats()["timeouts"] == 1
+
+    def test_permanent_error_not_retried(self):
+        runner, calls = self._runner(["HTTP 400: bad field"])
+        wrapped = sync_devops.RetryingRunner(runner, sleep=lambda s: None)
+        assert wrapped(["boards", "work-item", "update"]) == (None, "HTTP 400: bad field")
+        assert len(calls) == 1
+
+    def test_create_timeout_not_retried(self):
+        runner, calls = self._runner(["Command timed out after 120s"])
+        wrapped = sync_devops.RetryingRunner(runner, sleep=lambda s: None)
+        _, err = wrapped(["boards", "work-item", "create", "--type", "Task"])
+        assert err == "Command timed out after 120s"
+        assert len(calls) == 1
+
+    def test_gives_up_after_max_attempts(self):
+        runner, calls = self._runner(["HTTP 503"] * 10)
+        wrapped = sync_devops.RetryingRunner(runner, sync_devops.RetryPolicy(max_attempts=3), sleep=lambda s: None)
+        _, err = wrapped(["boards", "work-item", "update"])
+        assert err == "HTTP 503"
+        assert len(calls) == 3
+
+    def test_passes_adaptive_timeout(self):
+        runner, calls = self._runner([])
+        latency = sync_devops.LatencyTracker(default_timeout=60)
+        wrapped = sync_devops.RetryingRunner(runner, latency=latency)
+        wrapped(["boards", "work-item", "update"])
+        assert calls == [60]
+        assert "boards work-item update" in wrapped.stats()["latency"]
+
+
+class TestRunAzTimeout:
+    @pytest.mark.skipif(sys.platform == "win32", reason="POSIX shell wrapper")
+    def test_kills_hung_process_tree(self, tmp_path):
+        fake_az = tmp_path / "az"
+        # Like the real az wrapper: a shell script whose child holds the pipes
+        fake_az.write_text("#!/bin/sh\nsleep 30\n")
+        fake_az.chmod(0o755)
+        start = time.monotonic()
+        data, err = sync_devops.run_az(str(fake_az), ["boards"], timeout=1)
+        assert data is None
+        assert err == "Command timed out after 1s"
+        assert time.monotonic() - start < 10
+
+
+# --- in-process az ---
+
+class FakeAzCli:
+    """Mimics azure-cli-core's AzCli: invoke() sets .result and returns an exit code."""
+
+    invocations = []
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+
+    def invoke(self, args, out_file=None):
+        FakeAzCli.invocations.append(args)
+        if isinstance(self.outcome, BaseException):
+            raise self.outcome
+        data, error, code = self.outcome
+        self.result = type("Result", (), {"result": data, "error": error, "exit_code": code})()
+        return code
+
+
+class TestInProcessAz:
+    def test_returns_result_object(self):
+        FakeAzCli.invocations = []
+        engine = sync_devops.InProcessAz(lambda: FakeAzCli(({"id": 5}, None, 0)))
+        assert engine(["boards", "work-item", "show", "--id", "5"]) == ({"id": 5}, None)
+        assert FakeAzCli.invocations[0][-2:] == ["--output", "json"]
+
+    def test_command_error(self):
+        engine = sync_devops.InProcessAz(lambda: FakeAzCli((None, Exception("TF401232: no such item"), 1)))
+        assert engine(["boards"]) == (None, "TF401232: no such item")
+
+    def test_argument_error_exit(self):
+        engine = sync_devops.InProcessAz(lambda: FakeAzCli(SystemExit(2)))
+        data, err = engine(["boards", "--bogus"])
+        assert data is None
+        assert err == "Exit code 2"
+
+
+class TestAzRunner:
+    def test_counts_in_process_calls(self):
+        runner = sync_devops.AzRunner("az", sync_devops.InProcessAz(lambda: FakeAzCli(({"id": 1}, None, 0))))
+        runner(["boards"])
+        runner(["boards"])
+        assert runner.calls == {"inProcess": 2, "subprocess": 0}
+        assert runner.mode == "az-inprocess"
+
+    def test_falls_back_to_subprocess_when_in_process_breaks(self, monkeypatch):
+        spawned = []
+        monkeypatch.setattr(sync_devops, "run_az", lambda az, args, timeout=120: spawned.append(args) or ({"id": 2}, None))
+        runner = sync_devops.AzRunner("az", sync_devops.InProcessAz(lambda: FakeAzCli(RuntimeError("import hook"))))
+        assert runner(["boards"]) == ({"id": 2}, None)
+        assert runner(["boards"]) == ({"id": 2}, None)
+        assert runner.in_process is None
+        assert runner.calls == {"inProcess": 0, "subprocess": 2}
+        assert runner.mode == "az"
+
+    def test_without_azure_cli_core_spawns_az(self, monkeypatch):
+        monkeypatch.setattr(sync_devops, "load_az_cli_factory", lambda: None)
+        runner = sync_devops.make_az_runner("az", in_process=True)
+        assert runner.in_process is None
+
+
+# --- build_epic_*_args / build_story_*_args ---
+
+class TestBuildEpicStoryArgs:
+    def test_epic_create(self):
+        args = sync_devops.build_epic_create_args({"title": "E", "description": "D"}, "Area", "Iter")
+        assert args[:5] == ["boards", "work-item", "create", "--type", "Epic"]
+        assert args[args.index("--description") + 1] == "<div>D</div>"
+        assert "--area" in args and "--iteration" in args
+
+    def test_epic_update_with_state(self):
+        args = sync_devops.build_epic_update_args({"title": "E"}, 12, "Active")
+        assert args[args.index("--id") + 1] == "12"
+        assert args[args.index("--state") + 1] == "Active"
+
+    def test_epic_update_without_state(self):
+        args = sync_devops.build_epic_update_args({"title": "E"}, 12, None)
+        assert "--state" not in args
+
+    def test_story_create_with_ac(self):
+        story = {"title": "S", "userStoryText": "As a user", "acceptanceCriteria": "Given X"}
+        ac_field = "Microsoft.VSTS.Common.AcceptanceCriteria"
+        args = sync_devops.build_story_create_args(story, "User Story", ac_field, "", "")
+        assert args[args.index("--type") + 1] == "User Story"
+        assert f"{ac_field}=<div>Given X</div>" in args
+        assert "--area" not in args
+
+    def test_story_update_basic_template_has_no_ac(self):
+        story = {"title": "S", "acceptanceCriteria": "Given X"}
+        args = sync_devops.build_story_update_args(story, 5, None, "Doing")
+        assert "--fields" not in args
+        assert args[-2:] == ["--state", "Doing"]
+
+    def test_story_update_only_changed_fields(self):
+        story = {"title": "S", "userStoryText": "As a user", "acceptanceCriteria": "Given X"}
+        ac_field = "Microsoft.VSTS.Common.AcceptanceCriteria"
+        args = sync_devops.build_story_update_args(story, 5, ac_field, None, ["acceptanceCriteria"])
+        assert args == ["boards", "work-item", "update", "--id", "5", "--fields", f"{ac_field}=<div>Given X</div>"]
+
+    def test_epic_update_only_changed_fields(self):
+        args = sync_devops.build_epic_update_args({"title": "E", "description": "D"}, 12, None, ["title"])
+        assert args[5:] == ["--title", "E"]
+
+    def test_task_update_only_changed_fields(self):
+        task = {"description": "Build (AC: 1)", "complete": True, "acReferences": [1],
+                "subtaskHtml": "<ul></ul>", "priority": 2}
+        assert sync_devops.build_task_update_args(task, 7, "Closed", ["status"])[5:] == ["--state", "Closed"]
+        args = sync_devops.build_task_update_args(task, 7, "Closed", ["subtasks"])
+        assert args[5] == "--description" and len(args) == 7
+        args = sync_devops.build_task_update_args(task, 7, "Closed", ["title"])
+        assert "--title" in args and "--description" in args and "--state" not in args
+        assert "Microsoft.VSTS.Common.Priority=2" in args
+
+
+# --- build_batch_request / parse_batch_response ---
+
+class TestBatchRequest:
+    ORG = "https://dev.azure.com/myorg"
+
+    def test_create_with_temp_id_and_parent(self):
+        args = ["boards", "work-item", "create", "--type", "Task", "--title", "T"]
+        req = sync_devops.build_batch_request(args, "P", self.ORG, temp_id=-3, parent_ref=-1)
+        assert req["method"] == "PATCH"
+        assert req["uri"] == "/P/_apis/wit/workitems/$Task?api-version=4.1"
+        assert req["headers"] == {"Content-Type": "application/json-patch+json"}
+        assert req["body"][0] == {"op": "add", "path": "/id", "value": "-3"}
+        assert req["body"][-1]["value"] == {
+            "rel": "System.LinkTypes.Hierarchy-Reverse",
+            "url": "https://dev.azure.com/myorg/_apis/wit/workItems/-1",
+        }
+
+    def test_update_without_temp_id(self):
+        args = ["boards", "work-item", "update", "--id", "9", "--iteration", "P\\Sprint"]
+        req = sync_devops.build_batch_request(args, "P", self.ORG)
+        assert req["uri"] == "/_apis/wit/workitems/9?api-version=4.1"
+        assert req["body"] == [{"op": "add", "path": "/fields/System.IterationPath", "value": "P\\Sprint"}]
+
+    def test_parse_success_body_string(self):
+        data, err = sync_devops.parse_batch_response({"code": 200, "body": '{"id": 77}'})
+        assert err is None
+        assert data == {"id": 77}
+
+    def test_parse_error_message(self):
+        body = json.dumps({"value": {"Message": "TF401320: Rule Error"}})
+        data, err = sync_devops.parse_batch_response({"code": 400, "body": body})
+        assert data is None
+        assert err == "HTTP 400: TF401320: Rule Error"
+
+
+# --- plan_operations / optimize_plan / execute_plan ---
+
+CONFIG = {"processTemplate": "Agile", "projectName": "P", "iterationRootPath": "Sprints"}
+
+
+def make_diff():
+    return {
+        "epics": [
+            {"id": "1", "title": "E1", "classification": "NEW", "contentHash": "h1"},
+            {"id": "2", "title": "E2", "classification": "UNCHANGED", "devopsId": 50},
+        ],
+        "stories": [
+            {"id": "1.1", "epicId": "1", "title": "S11", "classification": "NEW", "contentHash": "s11"},
+            {"id": "2.1", "epicId": "2", "title": "S21", "classification": "CHANGED", "devopsId": 60},
+        ],
+        "tasks": [
+            {"id": "1.1-T1", "storyId": "1.1", "description": "T1", "complete": True,
+             "classification": "NEW", "contentHash": "t1"},
+        ],
+        "iterations": [
+            {"slug": "epic-1-e1", "epicId": "1", "storyIds": ["1.1"], "taskIds": ["1.1-T1"],
+             "classification": "NEW"},
+            {"slug": "epic-2-e2", "epicId": "2", "storyIds": ["2.1"], "taskIds": [],
+             "classification": "EXISTS"},
+        ],
+        "storyStatuses": {"1.1": "in-progress"},
+    }
+
+
+class FakeRunner:
+    """Records az argument lists and returns sequential IDs for creates."""
+
+    def __init__(self, fail_titles=(), fail_commands=()):
+        self.calls = []
+        self.next_id = 100
+        self.fail_titles = set(fail_titles)
+        self.fail_commands = set(fail_commands)
+        self.lock = threading.Lock()
+
+    def __call__(self, args, timeout=None, parent=None):
+        self.calls.append((args, parent))
+        if tuple(args[:4]) in self.fail_commands:
+            return None, "boom"
+        if "--title" in args and args[args.index("--title") + 1] in self.fail_titles:
+            return None, "boom"
+        if args[:3] == ["boards", "work-item", "create"]:
+            with self.lock:
+                self.next_id += 1
+                return {"id": self.next_id}, None
+        if args[:3] == ["boards", "iteration", "project"]:
+            return {"identifier": "it-" + args[args.index("--name") + 1]}, None
+        return {}, None
+
+
+class TestPlanOperations:
+    def test_emits_atomic_operations_in_dependency_order(self):
+        ops = sync_devops.plan_operations(CONFIG, make_diff())
+        assert [(o["kind"], o["id"], o["op"]) for o in ops] == [
+            ("iterations", "epic-1-e1", "createIteration"),
+            ("epics", "1", "create"),
+            ("epics", "1", "iteration"),
+            ("stories", "1.1", "create"),
+            ("stories", "1.1", "link"),
+            ("stories", "1.1", "state"),
+            ("stories", "1.1", "iteration"),
+            ("stories", "2.1", "update"),
+            ("stories", "2.1", "iteration"),
+            ("tasks", "1.1-T1", "create"),
+            ("tasks", "1.1-T1", "link"),
+            ("tasks", "1.1-T1", "state"),
+            ("tasks", "1.1-T1", "iteration"),
+        ]
+
+    def test_iteration_path_under_root(self):
+        ops = sync_devops.plan_operations(CONFIG, make_diff())
+        move = [o for o in ops if o["op"] == "iteration"][0]
+        assert move["path"] == "P\\Sprints\\epic-1-e1"
+
+    def test_new_item_with_default_state_gets_no_state_op(self):
+        diff = make_diff()
+        diff["storyStatuses"] = {"1.1": "draft"}
+        ops = sync_devops.plan_operations(CONFIG, diff)
+        assert ("stories", "1.1", "state") not in [(o["kind"], o["id"], o["op"]) for o in ops]
+
+    def test_unchanged_epic_in_new_iteration_is_moved(self):
+        diff = make_diff()
+        diff["iterations"][1]["classification"] = "NEW"
+        ops = sync_devops.plan_operations(CONFIG, diff)
+        assert [o["op"] for o in ops if o["id"] == "2"] == ["iteration"]
+
+
+class TestOptimizePlan:
+    def test_merges_operations_into_one_entry_per_item(self):
+        ops = sync_devops.plan_operations(CONFIG, make_diff())
+        entries = sync_devops.optimize_plan(ops)
+        assert [(e["kind"], e["id"], e["action"]) for e in entries] == [
+            ("iterations", "epic-1-e1", "createIteration"),
+            ("epics", "1", "create"),
+            ("stories", "1.1", "create"),
+            ("stories", "2.1", "update"),
+            ("tasks", "1.1-T1", "create"),
+        ]
+        story = entries[2]
+        assert story["parent"] == ("epics", "1")
+        assert story["state"] == "Active"
+        assert story["operations"] == ["create", "link", "state", "iteration"]
+
+    def test_render_merges_state_and_iteration(self):
+        entries = sync_devops.optimize_plan(sync_devops.plan_operations(CONFIG, make_diff()))
+        create_args = sync_devops.render_entry_args(entries[2])
+        assert "System.State=Active" in create_args
+        assert create_args[create_args.index("--iteration") + 1] == "P\\Sprints\\epic-1-e1"
+        assert create_args.count("--iteration") == 1
+        update_args = sync_devops.render_entry_args(entries[3])
+        assert update_args[update_args.index("--iteration") + 1] == "P\\Sprints\\epic-2-e2"
+
+    def test_move_only_entry_becomes_update(self):
+        diff = make_diff()
+        diff["iterations"][1]["classification"] = "NEW"
+        entries = sync_devops.optimize_plan(sync_devops.plan_operations(CONFIG, diff))
+        epic2 = [e for e in entries if e["kind"] == "epics" and e["id"] == "2"][0]
+        assert sync_devops.render_entry_args(epic2) == [
+            "boards", "work-item", "update", "--id", "50", "--iteration", "P\\Sprints\\epic-2-e2"
+        ]
+
+    def test_move_without_devops_id_has_no_args(self):
+        diff = make_diff()
+        diff["stories"][1]["devopsId"] = None
+        entries = sync_devops.optimize_plan(sync_devops.plan_operations(CONFIG, diff))
+        story = [e for e in entries if e["id"] == "2.1"][0]
+        assert story["args"] is None
+
+
+class TestCountPlannedCalls:
+    def test_calls_per_backend(self):
+        entries = sync_devops.optimize_plan(sync_devops.plan_operations(CONFIG, make_diff()))
+        # 1 iteration node + 4 work items; az adds a link call per new story/task
+        assert sync_devops.count_planned_calls(entries, "rest") == 5
+        assert sync_devops.count_planned_calls(entries, "az") == 7
+        assert sync_devops.count_planned_calls(entries, "batch") == 2
+        assert sync_devops.count_planned_calls(entries, "batch", batch_size=3) == 3
+
+    def test_summary_counts_unmerged_operations(self):
+        ops = sync_devops.plan_operations(CONFIG, make_diff())
+        entries = sync_devops.optimize_plan(ops)
+        summary = sync_devops.summarize_plan(ops, entries, "az", attachment_calls=2)
+        assert summary["operations"] == 13
+        assert summary["entries"] == 5
+        assert summary["plannedCalls"] == 9
+        assert summary["plannedCallsByBackend"] == {"az": 9, "rest": 7, "batch": 4}
+
+    def test_attachment_calls(self, tmp_path):
+        (tmp_path / "a.md").write_text("a")
+        (tmp_path / "b.md").write_text("b")
+        diff = make_diff()
+        diff["storyFilePaths"] = {"1.1": str(tmp_path / "a.md"), "2.1": str(tmp_path / "b.md")}
+        assert sync_devops.count_attachment_calls(diff) == 4
+        # Unchanged bytes are not re-uploaded; changed bytes replace the old relation
+        diff["stories"][0].update(attached="true", attachmentUrl="u1",
+                                  attachmentHash=sync_devops.file_digest(str(tmp_path / "a.md")))
+        diff["stories"][1].update(attached="true", attachmentUrl="u2", attachmentHash="old")
+        assert sync_devops.count_attachment_calls(diff) == 3
+
+    def test_pruned_stories_count_for_attachments(self, tmp_path):
+        (tmp_path / "c.md").write_text("c")
+        diff = make_diff()
+        diff["storyFilePaths"] = {"3.1": str(tmp_path / "c.md")}
+        diff["pruned"] = {"stories": [{"id": "3.1", "epicId": "3", "classification": "UNCHANGED",
+                                       "devopsId": 70, "contentHash": "s31"}]}
+        assert sync_devops.count_attachment_calls(diff) == 2
+
+    def test_pruned_items_plan_nothing(self):
+        diff = make_diff()
+        diff["pruned"] = {
+            "epics": [{"id": "3", "classification": "UNCHANGED", "devopsId": 70, "contentHash": "e3"}],
+            "stories": [{"id": "3.1", "epicId": "3", "classification": "UNCHANGED", "devopsId": 71}],
+            "tasks": [],
+        }
+        ops = sync_devops.plan_operations(CONFIG, diff)
+        assert all(op["id"] not in ("3", "3.1") for op in ops)
+        ctx = sync_devops.new_sync_context(diff)
+        assert ctx["results"]["epics"]["pruned"] == 1
+        assert ctx["results"]["stories"]["pruned"] == 1
+        assert "3" not in ctx["idMaps"]["epics"]
+
+    def test_changed_fields_limit_updates(self):
+        diff = make_diff()
+        diff["stories"][1]["changedFields"] = ["acceptanceCriteria"]
+        diff["stories"][1]["acceptanceCriteria"] = "Given Y"
+        diff["epics"].append({"id": "3", "title": "E3", "classification": "CHANGED", "devopsId": 70,
+                              "changedFields": ["phase"]})
+        diff["epicStatuses"] = {"3": "done"}
+        diff["storyStatuses"]["2.1"] = "done"
+        ops = sync_devops.plan_operations(CONFIG, diff)
+        # Only the acceptance criteria are sent, no state since the status did not change
+        assert [(op["op"], op["args"][5]) for op in ops if op["id"] == "2.1" and op["op"] != "iteration"] == [
+            ("update", "--fields")]
+        # Nothing Azure DevOps shows changed for the epic
+        assert not [op for op in ops if op["id"] == "3"]
+
+    def test_status_change_sends_only_state(self):
+        diff = make_diff()
+        diff["stories"][1]["changedFields"] = ["status"]
+        diff["storyStatuses"]["2.1"] = "done"
+        ops = [op for op in sync_devops.plan_operations(CONFIG, diff) if op["id"] == "2.1"]
+        assert [op["op"] for op in ops if op["op"] != "iteration"] == ["state"]
+
+    def test_moved_items_keep_work_items(self):
+        diff = make_diff()
+        diff["stories"].append({"id": "2.2", "epicId": "2", "title": "S22", "classification": "MOVED",
+                                "devopsId": 61, "movedFrom": "2.1", "contentHash": "s", "previousHash": "s"})
+        diff["stories"].append({"id": "2.3", "epicId": "2", "title": "S23", "classification": "MOVED",
+                                "devopsId": 62, "movedFrom": "2.2", "contentHash": "new", "previousHash": "old"})
+        diff["stories"].append({"id": "2.1", "classification": "ORPHANED", "devopsId": 99, "contentHash": "x"})
+        ops = sync_devops.plan_operations(CONFIG, diff)
+        assert not [op for op in ops if op["id"] == "2.2"]
+        assert [op["op"] for op in ops if op["id"] == "2.3"] == ["update"]
+        ctx = sync_devops.new_sync_context(diff)
+        assert [m["movedFrom"] for m in ctx["results"]["stories"]["moved"]] == ["2.1", "2.2"]
+        assert ctx["idMaps"]["stories"]["2.2"] == 61
+        # The orphan reusing a live ID does not take over its mapping
+        assert ctx["idMaps"]["stories"]["2.1"] == 60
+
+
+class TestExecutePlan:
+    def _run(self, runner, diff=None, native_relations=False):
+        diff = diff or make_diff()
+        entries = sync_devops.optimize_plan(sync_devops.plan_operations(CONFIG, diff))
+        ctx = sync_devops.new_sync_context(diff)
+        sync_devops.execute_plan(runner, entries, ctx, native_relations=native_relations)
+        return ctx
+
+    def test_az_backend_links_with_separate_call(self):
+        runner = FakeRunner()
+        ctx = self._run(runner)
+        commands = [tuple(args[:4]) for args, _ in runner.calls]
+        assert commands.count(("boards", "work-item", "relation", "add")) == 2
+        assert len(runner.calls) == 7
+        assert ctx["idMaps"]["stories"] == {"1.1": 102, "2.1": 60}
+        assert ctx["results"]["stories"]["created"] == [
+            {"id": "1.1", "devopsId": 102, "epicDevopsId": 101, "contentHash": "s11"}
+        ]
+        assert ctx["results"]["tasks"]["created"][0]["storyDevopsId"] == 102
+        assert ctx["results"]["epics"]["skipped"] == [{"id": "2", "classification": "UNCHANGED"}]
+        assert ctx["results"]["iterations"]["created"][0]["devopsId"] == "it-epic-1-e1"
+        assert ctx["results"]["iterations"]["skipped"][0]["slug"] == "epic-2-e2"
+        moved = [(m["type"], m["id"]) for m in ctx["results"]["iterations"]["movements"]]
+        assert moved == [("epic", "1"), ("story", "1.1"), ("story", "2.1"), ("task", "1.1-T1")]
+
+    def test_native_relations_send_one_request_per_item(self):
+        runner = FakeRunner()
+        self._run(runner, native_relations=True)
+        assert len(runner.calls) == 5
+        assert [parent for _, parent in runner.calls] == [None, None, 101, None, 102]
+
+    def test_failed_iteration_node_is_not_applied(self):
+        runner = FakeRunner(fail_commands={("boards", "iteration", "project", "create")})
+        ctx = self._run(runner)
+        epic_args = runner.calls[1][0]
+        assert epic_args[epic_args.index("--iteration") + 1] == "P\\Sprints"
+        assert ctx["results"]["iterations"]["failed"][0]["slug"] == "epic-1-e1"
+        moved = [m["id"] for m in ctx["results"]["iterations"]["movements"]]
+        assert moved == ["2.1"]
+
+    def test_failed_create_is_recorded(self):
+        runner = FakeRunner(fail_titles={"S11"})
+        ctx = self._run(runner)
+        assert ctx["results"]["stories"]["failed"] == [{"id": "1.1", "error": "boom"}]
+        assert "1.1" not in ctx["idMaps"]["stories"]
+        movement = [m for m in ctx["results"]["iterations"]["movements"] if m["id"] == "1.1"][0]
+        assert movement["status"] == "failed"
+
+
+class TestConcurrentExecutePlan:
+    def _entries(self, diff):
+        return sync_devops.optimize_plan(sync_devops.plan_operations(CONFIG, diff))
+
+    def test_dependencies(self):
+        entries = self._entries(make_diff())
+        # iteration, epic 1, story 1.1, story 2.1, task 1.1-T1
+        assert sync_devops.plan_dependencies(entries) == [[], [0], [1, 0], [], [2, 0]]
+
+    def test_children_wait_for_parent_ids(self):
+        runner = FakeRunner()
+        diff = make_diff()
+        ctx = sync_devops.new_sync_context(diff)
+        sync_devops.execute_plan(runner, self._entries(diff), ctx, native_relations=True, jobs=4)
+        story = ctx["results"]["stories"]["created"][0]
+        task = ctx["results"]["tasks"]["created"][0]
+        assert story["epicDevopsId"] == ctx["idMaps"]["epics"]["1"]
+        assert task["storyDevopsId"] == story["devopsId"]
+        assert len(ctx["results"]["iterations"]["movements"]) == 4
+
+    def test_independent_items_run_concurrently(self):
+        diff = {"epics": [
+            {"id": str(n), "title": f"E{n}", "classification": "NEW"} for n in range(1, 4)
+        ]}
+        barrier = threading.Barrier(3, timeout=5)
+        runner = FakeRunner()
+
+        def blocking_runner(args, timeout=None, parent=None):
+            barrier.wait()  # only passes if all three creates are in flight at once
+            return runner(args, timeout, parent)
+
+        ctx = sync_devops.new_sync_context(diff)
+        sync_devops.execute_plan(blocking_runner, self._entries(diff), ctx, jobs=3)
+        assert sorted(ctx["idMaps"]["epics"].values()) == [101, 102, 103]
+
+
+class TestCircuitBreaker:
+    @pytest.mark.parametrize("err,signature", [
+        ("HTTP 401: Unauthorized", "HTTP 401"),
+        ("ERROR: TF400813: The user is not authorized to access this resource.", "HTTP 401"),
+        ("HTTP 403: Forbidden", "HTTP 403"),
+        ("TF401019: The Git repository with name or identifier x does not exist", "TF401019"),
+        ("TF200016: The following project does not exist: Nope", "project-not-found"),
+        ("HTTP 400: TF401320: Rule Error", None),
+        (None, None),
+    ])
+    def test_fatal_error_signature(self, err, signature):
+        assert sync_devops.fatal_error_signature(err) == signature
+
+    def test_opens_after_consecutive_identical_errors(self):
+        breaker = sync_devops.CircuitBreaker(threshold=3)
+        breaker.record("HTTP 401: Unauthorized")
+        breaker.record("HTTP 401: Unauthorized")
+        assert not breaker.is_open
+        breaker.record("HTTP 401: Unauthorized")
+        assert breaker.is_open
+        assert "3 consecutive HTTP 401" in breaker.reason
+
+    def test_streak_resets_on_success_or_other_error(self):
+        breaker = sync_devops.CircuitBreaker(threshold=2)
+        breaker.record("HTTP 401: Unauthorized")
+        breaker.record(None)
+        breaker.record("HTTP 401: Unauthorized")
+        breaker.record("HTTP 403: Forbidden")
+        assert not breaker.is_open
+
+    def test_open_circuit_leaves_remaining_items_pending(self):
+        diff = make_diff()
+        calls = []
+
+        def unauthorized(args, timeout=None, parent=None):
+            calls.append(args)
+            return None, "HTTP 401: Unauthorized"
+
+        entries = sync_devops.optimize_plan(sync_devops.plan_operations(CONFIG, diff))
+        ctx = sync_devops.new_sync_context(diff, sync_devops.CircuitBreaker(threshold=2))
+        sync_devops.execute_plan(unauthorized, entries, ctx)
+        assert len(calls) == 2
+        assert ctx["breaker"].is_open
+        results = ctx["results"]
+        assert results["iterations"]["failed"][0]["slug"] == "epic-1-e1"
+        assert results["epics"]["failed"][0]["id"] == "1"
+        assert [p["id"] for p in results["stories"]["pending"]] == ["1.1", "2.1"]
+        assert results["stories"]["pending"][1] == {
+            "id": "2.1", "action": "update", "operations": ["update", "iteration"], "devopsId": 60
+        }
+        assert [p["id"] for p in results["tasks"]["pending"]] == ["1.1-T1"]
+
+
+class TestOperationJournal:
+    def _run(self, runner, diff, journal, entries=None, ctx=None):
+        entries = entries if entries is not None else sync_devops.optimize_plan(
+            sync_devops.plan_operations(CONFIG, diff))
+        ctx = ctx or sync_devops.new_sync_context(diff)
+        ctx["journal"] = journal
+        sync_devops.execute_plan(runner, entries, ctx)
+        return ctx
+
+    def test_confirmed_operations_are_journaled(self, tmp_path):
+        path = str(tmp_path / "sync.journal.jsonl")
+        journal = sync_devops.OperationJournal(path, "abc")
+        journal.open()
+        self._run(FakeRunner(fail_titles={"S11"}), make_diff(), journal)
+        journal.close()
+        header, done = sync_devops.load_journal(path)
+        assert header == {"event": "start", "version": 1, "diff": "abc"}
+        # Story 1.1 failed, so neither it nor anything else about it is journaled
+        assert sorted(done) == [("epics", "1"), ("iterations", "epic-1-e1"),
+                                ("stories", "2.1"), ("tasks", "1.1-T1")]
+        assert done[("epics", "1")]["devopsId"] == 101
+        assert done[("epics", "1")]["movement"]["status"] == "moved"
+        assert done[("tasks", "1.1-T1")]["needsLink"] is False  # parent story never got an ID
+
+    def test_journal_written_outside_context_lock(self, tmp_path):
+        ctx = sync_devops.new_sync_context(make_diff())
+        held = []
+
+        class Journal(sync_devops.OperationJournal):
+            def _append(self, event):
+                held.append(ctx["lock"].locked())
+                super()._append(event)
+
+        journal = Journal(str(tmp_path / "sync.journal.jsonl"))
+        journal.open()
+        self._run(FakeRunner(), make_diff(), journal, ctx=ctx)
+        journal.close()
+        assert len(held) > 1
+        assert not any(held)
+
+    def test_resume_skips_done_and_finishes_links(self, tmp_path):
+        path = str(tmp_path / "sync.journal.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"event": "start", "version": 1, "diff": "abc"}) + "\n")
+            for kind, item_id, action, devops_id, needs_link in [
+                ("iterations", "epic-1-e1", "createIteration", "it-1", False),
+                ("epics", "1", "create", 101, False),
+                ("stories", "1.1", "create", 102, True),
+            ]:
+                record = {"id": item_id, "devopsId": devops_id}
+                f.write(json.dumps({"event": "done", "kind": kind, "id": item_id, "action": action,
+                                    "devopsId": devops_id, "record": record, "movement": None,
+                                    "needsLink": needs_link}) + "\n")
+            f.write('{"event": "done", "kind": "tasks", "id": "1.1-T')  # torn write
+
+        diff = make_diff()
+        _, done = sync_devops.load_journal(path)
+        ctx = sync_devops.new_sync_context(diff)
+        entries = sync_devops.apply_journal(
+            sync_devops.optimize_plan(sync_devops.plan_operations(CONFIG, diff)), ctx, done)
+        assert [(e["id"], bool(e.get("linkOnly"))) for e in entries] == [
+            ("1.1", True), ("2.1", False), ("1.1-T1", False)
+        ]
+        assert ctx["idMaps"]["stories"]["1.1"] == 102
+
+        runner = FakeRunner()
+        journal = sync_devops.OperationJournal(path, "abc")
+        journal.open()
+        ctx = self._run(runner, diff, journal, entries, ctx)
+        journal.close()
+        commands = [args[:4] for args, _ in runner.calls]
+        assert commands[0] == ["boards", "work-item", "relation", "add"]
+        assert ["boards", "work-item", "create"] == commands[2][:3]  # only the task is created
+        assert len([c for c in commands if c[:3] == ["boards", "work-item", "create"]]) == 1
+        assert ctx["results"]["tasks"]["created"][0]["storyDevopsId"] == 102
+        _, done = sync_devops.load_journal(path)
+        assert done[("stories", "1.1")]["needsLink"] is False
+
+    def test_stop_leaves_remaining_entries_pending(self):
+        diff = make_diff()
+        ctx = sync_devops.new_sync_context(diff)
+        runner = FakeRunner()
+
+        def stopping_runner(args, timeout=None, parent=None):
+            ctx["stop"].set()  # Ctrl+C while the first call is in flight
+            return runner(args, timeout, parent)
+
+        self._run(stopping_runner, diff, None, ctx=ctx)
+        assert len(runner.calls) == 1
+        assert ctx["results"]["iterations"]["created"][0]["slug"] == "epic-1-e1"
+        assert [p["id"] for p in ctx["results"]["epics"]["pending"]] == ["1"]
+
+
+class FakeBatchBackend:
+    """Stand-in for RestBackend with $batch that assigns IDs and resolves temp IDs."""
+
+    org_url = "https://dev.azure.com/myorg"
+    project = "P"
+
+    def __init__(self, fail_titles=()):
+        self.calls = []
+        self.single_calls = []
+        self.next_id = 100
+        self.fail_titles = set(fail_titles)
+
+    def __call__(self, args, timeout=None, parent=None):
+        self.single_calls.append(args)
+        return {"identifier": "it"}, None
+
+    def batch(self, requests):
+        self.calls.append(requests)
+        temp_to_real = {}
+        results = []
+        for req in requests:
+            ops = {op["path"]: op["value"] for op in req["body"]}
+            if ops.get("/fields/System.Title") in self.fail_titles:
+                results.append((None, "HTTP 400: boom"))
+                continue
+            if "/id" in ops:
+                self.next_id += 1
+                temp_to_real[ops["/id"]] = self.next_id
+                parent = ops.get("/relations/-", {}).get("url", "").rsplit("/", 1)[-1]
+                results.append(({"id": self.next_id, "parent": temp_to_real.get(parent, parent)}, None))
+            else:
+                results.append(({"id": int(req["uri"].split("/")[-1].split("?")[0])}, None))
+        return results, None
+
+
+class TestExecutePlanBatch:
+    def _run(self, backend, batch_size=200):
+        diff = make_diff()
+        entries = sync_devops.optimize_plan(sync_devops.plan_operations(CONFIG, diff))
+        ctx = sync_devops.new_sync_context(diff)
+        sync_devops.execute_plan_batch(backend, entries, ctx, batch_size=batch_size)
+        return ctx
+
+    def test_single_batch_links_via_temp_ids(self):
+        backend = FakeBatchBackend()
+        ctx = self._run(backend)
+        assert len(backend.single_calls) == 1  # iteration node
+        assert len(backend.calls) == 1
+        assert ctx["idMaps"]["epics"] == {"1": 101, "2": 50}
+        assert ctx["idMaps"]["stories"] == {"1.1": 102, "2.1": 60}
+        assert ctx["idMaps"]["tasks"] == {"1.1-T1": 103}
+        assert ctx["results"]["stories"]["created"] == [
+            {"id": "1.1", "devopsId": 102, "epicDevopsId": 101, "contentHash": "s11"}
+        ]
+        story_req = backend.calls[0][1]
+        fields = {op["path"]: op["value"] for op in story_req["body"]}
+        assert fields["/fields/System.State"] == "Active"
+        assert fields["/fields/System.IterationPath"] == "P\\Sprints\\epic-1-e1"
+
+    def test_chunks_resolve_parents_from_earlier_batches(self):
+        backend = FakeBatchBackend()
+        ctx = self._run(backend, batch_size=1)
+        assert len(backend.calls) == 4
+        # Task was sent after its story was created, so the real ID is referenced
+        task_req = backend.calls[3][0]
+        relation = [op for op in task_req["body"] if op["path"] == "/relations/-"][0]
+        assert relation["value"]["url"].endswith("/workItems/102")
+        assert ctx["idMaps"]["tasks"]["1.1-T1"] == 103
+
+    def test_failures_land_in_failed_list(self):
+        backend = FakeBatchBackend(fail_titles={"S11"})
+        ctx = self._run(backend)
+        assert ctx["results"]["stories"]["failed"] == [{"id": "1.1", "error": "HTTP 400: boom"}]
+        assert "1.1" not in ctx["idMaps"]["stories"]
@@ -202,6 +202,34 @@ class TestWriteSyncState:
         assert "devopsId: 430" in content
         assert 'epicId: "2"' in content
 
+    def test_attachment_hash_and_url_written(self, tmp_path):
+        diff_results = {
+            "epics": [],
+            "stories": [
+                {"id": "1.1", "epicId": "1", "contentHash": "a", "classification": "CHANGED", "devopsId": 200,
+                 "attached": "true", "attachmentHash": "old", "attachmentUrl": "https://x/att/old"},
+                {"id": "1.2", "epicId": "1", "contentHash": "b", "classification": "UNCHANGED", "devopsId": 201,
+                 "attached": "true", "attachmentHash": "kept", "attachmentUrl": "https://x/att/kept"},
+            ],
+            "tasks": [],
+            "iterations": [],
+        }
+        sync_results = {
+            "storyIdMap": {"1.1": 200},
+            "stories": {"attachedIds": ["1.1", "1.2"],
+                        "attachments": {"1.1": {"hash": "new", "url": "https://x/att/new"}}},
+            "iterations": {"created": [], "failed": [], "skipped": [], "movements": []},
+        }
+        output = str(tmp_path / "sync.yaml")
+
+        write_sync_state.write_sync_state(diff_results, sync_results, {"projectName": "P"}, "2026-01-01T00:00:00Z", output)
+
+        content = open(output, encoding="utf-8").read()
+        assert 'attachmentHash: "new"' in content
+        assert 'attachmentUrl: "https://x/att/new"' in content
+        assert 'attachmentHash: "kept"' in content
+        assert "old" not in content
+
     def test_orphaned_items_excluded(self, tmp_path):
         diff_results = {
             "epics": [
@@ -226,3 +254,167 @@ class TestWriteSyncState:
         assert counts["epics"] == 1
         content = open(output, encoding="utf-8").read()
         assert '"99"' not in content
+
+    def _tree_diff(self):
+        return {
+            "epics": [{"id": "1", "contentHash": "e1", "treeHash": "te1", "classification": "CHANGED",
+                       "devopsId": 100}],
+            "stories": [
+                {"id": "1.1", "epicId": "1", "contentHash": "s11", "treeHash": "ts11",
+                 "classification": "NEW", "devopsId": None},
+                {"id": "1.2", "epicId": "1", "contentHash": "s12", "treeHash": "ts12",
+                 "classification": "UNCHANGED", "devopsId": 201},
+            ],
+            "tasks": [{"id": "1.1-T1", "storyId": "1.1", "contentHash": "t1", "classification": "NEW",
+                       "devopsId": None}],
+            "iterations": [],
+        }
+
+    def test_tree_hash_written_for_synced_subtree(self, tmp_path):
+        sync_results = {"epicIdMap": {"1": 100}, "storyIdMap": {"1.1": 200, "1.2": 201},
+                        "taskIdMap": {"1.1-T1": 300}}
+        output = str(tmp_path / "sync.yaml")
+        write_sync_state.write_sync_state(self._tree_diff(), sync_results, {}, "2026-01-01T00:00:00Z", output)
+        content = open(output, encoding="utf-8").read()
+        assert 'treeHash: "te1"' in content
+        assert 'treeHash: "ts11"' in content
+        assert 'treeHash: "ts12"' in content
+
+    def test_tree_hash_omitted_above_failed_item(self, tmp_path):
+        sync_results = {"epicIdMap": {"1": 100}, "storyIdMap": {"1.1": 200, "1.2": 201}, "taskIdMap": {},
+                        "tasks": {"failed": [{"id": "1.1-T1", "error": "boom"}]}}
+        output = str(tmp_path / "sync.yaml")
+        write_sync_state.write_sync_state(self._tree_diff(), sync_results, {}, "2026-01-01T00:00:00Z", output)
+        content = open(output, encoding="utf-8").read()
+        assert 'treeHash: "te1"' not in content
+        assert 'treeHash: "ts11"' not in content
+        assert 'treeHash: "ts12"' in content
+
+    def test_pruned_items_written(self, tmp_path):
+        diff_results = {
+            "epics": [], "stories": [], "tasks": [], "iterations": [],
+            "pruned": {
+                "epics": [{"id": "2", "classification": "UNCHANGED", "devopsId": 50, "contentHash": "e2",
+                           "treeHash": "te2"}],
+                "stories": [{"id": "2.1", "epicId": "2", "classification": "UNCHANGED", "devopsId": 60,
+                             "contentHash": "s21", "treeHash": "ts21", "attached": "true",
+                             "attachmentHash": "f00d", "attachmentUrl": "u"}],
+                "tasks": [{"id": "2.1-T1", "storyId": "2.1", "classification": "UNCHANGED", "devopsId": 70,
+                           "contentHash": "t1"}],
+            },
+        }
+        output = str(tmp_path / "sync.yaml")
+        counts = write_sync_state.write_sync_state(diff_results, {}, {}, "2026-01-01T00:00:00Z", output)
+        assert (counts["epics"], counts["stories"], counts["tasks"]) == (1, 1, 1)
+        content = open(output, encoding="utf-8").read()
+        assert 'treeHash: "te2"' in content
+        assert 'attachmentHash: "f00d"' in content
+        # Parents that were pruned still give their children parent IDs
+        assert "epicDevopsId: 50" in content
+        assert "storyDevopsId: 60" in content
+
+    def test_titles_written_for_move_detection(self, tmp_path):
+        diff_results = {
+            "epics": [{"id": "1", "title": 'Say "hi"\tnow', "contentHash": "e1", "classification": "UNCHANGED",
+                       "devopsId": 10}],
+            "stories": [{"id": "1.2", "epicId": "1", "title": "C:\\path  story", "contentHash": "s12",
+                         "classification": "MOVED", "devopsId": 20, "movedFrom": "1.1"}],
+            "tasks": [], "iterations": [],
+        }
+        sync_results = {"epicIdMap": {"1": 10}, "storyIdMap": {"1.2": 20}, "taskIdMap": {}}
+        output = str(tmp_path / "sync.yaml")
+        write_sync_state.write_sync_state(diff_results, sync_results, {}, "2026-01-01T00:00:00Z", output)
+        content = open(output, encoding="utf-8").read()
+        assert "title: \"Say 'hi' now\"" in content
+        assert 'title: "C:/path story"' in content
+        assert '"1.1"' not in content
+        state = importlib.import_module("compute-hashes").load_sync_state(output)
+        assert state["stories"]["1.2"]["title"] == "C:/path story"
+        assert state["stories"]["1.2"]["devopsId"] == 20
+
+    def test_task_title_from_description(self, tmp_path):
+        diff_results = {"epics": [], "stories": [], "iterations": [],
+                        "tasks": [{"id": "1.1-Tabc123", "storyId": "1.1", "description": "Build  API",
+                                   "contentHash": "t1", "classification": "NEW"}]}
+        sync_results = {"taskIdMap": {"1.1-Tabc123": 30}}
+        output = str(tmp_path / "sync.yaml")
+        write_sync_state.write_sync_state(diff_results, sync_results, {}, "2026-01-01T00:00:00Z", output)
+        assert 'title: "Build API"' in open(output, encoding="utf-8").read()
+
+    def test_task_position_written(self, tmp_path):
+        diff_results = {"epics": [], "stories": [], "iterations": [],
+                        "tasks": [{"id": "1.1-Tabc123", "storyId": "1.1", "description": "Build",
+                                   "legacyId": "1.1-T2", "contentHash": "t1", "classification": "NEW"}]}
+        output = str(tmp_path / "sync.yaml")
+        write_sync_state.write_sync_state(diff_results, {"taskIdMap": {"1.1-Tabc123": 30}}, {},
+                                          "2026-01-01T00:00:00Z", output)
+        state = importlib.import_module("compute-hashes").load_sync_state(output)
+        assert state["tasks"]["1.1-Tabc123"]["legacyId"] == "1.1-T2"
+
+    def test_field_hashes_written(self, tmp_path):
+        diff_results = {"epics": [], "stories": [], "iterations": [],
+                        "tasks": [{"id": "1.1-Tabc123", "storyId": "1.1", "contentHash": "t1",
+                                   "classification": "CHANGED", "devopsId": 30,
+                                   "fieldHashes": {"title": "aaaa1111", "status": "bbbb2222"}}],
+                        "pruned": {"tasks": [{"id": "1.1-Tdef456", "storyId": "1.1", "contentHash": "t2",
+                                              "classification": "UNCHANGED", "devopsId": 31,
+                                              "fieldHashes": "title=cccc3333"}]}}
+        output = str(tmp_path / "sync.yaml")
+        write_sync_state.write_sync_state(diff_results, {}, {}, "2026-01-01T00:00:00Z", output)
+        content = open(output, encoding="utf-8").read()
+        assert 'fieldHashes: "title=aaaa1111;status=bbbb2222"' in content
+        assert 'fieldHashes: "title=cccc3333"' in content
+
+    def test_aborted_sync_is_retried_by_next_diff(self, tmp_path):
+        compute_hashes = importlib.import_module("compute-hashes")
+        output = str(tmp_path / "sync.yaml")
+
+        def diff(stories):
+            state = compute_hashes.load_sync_state(output)
+            return compute_hashes.classify_items(
+                stories, state["stories"], compute_hashes.hash_story,
+                fields_fn=lambda s: compute_hashes.field_hashes(compute_hashes.story_field_values(s)))
+
+        story = {"id": "1.1", "epicId": "1", "title": "Login", "userStoryText": "As a user",
+                 "acceptanceCriteria": "Works"}
+        first = diff([story])
+        write_sync_state.write_sync_state({"stories": first}, {"storyIdMap": {"1.1": 20}}, {},
+                                          "2026-01-01T00:00:00Z", output)
+
+        # The breaker aborts before the edited 1.1 is updated and the new 1.2 created
+        edited = dict(story, acceptanceCriteria="Works on Edge")
+        added = {"id": "1.2", "epicId": "1", "title": "Logout", "userStoryText": "As a user",
+                 "acceptanceCriteria": "Ends session"}
+        second = diff([edited, added])
+        assert [s["classification"] for s in second] == ["CHANGED", "NEW"]
+        aborted = {"status": "aborted", "storyIdMap": {"1.1": 20},
+                   "stories": {"pending": [{"id": "1.1"}, {"id": "1.2"}]}}
+        counts = write_sync_state.write_sync_state({"stories": second}, aborted, {},
+                                                   "2026-01-02T00:00:00Z", output)
+        assert counts["pending_stories"] == 1
+        state = compute_hashes.load_sync_state(output)
+        assert state["stories"]["1.1"]["contentHash"] == first[0]["contentHash"]
+        assert state["stories"]["1.1"]["status"] == "pending"
+        assert "contentHash" not in state["stories"]["1.2"]
+
+        retry = {s["id"]: s for s in diff([edited, added])}
+        assert retry["1.1"]["classification"] == "CHANGED"
+        assert retry["1.1"]["devopsId"] == 20
+        assert retry["1.1"]["changedFields"] == ["acceptanceCriteria"]
+        assert retry["1.2"]["classification"] == "NEW"
+
+        # Once the retry goes through, the next diff is clean
+        write_sync_state.write_sync_state({"stories": list(retry.values())},
+                                          {"storyIdMap": {"1.1": 20, "1.2": 21}}, {},
+                                          "2026-01-03T00:00:00Z", output)
+        assert [s["classification"] for s in diff([edited, added])] == ["UNCHANGED", "UNCHANGED"]
+
+    def test_pending_entry_with_work_item_is_changed(self, tmp_path):
+        compute_hashes = importlib.import_module("compute-hashes")
+        story = {"id": "1.1", "title": "Login"}
+        stored = {"1.1": {"devopsId": 20, "contentHash": compute_hashes.hash_story(story), "status": "pending"},
+                  "1.2": {"contentHash": "stale", "status": "pending"}}
+        results = {r["id"]: r for r in compute_hashes.classify_items(
+            [story, {"id": "1.2", "title": "Logout"}], stored, compute_hashes.hash_story)}
+        assert results["1.1"]["classification"] == "CHANGED"
+        assert results["1.2"]["classification"] == "NEW"